@@ -0,0 +1,33 @@
+-- Migration: Job leases and replay claiming for multi-instance deployments
+-- Date: 2026-10-19
+-- Description: Allows several backend replicas to share the scheduler safely
+-- Includes: job_leases table (singleton cron jobs), claim columns on replays (parse queue)
+
+-- ============================================================================
+-- 1. Job leases: one row per scheduled job, owned by at most one instance
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS job_leases (
+  job_name VARCHAR(100) NOT NULL PRIMARY KEY,
+  holder_id VARCHAR(255) NULL DEFAULT NULL,
+  lease_until DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  heartbeat_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  acquired_at DATETIME NULL DEFAULT NULL,
+  INDEX idx_job_leases_lease_until (lease_until)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================================================
+-- 2. Replay claims: rows picked by a parser instance via FOR UPDATE SKIP LOCKED
+-- ============================================================================
+
+ALTER TABLE replays
+ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(255) NULL DEFAULT NULL;
+
+ALTER TABLE replays
+ADD COLUMN IF NOT EXISTS claim_expires_at DATETIME NULL DEFAULT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_replays_parse_queue
+ON replays(parse_status, parsed, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_replays_claimed_by
+ON replays(claimed_by);
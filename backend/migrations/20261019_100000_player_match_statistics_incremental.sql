@@ -0,0 +1,28 @@
+-- Migration: Incremental maintenance of player_match_statistics
+-- Date: 2026-10-19
+-- Description: Lets each created match upsert only the rows it touches instead of
+-- the nightly TRUNCATE-and-rebuild
+-- Includes: stat_key natural key (unique), elo_change_sum running total
+
+-- ============================================================================
+-- 1. Running ELO change total (avg_elo_change = elo_change_sum / total_games)
+-- ============================================================================
+
+ALTER TABLE player_match_statistics
+ADD COLUMN IF NOT EXISTS elo_change_sum DECIMAL(12,2) NOT NULL DEFAULT 0.00;
+
+UPDATE player_match_statistics
+SET elo_change_sum = ROUND(COALESCE(avg_elo_change, 0) * COALESCE(total_games, 0), 2);
+
+-- ============================================================================
+-- 2. Natural key over the nullable dimensions so deltas can use ON DUPLICATE KEY UPDATE
+-- ============================================================================
+
+ALTER TABLE player_match_statistics
+ADD COLUMN IF NOT EXISTS stat_key VARCHAR(200) AS (
+  CONCAT_WS('|', player_id, COALESCE(opponent_id, ''), COALESCE(map_id, ''),
+            COALESCE(faction_id, ''), COALESCE(opponent_faction_id, ''), player_side)
+) PERSISTENT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_player_match_statistics_stat_key
+ON player_match_statistics(stat_key);
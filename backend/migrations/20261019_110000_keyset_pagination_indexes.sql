@@ -0,0 +1,11 @@
+-- Migration: Indexes for keyset pagination of match listings
+-- Date: 2026-10-19
+-- Description: Match listings page by (created_at, id) instead of LIMIT/OFFSET.
+-- The global listing is served by idx_created_at (InnoDB secondary indexes carry the primary key);
+-- per-player histories need the player column in front of created_at.
+
+CREATE INDEX IF NOT EXISTS idx_matches_winner_created ON matches(winner_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_matches_loser_created ON matches(loser_id, created_at);
+
+-- Pending replay listings merged into match pages (confidence=1, parsed, unlinked)
+CREATE INDEX IF NOT EXISTS idx_replays_pending_created ON replays(integration_confidence, parsed, created_at);
@@ -0,0 +1,6 @@
+-- Migration: Index users_extension.updated_at
+-- Date: 2026-10-19
+-- Description: The in-memory leaderboard (services/leaderboardService.ts) pulls players changed
+-- since its last sync every few seconds; this keeps that delta read off a full table scan.
+
+CREATE INDEX IF NOT EXISTS idx_users_extension_updated_at ON users_extension(updated_at);
@@ -0,0 +1,20 @@
+-- Migration: Per-day counters for global statistics
+-- Date: 2026-10-19
+-- Description: services/globalStatisticsService.ts keeps one counter per metric and day
+-- (new users, ranked matches, played tournament matches, tournaments) instead of aggregating
+-- the whole history every 30 minutes. Days older than a year are folded into one archive
+-- bucket (1970-01-01), so every figure is a sum over at most 366 rows per metric.
+-- The buckets are filled by the service on first use.
+
+CREATE TABLE IF NOT EXISTS global_statistics_daily (
+  metric VARCHAR(32) NOT NULL,
+  bucket_date DATE NOT NULL,
+  value BIGINT NOT NULL DEFAULT 0,
+  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (metric, bucket_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Tournament match results are written from many places; the service re-counts only the
+-- creation days of rows changed since its last sync
+CREATE INDEX IF NOT EXISTS idx_tournament_matches_updated_at ON tournament_matches(updated_at);
+CREATE INDEX IF NOT EXISTS idx_tournament_matches_created_at ON tournament_matches(created_at);
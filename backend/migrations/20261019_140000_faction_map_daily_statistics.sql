@@ -0,0 +1,44 @@
+-- Migration: Daily faction/map/side aggregate for balance history
+-- Date: 2026-10-19
+-- Description: One row per day, map, faction, opponent faction and side with games and wins,
+-- kept up to date with the same per-match deltas as faction_map_statistics. Balance event
+-- impact windows and matchup trends become range sums over these buckets instead of a scan
+-- of every match joined to game_maps/factions by name.
+
+CREATE TABLE IF NOT EXISTS faction_map_daily_statistics (
+  map_id CHAR(36) NOT NULL,
+  faction_id CHAR(36) NOT NULL,
+  opponent_faction_id CHAR(36) NOT NULL,
+  faction_side TINYINT NOT NULL,
+  bucket_date DATE NOT NULL,
+  games INT NOT NULL DEFAULT 0,
+  wins INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (map_id, faction_id, opponent_faction_id, faction_side, bucket_date),
+  INDEX idx_faction_map_daily_bucket_date (bucket_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Backfill from every non-cancelled match, winner and loser perspective
+-- (same side convention as the faction_map_statistics rebuild: unknown winner_side counts as side 1)
+INSERT INTO faction_map_daily_statistics
+  (map_id, faction_id, opponent_faction_id, faction_side, bucket_date, games, wins)
+SELECT map_id, faction_id, opponent_faction_id, faction_side, bucket_date, COUNT(*), SUM(is_win)
+FROM (
+  SELECT gm.id AS map_id, f_w.id AS faction_id, f_l.id AS opponent_faction_id,
+         COALESCE(m.winner_side, 1) AS faction_side, DATE(m.created_at) AS bucket_date, 1 AS is_win
+  FROM matches m
+  JOIN game_maps gm ON gm.name = m.map
+  JOIN factions f_w ON f_w.name = m.winner_faction
+  JOIN factions f_l ON f_l.name = m.loser_faction
+  WHERE m.status != 'cancelled' AND m.created_at IS NOT NULL
+  UNION ALL
+  SELECT gm.id, f_l.id, f_w.id,
+         CASE COALESCE(m.winner_side, 1) WHEN 1 THEN 2 WHEN 2 THEN 1 ELSE 0 END,
+         DATE(m.created_at), 0
+  FROM matches m
+  JOIN game_maps gm ON gm.name = m.map
+  JOIN factions f_w ON f_w.name = m.winner_faction
+  JOIN factions f_l ON f_l.name = m.loser_faction
+  WHERE m.status != 'cancelled' AND m.created_at IS NOT NULL
+) perspectives
+GROUP BY map_id, faction_id, opponent_faction_id, faction_side, bucket_date
+ON DUPLICATE KEY UPDATE games = VALUES(games), wins = VALUES(wins);
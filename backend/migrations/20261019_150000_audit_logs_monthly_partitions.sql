@@ -0,0 +1,22 @@
+-- Migration: Partition audit_logs by month
+-- Date: 2026-10-19
+-- Description: audit_logs becomes RANGE-partitioned on created_at so retention
+-- (DELETE /admin/audit-logs/old) drops whole monthly partitions instead of running one
+-- table-locking DELETE. History up to this migration stays in p_initial; the audit log
+-- maintenance job (services/auditLogPartitions.ts) splits a partition per month off pmax
+-- ahead of time. The partitioning column has to be part of the primary key.
+
+UPDATE audit_logs SET created_at = NOW() WHERE created_at IS NULL;
+
+ALTER TABLE audit_logs
+  MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (id, created_at);
+
+ALTER TABLE audit_logs
+  PARTITION BY RANGE (TO_DAYS(created_at)) (
+    PARTITION p_initial VALUES LESS THAN (TO_DAYS('2026-11-01')),
+    PARTITION p202611 VALUES LESS THAN (TO_DAYS('2026-12-01')),
+    PARTITION p202612 VALUES LESS THAN (TO_DAYS('2027-01-01')),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+  );
@@ -0,0 +1,24 @@
+-- Migration: Persistent outbound queue for Discord messages
+-- Date: 2026-10-19
+-- Description: Tournament thread messages are stored in discord_outbox and delivered by the
+-- Discord dispatcher (services/discordOutbox.ts) instead of being posted inline from request
+-- handlers. Rows are claimed like replays (claimed_by/claim_expires_at), retried with backoff
+-- and kept with status 'dead' once they give up. payload is the JSON message body plus the
+-- Discord usernames to mention, resolved at send time.
+
+CREATE TABLE IF NOT EXISTS discord_outbox (
+  id BIGINT NOT NULL AUTO_INCREMENT,
+  channel_id VARCHAR(32) NOT NULL,
+  payload LONGTEXT NOT NULL,
+  status ENUM('pending', 'sending', 'sent', 'dead') NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  claimed_by VARCHAR(255) NULL DEFAULT NULL,
+  claim_expires_at DATETIME NULL DEFAULT NULL,
+  last_error TEXT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  sent_at DATETIME NULL DEFAULT NULL,
+  PRIMARY KEY (id),
+  INDEX idx_discord_outbox_due (status, next_attempt_at),
+  INDEX idx_discord_outbox_sent_at (status, sent_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
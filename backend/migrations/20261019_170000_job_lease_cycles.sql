@@ -0,0 +1,10 @@
+-- Migration: Remember the last completed cycle of each leased job
+-- Date: 2026-10-19
+-- Description: A scheduled job runs once per occurrence (e.g. per UTC day) across all replicas;
+-- a replica whose timer fires after the job finished elsewhere sees the cycle as done and skips it
+
+ALTER TABLE job_leases
+ADD COLUMN IF NOT EXISTS completed_cycle VARCHAR(64) NULL DEFAULT NULL;
+
+ALTER TABLE job_leases
+ADD COLUMN IF NOT EXISTS completed_at DATETIME NULL DEFAULT NULL;
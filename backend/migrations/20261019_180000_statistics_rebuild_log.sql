@@ -0,0 +1,47 @@
+-- Migration: Capture statistics deltas written during shadow-table rebuilds
+-- Date: 2026-10-19
+-- Description: Per-match deltas that land while player_match_statistics or faction_map_statistics
+-- is rebuilt are recorded here by every backend instance and recomputed into the shadow table
+-- before the RENAME swap; also makes the player_match_statistics natural key NULL-safe per part
+-- Includes: statistics_rebuilds (active flag per table), statistics_rebuild_log (touched keys),
+-- stat_key redefinition
+
+-- ============================================================================
+-- 1. Rebuild flag: one row per maintained table, active while a rebuild runs
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS statistics_rebuilds (
+  name VARCHAR(64) NOT NULL PRIMARY KEY,
+  active TINYINT(1) NOT NULL DEFAULT 0,
+  started_at DATETIME NULL DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================================================
+-- 2. Keys touched by deltas while a rebuild is active
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS statistics_rebuild_log (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  rebuild_name VARCHAR(64) NOT NULL,
+  entry_key VARCHAR(200) NOT NULL,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_statistics_rebuild_log_name (rebuild_name, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ============================================================================
+-- 3. stat_key: CONCAT_WS skips NULL arguments, so every part is COALESCEd
+-- ============================================================================
+
+ALTER TABLE player_match_statistics DROP INDEX IF EXISTS uq_player_match_statistics_stat_key;
+
+ALTER TABLE player_match_statistics
+DROP COLUMN IF EXISTS stat_key;
+
+ALTER TABLE player_match_statistics
+ADD COLUMN IF NOT EXISTS stat_key VARCHAR(200) AS (
+  CONCAT_WS('|', COALESCE(player_id, ''), COALESCE(opponent_id, ''), COALESCE(map_id, ''),
+            COALESCE(faction_id, ''), COALESCE(opponent_faction_id, ''), COALESCE(player_side, ''))
+) PERSISTENT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_player_match_statistics_stat_key
+ON player_match_statistics(stat_key);
@@ -0,0 +1,8 @@
+-- Migration: Remove empty and negative faction/map day buckets
+-- Date: 2026-10-19
+-- Description: -1 deltas for a day without a bucket used to insert rows with games = -1, and
+-- buckets decremented to zero were kept; both were summed into balance windows
+
+DELETE FROM faction_map_daily_statistics WHERE games <= 0;
+
+UPDATE faction_map_daily_statistics SET wins = 0 WHERE wins < 0;
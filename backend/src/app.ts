@@ -14,6 +14,8 @@ import replaysRoutes from './routes/replays.js';
 import schedulingRoutes from './routes/tournament-scheduling.js';
 import notificationsRoutes from './routes/notifications.js';
 import { generalLimiter } from './middleware/rateLimiter.js';
+import { queryContextMiddleware, renderPrometheusMetrics } from './config/queryMetrics.js';
+import { renderBcryptPoolMetrics } from './services/bcryptPool.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -60,6 +62,9 @@ const uploadsPath = path.join(__dirname, '..', 'uploads');
 app.use('/uploads', express.static(uploadsPath));
 console.log(`📁 Serving uploads from: ${uploadsPath}`);
 
+// Attribute database queries to the route that issued them (see config/queryMetrics.ts)
+app.use(queryContextMiddleware);
+
 // Apply general rate limiting to all API routes (except specific endpoints with stricter limits)
 app.use('/api/', generalLimiter);
 
@@ -85,6 +90,19 @@ app.get('/api/health', (req, res) => {
   res.json({ status: 'ok', timestamp: new Date().toISOString() });
 });
 
+// Prometheus scrape endpoint for query and password verification pool metrics
+// Requires the METRICS_TOKEN bearer token; without a configured token the endpoint does not exist
+app.get('/metrics', (req, res) => {
+  const token = process.env.METRICS_TOKEN;
+  if (!token) {
+    return res.status(404).send('Not found\n');
+  }
+  if (req.headers.authorization !== `Bearer ${token}`) {
+    return res.status(401).send('Unauthorized\n');
+  }
+  res.type('text/plain; version=0.0.4').send(renderPrometheusMetrics() + renderBcryptPoolMetrics());
+});
+
 // Global error handler - MUST be last
 app.use((err: any, req: express.Request, res: express.Response, next: express.NextFunction) => {
   console.error('Global error handler:', err);
@@ -1,7 +1,8 @@
-import mysql, { Pool, ResultSetHeader } from 'mysql2/promise';
+import mysql, { Pool, PoolConnection, ResultSetHeader } from 'mysql2/promise';
 import dotenv from 'dotenv';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { executeInstrumented, recordQuery } from './queryMetrics.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const envFile = process.env.NODE_ENV ? `.env.${process.env.NODE_ENV}` : '.env';
@@ -9,6 +10,9 @@ const envPath = path.resolve(__dirname, '../../', envFile);
 
 dotenv.config({ path: envPath });
 
+// Pool sizing is per deployment: DB_POOL_SIZE connections, DB_POOL_QUEUE_LIMIT waiting requests (0 = unbounded)
+const DB_POOL_SIZE = parseInt(process.env.DB_POOL_SIZE || '10', 10);
+
 const pool: Pool = mysql.createPool({
   host: process.env.DB_HOST || 'localhost',
   user: process.env.DB_USER,
@@ -16,8 +20,9 @@ const pool: Pool = mysql.createPool({
   database: process.env.DB_NAME || 'wesnoth_db',
   port: parseInt(process.env.DB_PORT || '3306'),
   waitForConnections: true,
-  connectionLimit: 10,
-  queueLimit: 0,
+  connectionLimit: DB_POOL_SIZE,
+  maxIdle: parseInt(process.env.DB_POOL_MAX_IDLE || String(DB_POOL_SIZE), 10),
+  queueLimit: parseInt(process.env.DB_POOL_QUEUE_LIMIT || '0', 10),
   charset: 'utf8mb4',
 });
 
@@ -33,122 +38,128 @@ interface QueryResult {
 }
 
 /**
- * Execute a query with PostgreSQL-compatible interface
- * Handles RETURNING clauses by using separate SELECT queries for MariaDB
+ * A PostgreSQL-style statement rewritten for MariaDB (computed once per distinct SQL text)
+ * INSERT/DELETE ... RETURNING run natively on MariaDB; UPDATE ... RETURNING is emulated
+ * with a re-SELECT on the same connection.
  */
-const query = async (sql: string, values?: any[]): Promise<QueryResult> => {
-  const connection = await pool.getConnection();
-  try {
-    // Convert PostgreSQL parameter syntax ($1, $2, etc.) to MySQL syntax (?)
-    let mariadbSql = sql;
-    const returningMatch = sql.match(/RETURNING\s+(.+?)(?:;|$)/i);
-    const hasReturning = !!returningMatch;
-    const isInsert = sql.trim().toUpperCase().startsWith('INSERT');
-    const isUpdate = sql.trim().toUpperCase().startsWith('UPDATE');
-    const isDelete = sql.trim().toUpperCase().startsWith('DELETE');
-    
-    // Extract WHERE clause for UPDATE queries (for retrieving updated rows)
-    const whereMatch = sql.match(/WHERE\s+(.+?)(?:\s+RETURNING|;|$)/i);
-    const whereClause = whereMatch ? whereMatch[1].trim() : null;
-    
-    if (values && values.length > 0) {
-      // Replace $1, $2, etc. with ?
-      mariadbSql = sql.replace(/\$\d+/g, '?');
-    }
-    
-    // Remove RETURNING clause from SQL
+interface TranslatedStatement {
+  sql: string;
+  updateReturning: {
+    selectSql: string;
+    // Indices into the original values array used by the WHERE clause ($2 → 1)
+    whereParamIndices: number[];
+  } | null;
+}
+
+const STATEMENT_CACHE_SIZE = 2000;
+const statementCache = new Map<string, TranslatedStatement>();
+
+const translateStatement = (sql: string, hasValues: boolean): TranslatedStatement => {
+  const cacheKey = hasValues ? sql : `\u0000${sql}`;
+  const cached = statementCache.get(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  // Convert PostgreSQL parameter syntax ($1, $2, etc.) to MySQL syntax (?)
+  let mariadbSql = hasValues ? sql.replace(/\$\d+/g, '?') : sql;
+  // Remove public. schema prefix if present
+  mariadbSql = mariadbSql.replace(/\bpublic\./gi, '');
+
+  let updateReturning: TranslatedStatement['updateReturning'] = null;
+  const returningMatch = sql.match(/RETURNING\s+(.+?)(?:;|$)/i);
+  if (returningMatch && sql.trim().toUpperCase().startsWith('UPDATE')) {
     mariadbSql = mariadbSql.replace(/\s+RETURNING\s+.*/gi, '');
-    
-    // Remove leading/trailing CURRENT_TIMESTAMP or other PostgreSQL functions
-    mariadbSql = mariadbSql.replace(/CURRENT_TIMESTAMP/gi, 'CURRENT_TIMESTAMP');
-    
-    // Remove public. schema prefix if present
-    mariadbSql = mariadbSql.replace(/\bpublic\./gi, '');
-    
-    // Execute the main query
-    const [results, fields] = await connection.execute<any>(mariadbSql, values || []);
-    
-    // Handle RETURNING for INSERT queries
-    if (hasReturning && isInsert && returningMatch) {
-      const [idResult] = await connection.execute<any>('SELECT LAST_INSERT_ID() as id');
-      if (idResult && Array.isArray(idResult) && idResult[0]) {
-        const lastId = (idResult[0] as any).id;
-        const returningCols = returningMatch[1].trim();
-        
-        // If RETURNING includes specific columns, fetch them by ID
-        if (returningCols !== '*' && returningCols !== 'id') {
-          // Get the table name from INSERT statement to fetch the row
-          const tableMatch = sql.match(/INSERT\s+INTO\s+(\w+)/i);
-          if (tableMatch) {
-            const tableName = tableMatch[1];
-            const [insertedRow] = await connection.execute<any>(
-              `SELECT ${returningCols} FROM ${tableName} WHERE id = ?`,
-              [lastId]
-            );
-            if (insertedRow && Array.isArray(insertedRow) && insertedRow[0]) {
-              return { rows: [insertedRow[0]], rowCount: 1 };
-            }
-          }
-        }
-        return { rows: [{ id: lastId }], rowCount: 1 };
-      }
+
+    // Extract WHERE clause and the parameters it uses for retrieving the updated rows
+    const whereMatch = sql.match(/WHERE\s+(.+?)(?:\s+RETURNING|;|$)/i);
+    const tableMatch = sql.match(/UPDATE\s+(\w+)/i);
+    if (whereMatch && tableMatch) {
+      const whereClause = whereMatch[1].trim();
+      updateReturning = {
+        selectSql: `SELECT ${returningMatch[1].trim()} FROM ${tableMatch[1]} WHERE ${whereClause.replace(/\$\d+/g, '?')}`,
+        whereParamIndices: (whereClause.match(/\$(\d+)/g) || []).map(match => parseInt(match.substring(1)) - 1)
+      };
     }
-    
-    // Handle RETURNING for UPDATE queries
-    if (hasReturning && isUpdate && returningMatch && whereClause) {
-      const affectedRows = (results as ResultSetHeader).affectedRows || 0;
-      
-      if (affectedRows > 0) {
-        const returningCols = returningMatch[1].trim();
-        
-        // For UPDATE RETURNING, we need to extract only WHERE clause parameters
-        // Extract parameter indices from WHERE clause ($2, $3, etc.)
-        const whereParams = [];
-        const paramMatches = whereClause.match(/\$(\d+)/g) || [];
-        const paramIndices: number[] = [];
-        
-        for (const match of paramMatches) {
-          const paramIndex = parseInt(match.substring(1)) - 1; // Convert $2 to index 1
-          if (paramIndex >= 0 && paramIndex < (values?.length || 0)) {
-            paramIndices.push(paramIndex);
-            whereParams.push(values![paramIndex]);
-          }
-        }
-        
-        // Get table name from UPDATE statement
-        const tableMatch = sql.match(/UPDATE\s+(\w+)/i);
-        if (tableMatch && whereParams.length > 0) {
-          const tableName = tableMatch[1];
-          // Replace PostgreSQL parameters in whereClause with MySQL ?
-          const convertedWhereClause = whereClause.replace(/\$\d+/g, '?');
-          const selectSql = `SELECT ${returningCols} FROM ${tableName} WHERE ${convertedWhereClause}`;
-          const [updatedRows] = await connection.execute<any>(
-            selectSql,
-            whereParams
-          );
-          
-          if (updatedRows && Array.isArray(updatedRows)) {
-            return { rows: updatedRows, rowCount: affectedRows };
-          }
-        }
+  }
+
+  const translated: TranslatedStatement = { sql: mariadbSql, updateReturning };
+  if (statementCache.size >= STATEMENT_CACHE_SIZE) {
+    // Evict the oldest entry (Map preserves insertion order)
+    statementCache.delete(statementCache.keys().next().value as string);
+  }
+  statementCache.set(cacheKey, translated);
+  return translated;
+};
+
+/**
+ * UPDATE ... RETURNING: run the UPDATE, then re-select the rows matched by its WHERE clause
+ */
+const runUpdateReturning = async (statement: TranslatedStatement, values: any[]): Promise<QueryResult> => {
+  const { selectSql, whereParamIndices } = statement.updateReturning!;
+  const requested = performance.now();
+  const connection = await pool.getConnection();
+  const started = performance.now();
+  try {
+    const [results] = await connection.execute<any>(statement.sql, values);
+    const affectedRows = (results as ResultSetHeader).affectedRows || 0;
+    recordQuery('main', statement.sql, performance.now() - started, started - requested, affectedRows);
+
+    const whereParams = whereParamIndices
+      .filter(index => index >= 0 && index < values.length)
+      .map(index => values[index]);
+
+    if (affectedRows > 0 && whereParams.length > 0) {
+      const [updatedRows] = await connection.execute<any>(selectSql, whereParams);
+      if (Array.isArray(updatedRows)) {
+        return { rows: updatedRows, rowCount: affectedRows };
       }
-      
-      // Fallback: return only rowCount
-      return { rows: [], rowCount: affectedRows };
-    }
-    
-    // Handle RETURNING for DELETE queries
-    if (hasReturning && isDelete) {
-      const affectedRows = (results as ResultSetHeader).affectedRows || 0;
-      return { rows: [], rowCount: affectedRows };
     }
-    
-    // For non-RETURNING queries, still extract rowCount info
-    const rowCount = (results as any).affectedRows || (Array.isArray(results) ? results.length : 0);
-    
-    // Return in PostgreSQL-compatible format
-    const resultArray = Array.isArray(results) ? results : [];
-    return { rows: resultArray, rowCount };
+
+    // Fallback: return only rowCount
+    return { rows: [], rowCount: affectedRows };
+  } finally {
+    connection.release();
+  }
+};
+
+/**
+ * Execute a query with PostgreSQL-compatible interface
+ * Statements are translated once and cached; everything except UPDATE ... RETURNING
+ * runs directly on the pool in a single round trip (timed by config/queryMetrics.ts).
+ */
+const query = async (sql: string, values?: any[]): Promise<QueryResult> => {
+  const params = values || [];
+  const statement = translateStatement(sql, params.length > 0);
+
+  if (statement.updateReturning) {
+    return runUpdateReturning(statement, params);
+  }
+
+  const results = await executeInstrumented(pool, 'main', statement.sql, params);
+
+  // Return in PostgreSQL-compatible format (SELECT / RETURNING rows, or affected row count)
+  if (Array.isArray(results)) {
+    return { rows: results, rowCount: results.length };
+  }
+  return { rows: [], rowCount: (results as ResultSetHeader).affectedRows || 0 };
+};
+
+/**
+ * Run a callback inside a single MariaDB transaction
+ * The callback receives a dedicated connection (use "?" placeholders with connection.execute/query).
+ * Commits when the callback resolves, rolls back and rethrows when it rejects.
+ */
+const withTransaction = async <T>(fn: (connection: PoolConnection) => Promise<T>): Promise<T> => {
+  const connection = await pool.getConnection();
+  try {
+    await connection.beginTransaction();
+    const result = await fn(connection);
+    await connection.commit();
+    return result;
+  } catch (error) {
+    await connection.rollback();
+    throw error;
   } finally {
     connection.release();
   }
@@ -157,9 +168,10 @@ const query = async (sql: string, values?: any[]): Promise<QueryResult> => {
 // Create a database object that provides both pool and query methods
 const db = {
   query,
+  withTransaction,
   getClient: async () => pool.getConnection(),
   pool,
 };
 
 export default db;
-export { query, pool };
+export { query, withTransaction, pool };
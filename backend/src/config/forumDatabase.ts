@@ -10,6 +10,7 @@ import mysql from 'mysql2/promise';
 import dotenv from 'dotenv';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { executeInstrumented } from './queryMetrics.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const envFile = process.env.NODE_ENV ? `.env.${process.env.NODE_ENV}` : '.env';
@@ -31,7 +32,7 @@ const forumPool = mysql.createPool({
   database: process.env.FORUM_DB_NAME || 'forum',
   port: parseInt(process.env.FORUM_DB_PORT || process.env.DB_PORT || '3306'),
   waitForConnections: true,
-  connectionLimit: 5,
+  connectionLimit: parseInt(process.env.FORUM_DB_POOL_SIZE || '5', 10),
   queueLimit: 0,
 });
 
@@ -43,13 +44,8 @@ const forumPool = mysql.createPool({
  * @returns Raw query result
  */
 export async function queryForum(sql: string, values?: any[]): Promise<any[]> {
-  const connection = await forumPool.getConnection();
-  try {
-    const [results] = await connection.execute(sql, values || []);
-    return results as any[];
-  } finally {
-    connection.release();
-  }
+  const results = await executeInstrumented(forumPool, 'forum', sql, values || []);
+  return results as any[];
 }
 
 /**
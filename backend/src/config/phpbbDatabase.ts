@@ -2,6 +2,7 @@ import mysql from 'mysql2/promise';
 import dotenv from 'dotenv';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { executeInstrumented } from './queryMetrics.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const envFile = process.env.NODE_ENV ? `.env.${process.env.NODE_ENV}` : '.env';
@@ -15,19 +16,14 @@ const pool = mysql.createPool({
   password: process.env.PHPBB_DB_PASSWORD || process.env.DB_PASSWORD,
   database: process.env.PHPBB_DB_NAME || 'forum',
   waitForConnections: true,
-  connectionLimit: 10,
+  connectionLimit: parseInt(process.env.PHPBB_DB_POOL_SIZE || '10', 10),
   queueLimit: 0,
   charset: 'utf8mb4',
 });
 
 export const queryPhpbb = async (sql: string, values?: any[]) => {
-  const connection = await pool.getConnection();
-  try {
-    const [results] = await connection.execute(sql, values || []);
-    return results;
-  } finally {
-    connection.release();
-  }
+  const results = await executeInstrumented(pool, 'phpbb', sql, values || []);
+  return results;
 };
 
 export default pool;
@@ -0,0 +1,385 @@
+/**
+ * Query Metrics
+ * File: backend/src/config/queryMetrics.ts
+ *
+ * Instrumentation shared by the query wrappers of every database pool
+ * (query, queryForum, queryPhpbb, queryTournament).
+ *
+ * - Statements are grouped by a normalized fingerprint (literals, numbers and IN lists collapsed)
+ * - Per fingerprint: call/error counts, latency histogram, rows returned, pool wait time, top callers
+ * - The caller is the Express route or the background job the query runs under (AsyncLocalStorage)
+ * - Statements slower than SLOW_QUERY_MS are logged (0 disables the slow-query log)
+ *
+ * Exposed through GET /api/admin/query-metrics (JSON) and GET /metrics (Prometheus text format).
+ */
+
+import { AsyncLocalStorage } from 'async_hooks';
+import { createHash } from 'crypto';
+import type { Request, Response, NextFunction } from 'express';
+import type { Pool, ResultSetHeader } from 'mysql2/promise';
+
+export type QueryDatabase = 'main' | 'forum' | 'phpbb' | 'tournament';
+
+// Read on first use: this module is imported by the database configs before they load .env
+let settings: { enabled: boolean; slowQueryMs: number } | null = null;
+const getSettings = () => {
+  if (!settings) {
+    settings = {
+      enabled: process.env.QUERY_METRICS_ENABLED !== 'false',
+      slowQueryMs: parseInt(process.env.SLOW_QUERY_MS || '1000', 10)
+    };
+  }
+  return settings;
+};
+
+// Latency histogram upper bounds in milliseconds (+Inf is implicit)
+const LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000];
+
+const MAX_FINGERPRINTS = 2000;
+const MAX_CALLERS_PER_FINGERPRINT = 20;
+const FINGERPRINT_CACHE_SIZE = 5000;
+const SLOW_LOG_SQL_LENGTH = 500;
+
+interface QueryContext {
+  label?: string;
+  req?: Request;
+}
+
+interface FingerprintStats {
+  id: string;
+  db: QueryDatabase;
+  fingerprint: string;
+  calls: number;
+  errors: number;
+  totalMs: number;
+  maxMs: number;
+  totalWaitMs: number;
+  maxWaitMs: number;
+  rows: number;
+  // Cumulative counts are derived at read time; each slot counts calls that fell in that bucket
+  buckets: number[];
+  callers: Map<string, number>;
+  lastSeen: number;
+}
+
+const queryContext = new AsyncLocalStorage<QueryContext>();
+const fingerprintCache = new Map<string, string>();
+const stats = new Map<string, FingerprintStats>();
+let droppedFingerprints = 0;
+let collectingSince = new Date();
+
+/**
+ * Normalize a statement so that calls differing only in literal values share one entry
+ */
+export function fingerprintQuery(sql: string): string {
+  const cached = fingerprintCache.get(sql);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  const fingerprint = sql
+    .replace(/--[^\n]*/g, ' ')
+    .replace(/\/\*[\s\S]*?\*\//g, ' ')
+    .replace(/'(?:[^'\\]|\\.|'')*'/g, '?')
+    .replace(/"(?:[^"\\]|\\.)*"/g, '?')
+    .replace(/\$\d+/g, '?')
+    .replace(/\b\d+(?:\.\d+)?\b/g, '?')
+    .replace(/\s+/g, ' ')
+    .trim()
+    // IN (?, ?, ?) and multi-row VALUES lists collapse to a single placeholder group
+    .replace(/\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)/gi, 'IN (?+)')
+    .replace(/(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+/g, '$1, ...')
+    .replace(/(SELECT \?(?: AS \w+)?(?:, \?(?: AS \w+)?)*)(?: UNION ALL SELECT \?(?:, \?)*)+/gi, '$1 UNION ALL ...');
+
+  if (fingerprintCache.size >= FINGERPRINT_CACHE_SIZE) {
+    fingerprintCache.delete(fingerprintCache.keys().next().value as string);
+  }
+  fingerprintCache.set(sql, fingerprint);
+  return fingerprint;
+}
+
+/**
+ * Run fn with every query it issues attributed to the given caller label (e.g. "job:forum_sync")
+ */
+export function runWithQueryContext<T>(label: string, fn: () => T): T {
+  return queryContext.run({ label }, fn);
+}
+
+/**
+ * Express middleware: attribute queries issued while handling the request to its route
+ * The route pattern is resolved lazily because req.route is only set once a route matched.
+ */
+export function queryContextMiddleware(req: Request, _res: Response, next: NextFunction): void {
+  if (!getSettings().enabled) {
+    return next();
+  }
+  queryContext.run({ req }, next);
+}
+
+function currentCaller(): string {
+  const context = queryContext.getStore();
+  if (!context) {
+    return 'background';
+  }
+  if (context.label) {
+    return context.label;
+  }
+  const req = context.req!;
+  // Route patterns (/api/users/:id) rather than concrete URLs keep the caller set small
+  const routePath = req.route?.path;
+  return `${req.method} ${req.baseUrl || ''}${typeof routePath === 'string' ? routePath : ''}`;
+}
+
+function resultRowCount(results: any): number {
+  if (Array.isArray(results)) {
+    return results.length;
+  }
+  return (results as ResultSetHeader)?.affectedRows || 0;
+}
+
+/**
+ * Record one statement execution
+ */
+export function recordQuery(
+  db: QueryDatabase,
+  sql: string,
+  durationMs: number,
+  waitMs: number,
+  rows: number,
+  error?: unknown
+): void {
+  if (!getSettings().enabled) {
+    return;
+  }
+
+  const fingerprint = fingerprintQuery(sql);
+  const key = `${db}\u0000${fingerprint}`;
+  let entry = stats.get(key);
+  if (!entry) {
+    if (stats.size >= MAX_FINGERPRINTS) {
+      droppedFingerprints++;
+      return;
+    }
+    entry = {
+      id: createHash('sha1').update(key).digest('hex').slice(0, 12),
+      db,
+      fingerprint,
+      calls: 0,
+      errors: 0,
+      totalMs: 0,
+      maxMs: 0,
+      totalWaitMs: 0,
+      maxWaitMs: 0,
+      rows: 0,
+      buckets: new Array(LATENCY_BUCKETS_MS.length + 1).fill(0),
+      callers: new Map(),
+      lastSeen: 0
+    };
+    stats.set(key, entry);
+  }
+
+  entry.calls++;
+  entry.totalMs += durationMs;
+  entry.maxMs = Math.max(entry.maxMs, durationMs);
+  entry.totalWaitMs += waitMs;
+  entry.maxWaitMs = Math.max(entry.maxWaitMs, waitMs);
+  entry.rows += rows;
+  entry.lastSeen = Date.now();
+  if (error) {
+    entry.errors++;
+  }
+
+  let bucket = LATENCY_BUCKETS_MS.findIndex(bound => durationMs <= bound);
+  if (bucket === -1) {
+    bucket = LATENCY_BUCKETS_MS.length;
+  }
+  entry.buckets[bucket]++;
+
+  const caller = currentCaller();
+  if (entry.callers.has(caller) || entry.callers.size < MAX_CALLERS_PER_FINGERPRINT) {
+    entry.callers.set(caller, (entry.callers.get(caller) || 0) + 1);
+  } else {
+    entry.callers.set('other', (entry.callers.get('other') || 0) + 1);
+  }
+
+  const { slowQueryMs } = getSettings();
+  if (slowQueryMs > 0 && durationMs >= slowQueryMs) {
+    console.warn(
+      `🐢 [SLOW QUERY] ${durationMs.toFixed(1)}ms (pool wait ${waitMs.toFixed(1)}ms, ${rows} rows) ` +
+      `db=${db} caller="${caller}" ${fingerprint.slice(0, SLOW_LOG_SQL_LENGTH)}`
+    );
+  }
+}
+
+/**
+ * Execute a statement on a pool and record its metrics
+ * Equivalent to pool.execute(): the connection is acquired, used for one statement and released,
+ * but acquiring it explicitly lets the pool wait be measured separately from execution time.
+ */
+export async function executeInstrumented(
+  pool: Pool,
+  db: QueryDatabase,
+  sql: string,
+  values: any[]
+): Promise<any> {
+  if (!getSettings().enabled) {
+    const [results] = await pool.execute<any>(sql, values);
+    return results;
+  }
+
+  const requested = performance.now();
+  const connection = await pool.getConnection();
+  const started = performance.now();
+  try {
+    const [results] = await connection.execute<any>(sql, values);
+    recordQuery(db, sql, performance.now() - started, started - requested, resultRowCount(results));
+    return results;
+  } catch (error) {
+    recordQuery(db, sql, performance.now() - started, started - requested, 0, error);
+    throw error;
+  } finally {
+    connection.release();
+  }
+}
+
+/**
+ * Snapshot of the collected statistics, sorted by total time (or calls/max/errors) descending
+ */
+export function getQueryMetricsSnapshot(options: {
+  sort?: 'total' | 'calls' | 'max' | 'errors' | 'wait';
+  limit?: number;
+  db?: QueryDatabase;
+} = {}) {
+  const sortKey = options.sort || 'total';
+  const sortValue = (entry: FingerprintStats): number => {
+    switch (sortKey) {
+      case 'calls': return entry.calls;
+      case 'max': return entry.maxMs;
+      case 'errors': return entry.errors;
+      case 'wait': return entry.totalWaitMs;
+      default: return entry.totalMs;
+    }
+  };
+
+  const entries = Array.from(stats.values())
+    .filter(entry => !options.db || entry.db === options.db)
+    .sort((a, b) => sortValue(b) - sortValue(a))
+    .slice(0, options.limit || 100);
+
+  return {
+    enabled: getSettings().enabled,
+    slow_query_threshold_ms: getSettings().slowQueryMs,
+    collecting_since: collectingSince.toISOString(),
+    fingerprint_count: stats.size,
+    dropped_fingerprints: droppedFingerprints,
+    latency_buckets_ms: LATENCY_BUCKETS_MS,
+    queries: entries.map(entry => ({
+      id: entry.id,
+      db: entry.db,
+      fingerprint: entry.fingerprint,
+      calls: entry.calls,
+      errors: entry.errors,
+      total_ms: Math.round(entry.totalMs * 100) / 100,
+      avg_ms: Math.round((entry.totalMs / entry.calls) * 100) / 100,
+      max_ms: Math.round(entry.maxMs * 100) / 100,
+      p50_ms: estimatePercentile(entry, 0.5),
+      p95_ms: estimatePercentile(entry, 0.95),
+      p99_ms: estimatePercentile(entry, 0.99),
+      total_pool_wait_ms: Math.round(entry.totalWaitMs * 100) / 100,
+      max_pool_wait_ms: Math.round(entry.maxWaitMs * 100) / 100,
+      rows: entry.rows,
+      avg_rows: Math.round((entry.rows / entry.calls) * 100) / 100,
+      histogram: entry.buckets,
+      callers: Array.from(entry.callers.entries())
+        .sort((a, b) => b[1] - a[1])
+        .map(([caller, calls]) => ({ caller, calls })),
+      last_seen: new Date(entry.lastSeen).toISOString()
+    }))
+  };
+}
+
+/**
+ * Upper bound of the histogram bucket containing the given percentile (max_ms for the +Inf bucket)
+ */
+function estimatePercentile(entry: FingerprintStats, percentile: number): number {
+  const target = Math.ceil(entry.calls * percentile);
+  let seen = 0;
+  for (let i = 0; i < entry.buckets.length; i++) {
+    seen += entry.buckets[i];
+    if (seen >= target) {
+      return i < LATENCY_BUCKETS_MS.length
+        ? Math.min(LATENCY_BUCKETS_MS[i], Math.round(entry.maxMs * 100) / 100)
+        : Math.round(entry.maxMs * 100) / 100;
+    }
+  }
+  return Math.round(entry.maxMs * 100) / 100;
+}
+
+function escapeLabel(value: string): string {
+  return value.replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+/**
+ * Render the statistics in the Prometheus text exposition format
+ * Fingerprints are referenced by a short id; db_query_info maps ids to the (truncated) statement.
+ */
+export function renderPrometheusMetrics(): string {
+  const lines: string[] = [];
+  const entries = Array.from(stats.values());
+
+  lines.push('# HELP db_query_info Normalized statement for a query fingerprint id');
+  lines.push('# TYPE db_query_info gauge');
+  for (const entry of entries) {
+    lines.push(`db_query_info{db="${entry.db}",query_id="${entry.id}",statement="${escapeLabel(entry.fingerprint.slice(0, 200))}"} 1`);
+  }
+
+  lines.push('# HELP db_query_duration_seconds Statement execution time (excluding pool wait)');
+  lines.push('# TYPE db_query_duration_seconds histogram');
+  for (const entry of entries) {
+    const labels = `db="${entry.db}",query_id="${entry.id}"`;
+    let cumulative = 0;
+    LATENCY_BUCKETS_MS.forEach((bound, i) => {
+      cumulative += entry.buckets[i];
+      lines.push(`db_query_duration_seconds_bucket{${labels},le="${bound / 1000}"} ${cumulative}`);
+    });
+    lines.push(`db_query_duration_seconds_bucket{${labels},le="+Inf"} ${entry.calls}`);
+    lines.push(`db_query_duration_seconds_sum{${labels}} ${entry.totalMs / 1000}`);
+    lines.push(`db_query_duration_seconds_count{${labels}} ${entry.calls}`);
+  }
+
+  const counters: Array<[string, string, (entry: FingerprintStats) => number]> = [
+    ['db_query_errors_total', 'Statements that failed', entry => entry.errors],
+    ['db_query_rows_total', 'Rows returned or affected', entry => entry.rows],
+    ['db_query_pool_wait_seconds_total', 'Time spent waiting for a pool connection', entry => entry.totalWaitMs / 1000]
+  ];
+  for (const [name, help, value] of counters) {
+    lines.push(`# HELP ${name} ${help}`);
+    lines.push(`# TYPE ${name} counter`);
+    for (const entry of entries) {
+      lines.push(`${name}{db="${entry.db}",query_id="${entry.id}"} ${value(entry)}`);
+    }
+  }
+
+  lines.push('# HELP db_query_caller_calls_total Statement executions per calling route or job');
+  lines.push('# TYPE db_query_caller_calls_total counter');
+  for (const entry of entries) {
+    for (const [caller, calls] of entry.callers) {
+      lines.push(`db_query_caller_calls_total{db="${entry.db}",query_id="${entry.id}",caller="${escapeLabel(caller)}"} ${calls}`);
+    }
+  }
+
+  lines.push('# HELP db_query_fingerprints_dropped_total Executions not tracked because the fingerprint limit was reached');
+  lines.push('# TYPE db_query_fingerprints_dropped_total counter');
+  lines.push(`db_query_fingerprints_dropped_total ${droppedFingerprints}`);
+
+  return lines.join('\n') + '\n';
+}
+
+/**
+ * Clear all collected statistics
+ */
+export function resetQueryMetrics(): void {
+  stats.clear();
+  droppedFingerprints = 0;
+  collectingSince = new Date();
+}
@@ -0,0 +1,201 @@
+/**
+ * Redis-compatible store connection (optional)
+ * File: backend/src/config/redis.ts
+ *
+ * Minimal RESP2 client over a single TCP connection for the handful of commands the
+ * shared caches need (GET, SET ... PX, DEL, INCR, MGET). Works with Redis, Valkey,
+ * KeyDB and Dragonfly. Enabled only when REDIS_URL is set (e.g. redis://127.0.0.1:6379/0);
+ * callers treat a null client or a failed command as a cache miss and fall back to
+ * their in-process state.
+ */
+
+import net from 'net';
+
+type RespValue = string | number | null | RespValue[];
+
+interface PendingCommand {
+  resolve: (value: RespValue) => void;
+  reject: (error: Error) => void;
+}
+
+const COMMAND_TIMEOUT_MS = parseInt(process.env.REDIS_COMMAND_TIMEOUT_MS || '250', 10);
+const RECONNECT_DELAY_MS = 5000;
+
+export class RespClient {
+  private socket: net.Socket | null = null;
+  private connected = false;
+  private reconnectAt = 0;
+  private buffer = Buffer.alloc(0);
+  private pending: PendingCommand[] = [];
+
+  constructor(private readonly url: URL) {}
+
+  get isConnected(): boolean {
+    return this.connected;
+  }
+
+  private connect(): void {
+    if (this.socket || Date.now() < this.reconnectAt) {
+      return;
+    }
+
+    const socket = net.createConnection({
+      host: this.url.hostname || '127.0.0.1',
+      port: parseInt(this.url.port || '6379', 10)
+    });
+    socket.setNoDelay(true);
+    this.socket = socket;
+
+    socket.on('connect', () => {
+      this.connected = true;
+      console.log(`✅ [REDIS] Connected to ${this.url.hostname}:${this.url.port || '6379'}`);
+    });
+    socket.on('data', (chunk) => this.onData(chunk));
+    socket.on('error', (error) => {
+      if (this.connected) {
+        console.error('❌ [REDIS] Connection error:', error.message);
+      }
+    });
+    socket.on('close', () => {
+      this.connected = false;
+      this.socket = null;
+      this.buffer = Buffer.alloc(0);
+      this.reconnectAt = Date.now() + RECONNECT_DELAY_MS;
+      const failed = this.pending.splice(0);
+      failed.forEach(command => command.reject(new Error('Redis connection closed')));
+    });
+
+    // AUTH and SELECT are queued ahead of any other command on the new connection
+    const password = decodeURIComponent(this.url.password || '');
+    if (password) {
+      const username = decodeURIComponent(this.url.username || '');
+      this.send(username ? ['AUTH', username, password] : ['AUTH', password]).catch(() => undefined);
+    }
+    const dbIndex = this.url.pathname.replace('/', '');
+    if (dbIndex) {
+      this.send(['SELECT', dbIndex]).catch(() => undefined);
+    }
+  }
+
+  private send(args: string[]): Promise<RespValue> {
+    const socket = this.socket!;
+    let payload = `*${args.length}\r\n`;
+    for (const arg of args) {
+      payload += `$${Buffer.byteLength(arg)}\r\n${arg}\r\n`;
+    }
+
+    return new Promise<RespValue>((resolve, reject) => {
+      this.pending.push({ resolve, reject });
+      socket.write(payload);
+    });
+  }
+
+  /**
+   * Send a command; rejects when the store is unreachable or does not answer within the timeout
+   */
+  async command(...args: Array<string | number>): Promise<RespValue> {
+    this.connect();
+    if (!this.socket) {
+      throw new Error('Redis unavailable');
+    }
+
+    let timer: NodeJS.Timeout | undefined;
+    const timeout = new Promise<never>((_, reject) => {
+      timer = setTimeout(() => {
+        reject(new Error('Redis command timed out'));
+        // Replies are matched to commands by order, so a late reply would desynchronise the stream
+        this.socket?.destroy();
+      }, COMMAND_TIMEOUT_MS);
+    });
+
+    try {
+      return await Promise.race([this.send(args.map(String)), timeout]);
+    } finally {
+      clearTimeout(timer);
+    }
+  }
+
+  private onData(chunk: Buffer): void {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    while (this.buffer.length > 0) {
+      const parsed = parseReply(this.buffer, 0);
+      if (!parsed) {
+        return;
+      }
+      this.buffer = this.buffer.subarray(parsed.end);
+      const command = this.pending.shift();
+      if (!command) {
+        continue;
+      }
+      if (parsed.value instanceof Error) {
+        command.reject(parsed.value);
+      } else {
+        command.resolve(parsed.value);
+      }
+    }
+  }
+}
+
+/**
+ * Parse one RESP2 reply starting at offset; returns null when the buffer is incomplete
+ */
+function parseReply(buffer: Buffer, offset: number): { value: RespValue | Error; end: number } | null {
+  const lineEnd = buffer.indexOf('\r\n', offset);
+  if (lineEnd === -1) {
+    return null;
+  }
+  const type = String.fromCharCode(buffer[offset]);
+  const line = buffer.toString('utf8', offset + 1, lineEnd);
+
+  switch (type) {
+    case '+':
+      return { value: line, end: lineEnd + 2 };
+    case '-':
+      return { value: new Error(line), end: lineEnd + 2 };
+    case ':':
+      return { value: parseInt(line, 10), end: lineEnd + 2 };
+    case '$': {
+      const length = parseInt(line, 10);
+      if (length < 0) {
+        return { value: null, end: lineEnd + 2 };
+      }
+      const dataEnd = lineEnd + 2 + length;
+      if (buffer.length < dataEnd + 2) {
+        return null;
+      }
+      return { value: buffer.toString('utf8', lineEnd + 2, dataEnd), end: dataEnd + 2 };
+    }
+    case '*': {
+      const count = parseInt(line, 10);
+      if (count < 0) {
+        return { value: null, end: lineEnd + 2 };
+      }
+      const items: RespValue[] = [];
+      let position = lineEnd + 2;
+      for (let i = 0; i < count; i++) {
+        const item = parseReply(buffer, position);
+        if (!item) {
+          return null;
+        }
+        items.push(item.value instanceof Error ? null : item.value);
+        position = item.end;
+      }
+      return { value: items, end: position };
+    }
+    default:
+      return { value: new Error(`Unexpected RESP reply type ${type}`), end: lineEnd + 2 };
+  }
+}
+
+let client: RespClient | null | undefined;
+
+/**
+ * Shared client, or null when REDIS_URL is not configured
+ */
+export function getRedisClient(): RespClient | null {
+  if (client === undefined) {
+    const url = process.env.REDIS_URL;
+    client = url ? new RespClient(new URL(url)) : null;
+  }
+  return client;
+}
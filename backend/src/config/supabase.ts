@@ -1,20 +1,40 @@
-import { createClient } from '@supabase/supabase-js';
-
-const supabaseUrl = process.env.SUPABASE_URL;
-const supabaseServiceRoleKey = process.env.SUPABASE_SERVICE_ROLE_KEY;
+import axios from 'axios';
+import fs from 'fs';
+import { Readable } from 'stream';
+import { getCachedReplay, openCachedReplay, invalidateCachedReplay, OpenedReplay } from '../utils/replayBlobCache.js';
 
 // Supabase is optional - can be disabled if using alternative storage
-let supabase: any = null;
-
-if (!supabaseUrl || !supabaseServiceRoleKey) {
-  if (process.env.BACKEND_DEBUG_LOGS === 'true') {
+// The client (and @supabase/supabase-js itself) is only loaded on first use, so it costs
+// nothing at startup; credentials are read then as well, after .env has been loaded
+let supabasePromise: Promise<any> | null = null;
+let credentialsWarningShown = false;
+
+export function isSupabaseConfigured(): boolean {
+  const configured = !!process.env.SUPABASE_URL && !!process.env.SUPABASE_SERVICE_ROLE_KEY;
+  if (!configured && !credentialsWarningShown && process.env.BACKEND_DEBUG_LOGS === 'true') {
+    credentialsWarningShown = true;
     console.warn('⚠️  Supabase credentials not configured - replay storage disabled');
     console.warn('   To enable: set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY in .env');
   }
-} else {
-  // Use service role key for backend operations (full access)
-  // This is safe because it runs on a private server
-  supabase = createClient(supabaseUrl, supabaseServiceRoleKey);
+  return configured;
+}
+
+// Shared Supabase client, or null when Supabase is not configured
+export function getSupabaseClient(): Promise<any> {
+  if (!isSupabaseConfigured()) {
+    return Promise.resolve(null);
+  }
+  if (!supabasePromise) {
+    // Use service role key for backend operations (full access)
+    // This is safe because it runs on a private server
+    supabasePromise = import('@supabase/supabase-js')
+      .then(({ createClient }) => createClient(process.env.SUPABASE_URL as string, process.env.SUPABASE_SERVICE_ROLE_KEY as string))
+      .catch(error => {
+        supabasePromise = null;
+        throw error;
+      });
+  }
+  return supabasePromise;
 }
 
 // Helper function to upload replay to Supabase Storage
@@ -24,6 +44,7 @@ export async function uploadReplayToSupabase(
   fileBuffer: Buffer
 ): Promise<{ path: string; url: string }> {
   try {
+    const supabase = await getSupabaseClient();
     if (!supabase) {
       console.warn('⚠️  [SUPABASE] Supabase not configured, replay storage disabled');
       return { path: storedFilename, url: '' };
@@ -61,45 +82,63 @@ export async function uploadReplayToSupabase(
   }
 }
 
+// Stream a replay straight from Supabase Storage (through a short-lived signed URL,
+// so the body is never buffered as a Blob)
+async function streamReplayFromStorage(filename: string): Promise<Readable> {
+  if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] Fetching replay from storage:', filename);
+
+  const supabase = await getSupabaseClient();
+  const { data, error } = await supabase.storage
+    .from('replays')
+    .createSignedUrl(filename, 60);
+
+  if (error) {
+    console.error('❌ [SUPABASE] Signed URL error object:', error);
+    throw error;
+  }
+
+  if (!data?.signedUrl) {
+    console.error('❌ [SUPABASE] No signed URL returned for download');
+    throw new Error('No data returned from Supabase');
+  }
+
+  const response = await axios.get(data.signedUrl, { responseType: 'stream' });
+  return response.data as Readable;
+}
+
 // Helper function to download replay from Supabase Storage
+// Served from the local replay cache; only a cache miss reaches Supabase
 export async function downloadReplayFromSupabase(
   filename: string
 ): Promise<Buffer> {
   try {
-    if (!supabase) {
+    if (!isSupabaseConfigured()) {
       console.warn('⚠️  [SUPABASE] Supabase not configured, cannot download replay');
       throw new Error('Supabase not configured');
     }
 
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] ===== DOWNLOAD START =====');
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] Filename:', filename);
+    const cached = await getCachedReplay(filename, () => streamReplayFromStorage(filename));
+    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('✅ [SUPABASE] Replay available locally:', filename, cached.size, 'bytes');
 
-    const { data, error } = await supabase.storage
-      .from('replays')
-      .download(filename);
-
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] Download response - error:', error?.message || 'none', 'data type:', typeof data);
-
-    if (error) {
-      console.error('❌ [SUPABASE] Download error object:', error);
-      throw error;
-    }
+    return await fs.promises.readFile(cached.path);
+  } catch (error) {
+    console.error('❌ [SUPABASE] Error downloading replay:', error);
+    throw error;
+  }
+}
 
-    if (!data) {
-      console.error('❌ [SUPABASE] No data returned from download');
-      throw new Error('No data returned from Supabase');
+// Helper function to open a replay from Supabase Storage as a stream (for HTTP responses)
+// Served from the local replay cache; only a cache miss reaches Supabase
+export async function openReplayFromSupabase(filename: string): Promise<OpenedReplay> {
+  try {
+    if (!isSupabaseConfigured()) {
+      console.warn('⚠️  [SUPABASE] Supabase not configured, cannot download replay');
+      throw new Error('Supabase not configured');
     }
 
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] Data type:', data.constructor.name, 'data instanceof Blob:', data instanceof Blob);
-    const buffer = await data.arrayBuffer();
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] ArrayBuffer size:', buffer.byteLength, 'bytes');
-    const fileBuffer = Buffer.from(buffer);
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('✅ [SUPABASE] Download successful, final buffer size:', fileBuffer.length, 'bytes');
-    if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('📥 [SUPABASE] ===== DOWNLOAD END =====');
-
-    return fileBuffer;
+    return await openCachedReplay(filename, () => streamReplayFromStorage(filename));
   } catch (error) {
-    console.error('❌ [SUPABASE] Error downloading replay:', error);
+    console.error('❌ [SUPABASE] Error opening replay:', error);
     throw error;
   }
 }
@@ -107,6 +146,7 @@ export async function downloadReplayFromSupabase(
 // Helper function to delete replay from Supabase Storage
 export async function deleteReplayFromSupabase(filename: string): Promise<void> {
   try {
+    const supabase = await getSupabaseClient();
     if (!supabase) {
       console.warn('⚠️  [SUPABASE] Supabase not configured, skipping replay deletion');
       return;
@@ -121,10 +161,11 @@ export async function deleteReplayFromSupabase(filename: string): Promise<void>
       throw error;
     }
 
+    await invalidateCachedReplay(filename);
+
     if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log('✅ [SUPABASE] Delete successful:', filename);
   } catch (error) {
     console.error('❌ [SUPABASE] Error deleting replay:', error);
     throw error;
   }
 }
-export { supabase };
\ No newline at end of file
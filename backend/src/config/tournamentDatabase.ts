@@ -2,6 +2,7 @@ import mysql from 'mysql2/promise';
 import dotenv from 'dotenv';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { executeInstrumented } from './queryMetrics.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const envFile = process.env.NODE_ENV ? `.env.${process.env.NODE_ENV}` : '.env';
@@ -15,18 +16,13 @@ const pool = mysql.createPool({
   password: process.env.DB_PASSWORD,
   database: process.env.DB_NAME || 'wesnoth_db',
   waitForConnections: true,
-  connectionLimit: 10,
+  connectionLimit: parseInt(process.env.DB_POOL_SIZE || '10', 10),
   queueLimit: 0,
 });
 
 export const queryTournament = async (sql: string, values?: any[]) => {
-  const connection = await pool.getConnection();
-  try {
-    const [results] = await connection.execute(sql, values || []);
-    return results;
-  } finally {
-    connection.release();
-  }
+  const results = await executeInstrumented(pool, 'tournament', sql, values || []);
+  return results;
 };
 
 export default pool;
@@ -1,17 +1,25 @@
 import {
   calculateGlobalStatistics,
   updateGlobalStatisticsCache,
+  rollUpGlobalStatisticsBuckets,
+  rebuildGlobalStatisticsBuckets,
 } from '../services/globalStatisticsService.js';
 
 /**
- * Calculate and update global site statistics
- * Should run every 30 minutes to keep statistics fresh
+ * Fold expired day buckets and persist a snapshot of the global site statistics
+ * Runs every 30 minutes; the live figures come from the day buckets and no longer depend on it
  */
-export const calculateGlobalStatisticsJob = async (): Promise<void> => {
+export const calculateGlobalStatisticsJob = async (signal?: AbortSignal): Promise<void> => {
   try {
     console.log('📊 [GlobalStats] Calculating global statistics...');
 
+    const folded = await rollUpGlobalStatisticsBuckets();
+    if (folded > 0) {
+      console.log(`   Folded ${folded} expired day buckets into the archive bucket`);
+    }
+
     const stats = await calculateGlobalStatistics();
+    signal?.throwIfAborted();
     await updateGlobalStatisticsCache(stats);
 
     console.log(`✅ [GlobalStats] Global statistics updated successfully at ${stats.last_updated}`);
@@ -24,3 +32,32 @@ export const calculateGlobalStatisticsJob = async (): Promise<void> => {
     throw error;
   }
 };
+
+/**
+ * Recount the day buckets from the source tables
+ * Runs daily to repair deltas lost to failed writes or to code paths that bypass the counters
+ */
+export const reconcileGlobalStatisticsJob = async (signal?: AbortSignal): Promise<void> => {
+  try {
+    console.log('📊 [GlobalStats] Reconciling global statistics day buckets...');
+
+    const before = await calculateGlobalStatistics();
+    signal?.throwIfAborted();
+    await rebuildGlobalStatisticsBuckets();
+    const after = await calculateGlobalStatistics();
+    signal?.throwIfAborted();
+    await updateGlobalStatisticsCache(after);
+
+    const drifted = (Object.keys(after) as Array<keyof typeof after>)
+      .filter(key => key !== 'last_updated' && before[key] !== after[key])
+      .map(key => `${key} ${before[key]} -> ${after[key]}`);
+
+    if (drifted.length > 0) {
+      console.log(`⚠️  [GlobalStats] Corrected drift: ${drifted.join(', ')}`);
+    }
+    console.log('✅ [GlobalStats] Day buckets reconciled');
+  } catch (error) {
+    console.error('❌ [GlobalStats] Error reconciling global statistics:', error);
+    throw error;
+  }
+};
@@ -19,6 +19,9 @@ import { parseRankedReplay, ParsedRankedReplay } from '../utils/replayRankedPars
 import { createMatch, createTournamentUnrankedMatch, updateTournamentRoundMatch } from '../services/matchCreationService.js';
 import { checkForumBanlist } from '../services/phpbbAuth.js';
 import { queryPhpbb } from '../config/phpbbDatabase.js';
+import { claimUnparsedReplays, releaseReplayClaims } from '../services/jobLeaseService.js';
+import { recordGlobalStatisticsEvent } from '../services/globalStatisticsService.js';
+import { lookupInAssetCatalog, assetKey, assetLooseKey, likePattern } from '../services/assetCatalog.js';
 import * as fs from 'fs';
 import * as path from 'path';
 
@@ -295,6 +298,12 @@ export class ParseNewReplaysRefactorized {
       };
 
     } finally {
+      // Replays left in 'new' (e.g. file not yet available) become claimable by any instance again
+      try {
+        await releaseReplayClaims();
+      } catch (releaseError) {
+        console.error('❌ [PARSE] Failed to release replay claims:', releaseError);
+      }
       this.isRunning = false;
     }
   }
@@ -762,6 +771,7 @@ export class ParseNewReplaysRefactorized {
            VALUES (?, ?, 1, 0, 1400, 0, 0, 0, NOW(), NOW())`,
           [newId, player.user_name]
         );
+        await recordGlobalStatisticsEvent('users_new');
         console.log(`👤 [PARSE] Auto-registered player: ${player.user_name} (id=${newId})`);
       } catch (err) {
         console.warn(`⚠️  [PARSE] Failed to ensure player ${player.user_name}:`, (err as any)?.message);
@@ -1230,20 +1240,16 @@ export class ParseNewReplaysRefactorized {
   }
 
   /**
-   * Get unparsed replays from database
+   * Claim the next batch of unparsed replays for this instance
+   * Rows are claimed with FOR UPDATE SKIP LOCKED, so several backend replicas
+   * can run this job concurrently without parsing the same replay twice
    */
   private async getUnparsedReplays(): Promise<UnparsedReplay[]> {
-    const result = await query(
-      `SELECT id, instance_uuid, game_id, replay_filename, replay_url, 
-              wesnoth_version, game_name, start_time, end_time, created_at, oos
-       FROM replays
-       WHERE parse_status = 'new' AND parsed = 0
-       ORDER BY created_at ASC
-       LIMIT 50`,
-      []
+    return claimUnparsedReplays<UnparsedReplay>(
+      `id, instance_uuid, game_id, replay_filename, replay_url,
+       wesnoth_version, game_name, start_time, end_time, created_at, oos`,
+      50
     );
-
-    return ((result as any).rows || []) as UnparsedReplay[];
   }
 
   private async parseReplayFromUrl(
@@ -1312,8 +1318,8 @@ export class ParseNewReplaysRefactorized {
   }
 
   /**
-   * Resolve faction name against factions table
-   * Searches with: exact match → without prefix → canonical match
+   * Resolve faction name against the factions in the asset catalog
+   * Searches with: exact match → without prefix → partial match
    */
   private async resolveFaction(factionName: string | null): Promise<{ name: string | null; isRanked: boolean }> {
     if (!factionName) {
@@ -1321,43 +1327,26 @@ export class ParseNewReplaysRefactorized {
     }
 
     try {
-      // Try exact match first
-      let result = await query(
-        `SELECT name, is_ranked FROM factions WHERE LOWER(name) = LOWER(?) LIMIT 1`,
-        [factionName]
-      );
-
-      if ((result as any).rows?.length > 0) {
-        const faction = (result as any).rows[0];
-        return { name: faction.name, isRanked: faction.is_ranked === 1 };
-      }
-
-      // Try without prefix (e.g., "Ladder Rebels" -> "Rebels")
-      const parts = factionName.split(' ').slice(1);
-      if (parts.length > 0) {
-        const searchName = parts.join(' ');
-        result = await query(
-          `SELECT name, is_ranked FROM factions WHERE LOWER(name) = LOWER(?) LIMIT 1`,
-          [searchName]
-        );
-
-        if ((result as any).rows?.length > 0) {
-          const faction = (result as any).rows[0];
-          return { name: faction.name, isRanked: faction.is_ranked === 1 };
+      const faction = await lookupInAssetCatalog(({ factions }) => {
+        // Try exact match first
+        const exact = factions.byKey.get(assetKey(factionName));
+        if (exact) return exact;
+
+        // Try without prefix (e.g., "Ladder Rebels" -> "Rebels")
+        const parts = factionName.split(' ').slice(1);
+        if (parts.length > 0) {
+          const withoutPrefix = factions.byKey.get(assetKey(parts.join(' ')));
+          if (withoutPrefix) return withoutPrefix;
         }
-      }
 
-      // Try LIKE match (partial)
-      result = await query(
-        `SELECT name, is_ranked FROM factions WHERE LOWER(name) LIKE LOWER(?) LIMIT 1`,
-        [`%${factionName}%`]
-      );
+        // Try LIKE match (partial)
+        const partial = likePattern(`%${assetKey(factionName)}%`);
+        return factions.all.find(candidate => partial.test(assetKey(candidate.name))) || null;
+      });
 
-      if ((result as any).rows?.length > 0) {
-        const faction = (result as any).rows[0];
-        return { name: faction.name, isRanked: faction.is_ranked === 1 };
+      if (faction) {
+        return { name: faction.name, isRanked: faction.is_ranked };
       }
-
       return { name: factionName, isRanked: false };
     } catch (err) {
       console.warn(`⚠️  Could not resolve faction "${factionName}":`, err);
@@ -1366,10 +1355,10 @@ export class ParseNewReplaysRefactorized {
   }
 
   /**
-   * Resolve map name against game_maps table.
-   * Tries multiple strategies (exact, prefix-stripped, LIKE, fuzzy with \ufffd→%).
-   * Prefers ranked results: never stops early on an unranked match — saves it as
-   * fallback and keeps searching for a ranked entry.
+   * Resolve map name against the maps in the asset catalog.
+   * Tries multiple strategies (map ID, exact, prefix-stripped, LIKE, fuzzy with \ufffd→%),
+   * comparing names case-insensitively and ignoring apostrophes.
+   * Only ranked maps count as a match: an unranked map with the same name never stops the search.
    */
   private async resolveMap(mapName: string | null, mapId: string | null = null): Promise<{ name: string | null; isRanked: boolean }> {
     if (!mapName) {
@@ -1382,169 +1371,60 @@ export class ParseNewReplaysRefactorized {
       s.replace(/[\u2018\u2019\u201a\u201b\u2032\u2035]/g, "'")
        .replace(/[\u201c\u201d]/g, '"');
 
-    // Remove all apostrophes for comparison (handles "Sullas Ruins" vs "Sulla's Ruins")
-    const removeApostrophes = (s: string) => s.replace(/'/g, '');
-
     const mapNameNorm = normalizeQuotes(mapName);
-    const mapNameNoApos = removeApostrophes(mapName);  // Apply to ORIGINAL, not to normalized
-
-    console.log(`   [MAP DEBUG] Input mapName: "${mapName}"`);
-    console.log(`   [MAP DEBUG] After normalizeQuotes: "${mapNameNorm}"`);
-    console.log(`   [MAP DEBUG] After removeApostrophes: "${mapNameNoApos}"`);
-    console.log(`   [MAP DEBUG] mapNameNorm === mapName? ${mapNameNorm === mapName}`);
-    console.log(`   [MAP DEBUG] mapNameNoApos === mapNameNorm? ${mapNameNoApos === mapNameNorm}`);
-
-    // Helper: run a query and return ranked result (is_ranked = 1)
-    // IMPORTANT: Only search for ranked maps - do NOT fallback to unranked maps.
-    // A map must be explicitly marked as ranked to be eligible for ranked matches.
-    const tryQuery = async (sql: string, params: any[], description: string): Promise<{ name: string; isRanked: boolean } | null> => {
-      console.log(`   [MAP DEBUG] Trying: ${description}`);
-      console.log(`   [MAP DEBUG]   SQL: ${sql}`);
-      console.log(`   [MAP DEBUG]   Params: [${params.map(p => `"${p}"`).join(', ')}]`);
-      
-      const result = await query(sql, params);
-      const rows = (result as any).rows || [];
-      
-      console.log(`   [MAP DEBUG]   Result rows: ${rows.length}`);
-      if (rows.length > 0) {
-        rows.forEach((row: any, idx: number) => {
-          console.log(`   [MAP DEBUG]     Row ${idx}: name="${row.name}", is_ranked=${row.is_ranked}`);
-        });
-      }
-      
-      if (rows.length === 0) return null;
-      const map = rows[0];
-      // Return only if this is a ranked map (is_ranked = 1)
-      if (map.is_ranked === 1) {
-        console.log(`   [MAP DEBUG]   ✅ MATCH FOUND (ranked)`);
-        return { name: map.name as string, isRanked: true };
-      }
-      // Unranked maps are not eligible for ranked match validation
-      console.log(`   [MAP DEBUG]   ❌ Found but not ranked (is_ranked=${map.is_ranked})`);
-      return null;
-    };
 
-    try {
-      // 0. Try exact match by map ID (from forum wesnothd_game_content_info) - highest priority
-      if (mapId) {
-        const mapIdWithoutPrefix = mapId.replace(/^multiplayer_/, '').replace(/_/g, ' ');
-        console.log(`   [MAP DEBUG] Step 0: Trying by map ID: "${mapId}" → "${mapIdWithoutPrefix}"`);
-        let hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-          [mapIdWithoutPrefix],
-          `Map ID exact match`
-        );
-        if (hit) {
-          console.log(`   📌 Matched by map ID: ${mapId} → ${hit.name}`);
-          return hit;
-        }
-      }
+    // Strip "Np —" / "Np \ufffd" prefix
+    const cleaned = mapName.replace(/^\d+[a-z]?\s*[—\-–\ufffd]\s*/i, '').trim();
+    const cleanedNorm = normalizeQuotes(cleaned);
 
-      // 1. Exact match on original name (ORDER BY is_ranked DESC so ranked rows come first)
-      console.log(`   [MAP DEBUG] Step 1: Trying exact match on original`);
-      let hit = await tryQuery(
-        `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-        [mapName],
-        `Exact match on original "${mapName}"`
-      );
-      if (hit) return hit;
-
-      // 1b. Exact match with normalized quotes (handles forum U+2019 vs DB U+0027)
-      console.log(`   [MAP DEBUG] Step 1b: mapNameNorm !== mapName? ${mapNameNorm !== mapName}`);
-      if (mapNameNorm !== mapName) {
-        hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-          [mapNameNorm],
-          `Exact match on normalized "${mapNameNorm}"`
-        );
-        if (hit) return hit;
-      }
+    // Exact candidates in priority order: map ID from forum wesnothd_game_content_info,
+    // original name, normalized quotes, then the prefix-stripped forms
+    const exactCandidates: string[] = [];
+    if (mapId) {
+      exactCandidates.push(mapId.replace(/^multiplayer_/, '').replace(/_/g, ' '));
+    }
+    exactCandidates.push(mapName, mapNameNorm);
+    if (cleaned !== mapName) {
+      exactCandidates.push(cleanedNorm, cleaned);
+    }
 
-      // 1c. Exact match ignoring apostrophes (handles "Sullas Ruins" vs "Sulla's Ruins")
-      console.log(`   [MAP DEBUG] Step 1c: mapNameNoApos !== mapNameNorm? ${mapNameNoApos !== mapNameNorm}`);
-      if (mapNameNoApos !== mapNameNorm) {
-        console.log(`   [MAP DEBUG]   Will try REPLACE query with: "${mapNameNoApos}"`);
-        hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = LOWER(?) ORDER BY is_ranked DESC LIMIT 1`,
-          [mapNameNoApos],
-          `Exact match ignoring apostrophes (REPLACE) for "${mapNameNoApos}"`
-        );
-        if (hit) {
-          console.log(`   📌 Matched ignoring apostrophes: "${mapName}" → "${hit.name}"`);
-          return hit;
-        }
-      } else {
-        console.log(`   [MAP DEBUG]   SKIPPING 1c: mapNameNoApos === mapNameNorm`);
-      }
+    // LIKE patterns: partial match, then \ufffd replaced by a % wildcard
+    const likeCandidates: string[] = [`%${mapNameNorm}%`];
+    const fuzzyClean = cleanedNorm.replace(/\s*\ufffd\s*/g, '%').replace(/%+/g, '%');
+    if (fuzzyClean !== cleanedNorm && cleaned !== mapName) {
+      likeCandidates.push(fuzzyClean);
+    }
+    const fuzzyRaw = mapNameNorm.replace(/\s*\ufffd\s*/g, '%').replace(/%+/g, '%');
+    if (fuzzyRaw !== mapNameNorm) {
+      likeCandidates.push(fuzzyRaw);
+    }
 
-      // 2. Strip "Np —" / "Np \ufffd" prefix, then exact match
-      const cleaned = mapName.replace(/^\d+[a-z]?\s*[—\-–\ufffd]\s*/i, '').trim();
-      const cleanedNorm = normalizeQuotes(cleaned);
-      const cleanedNoApos = removeApostrophes(cleaned);  // Apply to ORIGINAL cleaned, not normalized
-      if (cleaned !== mapName) {
-        console.log(`   [MAP DEBUG] Step 2: Prefix stripping: "${mapName}" → "${cleaned}"`);
-        // 2a. Exact match on normalized stripped name
-        hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-          [cleanedNorm],
-          `Exact match on cleaned normalized "${cleanedNorm}"`
-        );
-        if (hit) return hit;
-
-        // 2b. Exact match on raw stripped name (if different from normalized)
-        if (cleanedNorm !== cleaned) {
-          hit = await tryQuery(
-            `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-            [cleaned],
-            `Exact match on cleaned raw "${cleaned}"`
-          );
-          if (hit) return hit;
+    try {
+      const hit = await lookupInAssetCatalog(({ maps }) => {
+        for (const candidate of exactCandidates) {
+          const map = maps.byLooseKey.get(assetLooseKey(candidate));
+          if (map?.is_ranked) {
+            console.log(`   [MAP DEBUG] ✅ Exact match "${candidate}" → "${map.name}"`);
+            return map;
+          }
         }
-
-        // 2c. Exact match ignoring apostrophes on stripped name
-        if (cleanedNoApos !== cleanedNorm) {
-          hit = await tryQuery(
-            `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") = LOWER(?) ORDER BY is_ranked DESC LIMIT 1`,
-            [cleanedNoApos],
-            `Exact match ignoring apostrophes (REPLACE) on cleaned "${cleanedNoApos}"`
-          );
-          if (hit) return hit;
+        for (const candidate of likeCandidates) {
+          const pattern = likePattern(assetLooseKey(candidate));
+          const map = maps.all.find(asset => asset.is_ranked && pattern.test(assetLooseKey(asset.name)));
+          if (map) {
+            console.log(`   [MAP DEBUG] ✅ LIKE match "${candidate}" → "${map.name}"`);
+            return map;
+          }
         }
-      }
-
-      // 3. LIKE on normalized map name
-      console.log(`   [MAP DEBUG] Step 3: LIKE match`);
-      hit = await tryQuery(
-        `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") LIKE REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-        [`%${mapNameNorm}%`],
-        `LIKE match on normalized "${mapNameNorm}"`
-      );
-      if (hit) return hit;
-
-      // 4. Fuzzy on prefix-stripped name (replace \ufffd with % wildcard)
-      const fuzzyClean = cleanedNorm.replace(/\s*\ufffd\s*/g, '%').replace(/%+/g, '%');
-      if (fuzzyClean !== cleanedNorm && cleaned !== mapName) {
-        hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") LIKE REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-          [fuzzyClean],
-          `LIKE fuzzy on cleaned "${fuzzyClean}"`
-        );
-        if (hit) return hit;
-      }
+        return null;
+      });
 
-      // 5. Fuzzy on raw map name (replace \ufffd with %)
-      const fuzzyRaw = mapNameNorm.replace(/\s*\ufffd\s*/g, '%').replace(/%+/g, '%');
-      if (fuzzyRaw !== mapNameNorm) {
-        hit = await tryQuery(
-          `SELECT name, is_ranked FROM game_maps WHERE REPLACE(LOWER(name), "'", "") LIKE REPLACE(LOWER(?), "'", "") ORDER BY is_ranked DESC LIMIT 1`,
-          [fuzzyRaw],
-          `LIKE fuzzy on raw "${fuzzyRaw}"`
-        );
-        if (hit) return hit;
+      if (hit) {
+        return { name: hit.name, isRanked: true };
       }
 
       // No ranked map found — return false (map not eligible for ranked matches)
-      console.log(`   [MAP DEBUG] ❌ NO RANKED MAP FOUND - returning isRanked: false`);
+      console.log(`   [MAP DEBUG] ❌ NO RANKED MAP FOUND for "${mapName}" - returning isRanked: false`);
       return { name: mapName, isRanked: false };
     } catch (err) {
       console.warn(`⚠️  Could not resolve map "${mapName}":`, err);
@@ -5,7 +5,7 @@ import { query } from '../config/database.js';
  * Should run once at the beginning of each month (01:30 on the 1st)
  * Calculates for the PREVIOUS month (e.g., on Feb 1st, calculates for January)
  */
-export const calculatePlayerOfMonth = async (): Promise<void> => {
+export const calculatePlayerOfMonth = async (signal?: AbortSignal): Promise<void> => {
   try {
     console.log('🎯 Calculating player of the month for previous month...');
 
@@ -135,7 +135,8 @@ export const calculatePlayerOfMonth = async (): Promise<void> => {
 
     // Delete previous month's record and insert new one
     // Store the month_year as the first day of the PREVIOUS month in YYYY-MM-DD format
-    
+    signal?.throwIfAborted();
+
     await query(
       `DELETE FROM player_of_month WHERE month_year = ?`,
       [monthYearStr]
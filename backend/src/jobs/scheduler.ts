@@ -1,19 +1,24 @@
 import cron from 'node-cron';
 import { query } from '../config/database.js';
 import { calculatePlayerOfMonth } from './playerOfMonthJob.js';
-import { calculateGlobalStatisticsJob } from './globalStatisticsJob.js';
+import { calculateGlobalStatisticsJob, reconcileGlobalStatisticsJob } from './globalStatisticsJob.js';
 import { SyncGamesFromForumJob } from './syncGamesFromForum.js';
 import ParseNewReplaysRefactored from './parseNewReplaysRefactored.js';
 import { v4 as uuidv4 } from 'uuid';
 import { createFactionMapStatisticsSnapshot, recalculatePlayerMatchStatistics } from '../services/statisticsCalculator.js';
 import { logAuditEvent } from '../middleware/audit.js';
+import { runWithJobLease, jobCycle } from '../services/jobLeaseService.js';
+import { ensureAuditLogPartitions } from '../services/auditLogPartitions.js';
+import { startDiscordOutboxDispatcher } from '../services/discordOutbox.js';
+import { runWithQueryContext } from '../config/queryMetrics.js';
+import { invalidateResponseCache, CACHE_EVENTS } from '../middleware/responseCache.js';
 
 /**
  * Auto-discard unconfirmed replays that exceed the age threshold
  * Replays with parse_status='parsed' and integration_confidence=1 (unconfirmed)
  * are marked as 'rejected' after REPLAY_AUTO_DISCARD_TIME days
  */
-export async function autoDiscardUnconfirmedReplays(): Promise<void> {
+export async function autoDiscardUnconfirmedReplays(signal?: AbortSignal): Promise<void> {
   const thresholdDays = parseInt(process.env.REPLAY_AUTO_DISCARD_TIME || '30', 10);
   
   try {
@@ -33,6 +38,11 @@ export async function autoDiscardUnconfirmedReplays(): Promise<void> {
     let failedCount = 0;
     
     for (const replay of replays) {
+      // Stop discarding once another instance has taken over the lease
+      if (signal?.aborted) {
+        console.warn(`⚠️  [AUTO-DISCARD] Lease lost, stopping after ${discardedCount} replays`);
+        break;
+      }
       try {
         await query(
           `UPDATE replays SET parse_status = 'rejected', updated_at = NOW() WHERE id = ?`,
@@ -72,13 +82,17 @@ export async function autoDiscardUnconfirmedReplays(): Promise<void> {
  * Initialize all scheduled jobs
  * Runs at specific times in UTC:
  * - 00:30 UTC: Daily balance snapshot
- * - 00:45 UTC: Player statistics recalculation
+ * - 00:45 UTC: Player statistics verification (shadow rebuild + atomic swap)
  * - 01:00 UTC: Check and mark inactive players
  * - 01:30 UTC on 1st: Calculate player of the month
  * - 02:00 UTC: Auto-discard old unconfirmed replays
  * - Every 30 minutes: Calculate global site statistics
  * - Every 60s: Sync new games from forum database
  * - Every 30s: Parse unparsed replays and create matches
+ *
+ * Multi-instance safety: singleton jobs run under a DB lease (job_leases) keyed
+ * by their cycle (jobCycle), so only one backend replica executes them per cycle.
+ * Replay parsing runs on every replica and claims rows with FOR UPDATE SKIP LOCKED instead.
  */
 export const initializeScheduledJobs = (): void => {
   try {
@@ -87,20 +101,27 @@ export const initializeScheduledJobs = (): void => {
     // Schedule daily balance snapshot at 00:30 UTC
     cron.schedule('30 0 * * *', async () => {
       try {
-        console.log('⏰ [CRON] Running daily balance snapshot...');
-        await createFactionMapStatisticsSnapshot();
-        console.log('✅ [CRON] Daily balance snapshot completed');
+        await runWithJobLease('balance_snapshot', async (signal) => {
+          console.log('⏰ [CRON] Running daily balance snapshot...');
+          await createFactionMapStatisticsSnapshot(new Date(), signal);
+          invalidateResponseCache(CACHE_EVENTS.statistics);
+          console.log('✅ [CRON] Daily balance snapshot completed');
+        }, { cycle: jobCycle('day') });
       } catch (error) {
         console.error('❌ [CRON] Failed to create daily snapshot:', error);
       }
     });
     
-    // Schedule daily player statistics recalculation at 00:45 UTC
+    // Schedule daily player statistics verification at 00:45 UTC
+    // Statistics are maintained per match; this rebuilds into a shadow table and swaps it in to fix drift
     cron.schedule('45 0 * * *', async () => {
       try {
-        console.log('📊 [CRON] Recalculating player match statistics...');
-        const result = await recalculatePlayerMatchStatistics();
-        console.log(`✅ [CRON] Player statistics recalculated: ${result.records_updated} records`);
+        await runWithJobLease('player_statistics_recalculation', async (signal) => {
+          console.log('📊 [CRON] Verifying player match statistics (shadow rebuild)...');
+          const result = await recalculatePlayerMatchStatistics(signal);
+          invalidateResponseCache([...CACHE_EVENTS.statistics, ...CACHE_EVENTS.player]);
+          console.log(`✅ [CRON] Player statistics rebuilt: ${result.records_updated} records, ${result.records_drifted} drifted`);
+        }, { leaseSeconds: 1800, cycle: jobCycle('day') });
       } catch (error) {
         console.error('❌ [CRON] Failed to recalculate player statistics:', error);
       }
@@ -110,21 +131,24 @@ export const initializeScheduledJobs = (): void => {
     // Marks players as inactive if they have no matches in the last 30 days
     cron.schedule('0 1 * * *', async () => {
       try {
-        console.log('👤 [CRON] Running inactive player check...');
-        const result = await query(
-          `UPDATE users_extension 
-           SET is_active = 0, updated_at = CURRENT_TIMESTAMP
-           WHERE is_active = 1 
-             AND is_blocked = 0
-             AND id NOT IN (
-               SELECT DISTINCT u.id
-               FROM users_extension u
-               INNER JOIN matches m ON (m.winner_id = u.id OR m.loser_id = u.id)
-               WHERE m.status != 'cancelled' 
-                 AND m.created_at >= DATE_SUB(CURRENT_DATE, INTERVAL 30 DAY)
-             )`
-        );
-        console.log(`✅ [CRON] Marked inactive players as inactive`);
+        await runWithJobLease('inactive_players_check', async () => {
+          console.log('👤 [CRON] Running inactive player check...');
+          await query(
+            `UPDATE users_extension 
+             SET is_active = 0, updated_at = CURRENT_TIMESTAMP
+             WHERE is_active = 1 
+               AND is_blocked = 0
+               AND id NOT IN (
+                 SELECT DISTINCT u.id
+                 FROM users_extension u
+                 INNER JOIN matches m ON (m.winner_id = u.id OR m.loser_id = u.id)
+                 WHERE m.status != 'cancelled' 
+                   AND m.created_at >= DATE_SUB(CURRENT_DATE, INTERVAL 30 DAY)
+               )`
+          );
+          invalidateResponseCache(CACHE_EVENTS.player);
+          console.log(`✅ [CRON] Marked inactive players as inactive`);
+        }, { cycle: jobCycle('day') });
       } catch (error) {
         console.error('❌ [CRON] Failed to check inactive players:', error);
       }
@@ -132,6 +156,7 @@ export const initializeScheduledJobs = (): void => {
 
     // Schedule forum database sync job every 60 seconds
     // Fetches new games from forum database and inserts them into replays table
+    // Leased: the sync checkpoint is global, so only one instance may advance it
     const forumSyncJob = new SyncGamesFromForumJob();
     
     const forumSyncIntervalSeconds = 60;
@@ -139,7 +164,7 @@ export const initializeScheduledJobs = (): void => {
 
     setInterval(async () => {
       try {
-        await forumSyncJob.executeSync();
+        await runWithJobLease('forum_sync', (signal) => forumSyncJob.executeSync(signal));
       } catch (error) {
         console.error('❌ [FORUM SYNC] Job execution failed:', error);
       }
@@ -148,6 +173,7 @@ export const initializeScheduledJobs = (): void => {
     // Schedule replay parsing job every 30 seconds
     // Parses unparsed replays from forum database integration
     // Extracts victory conditions and creates/updates matches
+    // Not leased: each instance claims its own batch of replay rows
     const parseNewReplaysRefactored = new ParseNewReplaysRefactored();
     
     const replayParseIntervalSeconds = 30;
@@ -155,18 +181,24 @@ export const initializeScheduledJobs = (): void => {
 
     setInterval(async () => {
       try {
-        await parseNewReplaysRefactored.execute();
+        await runWithQueryContext('job:replay_parse', () => parseNewReplaysRefactored.execute());
       } catch (error) {
         console.error('❌ [PARSE] Job execution failed:', error);
       }
     }, replayParseIntervalMs);
     
+    // Deliver queued Discord thread messages (leased: one dispatcher across instances)
+    startDiscordOutboxDispatcher();
+
     // Schedule player of month calculation at 01:30 UTC on the 1st of every month
     cron.schedule('30 1 1 * *', async () => {
       try {
-        console.log('🎯 [CRON] Calculating player of the month...');
-        await calculatePlayerOfMonth();
-        console.log('✅ [CRON] Player of month calculated');
+        await runWithJobLease('player_of_month', async (signal) => {
+          console.log('🎯 [CRON] Calculating player of the month...');
+          await calculatePlayerOfMonth(signal);
+          invalidateResponseCache(CACHE_EVENTS.player);
+          console.log('✅ [CRON] Player of month calculated');
+        }, { cycle: jobCycle('month') });
       } catch (error) {
         console.error('❌ [CRON] Failed to calculate player of month:', error);
       }
@@ -176,31 +208,55 @@ export const initializeScheduledJobs = (): void => {
     // Discards replays with parse_status='parsed' and integration_confidence=1 older than threshold
     cron.schedule('0 2 * * *', async () => {
       try {
-        console.log('⏰ [CRON] Running auto-discard of old unconfirmed replays...');
-        await autoDiscardUnconfirmedReplays();
+        await runWithJobLease('replay_auto_discard', async (signal) => {
+          console.log('⏰ [CRON] Running auto-discard of old unconfirmed replays...');
+          await autoDiscardUnconfirmedReplays(signal);
+        }, { cycle: jobCycle('day') });
       } catch (error) {
         console.error('❌ [CRON] Auto-discard failed:', error);
       }
     });
 
+    // Schedule audit log partition maintenance at 02:30 UTC daily
+    // Keeps the next monthly partitions of audit_logs split off ahead of time
+    cron.schedule('30 2 * * *', async () => {
+      try {
+        await runWithJobLease('audit_log_partitions', (signal) => ensureAuditLogPartitions(new Date(), signal), { cycle: jobCycle('day') });
+      } catch (error) {
+        console.error('❌ [CRON] Audit log partition maintenance failed:', error);
+      }
+    });
+
+    // Schedule global statistics day bucket reconcile at 00:15 UTC daily
+    cron.schedule('15 0 * * *', async () => {
+      try {
+        await runWithJobLease('global_statistics_reconcile', (signal) => reconcileGlobalStatisticsJob(signal), { cycle: jobCycle('day') });
+      } catch (error) {
+        console.error('❌ [CRON] Global statistics reconcile failed:', error);
+      }
+    });
+
     // Schedule global statistics calculation every 30 minutes
     cron.schedule('*/30 * * * *', async () => {
       try {
-        await calculateGlobalStatisticsJob();
+        await runWithJobLease('global_statistics', (signal) => calculateGlobalStatisticsJob(signal), { cycle: jobCycle(30) });
       } catch (error) {
         console.error('❌ [CRON] Global statistics calculation failed:', error);
       }
     });
     
     console.log('✅ Scheduled jobs initialized:');
+    console.log('   - Global statistics reconcile: Daily at 00:15 UTC');
     console.log('   - Balance snapshot: Daily at 00:30 UTC');
     console.log('   - Player statistics recalculation: Daily at 00:45 UTC');
     console.log('   - Inactive players check: Daily at 01:00 UTC');
     console.log('   - Player of month: 1st of month at 01:30 UTC');
     console.log('   - Auto-discard unconfirmed replays: Daily at 02:00 UTC');
-    console.log('   - Global statistics calculation: Every 30 minutes');
+    console.log('   - Audit log partition maintenance: Daily at 02:30 UTC');
+    console.log('   - Global statistics snapshot: Every 30 minutes');
     console.log('   - Forum database sync: Every 60 seconds');
     console.log('   - Replay parsing & match creation: Every 30 seconds');
+    console.log('   - Discord outbox dispatch: Every few seconds (when Discord is enabled)');
   } catch (error) {
     console.error('❌ Failed to initialize scheduler:', error);
     process.exit(1);
@@ -48,8 +48,9 @@ export class SyncGamesFromForumJob {
   /**
    * Execute one cycle of the sync job
    * Fetches new games from forum database and inserts them into replays table
+   * Stops without advancing the checkpoint once `signal` is aborted (job lease lost)
    */
-  async executeSync(): Promise<void> {
+  async executeSync(signal?: AbortSignal): Promise<void> {
     if (this.isRunning) {
       console.log('⚠️  [FORUM SYNC] Job already running, skipping this cycle');
       return;
@@ -123,6 +124,7 @@ export class SyncGamesFromForumJob {
 
       // Process each game
       for (const game of gamesResult) {
+        signal?.throwIfAborted();
         try {
           const instanceUuid = game.INSTANCE_UUID;
           const gameId = game.GAME_ID;
@@ -235,6 +237,7 @@ export class SyncGamesFromForumJob {
       console.log(`❌ [FORUM SYNC] ${this.errorCount} errors during processing`);
 
       // Update last check timestamp with the latest game timestamp
+      signal?.throwIfAborted();
       await this.updateLastCheckTimestamp(latestGameTimestamp);
 
     } catch (error) {
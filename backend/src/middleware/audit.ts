@@ -13,25 +13,118 @@ export interface AuditLogEntry {
   timestamp?: Date;
 }
 
+// Buffered writes: flushed as one multi-row INSERT every AUDIT_FLUSH_MS or AUDIT_BATCH_SIZE events
+const AUDIT_FLUSH_MS = parseInt(process.env.AUDIT_FLUSH_MS || '1000', 10);
+const AUDIT_BATCH_SIZE = parseInt(process.env.AUDIT_BATCH_SIZE || '100', 10);
+// Above this many buffered events, callers write their own event synchronously (backpressure)
+const AUDIT_QUEUE_MAX = parseInt(process.env.AUDIT_QUEUE_MAX || '5000', 10);
+
+type AuditRow = [string, string, string | null, string | null, string | null, string | null, string, Date];
+
+const AUDIT_COLUMNS = '(id, event_type, user_id, username, ip_address, user_agent, details, created_at)';
+
+let auditQueue: AuditRow[] = [];
+let flushTimer: NodeJS.Timeout | null = null;
+let flushing: Promise<void> | null = null;
+// Set on shutdown: from then on every event is written synchronously
+let writeThrough = false;
+
+function toAuditRow(entry: AuditLogEntry): AuditRow {
+  return [
+    generateUUID(),
+    entry.event_type,
+    entry.user_id || null,
+    entry.username || null,
+    entry.ip_address || null,
+    entry.user_agent || null,
+    JSON.stringify(entry.details),
+    entry.timestamp || new Date()
+  ];
+}
+
+async function insertAuditRows(rows: AuditRow[]): Promise<void> {
+  await query(
+    `INSERT INTO audit_logs ${AUDIT_COLUMNS}
+     VALUES ${rows.map(() => '(?, ?, ?, ?, ?, ?, ?, ?)').join(', ')}`,
+    rows.flat()
+  );
+}
+
+async function flushQueue(): Promise<void> {
+  while (auditQueue.length > 0) {
+    const batch = auditQueue.slice(0, AUDIT_BATCH_SIZE);
+    auditQueue = auditQueue.slice(batch.length);
+    try {
+      await insertAuditRows(batch);
+    } catch (error) {
+      // Put the batch back for the next flush while there is room; drop it otherwise
+      const room = AUDIT_QUEUE_MAX - auditQueue.length;
+      auditQueue = [...batch.slice(0, Math.max(room, 0)), ...auditQueue];
+      console.error(`Failed to write ${batch.length} audit events${room < batch.length ? ` (${batch.length - Math.max(room, 0)} dropped)` : ''}:`, error);
+      return;
+    }
+  }
+}
+
+function scheduleFlush(): void {
+  if (auditQueue.length >= AUDIT_BATCH_SIZE) {
+    flushAuditLog().catch(() => undefined);
+    return;
+  }
+  if (!flushTimer) {
+    flushTimer = setTimeout(() => {
+      flushTimer = null;
+      flushAuditLog().catch(() => undefined);
+    }, AUDIT_FLUSH_MS);
+    flushTimer.unref();
+  }
+}
+
+/**
+ * Write all buffered audit events now (before reading audit_logs, and on shutdown)
+ */
+export async function flushAuditLog(): Promise<void> {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  while (flushing) {
+    await flushing;
+  }
+  if (auditQueue.length === 0) {
+    return;
+  }
+  flushing = flushQueue().finally(() => { flushing = null; });
+  await flushing;
+  if (auditQueue.length > 0 && !writeThrough) {
+    // A failed batch was requeued: retry on the next tick of the timer
+    scheduleFlush();
+  }
+}
+
+/**
+ * Flush the buffer and switch to synchronous writes (call on SIGTERM/SIGINT before exiting)
+ */
+export async function shutdownAuditLog(): Promise<void> {
+  writeThrough = true;
+  await flushAuditLog();
+}
+
 /**
  * Log security audit events to database
+ * Events are buffered and written in batches; the returned promise resolves once the event is
+ * queued (or written, when the buffer is full or the process is shutting down).
  */
 export async function logAuditEvent(entry: AuditLogEntry) {
   try {
-    const auditId = generateUUID();
-    await query(
-      `INSERT INTO audit_logs (id, event_type, user_id, username, ip_address, user_agent, details, created_at)
-       VALUES (?, ?, ?, ?, ?, ?, ?, NOW())`,
-      [
-        auditId,
-        entry.event_type,
-        entry.user_id || null,
-        entry.username || null,
-        entry.ip_address || null,
-        entry.user_agent || null,
-        JSON.stringify(entry.details)
-      ]
-    );
+    const row = toAuditRow(entry);
+
+    if (writeThrough || auditQueue.length >= AUDIT_QUEUE_MAX) {
+      await insertAuditRows([row]);
+    } else {
+      auditQueue.push(row);
+      scheduleFlush();
+    }
 
     // Also log to console for real-time monitoring
     if (process.env.BACKEND_DEBUG_LOGS === 'true') console.log(`[AUDIT] ${entry.event_type}:`, {
@@ -65,6 +158,8 @@ export function getUserAgent(req: Request | AuthRequest): string {
 
 export default {
   logAuditEvent,
+  flushAuditLog,
+  shutdownAuditLog,
   getUserIP,
   getUserAgent
 };
@@ -1,7 +1,6 @@
 import { Request, Response, NextFunction } from 'express';
 import { verifyToken } from '../utils/auth.js';
-import { checkUserIsForumModerator } from '../services/phpbbAuth.js';
-import { query } from '../config/database.js';
+import { getUserContext, isUserForumModerator } from '../services/userContextCache.js';
 
 export interface AuthRequest extends Request {
   userId?: string;
@@ -47,9 +46,9 @@ export const adminMiddleware = async (req: AuthRequest, res: Response, next: Nex
     return res.status(401).json({ error: 'Not authenticated' });
   }
 
-  const result = await query('SELECT id FROM users_extension WHERE id = ? AND is_admin = 1', [req.userId]);
+  const context = await getUserContext(req.userId);
 
-  if (result.rows.length === 0) {
+  if (!context?.isAdmin) {
     return res.status(403).json({ error: 'Not authorized' });
   }
 
@@ -80,16 +79,15 @@ export const moderatorOrAdminMiddleware = async (req: AuthRequest, res: Response
   req.userId = userId;
   req.username = username;
 
-  const result = await query('SELECT is_admin FROM users_extension WHERE id = ?', [userId]);
+  const context = await getUserContext(userId);
 
-  if (result.rows.length === 0) {
+  if (!context) {
     return res.status(403).json({ error: 'Not authorized' });
   }
 
-  const isAdmin = result.rows[0].is_admin;
-  if (isAdmin) return next();
+  if (context.isAdmin) return next();
 
-  const isModerator = await checkUserIsForumModerator(username);
+  const isModerator = await isUserForumModerator(userId, username);
   if (isModerator) return next();
 
   return res.status(403).json({ error: 'Not authorized' });
@@ -83,13 +83,13 @@ export const generalLimiter = rateLimit({
 });
 
 /**
- * Strict rate limiter for search endpoints
- * Prevents user enumeration and information gathering
- * Limits: 10 requests per minute per IP
+ * Rate limiter for search endpoints
+ * Prevents user enumeration and information gathering while leaving room for typeahead
+ * Limits: SEARCH_RATE_LIMIT_PER_MINUTE requests per minute per IP (default 60)
  */
 export const searchLimiter = rateLimit({
   windowMs: 60 * 1000,        // 1 minute
-  max: 10,                    // 10 requests per window
+  max: parseInt(process.env.SEARCH_RATE_LIMIT_PER_MINUTE || '60', 10),
   standardHeaders: true,
   legacyHeaders: false,
   keyGenerator: (req, res) => {
@@ -0,0 +1,292 @@
+/**
+ * Response Cache
+ * File: backend/src/middleware/responseCache.ts
+ *
+ * Read-through cache for anonymous GET endpoints (routes/public.ts, routes/statistics.ts).
+ *
+ * - Bodies are kept in an in-process LRU and, when REDIS_URL is set, in a shared Redis-compatible store
+ * - Every entry carries tags; invalidateResponseCache() bumps the tag generations so all entries
+ *   built from older data are skipped (generations live in Redis too, so other replicas follow)
+ * - Concurrent misses for the same URL wait for the first one instead of all hitting MariaDB
+ * - Responses carry a weak ETag and Cache-Control; If-None-Match revalidations get a 304
+ *
+ * Authenticated requests bypass the cache because several public endpoints personalise their output.
+ * Every response of a cached route carries Vary: Authorization so browsers and proxies keep the
+ * anonymous copy apart from personalised ones; routes whose output depends on auth also set
+ * `personalised` so only the browser (Cache-Control: private) may reuse it.
+ */
+
+import { createHash } from 'crypto';
+import { Request, Response, NextFunction } from 'express';
+import { getRedisClient } from '../config/redis.js';
+
+export type CacheTag = 'matches' | 'players' | 'tournaments' | 'statistics' | 'assets';
+
+export const ALL_CACHE_TAGS: CacheTag[] = ['matches', 'players', 'tournaments', 'statistics', 'assets'];
+
+/**
+ * What each domain event invalidates
+ * A match affects listings, player stats, faction/map statistics and tournament standings.
+ */
+export const CACHE_EVENTS = {
+  match: ['matches', 'players', 'statistics', 'tournaments'] as CacheTag[],
+  tournament: ['tournaments'] as CacheTag[],
+  player: ['players'] as CacheTag[],
+  assets: ['assets', 'statistics'] as CacheTag[],
+  statistics: ['statistics'] as CacheTag[]
+};
+
+interface CacheEntry {
+  body: string;
+  etag: string;
+  generations: string;
+  expiresAt: number;
+}
+
+interface CacheOptions {
+  // Seconds a cached body is served before it is rebuilt
+  ttlSeconds: number;
+  // Tags whose invalidation drops this entry
+  tags: CacheTag[];
+  // Seconds browsers and CDNs may reuse the response without revalidating (defaults to ttlSeconds / 2)
+  maxAgeSeconds?: number;
+  // Output depends on the caller (optionalAuthMiddleware): shared caches must not store it
+  personalised?: boolean;
+}
+
+const ENABLED = process.env.RESPONSE_CACHE_ENABLED !== 'false';
+const MAX_ENTRIES = parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES || '2000', 10);
+const MAX_BYTES = parseInt(process.env.RESPONSE_CACHE_MAX_MB || '64', 10) * 1024 * 1024;
+// How long a replica trusts its copy of the shared tag generations
+const GENERATION_REFRESH_MS = 1000;
+const INFLIGHT_WAIT_MS = 10000;
+const REDIS_PREFIX = 'rc:';
+
+const entries = new Map<string, CacheEntry>();
+let totalBytes = 0;
+const inflight = new Map<string, Promise<CacheEntry | null>>();
+const generations = new Map<CacheTag, number>(ALL_CACHE_TAGS.map(tag => [tag, 0]));
+let generationsFetchedAt = 0;
+const counters = { hits: 0, misses: 0, revalidated: 0, coalesced: 0, invalidations: 0 };
+
+function storeLocal(key: string, entry: CacheEntry): void {
+  const existing = entries.get(key);
+  if (existing) {
+    totalBytes -= existing.body.length;
+    entries.delete(key);
+  }
+  entries.set(key, entry);
+  totalBytes += entry.body.length;
+
+  // Evict least recently used entries (Map iteration order = insertion order, hits re-insert)
+  while (entries.size > MAX_ENTRIES || totalBytes > MAX_BYTES) {
+    const oldestKey = entries.keys().next().value as string;
+    totalBytes -= entries.get(oldestKey)!.body.length;
+    entries.delete(oldestKey);
+  }
+}
+
+function readLocal(key: string): CacheEntry | undefined {
+  const entry = entries.get(key);
+  if (entry) {
+    entries.delete(key);
+    entries.set(key, entry);
+  }
+  return entry;
+}
+
+/**
+ * Pull the shared tag generations from Redis at most once per GENERATION_REFRESH_MS
+ */
+async function refreshGenerations(): Promise<void> {
+  const redis = getRedisClient();
+  if (!redis || Date.now() - generationsFetchedAt < GENERATION_REFRESH_MS) {
+    return;
+  }
+  generationsFetchedAt = Date.now();
+  try {
+    const values = await redis.command('MGET', ...ALL_CACHE_TAGS.map(tag => `${REDIS_PREFIX}gen:${tag}`));
+    if (Array.isArray(values)) {
+      ALL_CACHE_TAGS.forEach((tag, i) => {
+        const shared = parseInt(String(values[i] ?? '0'), 10) || 0;
+        generations.set(tag, Math.max(generations.get(tag) || 0, shared));
+      });
+    }
+  } catch {
+    // Store unreachable: keep using local generations
+  }
+}
+
+function generationStamp(tags: CacheTag[]): string {
+  return tags.map(tag => generations.get(tag) || 0).join('.');
+}
+
+/**
+ * Drop every cached response tagged with any of the given tags
+ */
+export function invalidateResponseCache(tags: CacheTag[]): void {
+  counters.invalidations++;
+  for (const tag of tags) {
+    generations.set(tag, (generations.get(tag) || 0) + 1);
+  }
+
+  const redis = getRedisClient();
+  if (redis) {
+    for (const tag of tags) {
+      redis.command('INCR', `${REDIS_PREFIX}gen:${tag}`)
+        .then(value => {
+          if (typeof value === 'number' && value > (generations.get(tag) || 0)) {
+            generations.set(tag, value);
+          }
+        })
+        .catch(() => undefined);
+    }
+  }
+}
+
+/**
+ * Router middleware: invalidate the given tags after every successful non-GET request
+ * Keeps write endpoints in a router from each having to remember the cache.
+ */
+export function invalidateCacheOnWrite(tags: CacheTag[]) {
+  return (req: Request, res: Response, next: NextFunction) => {
+    if (req.method !== 'GET' && req.method !== 'HEAD') {
+      res.on('finish', () => {
+        if (res.statusCode < 400) {
+          invalidateResponseCache(tags);
+        }
+      });
+    }
+    next();
+  };
+}
+
+function cacheKey(req: Request): string {
+  // Query parameters are sorted so ?a=1&b=2 and ?b=2&a=1 share an entry
+  const [pathname, search = ''] = req.originalUrl.split('?');
+  const params = new URLSearchParams(search);
+  params.sort();
+  const normalized = params.toString();
+  return normalized ? `${pathname}?${normalized}` : pathname;
+}
+
+function sendEntry(req: Request, res: Response, entry: CacheEntry, maxAge: number, scope: string, status: string): void {
+  const remaining = Math.max(0, Math.ceil((entry.expiresAt - Date.now()) / 1000));
+  res.setHeader('ETag', entry.etag);
+  res.setHeader('Cache-Control', `${scope}, max-age=${Math.min(maxAge, remaining)}, stale-while-revalidate=${maxAge}`);
+  res.setHeader('X-Cache', status);
+
+  if (req.headers['if-none-match'] === entry.etag) {
+    counters.revalidated++;
+    res.status(304).end();
+    return;
+  }
+  res.type('application/json').send(entry.body);
+}
+
+/**
+ * Cache the JSON response of a public GET route
+ */
+export function cacheResponse(options: CacheOptions) {
+  const maxAge = options.maxAgeSeconds ?? Math.floor(options.ttlSeconds / 2);
+  const scope = options.personalised ? 'private' : 'public';
+
+  return async (req: Request, res: Response, next: NextFunction) => {
+    // Set on bypassed responses too, so no cache hands an anonymous copy to a logged-in user
+    res.vary('Authorization');
+    if (!ENABLED || req.method !== 'GET' || req.headers.authorization) {
+      return next();
+    }
+
+    await refreshGenerations();
+    const stamp = generationStamp(options.tags);
+    const key = cacheKey(req);
+    const now = Date.now();
+
+    const local = readLocal(key);
+    if (local && local.generations === stamp && local.expiresAt > now) {
+      counters.hits++;
+      return sendEntry(req, res, local, maxAge, scope, 'HIT');
+    }
+
+    const redis = getRedisClient();
+    const redisKey = `${REDIS_PREFIX}${stamp}:${key}`;
+    if (redis) {
+      try {
+        const shared = await redis.command('GET', redisKey);
+        if (typeof shared === 'string') {
+          const entry = JSON.parse(shared) as CacheEntry;
+          if (entry.expiresAt > now) {
+            storeLocal(key, entry);
+            counters.hits++;
+            return sendEntry(req, res, entry, maxAge, scope, 'HIT');
+          }
+        }
+      } catch {
+        // Fall through to the handler
+      }
+    }
+
+    // Another request is already building this response: wait for it
+    const pending = inflight.get(`${stamp}:${key}`);
+    if (pending) {
+      counters.coalesced++;
+      const entry = await pending;
+      if (entry) {
+        return sendEntry(req, res, entry, maxAge, scope, 'HIT');
+      }
+      return next();
+    }
+
+    counters.misses++;
+    let settle!: (entry: CacheEntry | null) => void;
+    const building = new Promise<CacheEntry | null>(resolve => { settle = resolve; });
+    inflight.set(`${stamp}:${key}`, building);
+    const timer = setTimeout(() => settle(null), INFLIGHT_WAIT_MS);
+    building.then(() => {
+      clearTimeout(timer);
+      inflight.delete(`${stamp}:${key}`);
+    });
+    res.on('close', () => settle(null));
+
+    const originalJson = res.json.bind(res);
+    res.json = (body: any) => {
+      if (res.statusCode !== 200) {
+        settle(null);
+        return originalJson(body);
+      }
+
+      const serialized = JSON.stringify(body);
+      const entry: CacheEntry = {
+        body: serialized,
+        etag: `W/"${createHash('sha1').update(serialized).digest('base64url').slice(0, 27)}"`,
+        generations: stamp,
+        expiresAt: Date.now() + options.ttlSeconds * 1000
+      };
+      // Only store if no invalidation happened while the handler was reading
+      if (generationStamp(options.tags) === stamp) {
+        storeLocal(key, entry);
+        redis?.command('SET', redisKey, JSON.stringify(entry), 'PX', options.ttlSeconds * 1000).catch(() => undefined);
+      }
+      settle(entry);
+      sendEntry(req, res, entry, maxAge, scope, 'MISS');
+      return res;
+    };
+
+    next();
+  };
+}
+
+/**
+ * Cache statistics for the admin dashboard
+ */
+export function getResponseCacheStats() {
+  return {
+    enabled: ENABLED,
+    shared_store: getRedisClient()?.isConnected ?? false,
+    entries: entries.size,
+    bytes: totalBytes,
+    generations: Object.fromEntries(generations),
+    ...counters
+  };
+}
@@ -5,11 +5,25 @@ import { queryPhpbb } from '../config/phpbbDatabase.js';
 import { authMiddleware, moderatorOrAdminMiddleware, AuthRequest } from '../middleware/auth.js';
 import { calculateNewRating, calculateTrend } from '../utils/elo.js';
 import { unlockAccount } from '../services/accountLockout.js';
-import { logAuditEvent, getUserIP, getUserAgent } from '../middleware/audit.js';
+import { logAuditEvent, flushAuditLog, getUserIP, getUserAgent } from '../middleware/audit.js';
+import { purgeAuditLogsBefore } from '../services/auditLogPartitions.js';
 import { performGlobalStatsRecalculation } from './matches.js';
+import { invalidateCacheOnWrite, getResponseCacheStats, ALL_CACHE_TAGS } from '../middleware/responseCache.js';
+import { refreshLeaderboardPlayers } from '../services/leaderboardService.js';
+import { recordGlobalStatisticsEvent } from '../services/globalStatisticsService.js';
+import { getQueryMetricsSnapshot, resetQueryMetrics, QueryDatabase } from '../config/queryMetrics.js';
+import { updateTournamentTiebreakers, updateTeamTiebreakers } from '../services/statisticsCalculator.js';
+import { refreshAssetCatalog } from '../services/assetCatalog.js';
+import { getDiscordOutboxStatus, retryDeadDiscordMessage } from '../services/discordOutbox.js';
+import { getBcryptPoolStats } from '../services/bcryptPool.js';
+import { getReplayCacheStats } from '../utils/replayBlobCache.js';
+import { isUserAdmin, invalidateUserContext } from '../services/userContextCache.js';
 
 const router = Router();
 
+// Admin writes touch users, matches, tournaments and assets alike; drop every cached public response
+router.use(invalidateCacheOnWrite(ALL_CACHE_TAGS));
+
 // Reserved team ID for replaced/inactive players
 const REPLACED_PLAYERS_TEAM_ID = '00000000-0000-0000-0000-000000000001';
 
@@ -17,8 +31,7 @@ const REPLACED_PLAYERS_TEAM_ID = '00000000-0000-0000-0000-000000000001';
 router.get('/users', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -85,6 +98,7 @@ router.post('/users/:id/unlock', moderatorOrAdminMiddleware, async (req: AuthReq
     // Unlock account - reset failed attempts and unblock
     await unlockAccount(id);
     await query('UPDATE users_extension SET is_blocked = 0 WHERE id = ?', [id]);
+    await refreshLeaderboardPlayers([id]);
 
     if (process.env.BACKEND_DEBUG_LOGS === 'true') {
       console.log('✅ User unlocked and unblocked:', user.nickname);
@@ -352,6 +366,7 @@ router.post('/users/:id/block', moderatorOrAdminMiddleware, async (req: AuthRequ
     if (target.rows[0].is_admin) return res.status(403).json({ error: 'Cannot block an admin user' });
 
     await query(`UPDATE users_extension SET is_blocked = 1 WHERE id = ?`, [id]);
+    await refreshLeaderboardPlayers([id]);
 
     await logAuditEvent({
       event_type: 'USER_BLOCKED',
@@ -371,8 +386,13 @@ router.post('/users/:id/block', moderatorOrAdminMiddleware, async (req: AuthRequ
 // Make user admin
 router.post('/users/:id/make-admin', authMiddleware, async (req: AuthRequest, res) => {
   try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can grant admin rights' });
+    }
+
     const { id } = req.params;
     await query(`UPDATE users_extension SET is_admin = 1 WHERE id = ?`, [id]);
+    invalidateUserContext(id);
     const result = await query(`SELECT id, nickname, is_blocked, is_admin FROM users_extension WHERE id = ?`, [id]);
 
     if (result.rows.length === 0) {
@@ -388,8 +408,13 @@ router.post('/users/:id/make-admin', authMiddleware, async (req: AuthRequest, re
 // Remove admin
 router.post('/users/:id/remove-admin', authMiddleware, async (req: AuthRequest, res) => {
   try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can revoke admin rights' });
+    }
+
     const { id } = req.params;
     await query(`UPDATE users_extension SET is_admin = 0 WHERE id = ?`, [id]);
+    invalidateUserContext(id);
     const result = await query(`SELECT id, nickname, is_blocked, is_admin FROM users_extension WHERE id = ?`, [id]);
 
     if (result.rows.length === 0) {
@@ -405,8 +430,18 @@ router.post('/users/:id/remove-admin', authMiddleware, async (req: AuthRequest,
 // Delete user
 router.delete('/users/:id', authMiddleware, async (req: AuthRequest, res) => {
   try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can delete users' });
+    }
+
     const { id } = req.params;
+    const existing = await query('SELECT created_at FROM users_extension WHERE id = ?', [id]);
     await query('DELETE FROM users_extension WHERE id = ?', [id]);
+    invalidateUserContext(id);
+    if (existing.rows.length > 0) {
+      await recordGlobalStatisticsEvent('users_new', -1, existing.rows[0].created_at);
+    }
+    await refreshLeaderboardPlayers([id]);
     res.json({ message: 'User deleted' });
   } catch (error) {
     res.status(500).json({ error: 'Failed to delete user' });
@@ -506,8 +541,7 @@ router.get('/debug/faction-map-stats', authMiddleware, async (req: AuthRequest,
 router.post('/recalculate-all-stats', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Verify admin status
-    const adminResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (adminResult.rows.length === 0 || !adminResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Admin access required' });
     }
 
@@ -583,6 +617,9 @@ router.get('/audit-logs', moderatorOrAdminMiddleware, async (req: AuthRequest, r
 
     const whereClause = whereConditions.length > 0 ? `WHERE ${whereConditions.join(' AND ')}` : '';
 
+    // Include events still in the write buffer
+    await flushAuditLog();
+
     const result = await query(
       `SELECT id, event_type, user_id, username, ip_address, user_agent, details, created_at
        FROM audit_logs
@@ -603,8 +640,7 @@ router.get('/audit-logs', moderatorOrAdminMiddleware, async (req: AuthRequest, r
 router.delete('/audit-logs', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const adminCheck = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (!adminCheck.rows[0]?.is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can delete audit logs' });
     }
 
@@ -641,30 +677,19 @@ router.delete('/audit-logs', authMiddleware, async (req: AuthRequest, res) => {
 router.delete('/audit-logs/old', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const adminCheck = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (!adminCheck.rows[0]?.is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can delete audit logs' });
     }
 
     const { daysBack = 30 } = req.body;
 
-    if (daysBack < 1) {
+    if (!(Number(daysBack) >= 1)) {
       return res.status(400).json({ error: 'daysBack must be at least 1' });
     }
 
-    // Get count before deletion
-    const countBefore = await query(
-      `SELECT COUNT(*) as count FROM audit_logs 
-       WHERE created_at < DATE_SUB(NOW(), INTERVAL ${daysBack} DAY)`
-    );
-
-    // Delete old logs
-    await query(
-      `DELETE FROM audit_logs 
-       WHERE created_at < DATE_SUB(NOW(), INTERVAL ${daysBack} DAY)`
-    );
-
-    const deletedCount = parseInt(countBefore.rows[0].count);
+    // Drop whole monthly partitions, then delete the remainder of the boundary month in chunks
+    const cutoff = new Date(Date.now() - Number(daysBack) * 24 * 60 * 60 * 1000);
+    const deletedCount = await purgeAuditLogsBefore(cutoff);
 
     // Log this admin action
     await logAuditEvent({
@@ -814,8 +839,7 @@ router.post('/replays/:replayId/reprocess', moderatorOrAdminMiddleware, async (r
 router.get('/maps', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -840,8 +864,7 @@ router.get('/maps', authMiddleware, async (req: AuthRequest, res) => {
 router.get('/maps/:mapId/translations', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -862,8 +885,7 @@ router.get('/maps/:mapId/translations', authMiddleware, async (req: AuthRequest,
 router.post('/maps', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -885,6 +907,7 @@ router.post('/maps', authMiddleware, async (req: AuthRequest, res) => {
       INSERT INTO map_translations (id, map_id, language_code, name, description)
       VALUES (?, ?, ?, ?, ?)
     `, [uuidv4(), mapId, language_code, name, description || null]);
+    await refreshAssetCatalog();
 
     const mapResult = await query(`
       SELECT id, name, is_active, is_ranked, created_at FROM game_maps WHERE id = ?
@@ -900,8 +923,7 @@ router.post('/maps', authMiddleware, async (req: AuthRequest, res) => {
 router.patch('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -921,6 +943,7 @@ router.patch('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
       name || null,
       mapId
     ]);
+    await refreshAssetCatalog();
 
     const result = await query(`
       SELECT id, name, is_active, is_ranked, created_at FROM game_maps WHERE id = ?
@@ -941,8 +964,7 @@ router.patch('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
 router.post('/maps/:mapId/translations', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -976,8 +998,7 @@ router.post('/maps/:mapId/translations', authMiddleware, async (req: AuthRequest
 router.delete('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -993,6 +1014,7 @@ router.delete('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
     }
 
     await query('DELETE FROM game_maps WHERE id = ?', [mapId]);
+    await refreshAssetCatalog();
     res.json({ success: true });
   } catch (error) {
     console.error('Error deleting map:', error);
@@ -1008,8 +1030,7 @@ router.delete('/maps/:mapId', authMiddleware, async (req: AuthRequest, res) => {
 router.get('/factions', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1034,8 +1055,7 @@ router.get('/factions', authMiddleware, async (req: AuthRequest, res) => {
 router.get('/factions/:factionId/translations', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1056,8 +1076,7 @@ router.get('/factions/:factionId/translations', authMiddleware, async (req: Auth
 router.post('/factions', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1079,6 +1098,7 @@ router.post('/factions', authMiddleware, async (req: AuthRequest, res) => {
       INSERT INTO faction_translations (id, faction_id, language_code, name, description)
       VALUES (?, ?, ?, ?, ?)
     `, [uuidv4(), factionId, language_code, name, description || null]);
+    await refreshAssetCatalog();
 
     const factionResult = await query(`
       SELECT id, name, is_active, is_ranked, created_at FROM factions WHERE id = ?
@@ -1094,8 +1114,7 @@ router.post('/factions', authMiddleware, async (req: AuthRequest, res) => {
 router.patch('/factions/:factionId', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1115,6 +1134,7 @@ router.patch('/factions/:factionId', authMiddleware, async (req: AuthRequest, re
       name || null,
       factionId
     ]);
+    await refreshAssetCatalog();
 
     const result = await query(`
       SELECT id, name, is_active, is_ranked, created_at FROM factions WHERE id = ?
@@ -1135,8 +1155,7 @@ router.patch('/factions/:factionId', authMiddleware, async (req: AuthRequest, re
 router.post('/factions/:factionId/translations', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1170,8 +1189,7 @@ router.post('/factions/:factionId/translations', authMiddleware, async (req: Aut
 router.delete('/factions/:factionId', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1189,6 +1207,7 @@ router.delete('/factions/:factionId', authMiddleware, async (req: AuthRequest, r
     }
 
     await query('DELETE FROM factions WHERE id = ?', [factionId]);
+    await refreshAssetCatalog();
     res.json({ success: true });
   } catch (error) {
     console.error('Error deleting faction:', error);
@@ -1200,8 +1219,7 @@ router.delete('/factions/:factionId', authMiddleware, async (req: AuthRequest, r
 router.post('/recalculate-snapshots', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access this resource' });
     }
 
@@ -1274,8 +1292,7 @@ router.get('/player-of-month', async (req, res) => {
 router.post('/calculate-player-of-month', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Verify admin status
-    const adminResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (adminResult.rows.length === 0 || !adminResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Admin access required' });
     }
 
@@ -1359,6 +1376,7 @@ router.post('/unranked-factions', authMiddleware, async (req: AuthRequest, res)
        VALUES (?, ?, 1, 0)`,
       [newFactionId, name]
     );
+    await refreshAssetCatalog();
     const result = await query(
       `SELECT id, name, is_ranked, created_at FROM factions WHERE id = ?`,
       [newFactionId]
@@ -1377,11 +1395,7 @@ router.post('/unranked-factions', authMiddleware, async (req: AuthRequest, res)
 // Get faction usage (before delete)
 router.get('/unranked-factions/:id/usage', authMiddleware, async (req: AuthRequest, res) => {
   try {
-    const userResult = await query(
-      'SELECT is_admin FROM users_extension WHERE id = ?',
-      [req.userId]
-    );
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ success: false, error: 'Admin access required' });
     }
 
@@ -1446,11 +1460,7 @@ router.get('/unranked-factions/:id/usage', authMiddleware, async (req: AuthReque
 // Delete unranked faction (admin only, validates not in active tournaments)
 router.delete('/unranked-factions/:id', authMiddleware, async (req: AuthRequest, res) => {
   try {
-    const userResult = await query(
-      'SELECT is_admin FROM users_extension WHERE id = ?',
-      [req.userId]
-    );
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ success: false, error: 'Admin access required' });
     }
 
@@ -1486,6 +1496,7 @@ router.delete('/unranked-factions/:id', authMiddleware, async (req: AuthRequest,
 
     // Delete faction (cascade will remove associations)
     await query('DELETE FROM factions WHERE id = ?', [id]);
+    await refreshAssetCatalog();
 
     res.json({ success: true, message: 'Faction deleted successfully' });
   } catch (error) {
@@ -1558,6 +1569,7 @@ router.post('/unranked-maps', authMiddleware, async (req: AuthRequest, res) => {
        VALUES (?, ?, 1, 0)`,
       [mapId, name]
     );
+    await refreshAssetCatalog();
 
     const inserted = await query(
       'SELECT id, name, is_ranked, is_active, created_at FROM game_maps WHERE id = ?',
@@ -1577,11 +1589,7 @@ router.post('/unranked-maps', authMiddleware, async (req: AuthRequest, res) => {
 // Get map usage (before delete)
 router.get('/unranked-maps/:id/usage', authMiddleware, async (req: AuthRequest, res) => {
   try {
-    const userResult = await query(
-      'SELECT is_admin FROM users_extension WHERE id = ?',
-      [req.userId]
-    );
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ success: false, error: 'Admin access required' });
     }
 
@@ -1646,11 +1654,7 @@ router.get('/unranked-maps/:id/usage', authMiddleware, async (req: AuthRequest,
 // Delete unranked map (admin only, validates not in active tournaments)
 router.delete('/unranked-maps/:id', authMiddleware, async (req: AuthRequest, res) => {
   try {
-    const userResult = await query(
-      'SELECT is_admin FROM users_extension WHERE id = ?',
-      [req.userId]
-    );
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ success: false, error: 'Admin access required' });
     }
 
@@ -1686,6 +1690,7 @@ router.delete('/unranked-maps/:id', authMiddleware, async (req: AuthRequest, res
 
     // Delete map (cascade will remove associations)
     await query('DELETE FROM game_maps WHERE id = ?', [id]);
+    await refreshAssetCatalog();
 
     res.json({ success: true, message: 'Map deleted successfully' });
   } catch (error) {
@@ -1715,11 +1720,7 @@ router.put('/tournaments/:id/unranked-assets', authMiddleware, async (req: AuthR
 
     // Check authorization (must be organizer)
     if (tournament.creator_id !== req.userId) {
-      const userResult = await query(
-        'SELECT is_admin FROM users_extension WHERE id = ?',
-        [req.userId]
-      );
-      if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+      if (!(await isUserAdmin(req.userId))) {
         return res.status(403).json({ success: false, error: 'Not authorized to modify this tournament' });
       }
     }
@@ -1796,6 +1797,7 @@ router.put('/tournaments/:id/unranked-assets', authMiddleware, async (req: AuthR
         [id, mapId]
       );
     }
+    await refreshAssetCatalog();
 
     res.json({
       success: true,
@@ -2191,32 +2193,10 @@ router.post('/tournaments/:id/calculate-tiebreakers', authMiddleware, async (req
       return res.status(403).json({ success: false, error: 'Only tournament organizer can calculate tiebreakers' });
     }
 
-    // Calculate tiebreakers - use appropriate function based on tournament mode
-    let tiebreakersResult;
-    if (tournament.tournament_mode === 'team') {
-      // For team tournaments, update team tiebreakers
-      tiebreakersResult = await query(
-        'SELECT updated_count, error_message FROM update_team_tiebreakers(?)',
-        [id]
-      );
-    } else {
-      // For individual tournaments, update participant tiebreakers
-      tiebreakersResult = await query(
-        'SELECT updated_count, error_message FROM update_tournament_tiebreakers(?)',
-        [id]
-      );
-    }
-
-    if (tiebreakersResult.rows.length === 0) {
-      return res.status(500).json({ success: false, error: 'Failed to calculate tiebreakers' });
-    }
-
-    const { updated_count, error_message } = tiebreakersResult.rows[0];
-    
-    if (error_message) {
-      console.error(`❌ [CALCULATE TIEBREAKERS] Error: ${error_message}`);
-      return res.status(500).json({ success: false, error: error_message });
-    }
+    // Calculate tiebreakers - teams for team tournaments, participants otherwise
+    const { updated_count } = tournament.tournament_mode === 'team'
+      ? await updateTeamTiebreakers(id)
+      : await updateTournamentTiebreakers(id);
 
     console.log(`✅ [CALCULATE TIEBREAKERS] Calculated tiebreakers for ${updated_count} ${tournament.tournament_mode === 'team' ? 'teams' : 'participants'}`);
     
@@ -2235,6 +2215,135 @@ router.post('/tournaments/:id/calculate-tiebreakers', authMiddleware, async (req
 // MAINTENANCE MODE ENDPOINTS
 // ============================================================================
 
+/**
+ * Get database query metrics (per statement fingerprint)
+ * Admin only - query params: sort (total|calls|max|errors|wait), limit, db (main|forum|phpbb|tournament)
+ */
+router.get('/query-metrics', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can view query metrics' });
+    }
+
+    const sort = req.query.sort as 'total' | 'calls' | 'max' | 'errors' | 'wait' | undefined;
+    const limit = Math.min(Math.max(parseInt(req.query.limit as string) || 100, 1), 1000);
+    const db = req.query.db as QueryDatabase | undefined;
+
+    res.json(getQueryMetricsSnapshot({ sort, limit, db }));
+  } catch (error) {
+    console.error('Error fetching query metrics:', error);
+    res.status(500).json({ error: 'Failed to fetch query metrics' });
+  }
+});
+
+/**
+ * Get response cache statistics (hit/miss counters, size, tag generations)
+ * Admin only
+ */
+router.get('/response-cache', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can view cache statistics' });
+    }
+
+    res.json(getResponseCacheStats());
+  } catch (error) {
+    console.error('Error fetching response cache statistics:', error);
+    res.status(500).json({ error: 'Failed to fetch response cache statistics' });
+  }
+});
+
+/**
+ * Reset database query metrics
+ * Admin only
+ */
+router.delete('/query-metrics', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can reset query metrics' });
+    }
+
+    resetQueryMetrics();
+    res.json({ success: true, message: 'Query metrics reset' });
+  } catch (error) {
+    console.error('Error resetting query metrics:', error);
+    res.status(500).json({ error: 'Failed to reset query metrics' });
+  }
+});
+
+/**
+ * Get password verification pool status (workers, queue depth, timeouts)
+ * Admin only
+ */
+router.get('/bcrypt-pool', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can view the password verification pool' });
+    }
+
+    res.json(getBcryptPoolStats());
+  } catch (error) {
+    console.error('Error fetching bcrypt pool status:', error);
+    res.status(500).json({ error: 'Failed to fetch bcrypt pool status' });
+  }
+});
+
+/**
+ * Get local replay disk cache status (entries, bytes used, size cap, downloads in flight)
+ * Admin only
+ */
+router.get('/replay-cache', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can view the replay cache' });
+    }
+
+    res.json(getReplayCacheStats());
+  } catch (error) {
+    console.error('Error fetching replay cache status:', error);
+    res.status(500).json({ error: 'Failed to fetch replay cache status' });
+  }
+});
+
+/**
+ * Get Discord outbox status (queued messages per status, recent dead-lettered messages)
+ * Admin only - query params: limit (dead messages, max 200)
+ */
+router.get('/discord-outbox', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can view the Discord outbox' });
+    }
+
+    res.json(await getDiscordOutboxStatus(parseInt(req.query.limit as string) || 50));
+  } catch (error) {
+    console.error('Error fetching Discord outbox status:', error);
+    res.status(500).json({ error: 'Failed to fetch Discord outbox status' });
+  }
+});
+
+/**
+ * Re-queue a dead-lettered Discord message
+ * Admin only
+ */
+router.post('/discord-outbox/:id/retry', authMiddleware, async (req: AuthRequest, res) => {
+  try {
+    if (!(await isUserAdmin(req.userId))) {
+      return res.status(403).json({ error: 'Only admins can retry Discord messages' });
+    }
+
+    const id = parseInt(req.params.id, 10);
+    if (isNaN(id) || !(await retryDeadDiscordMessage(id))) {
+      return res.status(404).json({ error: 'Dead-lettered message not found' });
+    }
+
+    res.json({ success: true, message: 'Discord message re-queued' });
+  } catch (error) {
+    console.error('Error retrying Discord message:', error);
+    res.status(500).json({ error: 'Failed to retry Discord message' });
+  }
+});
+
 /**
  * Get current maintenance mode status
  * Public endpoint - anyone can check if maintenance is active
@@ -2261,8 +2370,7 @@ router.get('/maintenance-status', async (req, res) => {
 router.post('/toggle-maintenance', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can toggle maintenance mode' });
     }
 
@@ -2316,14 +2424,14 @@ router.post('/toggle-maintenance', authMiddleware, async (req: AuthRequest, res)
 router.get('/maintenance-logs', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Check if user is admin
-    const userResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (userResult.rows.length === 0 || !userResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Only admins can access maintenance logs' });
     }
 
     const limit = Math.min(parseInt(req.query.limit as string) || 50, 100);
 
     // Get maintenance mode toggle events from audit log
+    await flushAuditLog();
     const result = await query(
       `SELECT 
         id,
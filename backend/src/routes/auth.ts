@@ -3,8 +3,9 @@ import { generateTokenWithUsername, verifyToken } from '../utils/auth.js';
 import { authenticatePhpbbUser, getPhpbbUser, checkForumBanlist, checkUserIsForumModerator } from '../services/phpbbAuth.js';
 import { generateUUID } from '../utils/uuid.js';
 import { queryTournament } from '../config/tournamentDatabase.js';
-import { query } from '../config/database.js';
 import { logAuditEvent, getUserIP, getUserAgent } from '../middleware/audit.js';
+import { recordGlobalStatisticsEvent } from '../services/globalStatisticsService.js';
+import { getUserContext, isUserForumModerator } from '../services/userContextCache.js';
 
 const router = Router();
 
@@ -51,6 +52,12 @@ router.post('/login', async (req, res) => {
     // Authenticate user against phpBB database
     const authResult = await authenticatePhpbbUser(normalizedUsername, password, skipPasswordCheck);
     
+    if (!authResult.valid && authResult.error === 'authentication_busy') {
+      // Password verification pool saturated: not a failed login, ask the client to retry
+      res.setHeader('Retry-After', '5');
+      return res.status(503).json({ error: 'Login temporarily unavailable, please try again' });
+    }
+
     if (!authResult.valid) {
       console.log(`❌ [LOGIN] Failed login for ${normalizedUsername}: ${authResult.error}`);
       // Log failed login attempt
@@ -102,6 +109,7 @@ router.post('/login', async (req, res) => {
          VALUES (?, ?, 1, 0, NULL)`,
         [tournamentUserId, authResult.username]
       );
+      await recordGlobalStatisticsEvent('users_new');
       
       console.log(`✅ [LOGIN] User created in users_extension: ${tournamentUserId}`);
     } else {
@@ -160,21 +168,17 @@ router.get('/validate-token', async (req, res) => {
       return res.status(401).json({ error: 'User not found' });
     }
 
-    // Get tournament user info to check if admin
-    const tournamentUserResult = await query(
-      'SELECT is_admin FROM users_extension WHERE id = ?',
-      [decoded.userId]
-    );
-
-    const isAdmin = tournamentUserResult.rows[0]?.is_admin || false;
-    const isTournamentModerator = await checkUserIsForumModerator(decoded.username);
+    // Tournament user info (admin flag, nickname) and moderator membership from the user context cache
+    const userContext = await getUserContext(decoded.userId);
+    const isAdmin = userContext?.isAdmin || false;
+    const isTournamentModerator = await isUserForumModerator(decoded.userId, decoded.username);
 
     // Return user info
     res.json({
       valid: true,
       userId: decoded.userId,
       username: phpbbUser.username,
-      nickname: tournamentUserResult.rows[0]?.nickname || phpbbUser.username,
+      nickname: userContext?.nickname || phpbbUser.username,
       isAdmin: isAdmin,
       isTournamentModerator,
     });
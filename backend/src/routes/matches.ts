@@ -6,9 +6,7 @@ import { getUserLevel } from '../utils/auth.js';
 import {
   calculateNewRating,
   calculateInitialRating,
-  shouldPlayerBeRated,
   calculateTrend,
-  getKFactorWithReason,
 } from '../utils/elo.js';
 import { updateBestOfSeriesDB, createNextMatchInSeries } from '../utils/bestOf.js';
 import { checkAndCompleteRound } from '../utils/tournament.js';
@@ -16,21 +14,58 @@ import {
   updateFactionMapStatistics,
   recalculatePlayerMatchStatistics,
   recalculateFactionMapStatistics,
+  applyMatchToPlayerMatchStatistics,
+  refreshPlayerMatchStatistics,
   updatePlayerElo
 } from '../services/statisticsCalculator.js';
+import { replayEloFull, replayEloFromMatch } from '../services/eloReplayService.js';
 import { updateTournamentRoundMatch } from '../services/matchCreationService.js';
 import { validateAndCorrectFactions, handlePostConfirmation } from '../services/replayConfirmationService.js';
-// NOTE: Supabase replay storage temporarily disabled - using /uploads/replays instead
+import { isUserAdmin } from '../services/userContextCache.js';
+// NOTE: Supabase replay uploads temporarily disabled - using /uploads/replays instead
+import { isSupabaseConfigured, openReplayFromSupabase } from '../config/supabase.js';
+import { pipeline } from 'stream/promises';
+import {
+  parseReplayUpload,
+  parseReplayBuffer,
+  getCachedReplayPreview,
+  ReplayUploadError,
+  REPLAY_UPLOAD_MAX_BYTES
+} from '../utils/replayPreview.js';
 import multer from 'multer';
 import path from 'path';
 import fs from 'fs';
 import { fileURLToPath } from 'url';
+import { invalidateCacheOnWrite, CACHE_EVENTS } from '../middleware/responseCache.js';
+import { recordGlobalStatisticsEvent } from '../services/globalStatisticsService.js';
+import {
+  KeysetColumn,
+  keysetOrderBy,
+  keysetCondition,
+  encodeCursor,
+  decodeCursor,
+  compareKeyset,
+  getApproximateCount
+} from '../utils/pagination.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
 const router = Router();
 
+// Reporting, confirming, disputing or cancelling a match changes public listings and statistics
+router.use(invalidateCacheOnWrite(CACHE_EVENTS.match));
+
+// GET / pages by (created_at, id); pending replays are merged in using the same order
+const MATCH_LIST_KEYSET: KeysetColumn[] = [
+  { expr: 'm.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'm.id', field: 'id', direction: 'DESC' }
+];
+const REPLAY_LIST_KEYSET: KeysetColumn[] = [
+  { expr: 'r.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'r.id', field: 'id', direction: 'DESC' }
+];
+
 console.log('🔧 Registering match routes');
 
 // Create uploads directory if it doesn't exist
@@ -43,7 +78,7 @@ if (!fs.existsSync(uploadsDir)) {
 // Use memory storage to avoid writing temp files before uploading to Supabase
 const upload = multer({ 
   storage: multer.memoryStorage(),
-  limits: { fileSize: 512 * 1024 }, // 512KB max file size
+  limits: { fileSize: REPLAY_UPLOAD_MAX_BYTES }, // 512KB max file size by default
   fileFilter: (req, file, cb) => {
     const ext = path.extname(file.originalname).toLowerCase();
     if (ext !== '.gz' && ext !== '.bz2') {
@@ -83,7 +118,38 @@ function normalizeMapName(mapName: string | null | undefined): string {
     .toLowerCase();
 }
 
-// Helper function to recalculate all stats (used by both admin and player self-cancel)
+// Helper to take a just-cancelled match out of ELO and statistics (used by dispute validation and self-cancel)
+// Incremental: ELO is replayed from the checkpoint just before the match, only the affected players'
+// statistics rows are rebuilt, and the match is removed from faction/map statistics with a -1 delta
+async function revertCancelledMatchStatistics(match: any) {
+  // Resume every player from their state just before the cancelled match, replay all later
+  // matches in one pass, and write back only what changed
+  const replaySummary = await replayEloFromMatch(match);
+
+  console.log(`🎯 [CASCADE] Replayed ${replaySummary.matchesReplayed} subsequent matches: ${replaySummary.matchesUpdated} changed, ${replaySummary.playersUpdated} players updated`);
+
+  // Refresh player match statistics of the affected players only
+  try {
+    const playerStatsResult = await refreshPlayerMatchStatistics(replaySummary.playerIds);
+    console.log(`✓ Refreshed ${playerStatsResult.records_updated} player match statistics rows`);
+  } catch (error: any) {
+    console.error('✗ Error refreshing player match statistics:', error);
+  }
+
+  // Remove the cancelled match from faction/map balance statistics (-1 delta)
+  try {
+    if (match.map && match.winner_faction && match.loser_faction) {
+      await updateFactionMapStatistics(match.map, match.winner_faction, match.loser_faction, match.winner_side, -1, match.created_at);
+      console.log('✓ Removed cancelled match from faction/map statistics');
+    }
+  } catch (error: any) {
+    console.error('✗ Error updating faction/map statistics:', error);
+  }
+
+  return replaySummary;
+}
+
+// Helper function to recalculate all stats (admin full recalculation)
 // This does a FULL replay of all non-cancelled matches to recalculate ELO correctly
 async function performGlobalStatsRecalculation() {
   const logs: string[] = [];
@@ -109,173 +175,16 @@ async function performGlobalStatsRecalculation() {
       if (isDebugEnabled) console.warn('Warning: Failed to disable triggers:', error);
     }
 
-    const defaultElo = 1400; // FIDE standard baseline for new users
-
-    // STEP 2: Get ALL non-cancelled matches in chronological order (including 'reported')
-    const allNonCancelledMatches = await query(
-      `SELECT m.id, m.winner_id, m.loser_id, m.created_at
-       FROM matches m
-       WHERE m.status != 'cancelled'
-       ORDER BY m.created_at ASC, m.id ASC`
-    );
-
-    // STEP 3: Initialize all users with baseline ELO and zero stats
-    const userStates = new Map<string, {
-      elo_rating: number;
-      matches_played: number;
-      total_wins: number;
-      total_losses: number;
-      trend: string;
-      level: string;
-    }>();
-
-    const allUsersResult = await query('SELECT id FROM users_extension');
-    for (const userRow of allUsersResult.rows) {
-      userStates.set(userRow.id, {
-        elo_rating: defaultElo,
-        matches_played: 0,
-        total_wins: 0,
-        total_losses: 0,
-        trend: '-',
-        level: 'Novato'
-      });
-    }
-
-    // STEP 4: Replay ALL non-cancelled matches chronologically to rebuild correct stats
-    let matchProcessedCount = 0;
-    let debugSampleLogs: string[] = [];
-
-    for (const matchRow of allNonCancelledMatches.rows) {
-      const winnerId = matchRow.winner_id;
-      const loserId = matchRow.loser_id;
+    // STEP 2-5: Replay ALL non-cancelled matches chronologically with the in-memory ELO engine,
+    // then write match ELO values and user stats back in bulk (single transaction)
+    const replaySummary = await replayEloFull();
+    const matchProcessedCount = replaySummary.matchesReplayed;
+    const usersUpdatedCount = replaySummary.playersUpdated;
 
-      // Ensure both users exist in state map
-      if (!userStates.has(winnerId)) {
-        userStates.set(winnerId, { elo_rating: defaultElo, matches_played: 0, total_wins: 0, total_losses: 0, trend: '-', level: 'Novato' });
-      }
-      if (!userStates.has(loserId)) {
-        userStates.set(loserId, { elo_rating: defaultElo, matches_played: 0, total_wins: 0, total_losses: 0, trend: '-', level: 'Novato' });
-      }
-
-      const winner = userStates.get(winnerId)!;
-      const loser = userStates.get(loserId)!;
-
-      // Store before values
-      const winnerEloBefore = winner.elo_rating;
-      const loserEloBefore = loser.elo_rating;
-      const winnerMatchesBeforeCalc = winner.matches_played;
-      const loserMatchesBeforeCalc = loser.matches_played;
-
-      // Calculate new ratings
-      const winnerNewRating = calculateNewRating(winner.elo_rating, loser.elo_rating, 'win', winner.matches_played);
-      const loserNewRating = calculateNewRating(loser.elo_rating, winner.elo_rating, 'loss', loser.matches_played);
-      
-      // Get K-factor info for debugging (from elo.ts)
-      const winnerKInfo = getKFactorWithReason(winner.elo_rating, winner.matches_played);
-      const loserKInfo = getKFactorWithReason(loser.elo_rating, loser.matches_played);
-
-      // Calculate levels based on ELO BEFORE and AFTER (not from previous state)
-      const winnerLevelBefore = getUserLevel(winnerEloBefore);
-      const loserLevelBefore = getUserLevel(loserEloBefore);
-      const winnerLevelAfter = getUserLevel(winnerNewRating);
-      const loserLevelAfter = getUserLevel(loserNewRating);
-
-      // Update stats
-      winner.elo_rating = winnerNewRating;
-      loser.elo_rating = loserNewRating;
-      winner.matches_played++;
-      loser.matches_played++;
-      winner.total_wins++;
-      loser.total_losses++;
-      winner.trend = calculateTrend(winner.trend, true);
-      loser.trend = calculateTrend(loser.trend, false);
-      
-      // Update levels in state for next iteration
-      winner.level = winnerLevelAfter;
-      loser.level = loserLevelAfter;
-
-      // Calculate ELO changes for both players
-      const winnerEloChange = winnerNewRating - winnerEloBefore;
-      const loserEloChange = loserNewRating - loserEloBefore;
-
-      // DEBUG: Log sample matches (first 3, last 3, and every 10th)
-      if (isDebugEnabled && (matchProcessedCount < 3 || matchProcessedCount % 10 === 0 || matchProcessedCount === allNonCancelledMatches.rows.length - 1)) {
-        const debugLog = `
-🎮 MATCH #${matchProcessedCount + 1}/${allNonCancelledMatches.rows.length} (${matchRow.created_at})
-   WINNER: ${winnerId.substring(0, 8)}...
-     - ELO: ${winnerEloBefore} | Matches played: ${winnerMatchesBeforeCalc}
-     - K-factor: ${winnerKInfo.k} (${winnerKInfo.reason})
-     - New ELO: ${winnerNewRating} | Change: ${winnerEloChange > 0 ? '+' : ''}${winnerEloChange}
-     - Level: ${winnerLevelBefore} → ${winnerLevelAfter}
-   
-   LOSER: ${loserId.substring(0, 8)}...
-     - ELO: ${loserEloBefore} | Matches played: ${loserMatchesBeforeCalc}
-     - K-factor: ${loserKInfo.k} (${loserKInfo.reason})
-     - New ELO: ${loserNewRating} | Change: ${loserEloChange > 0 ? '+' : ''}${loserEloChange}
-     - Level: ${loserLevelBefore} → ${loserLevelAfter}
-   
-   ✅ Winner +${winnerEloChange}, Loser ${loserEloChange} (balance: ${winnerEloChange + loserEloChange})`;
-        debugSampleLogs.push(debugLog);
-      }
-
-      // Update the match record with correct before/after ELO values and levels
-      await query(
-        `UPDATE matches 
-         SET winner_elo_before = ?, winner_elo_after = ?, 
-             loser_elo_before = ?, loser_elo_after = ?,
-             winner_level_before = ?, winner_level_after = ?,
-             loser_level_before = ?, loser_level_after = ?,
-             elo_change = ?
-         WHERE id = ?`,
-        [winnerEloBefore, winnerNewRating, loserEloBefore, loserNewRating, winnerLevelBefore, winnerLevelAfter, loserLevelBefore, loserLevelAfter, winnerEloChange, matchRow.id]
-      );
-
-      matchProcessedCount++;
-    }
-
-    const finalMsg = `✅ Replayed ${allNonCancelledMatches.rows.length} matches with FIDE ELO recalculation`;
+    const finalMsg = `✅ Replayed ${matchProcessedCount} matches with FIDE ELO recalculation (${usersUpdatedCount} users updated)`;
     if (isDebugEnabled) {
       logs.push(finalMsg);
       console.log(finalMsg);
-      logs.push('📊 DEBUG SAMPLE LOGS (first 3, every 10th, and last):');
-      debugSampleLogs.forEach(log => {
-        logs.push(log);
-        console.log(log);
-      });
-    }
-
-    // STEP 5: Update all users in the database with their recalculated stats
-    let usersUpdatedCount = 0;
-    for (const [userId, stats] of userStates.entries()) {
-      // Get current is_rated status from database
-      const userCurrentResult = await query('SELECT is_rated FROM users_extension WHERE id = ?', [userId]);
-      const isCurrentlyRated = userCurrentResult.rows[0]?.is_rated || false;
-      
-      let isRated = isCurrentlyRated;
-      
-      // If rated and ELO falls below 1400, unrate the player
-      if (isCurrentlyRated && stats.elo_rating < 1400) {
-        isRated = false;
-      }
-      // If unrated, has 10+ matches, and ELO >= 1400, rate the player
-      else if (!isCurrentlyRated && stats.matches_played >= 10 && stats.elo_rating >= 1400) {
-        isRated = true;
-      }
-      
-      await query(
-        `UPDATE users_extension 
-         SET elo_rating = ?, 
-             matches_played = ?,
-             total_wins = ?,
-             total_losses = ?,
-             trend = ?,
-             level = ?,
-             is_rated = ?,
-             updated_at = CURRENT_TIMESTAMP 
-         WHERE id = ?`,
-        [stats.elo_rating, stats.matches_played, stats.total_wins, stats.total_losses, stats.trend, stats.level, isCurrentlyRated, userId]
-      );
-      usersUpdatedCount++;
     }
 
     // STEP 6: Re-enable both triggers
@@ -429,6 +338,14 @@ router.options('/preview-replay', (req, res) => {
   res.status(200).end();
 });
 
+// OPTIONS for streaming endpoint
+router.options('/preview-replay-stream', (req, res) => {
+  res.header('Access-Control-Allow-Origin', '*');
+  res.header('Access-Control-Allow-Methods', 'POST, OPTIONS');
+  res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Replay-Sha256');
+  res.status(200).end();
+});
+
 // OPTIONS for base64 endpoint
 router.options('/preview-replay-base64', (req, res) => {
   console.log('✅ [PREVIEW-B64] OPTIONS request received for /preview-replay-base64');
@@ -456,114 +373,16 @@ router.post('/preview-replay-base64', authMiddleware, async (req: AuthRequest, r
     
     // Decode base64 to buffer
     const fileBuffer = Buffer.from(fileData, 'base64');
-    const fileExt = path.extname(fileName).toLowerCase();
-    
-    console.log(`📂 [PREVIEW-B64] Previewing replay file: ${fileName} (${fileBuffer.length} bytes), ext: ${fileExt}`);
-    
-    let decompressed: Buffer;
-    
-    if (fileExt === '.gz') {
-      console.log('[PREVIEW-B64] Handling GZIP decompression');
-      const { createGunzip } = await import('zlib');
-      const { Readable } = await import('stream');
-
-      const stream = Readable.from(fileBuffer);
-      const gunzip = createGunzip();
-      const chunks: Buffer[] = [];
-
-      await new Promise((resolve, reject) => {
-        stream
-          .pipe(gunzip)
-          .on('data', (chunk: Buffer) => chunks.push(chunk))
-          .on('end', resolve)
-          .on('error', reject);
-      });
-
-      decompressed = Buffer.concat(chunks);
-      console.log('[PREVIEW-B64] GZIP decompression complete, decompressed size:', decompressed.length);
-    } else if (fileExt === '.bz2') {
-      console.log('[PREVIEW-B64] Handling BZ2 decompression');
-      const bz2Module = await import('bz2');
-      let decompress = bz2Module.decompress || bz2Module.default?.decompress;
-      
-      if (!decompress && typeof bz2Module === 'function') {
-        decompress = bz2Module;
-      }
-
-      if (typeof decompress !== 'function') {
-        console.error('[PREVIEW-B64] Could not find decompress function in bz2 module');
-        throw new Error('bz2.decompress is not available');
-      }
+    console.log(`📂 [PREVIEW-B64] Previewing replay file: ${fileName} (${fileBuffer.length} bytes)`);
 
-      const decompressedData = decompress(fileBuffer);
-      decompressed = Buffer.from(decompressedData);
-      console.log('[PREVIEW-B64] BZ2 decompression complete, decompressed size:', decompressed.length);
-    } else {
-      console.warn('[PREVIEW-B64] Unsupported file extension:', fileExt);
-      return res.status(400).json({ error: 'Unsupported file format. Only .gz and .bz2 files are allowed.' });
-    }
-
-    // Convert to string and extract replay info (same as multipart endpoint)
-    const xmlText = decompressed.toString('utf-8');
-    const scenarioMatch = xmlText.match(/mp_scenario_name="([^"]+)"/);
-    let map = scenarioMatch ? scenarioMatch[1] : null;
-    if (map) {
-      map = map.replace(/^2p\s*—\s*/, '');
-    }
-
-    const sideUsersGlobal = xmlText.match(/side_users="([^"]+)"/);
-    const playerNames: string[] = [];
-    if (sideUsersGlobal && sideUsersGlobal[1]) {
-      const pairs = sideUsersGlobal[1].split(',');
-      for (const pair of pairs) {
-        const parts = pair.split(':');
-        const name = (parts[1] || parts[0]).trim();
-        if (name) playerNames.push(name);
-      }
-    }
-
-    const factionsInOrder: string[] = [];
-    const factionRegex = /faction_name\s*=\s*_?"([^"]+)"/g;
-    let factionMatch;
-    while ((factionMatch = factionRegex.exec(xmlText)) !== null) {
-      const raw = factionMatch[1];
-      const clean = raw.replace(/^_/, '');
-      factionsInOrder.push(clean);
-    }
-
-    const factionByPlayer: Record<string, string> = {};
-    const oldSideBlockRegex = /\[old_side[^\]]*\][\s\S]*?(?=\[old_side|\Z)/g;
-    let sideBlockMatch;
-    while ((sideBlockMatch = oldSideBlockRegex.exec(xmlText)) !== null) {
-      const text = sideBlockMatch[0];
-      const playerMatch = text.match(/current_player="([^"]+)"/);
-      if (!playerMatch) continue;
-      const player = playerMatch[1];
-      const factionNameMatch = text.match(/faction_name\s*=\s*_?"([^"]+)"/);
-      const factionMatchLocal = text.match(/faction="([^"]+)"/);
-      const rawFaction = (factionNameMatch?.[1] || factionMatchLocal?.[1] || '').trim();
-      if (!rawFaction) continue;
-      const cleanFaction = rawFaction.replace(/^_/, '');
-      factionByPlayer[player] = cleanFaction;
-    }
-
-    const players: Array<{ id: string; name: string; faction: string }> = [];
-    const count = Math.min(playerNames.length, factionsInOrder.length);
-    for (let i = 0; i < count; i++) {
-      const name = playerNames[i];
-      const faction = factionByPlayer[name] ?? factionsInOrder[i] ?? 'Unknown';
-      players.push({ id: name, name, faction });
-    }
-
-    if (playerNames.length === 0 && Object.keys(factionByPlayer).length > 0) {
-      for (const [name, faction] of Object.entries(factionByPlayer)) {
-        players.push({ id: name, name, faction });
-      }
-    }
-
-    console.log('[PREVIEW-B64] Extracted data:', { map, players: players.length });
-    return res.json({ map, players });
+    const { hash, preview, cached } = await parseReplayBuffer(fileBuffer, fileName);
+    console.log('[PREVIEW-B64] Extracted data:', { map: preview.map, players: preview.players.length, cached });
+    return res.json({ ...preview, hash });
   } catch (error) {
+    if (error instanceof ReplayUploadError) {
+      console.warn('[PREVIEW-B64] Rejected replay file:', error.message);
+      return res.status(error.status).json({ error: error.message });
+    }
     console.error('[PREVIEW-B64] Error in preview-replay-base64 endpoint:', error);
     res.status(500).json({ error: 'Failed to parse replay file', details: error instanceof Error ? error.message : String(error) });
   }
@@ -587,143 +406,17 @@ router.post('/preview-replay', authMiddleware, upload.single('replay'), async (r
 
     const fileBuffer = req.file.buffer;
     const fileName = req.file.originalname;
-    const fileExt = path.extname(fileName).toLowerCase();
-
-    console.log(`📂 [PREVIEW] Previewing replay file: ${fileName} (${fileBuffer.length} bytes), ext: ${fileExt}`);
-
-    let decompressed: Buffer;
-
-    if (fileExt === '.gz') {
-      console.log('[PREVIEW] Handling GZIP decompression');
-      // Handle gzip decompression
-      const { createGunzip } = await import('zlib');
-      const { Readable } = await import('stream');
-
-      const stream = Readable.from(fileBuffer);
-      const gunzip = createGunzip();
-      const chunks: Buffer[] = [];
+    console.log(`📂 [PREVIEW] Previewing replay file: ${fileName} (${fileBuffer.length} bytes)`);
 
-      await new Promise((resolve, reject) => {
-        stream
-          .pipe(gunzip)
-          .on('data', (chunk: Buffer) => chunks.push(chunk))
-          .on('end', resolve)
-          .on('error', reject);
-      });
-
-      decompressed = Buffer.concat(chunks);
-      console.log('[PREVIEW] GZIP decompression complete, decompressed size:', decompressed.length);
-    } else if (fileExt === '.bz2') {
-      console.log('[PREVIEW] Handling BZ2 decompression');
-      // Handle bzip2 decompression
-      const bz2Module = await import('bz2');
-      console.log('[PREVIEW] bz2Module:', Object.keys(bz2Module));
-      console.log('[PREVIEW] bz2Module.default:', bz2Module.default);
-      
-      // Try different ways to access decompress function
-      let decompress = bz2Module.decompress || bz2Module.default?.decompress;
-      
-      // If still not found, try accessing the module differently
-      if (!decompress && typeof bz2Module === 'function') {
-        // Sometimes the module itself is the decompress function
-        decompress = bz2Module;
-      }
-      
-      console.log('[PREVIEW] decompress type:', typeof decompress);
-
-      if (typeof decompress !== 'function') {
-        console.error('[PREVIEW] Could not find decompress function in bz2 module');
-        console.error('[PREVIEW] Available keys:', Object.keys(bz2Module || {}));
-        throw new Error('bz2.decompress is not available');
-      }
-
-      console.log('[PREVIEW] Calling bz2.decompress...');
-      const decompressedData = decompress(fileBuffer);
-      decompressed = Buffer.from(decompressedData);
-      console.log('[PREVIEW] BZ2 decompression complete, decompressed size:', decompressed.length);
-    } else {
-      console.warn('[PREVIEW] Unsupported file extension:', fileExt);
-      return res.status(400).json({ error: 'Unsupported file format. Only .gz and .bz2 files are allowed.' });
-    }
-
-    // Convert to string and extract replay info
-    console.log('[PREVIEW] Converting decompressed data to string...');
-    const xmlText = decompressed.toString('utf-8');
-
-    // Extract map name
-    const scenarioMatch = xmlText.match(/mp_scenario_name="([^"]+)"/);
-    let map = scenarioMatch ? scenarioMatch[1] : null;
-    console.log('[PREVIEW] Raw scenario match:', map);
-    if (map) {
-      console.log('[PREVIEW] Char codes:', Array.from(map).map((c, i) => ({ i, char: c, code: c.charCodeAt(0) })));
-      // Remove "2p — " prefix if present
-      map = map.replace(/^2p\s*—\s*/, '');
-      console.log('[PREVIEW] After removing 2p prefix:', map);
-    }
-    console.log('[PREVIEW] Extracted map:', map);
-
-    // Extract players from global side_users attribute (e.g., id1:Nick1,id2:Nick2)
-    const sideUsersGlobal = xmlText.match(/side_users="([^"]+)"/);
-    const playerNames: string[] = [];
-    if (sideUsersGlobal && sideUsersGlobal[1]) {
-      const pairs = sideUsersGlobal[1].split(',');
-      for (const pair of pairs) {
-        const parts = pair.split(':');
-        const name = (parts[1] || parts[0]).trim();
-        if (name) playerNames.push(name);
-      }
-    }
+    const { hash, preview, cached } = await parseReplayBuffer(fileBuffer, fileName);
+    console.log('[PREVIEW] Extracted data:', { map: preview.map, players: preview.players, cached });
 
-    // Extract factions in order of <side ...> blocks (fallback)
-    const factionsInOrder: string[] = [];
-    const factionRegex = /faction_name\s*=\s*_?"([^"]+)"/g;
-    let factionMatch;
-    while ((factionMatch = factionRegex.exec(xmlText)) !== null) {
-      const raw = factionMatch[1];
-      const clean = raw.replace(/^_/, '');
-      factionsInOrder.push(clean);
-    }
-
-    // Extract factions from [old_side*] blocks mapping current_player -> faction_name (preferred) or faction
-    const factionByPlayer: Record<string, string> = {};
-    const oldSideBlockRegex = /\[old_side[^\]]*\][\s\S]*?(?=\[old_side|\Z)/g;
-    let sideBlockMatch;
-    while ((sideBlockMatch = oldSideBlockRegex.exec(xmlText)) !== null) {
-      const text = sideBlockMatch[0];
-      const playerMatch = text.match(/current_player="([^"]+)"/);
-      if (!playerMatch) continue;
-      const player = playerMatch[1];
-      const factionNameMatch = text.match(/faction_name\s*=\s*_?"([^"]+)"/);
-      const factionMatchLocal = text.match(/faction="([^"]+)"/);
-      const rawFaction = (factionNameMatch?.[1] || factionMatchLocal?.[1] || '').trim();
-      if (!rawFaction) continue;
-      const cleanFaction = rawFaction.replace(/^_/, '');
-      factionByPlayer[player] = cleanFaction;
-    }
-
-    // Build players array by index mapping
-    const players: Array<{ id: string; name: string; faction: string }> = [];
-    const count = Math.min(playerNames.length, factionsInOrder.length);
-    for (let i = 0; i < count; i++) {
-      const name = playerNames[i];
-      const faction = factionByPlayer[name] ?? factionsInOrder[i] ?? 'Unknown';
-      players.push({ id: name, name, faction });
-    }
-
-    // If playerNames are empty but old_side mapping exists, use it to populate players
-    if (playerNames.length === 0 && Object.keys(factionByPlayer).length > 0) {
-      for (const [name, faction] of Object.entries(factionByPlayer)) {
-        players.push({ id: name, name, faction });
-      }
-    }
-    console.log('[PREVIEW] Extracted players:', players);
-
-    console.log('[PREVIEW] Sending successful response...');
     res.json({
       success: true,
-      map,
-      players,
+      map: preview.map,
+      players: preview.players,
       fileName,
+      hash,
     });
   } catch (error: any) {
     console.error('[PREVIEW] Error in preview-replay endpoint:', error);
@@ -735,6 +428,58 @@ router.post('/preview-replay', authMiddleware, upload.single('replay'), async (r
   }
 });
 
+// Streaming preview: the raw replay file is the request body (application/octet-stream),
+// the file name goes in ?fileName=. The upload is hashed, size-limited and parsed while it
+// arrives; a client that already knows the sha256 can send it as X-Replay-Sha256 and gets a
+// cached preview without uploading again.
+router.post('/preview-replay-stream', authMiddleware, async (req: AuthRequest, res) => {
+  res.header('Access-Control-Allow-Origin', '*');
+  res.header('Access-Control-Allow-Methods', 'POST, OPTIONS');
+  res.header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-Replay-Sha256');
+
+  const fileName = String(req.query.fileName || '');
+  try {
+    if (!fileName) {
+      req.resume();
+      return res.status(400).json({ error: 'Missing fileName query parameter' });
+    }
+
+    const knownHash = String(req.headers['x-replay-sha256'] || '').toLowerCase();
+    const known = knownHash ? getCachedReplayPreview(knownHash) : null;
+    if (known) {
+      req.resume();
+      return res.json({ success: true, ...known, fileName, hash: knownHash, cached: true });
+    }
+
+    if (parseInt(req.headers['content-length'] || '0', 10) > REPLAY_UPLOAD_MAX_BYTES) {
+      req.resume();
+      return res.status(413).json({ error: `Replay file too large (max ${REPLAY_UPLOAD_MAX_BYTES} bytes)` });
+    }
+
+    const { hash, size, preview, cached } = await parseReplayUpload(req, fileName);
+    console.log(`📂 [PREVIEW-STREAM] Previewed ${fileName} (${size} bytes):`, { map: preview.map, players: preview.players.length, cached });
+
+    res.json({ success: true, ...preview, fileName, hash, cached });
+  } catch (error) {
+    if (error instanceof ReplayUploadError) {
+      console.warn('[PREVIEW-STREAM] Rejected replay file:', fileName, error.message);
+      req.resume();
+      return res.status(error.status).json({ error: error.message });
+    }
+    console.error('[PREVIEW-STREAM] Error in preview-replay-stream endpoint:', error);
+    res.status(500).json({ error: 'Failed to parse replay file' });
+  }
+});
+
+// Preview of a recently uploaded replay by its sha256 (kept for a few minutes after the upload)
+router.get('/preview-replay/:hash', authMiddleware, async (req: AuthRequest, res) => {
+  const preview = getCachedReplayPreview(req.params.hash.toLowerCase());
+  if (!preview) {
+    return res.status(404).json({ error: 'Replay preview not found or expired' });
+  }
+  res.json({ success: true, ...preview, hash: req.params.hash.toLowerCase() });
+});
+
 // Confirm/dispute match - MUST be BEFORE generic /:id routes
 router.post('/:id/confirm', authMiddleware, async (req: AuthRequest, res) => {
   try {
@@ -1010,8 +755,7 @@ router.get('/disputed/all', moderatorOrAdminMiddleware, async (req: AuthRequest,
 router.get('/pending/all', authMiddleware, async (req: AuthRequest, res) => {
   try {
     // Verify admin status
-    const adminResult = await query('SELECT is_admin FROM users_extension WHERE id = ?', [req.userId]);
-    if (adminResult.rows.length === 0 || !adminResult.rows[0].is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Admin access required' });
     }
 
@@ -1092,197 +836,12 @@ router.post('/admin/:id/dispute', moderatorOrAdminMiddleware, async (req: AuthRe
         `UPDATE matches SET status = 'cancelled', admin_reviewed = ?, admin_reviewed_at = NOW(), admin_reviewed_by = ? WHERE id = ?`,
         [true, req.userId, id]
       );
+      await recordGlobalStatisticsEvent('matches', -1, match.created_at);
 
-      const directWinnerId: string = match.winner_id;
-      const directLoserId: string = match.loser_id;
-      const cancelledAt = new Date(match.created_at);
-
-      // ELO is applied for any match that is not cancelled/disputed/rejected.
-      // 'reported', 'unconfirmed', and 'confirmed' all have ELO applied.
-      // ELO is applied to all matches except cancelled ones.
-      const ELO_STATUS_FILTER = `status != 'cancelled'`;
-
-      // Counts ELO-applied matches for a player before a given date, excluding one match id
-      const countMatchesBefore = async (userId: string, beforeDate: Date, excludeMatchId: string): Promise<number> => {
-        const result = await query(
-          `SELECT COUNT(*) as cnt FROM matches
-           WHERE (winner_id = ? OR loser_id = ?) AND ${ELO_STATUS_FILTER}
-             AND created_at < ? AND id != ?`,
-          [userId, userId, beforeDate, excludeMatchId]
-        );
-        return Number(result.rows[0]?.cnt ?? 0);
-      };
-
-      // STEP 2: Initialize affected player set with ELO restored to their pre-cancelled-match values
-      interface PlayerState { elo: number; matches_played: number; nickname: string; }
-      const affectedPlayers = new Map<string, PlayerState>();
-
-      // Resolve nicknames for logging
-      const nicknameCache = new Map<string, string>();
-      const getNickname = async (userId: string): Promise<string> => {
-        if (nicknameCache.has(userId)) return nicknameCache.get(userId)!;
-        const r = await query(`SELECT nickname FROM users_extension WHERE id = ?`, [userId]);
-        const nick = r.rows[0]?.nickname ?? userId.substring(0, 8);
-        nicknameCache.set(userId, nick);
-        return nick;
-      };
-
-      const winnerNick = await getNickname(directWinnerId);
-      const loserNick  = await getNickname(directLoserId);
-      const winnerMatchesBefore = await countMatchesBefore(directWinnerId, cancelledAt, id);
-      const loserMatchesBefore  = await countMatchesBefore(directLoserId,  cancelledAt, id);
-
-      affectedPlayers.set(directWinnerId, {
-        elo: Number(match.winner_elo_before) || 1400,
-        matches_played: winnerMatchesBefore,
-        nickname: winnerNick
-      });
-      affectedPlayers.set(directLoserId, {
-        elo: Number(match.loser_elo_before) || 1400,
-        matches_played: loserMatchesBefore,
-        nickname: loserNick
-      });
-
-      console.log(`🎯 [CASCADE] Cancelled match: ${winnerNick} (ELO ${match.winner_elo_before}→restored) vs ${loserNick} (ELO ${match.loser_elo_before}→restored)`);
-      console.log(`🎯 [CASCADE] Initial affected players: ${winnerNick} (ELO=${match.winner_elo_before}, matches_before=${winnerMatchesBefore}), ${loserNick} (ELO=${match.loser_elo_before}, matches_before=${loserMatchesBefore})`);
-
-      // STEP 3: Load all ELO-applied matches that happened AFTER the cancelled one
-      const subsequentMatches = await query(
-        `SELECT id, winner_id, loser_id, winner_elo_before, loser_elo_before, created_at
-         FROM matches
-         WHERE ${ELO_STATUS_FILTER} AND created_at > ?
-         ORDER BY created_at ASC, id ASC`,
-        [cancelledAt]
-      );
-
-      console.log(`🎯 [CASCADE] Found ${subsequentMatches.rows.length} subsequent ELO-applied matches to scan`);
-
-      // STEP 4: Cascade forward — skip matches where neither player is affected
-      let matchesRecalculated = 0;
-      for (const m of subsequentMatches.rows) {
-        const mWinnerId: string = m.winner_id;
-        const mLoserId:  string = m.loser_id;
-        const winnerAffected = affectedPlayers.has(mWinnerId);
-        const loserAffected  = affectedPlayers.has(mLoserId);
-
-        if (!winnerAffected && !loserAffected) {
-          if (process.env.BACKEND_DEBUG_LOGS === 'true') {
-            const wn = await getNickname(mWinnerId);
-            const ln = await getNickname(mLoserId);
-            console.log(`   ⏭️  [CASCADE] Skip match ${m.id.substring(0,8)} (${wn} vs ${ln}) — neither player affected`);
-          }
-          continue;
-        }
-
-        const mCreatedAt = new Date(m.created_at);
-        const mWinnerNick = await getNickname(mWinnerId);
-        const mLoserNick  = await getNickname(mLoserId);
-
-        // Add newcomers using their elo_before from the (still-original) match record
-        if (!winnerAffected) {
-          const mBefore = await countMatchesBefore(mWinnerId, mCreatedAt, m.id);
-          affectedPlayers.set(mWinnerId, { elo: Number(m.winner_elo_before) || 1400, matches_played: mBefore, nickname: mWinnerNick });
-          console.log(`   ➕ [CASCADE] Added ${mWinnerNick} to affected set (ELO=${m.winner_elo_before}, matches_before=${mBefore})`);
-        }
-        if (!loserAffected) {
-          const mBefore = await countMatchesBefore(mLoserId, mCreatedAt, m.id);
-          affectedPlayers.set(mLoserId, { elo: Number(m.loser_elo_before) || 1400, matches_played: mBefore, nickname: mLoserNick });
-          console.log(`   ➕ [CASCADE] Added ${mLoserNick} to affected set (ELO=${m.loser_elo_before}, matches_before=${mBefore})`);
-        }
-
-        const winnerState = affectedPlayers.get(mWinnerId)!;
-        const loserState  = affectedPlayers.get(mLoserId)!;
-
-        const winnerEloBefore = winnerState.elo;
-        const loserEloBefore  = loserState.elo;
-
-        const winnerNewElo = calculateNewRating(winnerEloBefore, loserEloBefore, 'win',  winnerState.matches_played);
-        const loserNewElo  = calculateNewRating(loserEloBefore,  winnerEloBefore, 'loss', loserState.matches_played);
-
-        const eloChange = winnerNewElo - winnerEloBefore;
-
-        console.log(`   🎮 [CASCADE] Match ${m.id.substring(0,8)}: ${mWinnerNick} ${winnerEloBefore}→${winnerNewElo} (+${eloChange}) | ${mLoserNick} ${loserEloBefore}→${loserNewElo} (${loserNewElo - loserEloBefore})`);
-
-        await query(
-          `UPDATE matches
-           SET winner_elo_before = ?, winner_elo_after = ?,
-               loser_elo_before  = ?, loser_elo_after  = ?,
-               winner_level_before = ?, winner_level_after = ?,
-               loser_level_before  = ?, loser_level_after  = ?,
-               elo_change = ?
-           WHERE id = ?`,
-          [
-            winnerEloBefore, winnerNewElo,
-            loserEloBefore,  loserNewElo,
-            getUserLevel(winnerEloBefore), getUserLevel(winnerNewElo),
-            getUserLevel(loserEloBefore),  getUserLevel(loserNewElo),
-            eloChange, m.id
-          ]
-        );
-
-        winnerState.elo = winnerNewElo;
-        winnerState.matches_played++;
-        loserState.elo  = loserNewElo;
-        loserState.matches_played++;
-
-        matchesRecalculated++;
-      }
-
-      console.log(`🎯 [CASCADE] Cascade complete. Recalculated ${matchesRecalculated} matches. Affected players (${affectedPlayers.size}):`);
-      for (const [uid, s] of affectedPlayers.entries()) {
-        console.log(`   👤 ${s.nickname} → final ELO=${s.elo}`);
-      }
-
-      // STEP 5: Final stats update for all affected players
-      for (const [userId, state] of affectedPlayers.entries()) {
-        const winsResult = await query(
-          `SELECT COUNT(*) as cnt FROM matches WHERE winner_id = ? AND ${ELO_STATUS_FILTER}`,
-          [userId]
-        );
-        const lossesResult = await query(
-          `SELECT COUNT(*) as cnt FROM matches WHERE loser_id = ? AND ${ELO_STATUS_FILTER}`,
-          [userId]
-        );
-        // Fetch last 10 matches in chronological order (oldest→newest) to build trend
-        const trendResult = await query(
-          `SELECT winner_id FROM (
-             SELECT winner_id, created_at FROM matches
-             WHERE (winner_id = ? OR loser_id = ?) AND ${ELO_STATUS_FILTER}
-             ORDER BY created_at DESC LIMIT 10
-           ) sub ORDER BY created_at ASC`,
-          [userId, userId]
-        );
-
-        const totalWins   = Number(winsResult.rows[0]?.cnt   ?? 0);
-        const totalLosses = Number(lossesResult.rows[0]?.cnt ?? 0);
-        const matchesPlayed = totalWins + totalLosses;
-
-        let trend = '-';
-        for (const row of trendResult.rows) {
-          trend = calculateTrend(trend, row.winner_id === userId);
-        }
-
-        const isRated = shouldPlayerBeRated(matchesPlayed, state.elo);
-        const level   = getUserLevel(state.elo);
-
-        console.log(`   💾 [CASCADE] Updating ${state.nickname}: ELO=${state.elo}, W=${totalWins}, L=${totalLosses}, trend=${trend}, level=${level}, rated=${isRated}`);
-
-        await query(
-          `UPDATE users_extension
-           SET elo_rating = ?, matches_played = ?, total_wins = ?, total_losses = ?,
-               trend = ?, level = ?, is_rated = ?, updated_at = NOW()
-           WHERE id = ?`,
-          [state.elo, matchesPlayed, totalWins, totalLosses, trend, level, isRated, userId]
-        );
-      }
-
-      // STEP 6: Recalculate faction/map balance statistics
-      try {
-        const factionResult = await recalculateFactionMapStatistics();
-        console.log(`✓ Recalculated ${factionResult.records_updated} faction/map statistics`);
-      } catch (error: any) {
-        console.error('✗ Error with faction/map statistics recalculation:', error);
-      }
+      // STEP 2-6: Incremental ELO replay from the cancelled match, affected players' statistics
+      // and the faction/map -1 delta
+      const replaySummary = await revertCancelledMatchStatistics(match);
+      const matchesRecalculated = replaySummary.matchesUpdated;
 
       // STEP 7: Recalculate player of month if match is from a previous calendar month
       try {
@@ -1316,11 +875,11 @@ router.post('/admin/:id/dispute', moderatorOrAdminMiddleware, async (req: AuthRe
         console.log(`Match ${id} reopened in tournament_matches ${tournamentMatch.tm_id} for re-reporting`);
       }
 
-      console.log(`Match ${id} dispute validated by admin ${req.userId}: Cancelled, cascade recalculated ${matchesRecalculated} subsequent matches, updated ${affectedPlayers.size} affected players`);
+      console.log(`Match ${id} dispute validated by admin ${req.userId}: Cancelled, cascade recalculated ${matchesRecalculated} subsequent matches, updated ${replaySummary.playersUpdated} affected players`);
       res.json({
         message: 'Dispute validated. Match cancelled, ELO recalculated for all affected players, and reopened for re-reporting.',
         reopened: tournamentMatchResult.rows.length > 0,
-        affectedPlayers: affectedPlayers.size,
+        affectedPlayers: replaySummary.playersUpdated,
         matchesRecalculated
       });
     } else if (action === 'reject') {
@@ -1347,12 +906,13 @@ router.post('/admin/:id/dispute', moderatorOrAdminMiddleware, async (req: AuthRe
   }
 });
 
-// Get signed download URL for replay file - PUBLIC endpoint with expiring URLs
-// Returns a 5-minute signed URL that client can use for direct download from Supabase
+// Download the replay file of a match - PUBLIC endpoint
+// Replays in Supabase storage are streamed from the local replay cache (one upstream fetch per
+// replay, however many clients download it); replays hosted elsewhere are redirected to
 router.get('/:matchId/replay/download', async (req: AuthRequest, res) => {
   try {
     const { matchId } = req.params;
-    console.log('📥 [DOWNLOAD] Signed URL request for match:', matchId);
+    console.log('📥 [DOWNLOAD] Replay download request for match:', matchId);
 
     // Get match and replay file path from database
     const result = await query(
@@ -1373,13 +933,39 @@ router.get('/:matchId/replay/download', async (req: AuthRequest, res) => {
       return res.status(404).json({ error: 'No replay file for this match' });
     }
 
-    // NOTE: Supabase replay download temporarily disabled - using /uploads/replays instead
-    console.log('📥 [DOWNLOAD] Replay download feature will be implemented');
-    
-    // TODO: Implement local file download from /uploads/replays
-    return res.status(501).json({ error: 'Replay download feature will be implemented' });
+    if (/^https?:\/\//i.test(replayFilePath)) {
+      return res.redirect(replayFilePath);
+    }
+
+    if (!isSupabaseConfigured()) {
+      // TODO: Implement local file download from /uploads/replays
+      return res.status(501).json({ error: 'Replay download feature will be implemented' });
+    }
+
+    const replay = await openReplayFromSupabase(replayFilePath);
+    const etag = `"${replay.hash}"`;
+    if (req.headers['if-none-match'] === etag) {
+      replay.stream.destroy();
+      return res.status(304).end();
+    }
+
+    res.setHeader('Content-Type', 'application/gzip');
+    res.setHeader('Content-Length', String(replay.size));
+    res.setHeader('Content-Disposition', `attachment; filename="${path.basename(replayFilePath).replace(/"/g, '')}"`);
+    res.setHeader('ETag', etag);
+    res.setHeader('Cache-Control', 'public, max-age=86400');
+
+    try {
+      await pipeline(replay.stream, res);
+    } catch (error) {
+      // Client went away mid-download; nothing left to send
+      console.warn('⚠️  [DOWNLOAD] Replay stream interrupted for match:', matchId, (error as any)?.message);
+    }
   } catch (error) {
     console.error('❌ [DOWNLOAD] Replay download error:', error);
+    if (res.headersSent) {
+      return res.end();
+    }
     return res.status(500).json({ error: 'Failed to download replay' });
   }
 });
@@ -1674,6 +1260,7 @@ router.post('/report-confidence-1-replay', authMiddleware, async (req: AuthReque
              VALUES (?, ?, true, false, 1400, 0)`,
             [newUserId, primaryOpponentNickname]
           );
+          await recordGlobalStatisticsEvent('users_new');
           otherPlayerId = newUserId;
           console.log(`✅ [CONFIDENCE-1] Created new player ${primaryOpponentNickname} with ID ${otherPlayerId}`);
         } catch (createErr) {
@@ -1946,6 +1533,7 @@ router.post('/report-confidence-1-replay', authMiddleware, async (req: AuthReque
         ]
       );
 
+      await recordGlobalStatisticsEvent('matches');
       console.log(`✅ [CONFIDENCE-1] Match created in global table: ${matchId}`);
 
       // Calculate new trends
@@ -2010,6 +1598,13 @@ router.post('/report-confidence-1-replay', authMiddleware, async (req: AuthReque
       } catch (statsError) {
         console.error('Warning: Error updating faction/map statistics:', statsError);
       }
+
+      // Update per-player statistics for this match (incremental update)
+      try {
+        await applyMatchToPlayerMatchStatistics(matchId);
+      } catch (statsError) {
+        console.error('Warning: Error updating player match statistics:', statsError);
+      }
     } else {
       // UNRANKED tournament - don't update global ELO
       console.log(`🎯 [CONFIDENCE-1] Unranked tournament - skipping global ELO updates`);
@@ -2408,6 +2003,11 @@ router.get('/', authMiddleware, async (req: AuthRequest, res) => {
     const page = Math.max(1, parseInt(req.query.page as string) || 1);
     const limit = 20;
     const offset = (page - 1) * limit;
+    const cursor = (req.query.cursor as string) || '';
+    const cursorValues = cursor ? decodeCursor(cursor, 'matches', MATCH_LIST_KEYSET) : null;
+    if (cursor && !cursorValues) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
 
     // Get filter params from query
     const playerFilter = (req.query.player as string)?.trim() || '';
@@ -2458,13 +2058,18 @@ router.get('/', authMiddleware, async (req: AuthRequest, res) => {
                         JOIN users_extension w ON m.winner_id = w.id 
                         JOIN users_extension l ON m.loser_id = l.id 
                         ${whereClause}`;
-    const countResult = await query(countQuery, params);
-    const total = parseInt(countResult.rows[0].total);
-    const totalPages = Math.ceil(total / limit);
+    const total = await getApproximateCount(countQuery, params);
 
     // Get matches for current page with filters
-    params.push(limit);
-    params.push(offset);
+    // Cursor mode seeks past the last (created_at, id) seen instead of skipping OFFSET rows
+    let pageWhereClause = whereClause;
+    if (cursorValues) {
+      const after = keysetCondition(MATCH_LIST_KEYSET, cursorValues);
+      pageWhereClause = whereClause ? `${whereClause} AND ${after.sql}` : `WHERE ${after.sql}`;
+      params.push(...after.params);
+    }
+    params.push(cursorValues ? limit + 1 : limit);
+    params.push(cursorValues ? 0 : offset);
     const result = await query(
       `SELECT m.id, m.winner_id, m.loser_id, m.winner_faction, m.loser_faction, m.map, m.status,
               m.winner_elo_before, m.winner_elo_after, m.loser_elo_before, m.loser_elo_after,
@@ -2477,13 +2082,14 @@ router.get('/', authMiddleware, async (req: AuthRequest, res) => {
        FROM matches m
        JOIN users_extension w ON m.winner_id = w.id
        JOIN users_extension l ON m.loser_id = l.id
-       ${whereClause}
-       ORDER BY m.created_at DESC
+       ${pageWhereClause}
+       ORDER BY ${keysetOrderBy(MATCH_LIST_KEYSET)}
        LIMIT ? OFFSET ?`,
       params
     );
 
     // Get replays with confidence=1 to show as pending reports (ONLY for involved players)
+    const replayAfter = cursorValues ? keysetCondition(REPLAY_LIST_KEYSET, cursorValues) : null;
     const replayResult = await query(
       `SELECT 
         r.id, 
@@ -2499,9 +2105,10 @@ router.get('/', authMiddleware, async (req: AuthRequest, res) => {
          AND r.parse_status != 'rejected'
          AND r.match_id IS NULL
          AND (r.tournament_round_match_id IS NULL AND (r.parse_summary IS NULL OR JSON_UNQUOTE(JSON_EXTRACT(r.parse_summary, '$.linkedTournamentRoundMatchId')) IS NULL OR JSON_UNQUOTE(JSON_EXTRACT(r.parse_summary, '$.linkedTournamentRoundMatchId')) = 'null'))
-       ORDER BY r.created_at DESC
+         ${replayAfter ? `AND ${replayAfter.sql}` : ''}
+       ORDER BY ${keysetOrderBy(REPLAY_LIST_KEYSET)}
        LIMIT ? OFFSET ?`,
-      [limit, offset]
+      [...(replayAfter ? replayAfter.params : []), cursorValues ? limit + 1 : limit, cursorValues ? 0 : offset]
     );
 
     console.log(`📊 [MATCHES] Found ${result.rows.length} matches and ${replayResult.rows?.length || 0} confidence=1 replays`);
@@ -2600,26 +2207,27 @@ router.get('/', authMiddleware, async (req: AuthRequest, res) => {
     // Combine matches and replays
     const allResults = [...result.rows, ...formattedReplays];
     
-    // Sort by created_at DESC
-    allResults.sort((a: any, b: any) => {
-      const aTime = new Date(a.created_at).getTime();
-      const bTime = new Date(b.created_at).getTime();
-      return bTime - aTime;
-    });
+    // Sort by created_at DESC, id DESC (the keyset order)
+    allResults.sort((a: any, b: any) => compareKeyset(MATCH_LIST_KEYSET, a, b));
 
     // Apply pagination to combined results
     const paginatedResults = allResults.slice(0, limit);
     const combinedTotal = total + (replayResult.rows?.length || 0);
     const combinedTotalPages = Math.ceil(combinedTotal / limit);
+    const hasMore = cursorValues ? allResults.length > limit : page < combinedTotalPages;
+    const lastResult = paginatedResults[paginatedResults.length - 1];
 
     res.json({
       data: paginatedResults,
       pagination: {
-        page,
+        page: cursorValues ? null : page,
         limit,
         total: combinedTotal,
         totalPages: combinedTotalPages,
-        showing: paginatedResults.length
+        total_is_approximate: true,
+        showing: paginatedResults.length,
+        has_more: hasMore,
+        next_cursor: hasMore && lastResult ? encodeCursor('matches', MATCH_LIST_KEYSET, lastResult) : null
       }
     });
   } catch (error) {
@@ -2664,26 +2272,16 @@ router.post('/:id/cancel-own', authMiddleware, async (req: AuthRequest, res) =>
       'UPDATE matches SET status = ?, admin_reviewed = true, admin_reviewed_at = CURRENT_TIMESTAMP, admin_reviewed_by = ? WHERE id = ?',
       ['cancelled', userId, id]
     );
+    await recordGlobalStatisticsEvent('matches', -1, match.created_at);
     
-    // STEP 2: Perform global stats recalculation
-    const recalcResult = await performGlobalStatsRecalculation();
-    
-    if (recalcResult.success) {
-      console.log(`Match ${id} self-cancelled by reporter ${userId}: Stats recalculated`);
-      res.json({ 
-        message: 'Match cancelled successfully. Stats have been recalculated.',
-        matchId: id,
-        debugLogs: recalcResult.logs
-      });
-    } else {
-      console.error(`Match ${id} cancelled but stats recalculation may have failed`);
-      res.json({ 
-        message: 'Match cancelled successfully.',
-        matchId: id,
-        warning: 'Stats recalculation encountered some issues',
-        debugLogs: recalcResult.logs
-      });
-    }
+    // STEP 2: Incremental recalculation from the cancelled match (same path as dispute validation)
+    const replaySummary = await revertCancelledMatchStatistics(match);
+
+    console.log(`Match ${id} self-cancelled by reporter ${userId}: ELO replayed for ${replaySummary.playersUpdated} affected players`);
+    res.json({
+      message: 'Match cancelled successfully. Stats have been recalculated.',
+      matchId: id
+    });
   } catch (error) {
     console.error('Error cancelling match:', error);
     res.status(500).json({ error: 'Failed to cancel match' });
@@ -2963,11 +2561,7 @@ router.post('/admin-discard-replay', authMiddleware, async (req: AuthRequest, re
     }
 
     // Verify admin
-    const adminResult = await query(
-      `SELECT is_admin FROM users_extension WHERE id = ?`,
-      [req.userId]
-    );
-    if (!adminResult.rows?.[0]?.is_admin) {
+    if (!(await isUserAdmin(req.userId))) {
       return res.status(403).json({ error: 'Admin access required' });
     }
 
@@ -1,12 +1,101 @@
-import { Router, Response } from 'express';
+import { Router, Response, NextFunction } from 'express';
 import { query } from '../config/database.js';
 import { authMiddleware, AuthRequest } from '../middleware/auth.js';
 import { v4 as uuidv4 } from 'uuid';
+import {
+  subscribeToNotifications,
+  getCachedUnreadCount,
+  getConnectionCount,
+  resyncUnreadCounts,
+  NotificationEvent
+} from '../services/notificationBus.js';
 
 const router = Router();
 
+// Open tabs per user; each holds one stream
+const MAX_STREAMS_PER_USER = 10;
+// Comment line sent on idle streams so proxies do not time them out
+const STREAM_HEARTBEAT_MS = 25 * 1000;
+
 console.log(`🔧 Registering notifications routes`);
 
+/**
+ * Push the user's new unread count to their open streams (no query when none are open)
+ */
+function resyncUnreadCount(userId: string): void {
+  resyncUnreadCounts([userId]).catch(error => console.error('⚠️ Error resyncing unread count:', error));
+}
+
+/**
+ * EventSource cannot send headers: accept the JWT as ?token= on the stream endpoint only
+ */
+function streamTokenFromQuery(req: AuthRequest, res: Response, next: NextFunction) {
+  if (!req.headers.authorization && typeof req.query.token === 'string') {
+    req.headers.authorization = `Bearer ${req.query.token}`;
+  }
+  next();
+}
+
+/**
+ * GET /stream
+ * Server-sent events channel for the navbar badge and toasts
+ * Events: "unread" { unreadCount } on connect (the resync after a reconnect) and whenever the
+ * count changes; "notification" { notification, unreadCount } for each new notification.
+ */
+router.get('/stream', streamTokenFromQuery, authMiddleware, async (req: AuthRequest, res: Response) => {
+  const userId = req.userId;
+
+  if (!userId) {
+    return res.status(401).json({ error: 'Not authenticated' });
+  }
+
+  if (getConnectionCount(userId) >= MAX_STREAMS_PER_USER) {
+    return res.status(429).json({ error: 'Too many open notification streams' });
+  }
+
+  let closed = false;
+  let unsubscribe: (() => void) | null = null;
+  let heartbeat: NodeJS.Timeout | null = null;
+  req.on('close', () => {
+    closed = true;
+    if (heartbeat) clearInterval(heartbeat);
+    unsubscribe?.();
+  });
+
+  const send = (event: NotificationEvent) => {
+    const { type, ...data } = event;
+    res.write(`event: ${type}\ndata: ${JSON.stringify(data)}\n\n`);
+  };
+
+  try {
+    const subscription = await subscribeToNotifications(userId, send);
+    if (closed) {
+      subscription.unsubscribe();
+      return;
+    }
+    unsubscribe = subscription.unsubscribe;
+
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      // Disable response buffering in nginx
+      'X-Accel-Buffering': 'no',
+    });
+    res.write('retry: 10000\n\n');
+    send({ type: 'unread', unreadCount: subscription.unreadCount });
+
+    heartbeat = setInterval(() => res.write(': ping\n\n'), STREAM_HEARTBEAT_MS);
+  } catch (error) {
+    console.error('❌ Error opening notification stream:', error);
+    if (!res.headersSent) {
+      res.status(500).json({ error: 'Internal server error' });
+    } else {
+      res.end();
+    }
+  }
+});
+
 /**
  * GET /unread-count
  * Get count of unread notifications for navbar badge
@@ -19,15 +108,17 @@ router.get('/unread-count', authMiddleware, async (req: AuthRequest, res: Respon
       return res.status(401).json({ error: 'Not authenticated' });
     }
 
-    const result = await query(
-      `SELECT COUNT(*) as count
-       FROM user_notifications
-       WHERE user_id = ? AND is_read = false AND is_deleted = false`,
-      [userId]
-    );
-
-    const count = (result.rows && result.rows[0]) ? result.rows[0].count : 0;
-    console.log(`✅ Unread count for user ${userId}: ${count}`);
+    // Users with an open stream have their count in memory
+    let count = getCachedUnreadCount(userId);
+    if (count === null) {
+      const result = await query(
+        `SELECT COUNT(*) as count
+         FROM user_notifications
+         WHERE user_id = ? AND is_read = false AND is_deleted = false`,
+        [userId]
+      );
+      count = (result.rows && result.rows[0]) ? result.rows[0].count : 0;
+    }
 
     res.json({
       success: true,
@@ -228,6 +319,7 @@ router.post('/:notificationId/mark-read', authMiddleware, async (req: AuthReques
     );
 
     console.log(`✅ Marked notification ${notificationId} as read`);
+    resyncUnreadCount(userId);
 
     res.json({
       success: true,
@@ -273,6 +365,7 @@ router.post('/:notificationId/mark-unread', authMiddleware, async (req: AuthRequ
     );
 
     console.log(`✅ Marked notification ${notificationId} as unread`);
+    resyncUnreadCount(userId);
 
     res.json({
       success: true,
@@ -318,6 +411,7 @@ router.post('/:notificationId/delete', authMiddleware, async (req: AuthRequest,
     );
 
     console.log(`✅ Deleted notification ${notificationId}`);
+    resyncUnreadCount(userId);
 
     res.json({
       success: true,
@@ -348,6 +442,7 @@ router.post('/mark-all-read', authMiddleware, async (req: AuthRequest, res: Resp
 
     const affectedRows = (result as any).affectedRows || 0;
     console.log(`✅ Marked ${affectedRows} notifications as read for user ${userId}`);
+    resyncUnreadCount(userId);
 
     res.json({
       success: true,
@@ -378,6 +473,7 @@ router.post('/delete-all', authMiddleware, async (req: AuthRequest, res: Respons
 
     const affectedRows = (result as any).affectedRows || 0;
     console.log(`✅ Deleted ${affectedRows} notifications for user ${userId}`);
+    resyncUnreadCount(userId);
 
     res.json({
       success: true,
@@ -3,10 +3,35 @@ import jwt from 'jsonwebtoken';
 import { query } from '../config/database.js';
 import { getWinnerAndRunnerUp } from '../utils/tournament.js';
 import { optionalAuthMiddleware } from '../middleware/auth.js';
+import { cacheResponse } from '../middleware/responseCache.js';
+import {
+  KeysetColumn,
+  keysetOrderBy,
+  keysetCondition,
+  encodeCursor,
+  decodeCursor,
+  compareKeyset,
+  getApproximateCount
+} from '../utils/pagination.js';
+import { getLeaderboardPage, findPlayerIdsByNickname } from '../services/leaderboardService.js';
+import { getTournamentUnrankedAssets } from '../services/assetCatalog.js';
 // NOTE: Supabase replay storage temporarily disabled - using /uploads/replays instead
 
 const router = Router();
 
+// Match listings page by (created_at, id); pending replays are merged in using the same order
+const MATCH_LIST_KEYSET: KeysetColumn[] = [
+  { expr: 'm.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'm.id', field: 'id', direction: 'DESC' }
+];
+const REPLAY_LIST_KEYSET: KeysetColumn[] = [
+  { expr: 'r.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'r.id', field: 'id', direction: 'DESC' }
+];
+
+// Nickname filters matching more players than this fall back to a LIKE scan instead of an IN list
+const NICKNAME_FILTER_MAX_IDS = 1000;
+
 // Get FAQ (public endpoint) - returns all language versions
 // Frontend will handle language selection with fallback to English
 router.get('/faq', async (req, res) => {
@@ -24,7 +49,7 @@ router.get('/faq', async (req, res) => {
 });
 
 // Get all tournaments (public endpoint)
-router.get('/tournaments', optionalAuthMiddleware, async (req, res) => {
+router.get('/tournaments', cacheResponse({ ttlSeconds: 60, tags: ['tournaments'], personalised: true }), optionalAuthMiddleware, async (req, res) => {
   try {
     // Get page from query params, default to 1
     const page = Math.max(1, parseInt(req.query.page as string) || 1);
@@ -415,7 +440,7 @@ router.get('/news', async (req, res) => {
 });
 
 // Get recent matches (public endpoint)
-router.get('/matches/recent', async (req, res) => {
+router.get('/matches/recent', cacheResponse({ ttlSeconds: 30, tags: ['matches'] }), async (req, res) => {
   try {
     const [matchResult, replayResult] = await Promise.all([
       query(
@@ -499,26 +524,34 @@ router.get('/matches/recent', async (req, res) => {
 });
 
 // Get all players directory (public endpoint)
-router.get('/players', async (req, res) => {
+// Pages by ?cursor= (keyset on the sort column + id); ?page= is still accepted for existing clients
+router.get('/players', cacheResponse({ ttlSeconds: 60, tags: ['players'] }), async (req, res) => {
   try {
     // Get page from query params, default to 1
     const page = Math.max(1, parseInt(req.query.page as string) || 1);
     const limit = 20;
     const offset = (page - 1) * limit;
+    const cursor = (req.query.cursor as string) || '';
 
     // Sort params — whitelist to prevent SQL injection
+    // win_percentage sorts players without matches first (ASC), as NULL did before
     const ALLOWED_SORT_COLUMNS: Record<string, string> = {
       nickname:       'nickname',
       elo_rating:     'elo_rating',
       matches_played: 'matches_played',
       total_wins:     'total_wins',
       total_losses:   'total_losses',
-      win_percentage: '(total_wins * 1.0 / NULLIF(matches_played, 0))',
+      win_percentage: 'COALESCE(total_wins * 1.0 / NULLIF(matches_played, 0), -1)',
       is_rated:       'is_rated',
     };
     const sortByRaw = (req.query.sortBy as string) || 'nickname';
-    const sortByExpr = ALLOWED_SORT_COLUMNS[sortByRaw] ?? 'nickname';
+    const sortBy = ALLOWED_SORT_COLUMNS[sortByRaw] ? sortByRaw : 'nickname';
     const sortOrder = (req.query.sortOrder as string)?.toLowerCase() === 'desc' ? 'DESC' : 'ASC';
+    const keysetColumns: KeysetColumn[] = [
+      { expr: ALLOWED_SORT_COLUMNS[sortBy], field: 'sort_value', direction: sortOrder },
+      { expr: 'id', field: 'id', direction: sortOrder }
+    ];
+    const sortKey = `players:${sortBy}:${sortOrder}`;
 
     // Get filter params from query
     const nicknameFilter = (req.query.nickname as string)?.trim() || '';
@@ -532,7 +565,14 @@ router.get('/players', async (req, res) => {
     let whereConditions: string[] = ['is_blocked = 0'];
     let params: any[] = [];
 
-    if (nicknameFilter) {
+    // Nickname matches come from the in-memory index; very broad filters keep the LIKE
+    const nicknameIds = nicknameFilter ? new Set(await findPlayerIdsByNickname(nicknameFilter)) : null;
+    if (nicknameIds && nicknameIds.size === 0) {
+      whereConditions.push('1 = 0');
+    } else if (nicknameIds && nicknameIds.size <= NICKNAME_FILTER_MAX_IDS) {
+      whereConditions.push(`id IN (${Array.from(nicknameIds, () => '?').join(',')})`);
+      params.push(...nicknameIds);
+    } else if (nicknameIds) {
       whereConditions.push(`nickname LIKE ?`);
       params.push(`%${nicknameFilter}%`);
     }
@@ -560,34 +600,110 @@ router.get('/players', async (req, res) => {
       params.push(minMatches);
     }
 
+    // ELO order is served from the maintained leaderboard (rated view for rated_only); the remaining
+    // filters are a scan over the already sorted view rather than a sort of users_extension
+    if (sortBy === 'elo_rating') {
+      let after: { elo_rating: number; id: string } | undefined;
+      if (cursor) {
+        const cursorValues = decodeCursor(cursor, sortKey, keysetColumns);
+        if (!cursorValues) {
+          return res.status(400).json({ error: 'Invalid cursor' });
+        }
+        after = { elo_rating: Number(cursorValues[0]), id: String(cursorValues[1]) };
+      }
+
+      const needsFilter = !!nicknameIds || rankedOnly || minMatches !== null;
+      const leaderboardPage = await getLeaderboardPage(ratedOnly ? 'rated' : 'all', {
+        offset,
+        limit,
+        after,
+        minElo,
+        maxElo,
+        ascending: sortOrder === 'ASC',
+        filter: needsFilter
+          ? entry => (!nicknameIds || nicknameIds.has(entry.id))
+            && (!rankedOnly || entry.enable_ranked)
+            && (minMatches === null || entry.matches_played >= minMatches)
+          : undefined
+      });
+
+      const entries = leaderboardPage.entries;
+      const lastEntry = entries[entries.length - 1];
+      return res.json({
+        data: entries.map(entry => ({
+          id: entry.id,
+          nickname: entry.nickname,
+          elo_rating: entry.elo_rating,
+          is_rated: entry.is_rated,
+          enable_ranked: entry.enable_ranked,
+          matches_played: entry.matches_played,
+          total_wins: entry.total_wins,
+          total_losses: entry.total_losses,
+          country: entry.country,
+          avatar: entry.avatar
+        })),
+        pagination: {
+          page: cursor ? null : page,
+          limit,
+          total: leaderboardPage.total,
+          totalPages: Math.ceil(leaderboardPage.total / limit),
+          total_is_approximate: false,
+          showing: entries.length,
+          has_more: leaderboardPage.hasMore,
+          next_cursor: leaderboardPage.hasMore && lastEntry
+            ? encodeCursor(sortKey, keysetColumns, { sort_value: lastEntry.elo_rating, id: lastEntry.id })
+            : null
+        }
+      });
+    }
+
     const whereClause = whereConditions.join(' AND ');
 
-    // Get total count of filtered players
-    const countQuery = `SELECT COUNT(*) as total FROM users_extension WHERE ${whereClause}`;
-    const countResult = await query(countQuery, params);
-    const total = parseInt(countResult.rows[0].total);
+    // Total of filtered players (cached for a minute rather than counted on every page)
+    const total = await getApproximateCount(`SELECT COUNT(*) as total FROM users_extension WHERE ${whereClause}`, params);
     const totalPages = Math.ceil(total / limit);
 
-    // Get players for current page with filters
-    params.push(limit);
-    params.push(offset);
+    // Get players for current page with filters (one extra row tells whether there is a next page)
+    const pageConditions = [...whereConditions];
+    const pageParams = [...params];
+    if (cursor) {
+      const cursorValues = decodeCursor(cursor, sortKey, keysetColumns);
+      if (!cursorValues) {
+        return res.status(400).json({ error: 'Invalid cursor' });
+      }
+      const after = keysetCondition(keysetColumns, cursorValues);
+      pageConditions.push(after.sql);
+      pageParams.push(...after.params);
+    }
+    pageParams.push(limit + 1);
+    if (!cursor) {
+      pageParams.push(offset);
+    }
     const result = await query(
-      `SELECT id, nickname, elo_rating, is_rated, enable_ranked, matches_played, total_wins, total_losses, country, avatar
+      `SELECT id, nickname, elo_rating, is_rated, enable_ranked, matches_played, total_wins, total_losses, country, avatar,
+              ${ALLOWED_SORT_COLUMNS[sortBy]} AS sort_value
        FROM users_extension
-       WHERE ${whereClause}
-       ORDER BY ${sortByExpr} ${sortOrder}
-       LIMIT ? OFFSET ?`,
-      params
+       WHERE ${pageConditions.join(' AND ')}
+       ORDER BY ${keysetOrderBy(keysetColumns)}
+       LIMIT ?${cursor ? '' : ' OFFSET ?'}`,
+      pageParams
     );
 
+    const hasMore = result.rows.length > limit;
+    const rows = result.rows.slice(0, limit);
+    const nextCursor = hasMore ? encodeCursor(sortKey, keysetColumns, rows[rows.length - 1]) : null;
+
     res.json({
-      data: result.rows,
+      data: rows.map(({ sort_value, ...player }: any) => player),
       pagination: {
-        page,
+        page: cursor ? null : page,
         limit,
         total,
         totalPages,
-        showing: result.rows.length
+        total_is_approximate: true,
+        showing: rows.length,
+        has_more: hasMore,
+        next_cursor: nextCursor
       }
     });
   } catch (error) {
@@ -597,11 +713,12 @@ router.get('/players', async (req, res) => {
 });
 
 // Get all confirmed matches (public endpoint)
-router.get('/matches', async (req, res) => {
+router.get('/matches', cacheResponse({ ttlSeconds: 30, tags: ['matches'] }), async (req, res) => {
   try {
     const page = parseInt(req.query.page as string) || 1;
     const pageSize = 20;
     const offset = (page - 1) * pageSize;
+    const cursor = (req.query.cursor as string) || '';
 
     // Parse filters
     const player = req.query.player ? (req.query.player as string).trim() : null;
@@ -647,7 +764,7 @@ router.get('/matches', async (req, res) => {
 
     const whereClause = whereConditions.length > 0 ? `WHERE ${whereConditions.join(' AND ')}` : '';
 
-    // Get total count
+    // Get total count (cached for a minute rather than counted on every page)
     const countQuery = `
       SELECT COUNT(*) as count
       FROM matches m
@@ -656,9 +773,20 @@ router.get('/matches', async (req, res) => {
       ${whereClause}
     `;
 
-    const countResult = await query(countQuery, params);
-    const total = parseInt(countResult.rows[0].count);
-    const totalPages = Math.ceil(total / pageSize);
+    const total = await getApproximateCount(countQuery, params);
+
+    // Cursor mode: keyset on (created_at, id) over both matches and pending replays
+    let cursorValues: any[] | null = null;
+    if (cursor) {
+      cursorValues = decodeCursor(cursor, 'matches', MATCH_LIST_KEYSET);
+      if (!cursorValues) {
+        return res.status(400).json({ error: 'Invalid cursor' });
+      }
+      const after = keysetCondition(MATCH_LIST_KEYSET, cursorValues);
+      whereConditions.push(after.sql);
+      params.push(...after.params);
+    }
+    const pageWhereClause = whereConditions.length > 0 ? `WHERE ${whereConditions.join(' AND ')}` : '';
 
     // Get paginated data
     const dataQuery = `
@@ -668,13 +796,13 @@ router.get('/matches', async (req, res) => {
        FROM matches m
        JOIN users_extension w ON m.winner_id = w.id
        JOIN users_extension l ON m.loser_id = l.id
-       ${whereClause}
-       ORDER BY m.created_at DESC
+       ${pageWhereClause}
+       ORDER BY ${keysetOrderBy(MATCH_LIST_KEYSET)}
        LIMIT ? OFFSET ?
     `;
 
-    params.push(pageSize);
-    params.push(offset);
+    params.push(cursor ? pageSize + 1 : pageSize);
+    params.push(cursor ? 0 : offset);
 
     const result = await query(dataQuery, params);
 
@@ -708,6 +836,7 @@ router.get('/matches', async (req, res) => {
     // Get replays with confidence=1 (visible to everyone, action buttons controlled in frontend)
     let formattedReplays = [];
     try {
+      const replayAfter = cursorValues ? keysetCondition(REPLAY_LIST_KEYSET, cursorValues) : null;
       const replayResult = await query(
         `SELECT 
           r.id, 
@@ -724,9 +853,10 @@ router.get('/matches', async (req, res) => {
            AND r.parse_status != 'rejected'
            AND r.match_id IS NULL
            AND r.tournament_id IS NULL
-         ORDER BY r.created_at DESC
+           ${replayAfter ? `AND ${replayAfter.sql}` : ''}
+         ORDER BY ${keysetOrderBy(REPLAY_LIST_KEYSET)}
          LIMIT ? OFFSET ?`,
-        [pageSize, offset]
+        [...(replayAfter ? replayAfter.params : []), cursor ? pageSize + 1 : pageSize, cursor ? 0 : offset]
       );
 
       console.log(`📋 [PUBLIC/MATCHES] Found ${replayResult.rows?.length || 0} confidence=1 replays`);
@@ -818,25 +948,28 @@ router.get('/matches', async (req, res) => {
     // Combine matches and replays
     const allResults = [...result.rows, ...formattedReplays];
     
-    // Sort by created_at DESC
-    allResults.sort((a: any, b: any) => {
-      const aTime = new Date(a.created_at).getTime();
-      const bTime = new Date(b.created_at).getTime();
-      return bTime - aTime;
-    });
+    // Sort by created_at DESC, id DESC (the keyset order)
+    allResults.sort((a: any, b: any) => compareKeyset(MATCH_LIST_KEYSET, a, b));
 
     // Paginate combined results
     const paginatedResults = allResults.slice(0, pageSize);
+    const hasMore = cursor ? allResults.length > pageSize : false;
     const combinedTotal = total + (formattedReplays.length > 0 ? formattedReplays.length : 0);
     const combinedTotalPages = Math.ceil(combinedTotal / pageSize);
+    const lastResult = paginatedResults[paginatedResults.length - 1];
 
     res.json({
       data: paginatedResults,
       pagination: {
-        page,
+        page: cursor ? null : page,
         pageSize,
         total: combinedTotal,
         totalPages: combinedTotalPages,
+        total_is_approximate: true,
+        has_more: cursor ? hasMore : page < combinedTotalPages,
+        next_cursor: lastResult && (cursor ? hasMore : page < combinedTotalPages)
+          ? encodeCursor('matches', MATCH_LIST_KEYSET, lastResult)
+          : null,
       },
     });
   } catch (error) {
@@ -909,7 +1042,7 @@ router.get('/players/:id', async (req, res) => {
 });
 
 // Get all maps (public endpoint - only active)
-router.get('/maps', async (req, res) => {
+router.get('/maps', cacheResponse({ ttlSeconds: 600, tags: ['assets'] }), async (req, res) => {
   try {
     const isRanked = req.query.is_ranked === 'true';
     let query_str = `SELECT id, name, created_at, usage_count FROM game_maps WHERE is_active = 1`;
@@ -934,7 +1067,7 @@ router.get('/maps', async (req, res) => {
 });
 
 // Get all factions (public endpoint - only active)
-router.get('/factions', async (req, res) => {
+router.get('/factions', cacheResponse({ ttlSeconds: 600, tags: ['assets'] }), async (req, res) => {
   try {
     const isRanked = req.query.is_ranked === 'true';
     let query_str = `SELECT id, name, description, icon_path, created_at FROM factions WHERE is_active = 1`;
@@ -963,7 +1096,7 @@ router.get('/debug', (req, res) => {
 });
 
 // Get player of the month
-router.get('/player-of-month', async (req, res) => {
+router.get('/player-of-month', cacheResponse({ ttlSeconds: 3600, tags: ['players'] }), async (req, res) => {
   try {
     console.log('🔍🔍🔍 GET /public/player-of-month called START');
     
@@ -1017,32 +1150,15 @@ router.get('/tournaments/:id/unranked-assets', async (req, res) => {
 
     const tournament = tournamentResult.rows[0];
 
-    // Get factions for this tournament
-    const factions = await query(
-      `SELECT f.id, f.name
-       FROM factions f
-       JOIN tournament_unranked_factions tuf ON f.id = tuf.faction_id
-       WHERE tuf.tournament_id = ?
-       ORDER BY f.name ASC`,
-      [id]
-    );
-
-    // Get maps for this tournament
-    const maps = await query(
-      `SELECT m.id, m.name
-       FROM game_maps m
-       JOIN tournament_unranked_maps tum ON m.id = tum.map_id
-       WHERE tum.tournament_id = ?
-       ORDER BY m.name ASC`,
-      [id]
-    );
+    // Factions and maps for this tournament (from the asset catalog)
+    const assets = await getTournamentUnrankedAssets(id);
 
     res.json({
       success: true,
       tournament_mode: tournament.tournament_mode,
       data: {
-        factions: factions.rows,
-        maps: maps.rows
+        factions: assets.factions.map(({ id, name }) => ({ id, name })),
+        maps: assets.maps.map(({ id, name }) => ({ id, name }))
       }
     });
   } catch (error) {
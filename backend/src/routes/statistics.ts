@@ -7,32 +7,50 @@ import {
   createFactionMapStatisticsSnapshot,
 } from '../services/statisticsCalculator.js';
 import {
+  getGlobalStatistics,
   getGlobalStatisticsFromCache,
   calculateGlobalStatistics,
   updateGlobalStatisticsCache,
+  rebuildGlobalStatisticsBuckets,
 } from '../services/globalStatisticsService.js';
+import { cacheResponse, invalidateCacheOnWrite, CACHE_EVENTS } from '../middleware/responseCache.js';
+import { optionalAuthMiddleware, AuthRequest } from '../middleware/auth.js';
+import { isUserAdmin } from '../services/userContextCache.js';
 
 const router = Router();
 
+// Balance events and snapshots are written through this router; cached statistics follow them
+router.use(invalidateCacheOnWrite(CACHE_EVENTS.statistics));
+
+// Statistics only change when matches are reported or cancelled, which invalidates the 'statistics' tag
+const statisticsCache = cacheResponse({ ttlSeconds: 300, tags: ['statistics'] });
+
 /**
  * Get global site statistics (public endpoint)
- * Returns cached statistics from global_statistics table
- * Accepts ?force=true query parameter to recalculate immediately
+ * Returns live statistics summed from the per-day counters
+ * Accepts ?force=true query parameter to recount the counters from the source tables
+ * (admins only: the recount rewrites global_statistics_daily; other callers get the live figures)
  */
-router.get('/global', async (req, res) => {
+router.get('/global', optionalAuthMiddleware, async (req: AuthRequest, res) => {
   try {
-    const forceRecalculate = req.query.force === 'true';
+    const forceRecalculate = req.query.force === 'true' && (await isUserAdmin(req.userId));
 
     if (forceRecalculate) {
-      // Recalculate statistics
+      // Recount the day buckets
+      await rebuildGlobalStatisticsBuckets();
       const stats = await calculateGlobalStatistics();
       await updateGlobalStatisticsCache(stats);
       return res.json(stats);
     }
 
-    // Get from cache
-    const stats = await getGlobalStatisticsFromCache();
-    res.json(stats);
+    try {
+      return res.json(await getGlobalStatistics());
+    } catch (error) {
+      // Fall back to the last persisted snapshot
+      console.error('Error calculating live global statistics:', error);
+      const stats = await getGlobalStatisticsFromCache();
+      res.json(stats);
+    }
   } catch (error) {
     console.error('Error fetching global statistics:', error);
     res.status(500).json({ error: 'Failed to fetch global statistics' });
@@ -61,7 +79,7 @@ router.get('/config', async (req, res) => {
  * Get faction statistics by map
  * Returns winrates for each faction on each map
  */
-router.get('/faction-by-map', async (req, res) => {
+router.get('/faction-by-map', statisticsCache, async (req, res) => {
   try {
     const result = await query(
       `SELECT 
@@ -92,7 +110,7 @@ router.get('/faction-by-map', async (req, res) => {
  * Shows which matchups are most unbalanced
  * Only shows one direction (faction_id < opponent_faction_id) to avoid duplicates
  */
-router.get('/matchups', async (req, res) => {
+router.get('/matchups', statisticsCache, async (req, res) => {
   try {
     const minGames = parseInt(req.query.minGames as string) || 5;
     console.log(`[MATCHUPS] Request received with minGames=${minGames}`);
@@ -164,7 +182,7 @@ router.get('/matchups', async (req, res) => {
  * Get faction winrates across all maps (global stats)
  * Sums wins from both perspectives (when faction_id is winner or when winning against opponent)
  */
-router.get('/faction-global', async (req, res) => {
+router.get('/faction-global', statisticsCache, async (req, res) => {
   try {
     const result = await query(
       `SELECT 
@@ -205,7 +223,7 @@ router.get('/faction-global', async (req, res) => {
  * Get map statistics (which maps have best balance)
  * Groups by map only to avoid duplicates from bidirectional matchups
  */
-router.get('/map-balance', async (req, res) => {
+router.get('/map-balance', statisticsCache, async (req, res) => {
   try {
     // First get raw data to show what we're calculating
     const rawResult = await query(
@@ -261,7 +279,7 @@ router.get('/map-balance', async (req, res) => {
 /**
  * Get statistics for a specific faction across all maps
  */
-router.get('/faction/:factionId', async (req, res) => {
+router.get('/faction/:factionId', statisticsCache, async (req, res) => {
   try {
     const { factionId } = req.params;
     
@@ -294,7 +312,7 @@ router.get('/faction/:factionId', async (req, res) => {
 /**
  * Get statistics for a specific map
  */
-router.get('/map/:mapId', async (req, res) => {
+router.get('/map/:mapId', statisticsCache, async (req, res) => {
   try {
     const { mapId } = req.params;
     
@@ -327,7 +345,7 @@ router.get('/map/:mapId', async (req, res) => {
  * Get balance history for a specific faction/map matchup
  * Returns daily snapshots of winrate over a date range
  */
-router.get('/history/trend', async (req, res) => {
+router.get('/history/trend', statisticsCache, async (req, res) => {
   try {
     const { mapId, factionId, opponentFactionId, dateFrom, dateTo } = req.query;
     
@@ -354,7 +372,7 @@ router.get('/history/trend', async (req, res) => {
  * Get all balance events with optional filtering
  * Used to mark balance patches and changes
  */
-router.get('/history/events', async (req, res) => {
+router.get('/history/events', statisticsCache, async (req, res) => {
   try {
     const { factionId, mapId, eventType, limit = '50', offset = '0' } = req.query;
     
@@ -414,7 +432,7 @@ router.get('/history/events', async (req, res) => {
  * Get balance event forward impact (from event onwards)
  * Shows stats from the event date until next event or today
  */
-router.get('/history/events/:eventId/impact', async (req, res) => {
+router.get('/history/events/:eventId/impact', statisticsCache, async (req, res) => {
   try {
     const { eventId } = req.params;
     console.log(`\n=== EVENT IMPACT REQUEST === EventID: ${eventId}`);
@@ -434,18 +452,7 @@ router.get('/history/events/:eventId/impact', async (req, res) => {
     const event = eventCheck.rows[0];
     console.log(`✅ Event found: Date=${event.event_date}, Type=${event.event_type}`);
     
-    // Check how many snapshots exist for this date range
-    const countCheck = await query(
-      `SELECT COUNT(*) as total_snapshots, 
-              MIN(snapshot_date) as earliest_date,
-              MAX(snapshot_date) as latest_date
-       FROM faction_map_statistics_history`
-    );
-    
-    console.log(`📊 Total snapshots in DB: ${countCheck.rows[0].total_snapshots}`);
-    console.log(`   Date range: ${countCheck.rows[0].earliest_date} to ${countCheck.rows[0].latest_date}`);
-    
-    // Now get the actual impact data
+    // Impact is summed from the daily faction/map buckets
     const impactRows = await getBalanceEventForwardImpact(eventId);
     
     console.log(`⚡ Event impact function returned: ${impactRows.length} rows`);
@@ -485,7 +492,7 @@ router.get('/history/events/:eventId/impact', async (req, res) => {
  * Get snapshot data for a specific date (admin only)
  * Shows all faction/map combinations as they were on that date
  */
-router.get('/history/snapshot', async (req, res) => {
+router.get('/history/snapshot', statisticsCache, async (req, res) => {
   try {
     const { date, minGames = '2' } = req.query;
     
@@ -3,9 +3,14 @@ import { v4 as uuidv4 } from 'uuid';
 import { query } from '../config/database.js';
 import { authMiddleware, AuthRequest } from '../middleware/auth.js';
 import { sendDiscordNotification, storeNotificationForUsers } from '../services/discordNotificationService.js';
+import { resyncUnreadCountsForMatch } from '../services/notificationBus.js';
+import { invalidateCacheOnWrite, CACHE_EVENTS } from '../middleware/responseCache.js';
 
 const router = Router();
 
+// Tournament writes invalidate cached public tournament listings
+router.use(invalidateCacheOnWrite(CACHE_EVENTS.tournament));
+
 console.log('🔧 Registering tournament scheduling routes');
 
 // Convert ISO string to MySQL datetime format (YYYY-MM-DD HH:MM:SS)
@@ -441,7 +446,9 @@ router.post('/:tournamentRoundMatchId/propose-schedule', authMiddleware, async (
         SET is_read = true 
         WHERE match_id = ? AND (type = 'schedule_confirmed' OR type = 'schedule_proposal') AND is_read = false`,
         [tournamentRoundMatchId]
-      ).catch(err => console.error('⚠️ Error marking old notifications as read:', err));
+      )
+        .then(() => resyncUnreadCountsForMatch(tournamentRoundMatchId))
+        .catch(err => console.error('⚠️ Error marking old notifications as read:', err));
     }
 
     // Get opponent name/email for Discord notification
@@ -670,7 +677,9 @@ router.post('/:tournamentRoundMatchId/confirm-schedule', authMiddleware, async (
       SET is_read = true 
       WHERE match_id = ? AND type = 'schedule_proposal' AND is_read = false`,
       [tournamentRoundMatchId]
-    ).catch(err => console.error('⚠️ Error marking old notifications as read:', err));
+    )
+      .then(() => resyncUnreadCountsForMatch(tournamentRoundMatchId))
+      .catch(err => console.error('⚠️ Error marking old notifications as read:', err));
 
     // Get opponent name for Discord notification and team members for Socket.IO
     let opponentName = 'Opponent';
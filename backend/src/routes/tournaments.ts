@@ -6,9 +6,17 @@ import discordService from '../services/discordService.js';
 import { randomUUID } from 'crypto';
 import { logAuditEvent, getUserIP, getUserAgent } from '../middleware/audit.js';
 import { checkUserIsForumModerator } from '../services/phpbbAuth.js';
+import { isUserAdmin } from '../services/userContextCache.js';
+import { updateTournamentTiebreakers, updateTeamTiebreakers } from '../services/statisticsCalculator.js';
+import { invalidateCacheOnWrite, CACHE_EVENTS } from '../middleware/responseCache.js';
+import { recordGlobalStatisticsEvent, removeTournamentFromGlobalStatistics } from '../services/globalStatisticsService.js';
+import { refreshAssetCatalog } from '../services/assetCatalog.js';
 
 const router = Router();
 
+// Tournament writes invalidate cached public tournament listings
+router.use(invalidateCacheOnWrite(CACHE_EVENTS.tournament));
+
 // Reserved team ID for rejected players (special system UUID)
 const REJECTED_TEAM_ID = '00000000-0000-0000-0000-000000000001';
 const REJECTED_PLAYERS_TRANSLATIONS = [
@@ -168,6 +176,8 @@ router.post('/', authMiddleware, async (req: AuthRequest, res) => {
       ]
     );
 
+    await recordGlobalStatisticsEvent('tournaments');
+
     // Add allowed factions and maps for all tournament modes (ranked, unranked, team)
     if (unranked_factions || unranked_maps) {
       try {
@@ -203,6 +213,7 @@ router.post('/', authMiddleware, async (req: AuthRequest, res) => {
             );
           }
         }
+        await refreshAssetCatalog();
         
         console.log(`Successfully added assets to tournament ${tournamentId}`);
       } catch (assetError) {
@@ -478,6 +489,8 @@ router.delete('/:id', authMiddleware, async (req: AuthRequest, res) => {
       return res.status(400).json({ error: 'Cannot cancel tournament that is in progress or finished' });
     }
 
+    await removeTournamentFromGlobalStatistics(id);
+
     // Start transaction
     await query('BEGIN');
 
@@ -1284,6 +1297,7 @@ router.post('/:id/close-registration', authMiddleware, async (req: AuthRequest,
     // If insufficient participants or incomplete team tournament (after confirmation)
     if (incompleteParticipants) {
       // Delete tournament and all related data
+      await removeTournamentFromGlobalStatistics(id, { includeMatches: true });
       await query('DELETE FROM tournament_rounds WHERE tournament_id = ?', [id]);
       await query('DELETE FROM tournament_matches WHERE tournament_id = ?', [id]);
       await query('DELETE FROM tournament_round_matches WHERE tournament_id = ?', [id]);
@@ -3591,35 +3605,17 @@ router.post('/:id/calculate-tiebreakers', authMiddleware, async (req: AuthReques
     }
     
     const tournament = tournamentQuery.rows[0];
-    const userQuery = await query(
-      'SELECT is_admin FROM users_extension WHERE user_id = ?',
-      [req.userId]
-    );
-    
-    const isAdmin = userQuery && userQuery.rows && userQuery.rows.length > 0 && userQuery.rows[0].is_admin;
+    const isAdmin = await isUserAdmin(req.userId);
     const isCreator = tournament.creator_id === req.userId;
     
     if (!isAdmin && !isCreator) {
       return res.status(403).json({ error: 'Only admins or tournament creators can calculate tiebreakers' });
     }
 
-    // Determine tournament mode to use appropriate function
-    const functionName = tournament.tournament_mode === 'team' ? 'update_team_tiebreakers' : 'update_tournament_tiebreakers';
-    
-    // Execute the stored procedure
-    const result = await query(
-      `SELECT updated_count, error_message FROM ${functionName}(?)`,
-      [id]
-    );
-    
-    if (result && result.rows && result.rows.length > 0 && result.rows[0].error_message) {
-      return res.status(400).json({ 
-        error: 'Failed to calculate tiebreakers',
-        details: result.rows[0].error_message
-      });
-    }
-    
-    const updatedCount = result && result.rows && result.rows.length > 0 ? result.rows[0].updated_count : 0;
+    // Teams for team tournaments, participants otherwise
+    const { updated_count: updatedCount } = tournament.tournament_mode === 'team'
+      ? await updateTeamTiebreakers(id)
+      : await updateTournamentTiebreakers(id);
     
     // Fetch updated participants ordered by tiebreakers
     const participants = await query(
@@ -3661,12 +3657,7 @@ router.post('/leagues/:id/calculate-tiebreakers', authMiddleware, async (req: Au
     }
     
     const tournament = tournamentQuery.rows[0];
-    const userQuery = await query(
-      'SELECT is_admin FROM users_extension WHERE user_id = ?',
-      [req.userId]
-    );
-    
-    const isAdmin = userQuery && userQuery.rows && userQuery.rows.length > 0 && userQuery.rows[0].is_admin;
+    const isAdmin = await isUserAdmin(req.userId);
     const isCreator = tournament.creator_id === req.userId;
     
     if (!isAdmin && !isCreator) {
@@ -3865,8 +3856,7 @@ router.put('/:tournamentId/teams/:teamId/rename', authMiddleware, async (req: Au
     const isTeamMember = memberResult.rows.length > 0;
 
     // Check admin
-    const adminResult = await query(`SELECT is_admin FROM users_extension WHERE id = ?`, [userId]);
-    const isAdmin = adminResult.rows[0]?.is_admin;
+    const isAdmin = await isUserAdmin(userId);
 
     // Check moderator
     const isModerator = !isOrganizer && !isTeamMember && !isAdmin
@@ -3931,8 +3921,7 @@ router.delete('/:tournamentId/participants/:participantId', authMiddleware, asyn
     const isSelf = participant.user_id === userId;
     const isOrganizer = tournament.creator_id === userId;
 
-    const adminResult = await query(`SELECT is_admin FROM users_extension WHERE id = ?`, [userId]);
-    const isAdmin = adminResult.rows[0]?.is_admin;
+    const isAdmin = await isUserAdmin(userId);
 
     const isModerator = !isSelf && !isOrganizer && !isAdmin
       ? await checkUserIsForumModerator(username)
@@ -4,9 +4,41 @@ import { authMiddleware, AuthRequest } from '../middleware/auth.js';
 import { searchLimiter } from '../middleware/rateLimiter.js';
 import { logAuditEvent, getUserIP, getUserAgent } from '../middleware/audit.js';
 import { avatarManifestService } from '../services/avatarManifestService.js';
+import { invalidateCacheOnWrite, CACHE_EVENTS } from '../middleware/responseCache.js';
+import {
+  KeysetColumn,
+  keysetCondition,
+  encodeCursor,
+  decodeCursor,
+  compareKeyset,
+  getApproximateCount
+} from '../utils/pagination.js';
+import {
+  LeaderboardEntry,
+  LeaderboardView,
+  getLeaderboardPage,
+  getPlayerRank,
+  getPlayersAround,
+  getRankForElo,
+  withRanks,
+  searchPlayersByNickname
+} from '../services/leaderboardService.js';
 
 const router = Router();
 
+// Profile changes (nickname, country, avatar) show up in cached player listings
+router.use(invalidateCacheOnWrite(CACHE_EVENTS.player));
+
+// Match history pages by (created_at, id); pending replays are merged in using the same order
+const USER_MATCH_KEYSET: KeysetColumn[] = [
+  { expr: 'm.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'm.id', field: 'id', direction: 'DESC' }
+];
+const REPLAY_KEYSET: KeysetColumn[] = [
+  { expr: 'r.created_at', field: 'created_at', direction: 'DESC' },
+  { expr: 'r.id', field: 'id', direction: 'DESC' }
+];
+
 // Get user profile
 router.get('/profile', authMiddleware, async (req: AuthRequest, res) => {
   try {
@@ -111,6 +143,11 @@ router.get('/:id/matches', async (req, res) => {
     const page = Math.max(1, parseInt(req.query.page as string) || 1);
     const limit = 20;
     const offset = (page - 1) * limit;
+    const cursor = (req.query.cursor as string) || '';
+    const cursorValues = cursor ? decodeCursor(cursor, 'user-matches', USER_MATCH_KEYSET) : null;
+    if (cursor && !cursorValues) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
 
     // Get filter params from query
     const playerFilter = (req.query.player as string)?.trim() || '';
@@ -160,18 +197,24 @@ router.get('/:id/matches', async (req, res) => {
     console.log('🔍 WHERE clause:', whereClause);
     console.log('🔍 Query params (matches):', params);
 
-    // Get total count of filtered matches
+    // Get total count of filtered matches (cached for a minute rather than counted on every page)
     const countQuery = `SELECT COUNT(*) as total FROM matches m 
                         JOIN users_extension w ON m.winner_id = w.id 
                         JOIN users_extension l ON m.loser_id = l.id 
                         WHERE ${whereClause}`;
-    const countResult = await query(countQuery, params);
-    const total = parseInt(countResult.rows[0].total);
+    const total = await getApproximateCount(countQuery, params);
 
     // Get matches for current page with filters
+    // Cursor mode seeks past the last (created_at, id) seen instead of skipping OFFSET rows
     const matchParams = [...params];
-    matchParams.push(limit);
-    matchParams.push(offset);
+    let pageWhereClause = whereClause;
+    if (cursorValues) {
+      const after = keysetCondition(USER_MATCH_KEYSET, cursorValues);
+      pageWhereClause += ` AND ${after.sql}`;
+      matchParams.push(...after.params);
+    }
+    matchParams.push(cursorValues ? limit + 1 : limit);
+    matchParams.push(cursorValues ? 0 : offset);
     const result = await query(
       `SELECT 
         m.*,
@@ -180,8 +223,8 @@ router.get('/:id/matches', async (req, res) => {
        FROM matches m
        JOIN users_extension w ON m.winner_id = w.id
        JOIN users_extension l ON m.loser_id = l.id
-       WHERE ${whereClause}
-       ORDER BY m.created_at DESC
+       WHERE ${pageWhereClause}
+       ORDER BY m.created_at DESC, m.id DESC
        LIMIT ? OFFSET ?`,
       matchParams
     );
@@ -192,6 +235,7 @@ router.get('/:id/matches', async (req, res) => {
     let formattedReplays: any[] = [];
     if (userNickname) {
       try {
+        const replayAfter = cursorValues ? keysetCondition(REPLAY_KEYSET, cursorValues) : null;
         const replayResult = await query(
           `SELECT 
             r.id, 
@@ -208,8 +252,9 @@ router.get('/:id/matches', async (req, res) => {
              AND r.parse_status != 'rejected'
              AND r.match_id IS NULL
              AND r.tournament_id IS NULL
-           ORDER BY r.created_at DESC`,
-          []
+             ${replayAfter ? `AND ${replayAfter.sql}` : ''}
+           ORDER BY r.created_at DESC, r.id DESC`,
+          replayAfter ? replayAfter.params : []
         );
 
         console.log(`📋 [USER/MATCHES] Found ${replayResult.rows?.length || 0} confidence=1 replays to check`);
@@ -319,26 +364,27 @@ router.get('/:id/matches', async (req, res) => {
     // Combine matches and replays
     const allResults = [...result.rows, ...formattedReplays];
     
-    // Sort by created_at DESC
-    allResults.sort((a: any, b: any) => {
-      const aTime = new Date(a.created_at).getTime();
-      const bTime = new Date(b.created_at).getTime();
-      return bTime - aTime;
-    });
+    // Sort by created_at DESC, id DESC (the keyset order)
+    allResults.sort((a: any, b: any) => compareKeyset(USER_MATCH_KEYSET, a, b));
 
     // Paginate combined results
     const paginatedResults = allResults.slice(0, limit);
     const combinedTotal = total + formattedReplays.length;
     const totalPages = Math.ceil(combinedTotal / limit);
+    const hasMore = cursorValues ? allResults.length > limit : page < totalPages;
+    const lastResult = paginatedResults[paginatedResults.length - 1];
 
     res.json({
       data: paginatedResults,
       pagination: {
-        page,
+        page: cursorValues ? null : page,
         limit,
         total: combinedTotal,
         totalPages,
-        showing: paginatedResults.length
+        total_is_approximate: true,
+        showing: paginatedResults.length,
+        has_more: hasMore,
+        next_cursor: hasMore && lastResult ? encodeCursor('user-matches', USER_MATCH_KEYSET, lastResult) : null
       }
     });
   } catch (error) {
@@ -348,18 +394,24 @@ router.get('/:id/matches', async (req, res) => {
 });
 
 // Search users - RATE LIMITED
+// Served from the in-memory nickname index, best matches first (exact, prefix, substring, typos)
 router.get('/search/:searchQuery', searchLimiter, async (req, res) => {
   try {
     const { searchQuery } = req.params;
+    const limit = Math.min(Math.max(parseInt(req.query.limit as string) || 20, 1), 50);
 
-    const result = await query(
-      `SELECT id, nickname, elo_rating, level FROM users_extension 
-       WHERE nickname LIKE ? AND is_active = 1 AND is_blocked = 0
-       LIMIT 20`,
-      [`%${searchQuery}%`]
+    const players = await searchPlayersByNickname(
+      searchQuery,
+      limit,
+      entry => entry.is_active && !entry.is_blocked
     );
 
-    res.json(result.rows);
+    res.json(players.map(player => ({
+      id: player.id,
+      nickname: player.nickname,
+      elo_rating: player.elo_rating,
+      level: player.level
+    })));
   } catch (error) {
     res.status(500).json({ error: 'Failed to search users' });
   }
@@ -485,6 +537,22 @@ router.put('/profile/ranked', authMiddleware, async (req: AuthRequest, res) => {
   }
 });
 
+// Ranking rows expose the same columns the SQL listings did, plus the competition rank
+const toRankingRow = (entry: LeaderboardEntry & { rank: number }) => ({
+  id: entry.id,
+  nickname: entry.nickname,
+  elo_rating: entry.elo_rating,
+  level: entry.level,
+  is_rated: entry.is_rated,
+  matches_played: entry.matches_played,
+  total_wins: entry.total_wins,
+  total_losses: entry.total_losses,
+  country: entry.country,
+  avatar: entry.avatar,
+  trend: entry.trend,
+  rank: entry.rank
+});
+
 // Get global ranking
 router.get('/ranking/global', async (req, res) => {
   try {
@@ -537,6 +605,30 @@ router.get('/ranking/global', async (req, res) => {
       params.push(maxElo);
     }
 
+    // ELO order (the default) is served from the maintained leaderboard: no per-request sort
+    if (sortByRaw === 'elo_rating' || !ALLOWED_SORT_COLUMNS[sortByRaw]) {
+      const nicknameNeedle = nicknameFilter.toLowerCase();
+      const leaderboardPage = await getLeaderboardPage('ranked', {
+        offset,
+        limit,
+        minElo,
+        maxElo,
+        ascending: sortOrder === 'ASC',
+        filter: nicknameNeedle ? entry => entry.nickname.toLowerCase().includes(nicknameNeedle) : undefined
+      });
+
+      return res.json({
+        data: withRanks(leaderboardPage.entries, 'ranked').map(toRankingRow),
+        pagination: {
+          page,
+          limit,
+          total: leaderboardPage.total,
+          totalPages: Math.ceil(leaderboardPage.total / limit),
+          showing: leaderboardPage.entries.length
+        }
+      });
+    }
+
     const whereClause = whereConditions.join(' AND ');
 
     // Get total count of filtered players
@@ -576,25 +668,47 @@ router.get('/ranking/global', async (req, res) => {
 // Get active ranking (with recent activity filter)
 router.get('/ranking/active', async (req, res) => {
   try {
-    const result = await query(
-      `SELECT u.id, u.nickname, u.elo_rating, u.level, u.is_rated, u.matches_played, u.total_wins, u.total_losses, u.country, u.avatar, COALESCE(u.trend, '-') as trend
-       FROM users_extension u
-       WHERE u.is_active = 1
-         AND u.is_blocked = 0
-         AND u.is_rated = 1
-         AND u.elo_rating >= 1400
-         AND u.matches_played >= 10
-       ORDER BY u.elo_rating DESC
-       LIMIT 100`
-    );
-
-    res.json(result.rows);
+    const top = await getLeaderboardPage('ranked', { limit: 100 });
+    res.json(withRanks(top.entries, 'ranked').map(toRankingRow));
   } catch (error) {
     console.error('Active ranking error:', error);
     res.status(500).json({ error: 'Failed to fetch active ranking', details: (error as any).message });
   }
 });
 
+// Get a player's ranking position and the players ranked around them
+// ?view=ranked|rated|active|all (default ranked), ?radius= players above/below (default 5, max 25)
+router.get('/:id/rank', async (req, res) => {
+  try {
+    const { id } = req.params;
+    const viewParam = (req.query.view as string) || 'ranked';
+    const view: LeaderboardView = ['ranked', 'rated', 'active', 'all'].includes(viewParam)
+      ? viewParam as LeaderboardView
+      : 'ranked';
+    const radius = Math.min(Math.max(parseInt(req.query.radius as string) || 5, 0), 25);
+
+    const ranking = await getPlayerRank(id, view);
+    if (!ranking) {
+      return res.status(404).json({ error: 'User not found' });
+    }
+
+    const around = await getPlayersAround(id, radius, view);
+
+    res.json({
+      id,
+      view,
+      rank: ranking.rank,
+      total: ranking.total,
+      in_view: ranking.in_view,
+      percentile: ranking.total > 0 ? Math.round((1 - (ranking.rank - 1) / ranking.total) * 1000) / 10 : null,
+      around: around ? around.map(toRankingRow) : []
+    });
+  } catch (error) {
+    console.error('Rank lookup error:', error);
+    res.status(500).json({ error: 'Failed to fetch rank' });
+  }
+});
+
 // Get all active users for opponent selection (no rating filter)
 router.get('/all', async (req, res) => {
   try {
@@ -659,37 +773,9 @@ router.get('/:id/stats/month', async (req, res) => {
     const currentElo = currentEloResult.rows[0]?.elo_rating || 0;
     const prevMonthElo = prevMonthEloResult.rows[0]?.min_elo_month || currentElo;
 
-    // Get ranking at start of month and current ranking
-    const startRankingResult = await query(
-      `SELECT COUNT(*) as rank_at_start 
-       FROM users_extension u2 
-       WHERE u2.is_active = 1
-         AND u2.is_blocked = 0
-         AND u2.is_rated = 1
-         AND u2.elo_rating >= 1400
-         AND (
-           u2.elo_rating > ?
-           OR (u2.elo_rating = ? AND u2.id < ?)
-         )`,
-      [prevMonthElo, prevMonthElo, id]
-    );
-
-    const currentRankingResult = await query(
-      `SELECT COUNT(*) as current_rank 
-       FROM users_extension u2 
-       WHERE u2.is_active = 1
-         AND u2.is_blocked = 0
-         AND u2.is_rated = 1
-         AND u2.elo_rating >= 1400
-         AND (
-           u2.elo_rating > ?
-           OR (u2.elo_rating = ? AND u2.id < ?)
-         )`,
-      [currentElo, currentElo, id]
-    );
-
-    const rankAtStart = parseInt(startRankingResult.rows[0].rank_at_start) + 1;
-    const currentRank = parseInt(currentRankingResult.rows[0].current_rank) + 1;
+    // Get ranking at start of month and current ranking (positions on the maintained leaderboard)
+    const rankAtStart = await getRankForElo(Number(prevMonthElo), 'ranked');
+    const currentRank = await getRankForElo(Number(currentElo), 'ranked');
     const positionsGained = rankAtStart - currentRank;
 
     res.json({
@@ -1,7 +1,10 @@
 import app from './app.js';
-import { initializeScheduledJobs, autoDiscardUnconfirmedReplays } from './jobs/scheduler.js';
 import { runMigrations } from './services/migrationRunner.js';
 import { avatarManifestService } from './services/avatarManifestService.js';
+import { runWithJobLease } from './services/jobLeaseService.js';
+import { shutdownAuditLog } from './middleware/audit.js';
+import { stopDiscordOutboxDispatcher } from './services/discordOutbox.js';
+import { timePhase, markStartupReady, logStartupReport } from './utils/startupPhases.js';
 
 // Port configuration - 7100 for test, 8100 for production
 const PORT = parseInt(process.env.PORT || '7100', 10);
@@ -41,33 +44,51 @@ const startServer = async () => {
     
     // Run migrations on startup (for all environments)
     console.log('\n🔄 Running database migrations...\n');
-    await runMigrations();
+    await timePhase('migrations', () => runMigrations());
     console.log('\n');
 
+    // Start server using Express app directly
+    await timePhase('listen', () => new Promise<void>((resolve, reject) => {
+      const server = app.listen(PORT, () => {
+        console.log(`🚀 Backend server running on http://0.0.0.0:${PORT}`);
+        console.log('📡 Nginx will reverse proxy tournament.wesnoth.org:443 → localhost:8100');
+        resolve();
+      });
+      server.once('error', reject);
+    }));
+    markStartupReady();
+
+    // Everything below is not needed to serve requests and runs once the server is listening
+
     // Generate/regenerate avatar manifest from PNG files
     console.log('📦 Generating avatar manifest...');
-    await avatarManifestService.generateAvatarManifest();
-    await avatarManifestService.validateManifest();
-    console.log('');
-
-    // Start server using Express app directly
-    app.listen(PORT, () => {
-      console.log(`🚀 Backend server running on http://0.0.0.0:${PORT}`);
-      console.log('📡 Nginx will reverse proxy tournament.wesnoth.org:443 → localhost:8100');
+    await timePhase('avatar manifest', async () => {
+      await avatarManifestService.generateAvatarManifest();
+      await avatarManifestService.validateManifest();
     });
+    console.log('');
 
     // Initialize all scheduled jobs (crons)
-    initializeScheduledJobs();
+    // The job modules (replay parser, forum sync, statistics) are only loaded here
+    const { initializeScheduledJobs, autoDiscardUnconfirmedReplays } = await timePhase(
+      'load scheduled jobs',
+      () => import('./jobs/scheduler.js')
+    );
+    await timePhase('schedule jobs', () => initializeScheduledJobs());
     
     // Run auto-discard on startup in case backend was down during scheduled time
     console.log('\n🔄 Running replay auto-discard on startup...');
     try {
-      await autoDiscardUnconfirmedReplays();
+      await timePhase('startup auto-discard', () =>
+        runWithJobLease('replay_auto_discard', (signal) => autoDiscardUnconfirmedReplays(signal))
+      );
       console.log('✅ Startup auto-discard completed\n');
     } catch (error) {
       console.error('❌ Startup auto-discard failed:', error);
       // Don't exit, just log the error
     }
+
+    logStartupReport();
     
   } catch (error) {
     console.error('Failed to start server:', error);
@@ -78,11 +99,15 @@ const startServer = async () => {
 // Graceful shutdown
 process.on('SIGTERM', async () => {
   console.log('\n⏹️  SIGTERM received, shutting down gracefully...');
+  await shutdownAuditLog();
+  await stopDiscordOutboxDispatcher();
   process.exit(0);
 });
 
 process.on('SIGINT', async () => {
   console.log('\n⏹️  SIGINT received, shutting down gracefully...');
+  await shutdownAuditLog();
+  await stopDiscordOutboxDispatcher();
   process.exit(0);
 });
 
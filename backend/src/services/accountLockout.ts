@@ -1,4 +1,5 @@
 import { query } from '../config/database.js';
+import { getUserContext, isUserLocked, invalidateUserContext } from './userContextCache.js';
 
 const MAX_FAILED_ATTEMPTS = 5;
 const LOCKOUT_DURATION_MINUTES = 15;
@@ -8,22 +9,12 @@ const LOCKOUT_DURATION_MINUTES = 15;
  */
 export async function isAccountLocked(userId: string): Promise<boolean> {
   try {
-    const result = await query(
-      `SELECT locked_until FROM users_extension WHERE id = ?`,
-      [userId]
-    );
-
-    if (result.rows.length === 0) {
+    const context = await getUserContext(userId);
+    if (!context || !context.lockedUntil) {
       return false;
     }
 
-    const lockedUntil = result.rows[0].locked_until;
-    if (!lockedUntil) {
-      return false;
-    }
-
-    const now = new Date();
-    if (new Date(lockedUntil) > now) {
+    if (isUserLocked(context)) {
       // Account still locked
       return true;
     }
@@ -49,6 +40,7 @@ export async function recordFailedLoginAttempt(userId: string, username: string)
        WHERE id = ?`,
       [userId]
     );
+    invalidateUserContext(userId);
 
     const attemptResult = await query(
       'SELECT failed_login_attempts FROM users_extension WHERE id = ?',
@@ -64,6 +56,7 @@ export async function recordFailedLoginAttempt(userId: string, username: string)
         `UPDATE users_extension SET locked_until = ? WHERE id = ?`,
         [lockUntil, userId]
       );
+      invalidateUserContext(userId);
 
       console.warn(`Account lockout: ${username} (${userId}) locked until ${lockUntil}`);
     }
@@ -84,6 +77,7 @@ export async function recordSuccessfulLogin(userId: string): Promise<void> {
        WHERE id = ?`,
       [userId]
     );
+    invalidateUserContext(userId);
   } catch (error) {
     console.error('Error recording successful login:', error);
   }
@@ -95,9 +89,10 @@ export async function recordSuccessfulLogin(userId: string): Promise<void> {
 export async function unlockAccount(userId: string): Promise<void> {
   try {
     await query(
-      `UPDATE users SET failed_login_attempts = 0, locked_until = NULL WHERE id = ?`,
+      `UPDATE users_extension SET failed_login_attempts = 0, locked_until = NULL WHERE id = ?`,
       [userId]
     );
+    invalidateUserContext(userId);
   } catch (error) {
     console.error('Error unlocking account:', error);
   }
@@ -109,7 +104,7 @@ export async function unlockAccount(userId: string): Promise<void> {
 export async function getRemainingLockoutTime(userId: string): Promise<number> {
   try {
     const result = await query(
-      `SELECT locked_until FROM users WHERE id = ?`,
+      `SELECT locked_until FROM users_extension WHERE id = ?`,
       [userId]
     );
 
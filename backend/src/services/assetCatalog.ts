@@ -0,0 +1,273 @@
+/**
+ * Asset Catalog
+ * Process-wide in-memory copy of game_maps, factions and the tournament unranked asset
+ * tables, so replay parsing, ranked validation and statistics deltas resolve map and
+ * faction names without a query per name variant.
+ *
+ * - Names are keyed like the utf8mb4_unicode_ci collation compares them (case and accents
+ *   folded, surrounding spaces ignored); maps are also keyed without apostrophes, matching
+ *   the REPLACE(LOWER(name), "'", "") lookups of the replay parser
+ * - When several rows share a key, ranked rows win (same as ORDER BY is_ranked DESC LIMIT 1)
+ * - Name variant resolutions (prefix stripping) are memoised per load
+ * - Reloaded by the admin map/faction endpoints, every RELOAD_MS as a safety net for other
+ *   instances, and on a lookup miss at most once per MISS_RELOAD_MS
+ */
+
+import { query } from '../config/database.js';
+
+export interface CatalogAsset {
+  id: string;
+  name: string;
+  is_ranked: boolean;
+  is_active: boolean;
+}
+
+export interface AssetIndex {
+  // Sorted by name
+  all: CatalogAsset[];
+  byKey: Map<string, CatalogAsset>;
+  byLooseKey: Map<string, CatalogAsset>;
+}
+
+export interface AssetCatalog {
+  maps: AssetIndex;
+  factions: AssetIndex;
+  unrankedMapsByTournament: Map<string, Set<string>>;
+  unrankedFactionsByTournament: Map<string, Set<string>>;
+}
+
+const RELOAD_MS = parseInt(process.env.ASSET_CATALOG_RELOAD_MS || '300000', 10);
+const MISS_RELOAD_MS = 30 * 1000;
+
+let catalog: AssetCatalog | null = null;
+let loadedAt = 0;
+let loading: Promise<AssetCatalog> | null = null;
+// Memoised variant resolutions of the current load (keys prefixed 'm:' for maps, 'f:' for factions)
+let resolved = new Map<string, CatalogAsset | null>();
+
+/**
+ * Collation-like key: lower case, accents stripped, surrounding spaces ignored
+ */
+export function assetKey(name: string): string {
+  return name.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().trim();
+}
+
+/**
+ * assetKey() without apostrophes ("Sullas Ruins" and "Sulla's Ruins" share a key)
+ */
+export function assetLooseKey(name: string): string {
+  return assetKey(name).replace(/'/g, '');
+}
+
+function toAsset(row: any): CatalogAsset {
+  return {
+    id: row.id,
+    name: row.name,
+    is_ranked: row.is_ranked === 1 || row.is_ranked === true,
+    is_active: row.is_active === 1 || row.is_active === true
+  };
+}
+
+function buildIndex(rows: any[]): AssetIndex {
+  const all = rows.map(toAsset).sort((a, b) => a.name.localeCompare(b.name));
+  const byKey = new Map<string, CatalogAsset>();
+  const byLooseKey = new Map<string, CatalogAsset>();
+  const keep = (index: Map<string, CatalogAsset>, key: string, asset: CatalogAsset) => {
+    const existing = index.get(key);
+    if (!existing || (asset.is_ranked && !existing.is_ranked)) {
+      index.set(key, asset);
+    }
+  };
+  for (const asset of all) {
+    keep(byKey, assetKey(asset.name), asset);
+    keep(byLooseKey, assetLooseKey(asset.name), asset);
+  }
+  return { all, byKey, byLooseKey };
+}
+
+function groupByTournament(rows: any[], assetColumn: string): Map<string, Set<string>> {
+  const groups = new Map<string, Set<string>>();
+  for (const row of rows) {
+    let ids = groups.get(row.tournament_id);
+    if (!ids) {
+      ids = new Set<string>();
+      groups.set(row.tournament_id, ids);
+    }
+    ids.add(row[assetColumn]);
+  }
+  return groups;
+}
+
+async function load(): Promise<AssetCatalog> {
+  const [maps, factions, unrankedMaps, unrankedFactions] = await Promise.all([
+    query('SELECT id, name, is_ranked, is_active FROM game_maps'),
+    query('SELECT id, name, is_ranked, is_active FROM factions'),
+    query('SELECT tournament_id, map_id FROM tournament_unranked_maps'),
+    query('SELECT tournament_id, faction_id FROM tournament_unranked_factions')
+  ]);
+
+  catalog = {
+    maps: buildIndex(maps.rows),
+    factions: buildIndex(factions.rows),
+    unrankedMapsByTournament: groupByTournament(unrankedMaps.rows, 'map_id'),
+    unrankedFactionsByTournament: groupByTournament(unrankedFactions.rows, 'faction_id')
+  };
+  resolved = new Map();
+  loadedAt = Date.now();
+  return catalog;
+}
+
+function startLoad(): Promise<AssetCatalog> {
+  if (!loading) {
+    loading = load().finally(() => { loading = null; });
+  }
+  return loading;
+}
+
+/**
+ * The loaded catalog; the first call (or the first after a failed refresh) loads it
+ */
+export async function getAssetCatalog(): Promise<AssetCatalog> {
+  if (!catalog) {
+    return startLoad();
+  }
+  if (Date.now() - loadedAt > RELOAD_MS) {
+    // Keep serving the current copy while the periodic reload runs
+    startLoad().catch(error => console.error('❌ [ASSETS] Background catalog reload failed:', error));
+  }
+  return catalog;
+}
+
+/**
+ * Reload now (call after creating, editing or deleting maps, factions or tournament unranked assets)
+ * Never throws: on failure the catalog is dropped and the next lookup reloads it.
+ */
+export async function refreshAssetCatalog(): Promise<void> {
+  try {
+    // A load already in flight may predate the change: wait for it, then load again
+    await (loading ? loading.catch(() => undefined).then(() => startLoad()) : startLoad());
+  } catch (error) {
+    console.error('❌ [ASSETS] Catalog refresh failed:', error);
+    catalog = null;
+    loadedAt = 0;
+  }
+}
+
+/**
+ * Look something up in the catalog; a miss (null) reloads it once, at most every MISS_RELOAD_MS,
+ * since the asset may have been added on another instance
+ */
+export async function lookupInAssetCatalog<T>(lookup: (current: AssetCatalog) => T | null): Promise<T | null> {
+  const current = await getAssetCatalog();
+  const found = lookup(current);
+  if (found !== null || Date.now() - loadedAt < MISS_RELOAD_MS) {
+    return found;
+  }
+  return lookup(await startLoad());
+}
+
+/**
+ * Map name variants: "2p — Tombs of Kesorak" → ["2p — Tombs of Kesorak", "Tombs of Kesorak"]
+ */
+export function getMapNameVariants(mapName: string): string[] {
+  const variants: Set<string> = new Set([mapName]);
+  const cleaned = mapName.replace(/^\d+p[\s—\-]+/i, '');
+  if (cleaned !== mapName) {
+    variants.add(cleaned);
+  }
+  return Array.from(variants);
+}
+
+/**
+ * Faction name variants: "Ladder Rebels" → ["Ladder Rebels", "Rebels"]
+ */
+export function getFactionNameVariants(factionName: string): string[] {
+  const variants: Set<string> = new Set([factionName]);
+  const cleaned = factionName.replace(/^(Ladder|Campaign|Ranked|Custom)\s+/i, '');
+  if (cleaned !== factionName) {
+    variants.add(cleaned);
+  }
+  return Array.from(variants);
+}
+
+function resolveVariants(index: AssetIndex, memoKey: string, variants: string[]): CatalogAsset | null {
+  if (resolved.has(memoKey)) {
+    return resolved.get(memoKey)!;
+  }
+  let asset: CatalogAsset | null = null;
+  for (const variant of variants) {
+    asset = index.byKey.get(assetKey(variant)) || null;
+    if (asset) {
+      break;
+    }
+  }
+  resolved.set(memoKey, asset);
+  return asset;
+}
+
+/**
+ * Find a map by name, trying the name variants in order
+ */
+export async function findMap(mapName: string): Promise<CatalogAsset | null> {
+  return lookupInAssetCatalog(current => resolveVariants(current.maps, `m:${mapName}`, getMapNameVariants(mapName)));
+}
+
+/**
+ * Find a faction by name, trying the name variants in order
+ */
+export async function findFaction(factionName: string): Promise<CatalogAsset | null> {
+  return lookupInAssetCatalog(current =>
+    resolveVariants(current.factions, `f:${factionName}`, getFactionNameVariants(factionName)));
+}
+
+/**
+ * Map and faction ids by exact (collation-folded) name, or null if any of them is unknown
+ */
+export async function resolveAssetIds(
+  map: string,
+  factions: string[]
+): Promise<{ mapId: string; factionIds: string[] } | null> {
+  return lookupInAssetCatalog(current => {
+    const mapAsset = current.maps.byKey.get(assetKey(map));
+    const factionAssets = factions.map(name => current.factions.byKey.get(assetKey(name)));
+    if (!mapAsset || factionAssets.some(asset => !asset)) {
+      return null;
+    }
+    return { mapId: mapAsset.id, factionIds: factionAssets.map(asset => asset!.id) };
+  });
+}
+
+/**
+ * SQL LIKE pattern ('%' and '_' wildcards) as an anchored regular expression
+ */
+export function likePattern(pattern: string): RegExp {
+  const source = pattern
+    .split('')
+    .map(char => char === '%' ? '.*' : char === '_' ? '.' : char.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'))
+    .join('');
+  return new RegExp(`^${source}$`, 's');
+}
+
+/**
+ * Maps and factions marked unranked-allowed for a tournament, sorted by name
+ */
+export async function getTournamentUnrankedAssets(
+  tournamentId: string
+): Promise<{ maps: CatalogAsset[]; factions: CatalogAsset[] }> {
+  const current = await getAssetCatalog();
+  const mapIds = current.unrankedMapsByTournament.get(tournamentId);
+  const factionIds = current.unrankedFactionsByTournament.get(tournamentId);
+  return {
+    maps: mapIds ? current.maps.all.filter(asset => mapIds.has(asset.id)) : [],
+    factions: factionIds ? current.factions.all.filter(asset => factionIds.has(asset.id)) : []
+  };
+}
+
+export default {
+  getAssetCatalog,
+  refreshAssetCatalog,
+  findMap,
+  findFaction,
+  resolveAssetIds,
+  getTournamentUnrankedAssets
+};
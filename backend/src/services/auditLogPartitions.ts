@@ -0,0 +1,123 @@
+/**
+ * Audit log partition maintenance
+ * audit_logs is RANGE-partitioned by month on created_at (pYYYYMM, plus p_initial for the
+ * history before partitioning and an always-empty pmax catch-all).
+ *
+ * - ensureAuditLogPartitions() splits the next months off pmax before any row lands there,
+ *   so every REORGANIZE only touches an empty partition
+ * - purgeAuditLogsBefore() drops the partitions entirely older than the cutoff and deletes the
+ *   rest of the boundary month in small chunks (pruned to that one partition)
+ * - Both degrade to plain chunked deletes / no-ops on an unpartitioned table
+ */
+
+import { query } from '../config/database.js';
+
+// Months kept split off ahead of the current one
+const MONTHS_AHEAD = 2;
+const DELETE_CHUNK_SIZE = 5000;
+
+interface AuditPartition {
+  name: string;
+  // Exclusive upper bound (YYYY-MM-DD), null for the MAXVALUE partition
+  upperBound: string | null;
+}
+
+function monthStart(date: Date, addMonths = 0): Date {
+  return new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + addMonths, 1));
+}
+
+function toDateString(date: Date): string {
+  return date.toISOString().slice(0, 10);
+}
+
+function partitionName(month: Date): string {
+  return `p${toDateString(month).slice(0, 7).replace('-', '')}`;
+}
+
+async function getAuditPartitions(): Promise<AuditPartition[]> {
+  const result = await query(
+    `SELECT PARTITION_NAME AS name,
+            CASE WHEN PARTITION_DESCRIPTION = 'MAXVALUE' THEN NULL
+                 ELSE DATE_FORMAT(FROM_DAYS(PARTITION_DESCRIPTION), '%Y-%m-%d') END AS upper_bound
+     FROM INFORMATION_SCHEMA.PARTITIONS
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' AND PARTITION_NAME IS NOT NULL
+     ORDER BY PARTITION_ORDINAL_POSITION`
+  );
+  return result.rows.map((row: any) => ({ name: row.name, upperBound: row.upper_bound }));
+}
+
+/**
+ * Make sure monthly partitions exist up to MONTHS_AHEAD months after the current one
+ * Returns the names of the partitions created.
+ */
+export async function ensureAuditLogPartitions(now: Date = new Date(), signal?: AbortSignal): Promise<string[]> {
+  const partitions = await getAuditPartitions();
+  if (partitions.length === 0 || partitions[partitions.length - 1].upperBound !== null) {
+    // Not partitioned (or no catch-all to split): nothing to maintain
+    return [];
+  }
+
+  const bounded = partitions.filter(partition => partition.upperBound !== null);
+  const lastBound = bounded.length > 0 ? bounded[bounded.length - 1].upperBound! : toDateString(monthStart(now));
+  const target = toDateString(monthStart(now, MONTHS_AHEAD + 1));
+
+  const created: string[] = [];
+  let month = new Date(`${lastBound}T00:00:00Z`);
+  while (toDateString(month) < target) {
+    signal?.throwIfAborted();
+    const next = monthStart(month, 1);
+    const name = partitionName(month);
+    await query(
+      `ALTER TABLE audit_logs REORGANIZE PARTITION pmax INTO (
+         PARTITION ${name} VALUES LESS THAN (TO_DAYS('${toDateString(next)}')),
+         PARTITION pmax VALUES LESS THAN MAXVALUE
+       )`
+    );
+    created.push(name);
+    month = next;
+  }
+
+  if (created.length > 0) {
+    console.log(`🗂️  [AUDIT] Created audit log partitions: ${created.join(', ')}`);
+  }
+  return created;
+}
+
+/**
+ * Delete every audit log entry created before the cutoff
+ * Returns the number of entries removed.
+ */
+export async function purgeAuditLogsBefore(cutoff: Date): Promise<number> {
+  const countResult = await query('SELECT COUNT(*) AS count FROM audit_logs WHERE created_at < ?', [cutoff]);
+  const total = parseInt(countResult.rows[0]?.count || '0', 10);
+  if (total === 0) {
+    return 0;
+  }
+
+  // Whole partitions below the cutoff (pmax and the current month are never dropped)
+  const cutoffDate = toDateString(cutoff);
+  const droppable = (await getAuditPartitions())
+    .filter(partition => partition.upperBound !== null && partition.upperBound <= cutoffDate)
+    .map(partition => partition.name);
+  if (droppable.length > 0) {
+    await query(`ALTER TABLE audit_logs DROP PARTITION ${droppable.join(', ')}`);
+    console.log(`🗂️  [AUDIT] Dropped audit log partitions: ${droppable.join(', ')}`);
+  }
+
+  // The rest of the boundary month, in chunks so no single statement holds locks for long
+  let deleted: number;
+  do {
+    const result = await query(
+      `DELETE FROM audit_logs WHERE created_at < ? LIMIT ${DELETE_CHUNK_SIZE}`,
+      [cutoff]
+    );
+    deleted = result.rowCount || 0;
+  } while (deleted === DELETE_CHUNK_SIZE);
+
+  return total;
+}
+
+export default {
+  ensureAuditLogPartitions,
+  purgeAuditLogsBefore
+};
@@ -98,10 +98,16 @@ class AvatarManifestService {
       console.log(`✅ Generated manifest with ${manifest.length} unique avatars`);
 
       // Load existing manifest to compare
+      const content = JSON.stringify(manifest, null, 2);
       let existingManifest: AvatarEntry[] = [];
       if (fs.existsSync(this.manifestPath)) {
         try {
-          existingManifest = JSON.parse(fs.readFileSync(this.manifestPath, 'utf-8'));
+          const existingContent = fs.readFileSync(this.manifestPath, 'utf-8');
+          if (existingContent === content) {
+            // Unchanged: leave the file (and its mtime, for caches in front of it) alone
+            return manifest;
+          }
+          existingManifest = JSON.parse(existingContent);
         } catch (e) {
           console.warn('⚠️  Could not parse existing manifest, will overwrite');
         }
@@ -117,7 +123,7 @@ class AvatarManifestService {
       }
 
       // Write manifest.json
-      fs.writeFileSync(this.manifestPath, JSON.stringify(manifest, null, 2), 'utf-8');
+      fs.writeFileSync(this.manifestPath, content, 'utf-8');
 
       return manifest;
     } catch (error) {
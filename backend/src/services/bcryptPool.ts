@@ -0,0 +1,280 @@
+/**
+ * bcrypt Verification Pool
+ * Runs password hash comparisons on a small set of dedicated worker threads instead of the
+ * shared libuv threadpool, so a burst of logins cannot starve file I/O, zlib and DNS work
+ * (replay parsing, uploads) that also runs on that threadpool.
+ *
+ * - At most BCRYPT_POOL_SIZE comparisons run at once; further requests wait in a FIFO queue
+ * - The queue holds at most BCRYPT_QUEUE_MAX requests; beyond that callers get a
+ *   BcryptPoolBusyError right away instead of piling up
+ * - A request that is not answered within BCRYPT_TIMEOUT_MS (queue wait included) fails with
+ *   BcryptPoolBusyError; if it was already running, its worker is terminated and replaced
+ * - One request carries all password candidates for a login; the worker stops at the first
+ *   match, so a correct password in first position costs a single hash
+ *
+ * Queue depth and timings are exposed through GET /metrics and GET /api/admin/bcrypt-pool.
+ */
+
+import { Worker } from 'worker_threads';
+import { createRequire } from 'module';
+
+export class BcryptPoolBusyError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'BcryptPoolBusyError';
+  }
+}
+
+interface PendingJob {
+  id: number;
+  hash: string;
+  candidates: Array<string | Buffer>;
+  enqueuedAt: number;
+  startedAt: number | null;
+  timer: NodeJS.Timeout;
+  resolve: (match: number) => void;
+  reject: (error: Error) => void;
+}
+
+interface PoolWorker {
+  worker: Worker;
+  job: PendingJob | null;
+}
+
+// Read on first use so the values from .env apply (this module is imported before it is loaded)
+let settings: { size: number; queueMax: number; timeoutMs: number } | null = null;
+const getSettings = () => {
+  if (!settings) {
+    settings = {
+      size: Math.max(1, parseInt(process.env.BCRYPT_POOL_SIZE || '2', 10)),
+      queueMax: parseInt(process.env.BCRYPT_QUEUE_MAX || '64', 10),
+      timeoutMs: parseInt(process.env.BCRYPT_TIMEOUT_MS || '10000', 10)
+    };
+  }
+  return settings;
+};
+
+// Plain CommonJS so it runs the same under tsx and from dist/; bcrypt is loaded by path
+const WORKER_SOURCE = `
+const { parentPort, workerData } = require('worker_threads');
+const bcrypt = require(workerData.bcryptPath);
+parentPort.on('message', ({ id, hash, candidates }) => {
+  try {
+    let match = -1;
+    for (let i = 0; i < candidates.length; i++) {
+      const candidate = typeof candidates[i] === 'string' ? candidates[i] : Buffer.from(candidates[i]);
+      if (bcrypt.compareSync(candidate, hash)) {
+        match = i;
+        break;
+      }
+    }
+    parentPort.postMessage({ id, match });
+  } catch (error) {
+    parentPort.postMessage({ id, error: String((error && error.message) || error) });
+  }
+});
+`;
+
+const workers: PoolWorker[] = [];
+const queue: PendingJob[] = [];
+let nextJobId = 1;
+let bcryptPath: string | null = null;
+
+const stats = {
+  completed: 0,
+  failed: 0,
+  rejected: 0,
+  timedOut: 0,
+  comparisons: 0,
+  maxQueueDepth: 0,
+  totalQueueWaitMs: 0,
+  totalRunMs: 0,
+  workersReplaced: 0
+};
+
+function spawnWorker(): PoolWorker {
+  if (!bcryptPath) {
+    bcryptPath = createRequire(import.meta.url).resolve('bcrypt');
+  }
+  const entry: PoolWorker = {
+    worker: new Worker(WORKER_SOURCE, { eval: true, workerData: { bcryptPath } }),
+    job: null
+  };
+  entry.worker.on('message', (message: { id: number; match?: number; error?: string }) => {
+    const job = entry.job;
+    if (!job || job.id !== message.id) {
+      return;
+    }
+    entry.job = null;
+    clearTimeout(job.timer);
+    stats.totalRunMs += Date.now() - (job.startedAt as number);
+    if (message.error !== undefined) {
+      stats.failed++;
+      job.reject(new Error(message.error));
+    } else {
+      stats.completed++;
+      stats.comparisons += message.match === -1 ? job.candidates.length : (message.match as number) + 1;
+      job.resolve(message.match as number);
+    }
+    dispatch();
+  });
+
+  const onGone = (error?: Error) => {
+    const index = workers.indexOf(entry);
+    if (index === -1) {
+      return;
+    }
+    workers.splice(index, 1);
+    const job = entry.job;
+    entry.job = null;
+    if (job) {
+      clearTimeout(job.timer);
+      stats.failed++;
+      job.reject(error || new Error('bcrypt worker exited'));
+    }
+    if (error) {
+      console.error('❌ [bcrypt] Worker failed:', error);
+    }
+    dispatch();
+  };
+  entry.worker.on('error', onGone);
+  entry.worker.on('exit', () => onGone());
+  // Idle workers must not keep the process alive (after the listeners, which would ref it again)
+  entry.worker.unref();
+
+  workers.push(entry);
+  return entry;
+}
+
+function dispatch(): void {
+  while (queue.length > 0) {
+    let entry = workers.find(candidate => candidate.job === null);
+    if (!entry) {
+      if (workers.length >= getSettings().size) {
+        return;
+      }
+      entry = spawnWorker();
+    }
+    const job = queue.shift() as PendingJob;
+    job.startedAt = Date.now();
+    stats.totalQueueWaitMs += job.startedAt - job.enqueuedAt;
+    entry.job = job;
+    entry.worker.postMessage({ id: job.id, hash: job.hash, candidates: job.candidates });
+  }
+}
+
+function onTimeout(job: PendingJob): void {
+  stats.timedOut++;
+  const queued = queue.indexOf(job);
+  if (queued !== -1) {
+    queue.splice(queued, 1);
+  } else {
+    // compareSync cannot be interrupted: replace the worker that is stuck on it
+    const entry = workers.find(candidate => candidate.job === job);
+    if (entry) {
+      entry.job = null;
+      workers.splice(workers.indexOf(entry), 1);
+      stats.workersReplaced++;
+      entry.worker.terminate().catch(() => undefined);
+    }
+  }
+  job.reject(new BcryptPoolBusyError(`Password verification timed out after ${getSettings().timeoutMs}ms`));
+  dispatch();
+}
+
+/**
+ * Compare password candidates against a bcrypt hash on the pool
+ * Resolves with the index of the first matching candidate, or -1 when none matches.
+ * Throws BcryptPoolBusyError when the queue is full or the request times out.
+ */
+export function compareOnPool(candidates: Array<string | Buffer>, hash: string): Promise<number> {
+  if (candidates.length === 0) {
+    return Promise.resolve(-1);
+  }
+  const { queueMax, timeoutMs } = getSettings();
+  if (queue.length >= queueMax) {
+    stats.rejected++;
+    return Promise.reject(new BcryptPoolBusyError(`Password verification queue is full (${queueMax} waiting)`));
+  }
+
+  return new Promise<number>((resolve, reject) => {
+    const job: PendingJob = {
+      id: nextJobId++,
+      hash,
+      candidates,
+      enqueuedAt: Date.now(),
+      startedAt: null,
+      timer: setTimeout(() => onTimeout(job), timeoutMs),
+      resolve,
+      reject
+    };
+    queue.push(job);
+    stats.maxQueueDepth = Math.max(stats.maxQueueDepth, queue.length);
+    dispatch();
+  });
+}
+
+/**
+ * Current pool state and cumulative counters (for diagnostics)
+ */
+export function getBcryptPoolStats() {
+  const { size, queueMax, timeoutMs } = getSettings();
+  const started = stats.completed + stats.failed;
+  return {
+    size,
+    queueMax,
+    timeoutMs,
+    workers: workers.length,
+    active: workers.filter(entry => entry.job !== null).length,
+    queueDepth: queue.length,
+    ...stats,
+    avgQueueWaitMs: started > 0 ? Math.round(stats.totalQueueWaitMs / started) : 0,
+    avgRunMs: started > 0 ? Math.round(stats.totalRunMs / started) : 0,
+    avgComparisons: stats.completed > 0 ? Number((stats.comparisons / stats.completed).toFixed(2)) : 0
+  };
+}
+
+/**
+ * Pool metrics in the Prometheus text exposition format (appended to GET /metrics)
+ */
+export function renderBcryptPoolMetrics(): string {
+  const current = getBcryptPoolStats();
+  const lines: string[] = [];
+  const gauges: Array<[string, string, number]> = [
+    ['bcrypt_pool_size', 'Maximum number of bcrypt worker threads', current.size],
+    ['bcrypt_pool_active', 'Verifications currently running', current.active],
+    ['bcrypt_pool_queue_depth', 'Verifications waiting for a worker', current.queueDepth],
+    ['bcrypt_pool_queue_depth_max', 'Highest queue depth since startup', current.maxQueueDepth]
+  ];
+  for (const [name, help, value] of gauges) {
+    lines.push(`# HELP ${name} ${help}`);
+    lines.push(`# TYPE ${name} gauge`);
+    lines.push(`${name} ${value}`);
+  }
+
+  lines.push('# HELP bcrypt_pool_requests_total Verification requests by outcome');
+  lines.push('# TYPE bcrypt_pool_requests_total counter');
+  lines.push(`bcrypt_pool_requests_total{result="completed"} ${current.completed}`);
+  lines.push(`bcrypt_pool_requests_total{result="failed"} ${current.failed}`);
+  lines.push(`bcrypt_pool_requests_total{result="rejected"} ${current.rejected}`);
+  lines.push(`bcrypt_pool_requests_total{result="timeout"} ${current.timedOut}`);
+
+  const counters: Array<[string, string, number]> = [
+    ['bcrypt_pool_comparisons_total', 'bcrypt hash computations performed', current.comparisons],
+    ['bcrypt_pool_queue_wait_seconds_total', 'Time verifications spent waiting for a worker', current.totalQueueWaitMs / 1000],
+    ['bcrypt_pool_run_seconds_total', 'Time workers spent verifying', current.totalRunMs / 1000]
+  ];
+  for (const [name, help, value] of counters) {
+    lines.push(`# HELP ${name} ${help}`);
+    lines.push(`# TYPE ${name} counter`);
+    lines.push(`${name} ${value}`);
+  }
+
+  return lines.join('\n') + '\n';
+}
+
+export default {
+  compareOnPool,
+  getBcryptPoolStats,
+  renderBcryptPoolMetrics
+};
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-const DISCORD_API_URL = 'https://discord.com/api/v10';
+const DISCORD_API_URL = process.env.DISCORD_API_URL || 'https://discord.com/api/v10';
 
 // Check if Discord is explicitly enabled via environment variable
 export const DISCORD_ENABLED = process.env.DISCORD_ENABLED === 'true';
@@ -24,7 +24,6 @@ export async function resolveDiscordIdFromUsername(usernameInput: string): Promi
   }
 
   try {
-    const DISCORD_API_URL = 'https://discord.com/api/v10';
     const guildId = process.env.DISCORD_GUILD_ID;
     const headers = {
       Authorization: `Bot ${process.env.DISCORD_BOT_TOKEN}`,
@@ -7,7 +7,7 @@
 import { query } from '../config/database.js';
 import { v4 as uuidv4 } from 'uuid';
 import discordService from './discordService.js';
-import { resolveDiscordIdFromUsername } from './discord.js';
+import { publishNotifications, PushedNotification } from './notificationBus.js';
 
 const DISCORD_ENABLED = process.env.DISCORD_ENABLED === 'true';
 
@@ -126,51 +126,19 @@ export async function sendDiscordNotification(
       ? buildScheduleProposalEmbed(tournamentName, notificationData)
       : buildScheduleConfirmationEmbed(tournamentName, notificationData);
 
-    // Build message content with mentions
-    let messageContent = '';
-    if (notificationData.toDiscordIds && notificationData.toDiscordIds.length > 0) {
-      console.log(`🔍 [DISCORD-MENTION] Starting to resolve ${notificationData.toDiscordIds.length} Discord usernames:`, notificationData.toDiscordIds);
-      
-      // Resolve usernames to numeric Discord IDs for proper mentions
-      const resolvedIds: string[] = [];
-      for (const discordUsername of notificationData.toDiscordIds) {
-        console.log(`🔄 [DISCORD-MENTION] Attempting to resolve username: ${discordUsername}`);
-        const numericId = await resolveDiscordIdFromUsername(discordUsername);
-        if (numericId) {
-          console.log(`✅ [DISCORD-MENTION] Successfully resolved ${discordUsername} → ${numericId}`);
-          resolvedIds.push(numericId);
-        } else {
-          console.warn(`❌ [DISCORD-MENTION] Failed to resolve Discord ID for username: ${discordUsername}`);
-        }
-      }
-      
-      console.log(`📊 [DISCORD-MENTION] Resolution summary: ${resolvedIds.length}/${notificationData.toDiscordIds.length} resolved`);
-      
-      if (resolvedIds.length > 0) {
-        messageContent = resolvedIds.map(id => `<@${id}>`).join(' ');
-        console.log(`📝 [DISCORD-MENTION] Final message content: ${messageContent}`);
-      } else {
-        console.warn(`⚠️  [DISCORD-MENTION] No Discord IDs resolved, message will have no mentions`);
-      }
-    } else {
-      console.log(`ℹ️  [DISCORD-MENTION] No Discord IDs provided in notification data`);
-    }
-
-    const discordMessage = { 
-      content: messageContent || undefined,
-      embeds: [embed] 
-    };
+    // Mentions are resolved to Discord IDs by the outbox dispatcher when the message is sent
+    const mentions = notificationData.toDiscordIds && notificationData.toDiscordIds.length > 0
+      ? notificationData.toDiscordIds
+      : undefined;
 
-    console.log(`📤 [DISCORD-MENTION] Sending Discord message with content: "${messageContent || '(empty)'}"`);
-
-    // Send to Discord thread
-    const success = await discordService.publishTournamentMessage(threadId, discordMessage);
+    // Queue for the tournament thread
+    const success = await discordService.publishTournamentMessage(threadId, { embeds: [embed] }, mentions);
     
     if (success) {
-      console.log(`✅ Discord notification sent to thread ${threadId} (${notificationType})`);
+      console.log(`✅ Discord notification queued for thread ${threadId} (${notificationType})`);
       return true;
     } else {
-      console.log(`⚠️  Failed to send Discord notification to thread`);
+      console.log(`⚠️  Failed to queue Discord notification for thread`);
       return false;
     }
   } catch (error: any) {
@@ -192,6 +160,7 @@ export async function storeNotificationForUsers(
   messageExtra?: string | null
 ): Promise<boolean> {
   try {
+    const stored: PushedNotification[] = [];
     for (const userId of userIds) {
       const notificationId = uuidv4();
       await query(
@@ -199,8 +168,23 @@ export async function storeNotificationForUsers(
          VALUES (?, ?, ?, ?, ?, ?, ?, ?, false)`,
         [notificationId, userId, tournamentId, matchId, type, title, message, messageExtra || null]
       );
+      stored.push({
+        id: notificationId,
+        user_id: userId,
+        tournament_id: tournamentId,
+        match_id: matchId,
+        type,
+        title,
+        message,
+        message_extra: messageExtra || null,
+        is_read: false,
+        created_at: new Date()
+      });
     }
     console.log(`✅ Stored ${userIds.length} notification(s) in database`);
+
+    // Push to users with the app open
+    publishNotifications(stored);
     return true;
   } catch (error: any) {
     console.error(`❌ Error storing notifications:`, error.message);
@@ -0,0 +1,591 @@
+/**
+ * Discord Outbox
+ * Persistent queue for messages to Discord threads: request handlers and tournament transitions
+ * enqueue a row in discord_outbox and return, the dispatcher delivers it.
+ *
+ * - One dispatcher at a time across instances (job lease 'discord_outbox', kept while it runs),
+ *   so the rate limit buckets below see every request made with the bot token
+ * - Due rows are claimed like replays (SKIP LOCKED + claimed_by); a claim left behind by a
+ *   crashed instance expires after CLAIM_SECONDS and the message is sent again
+ * - Messages waiting for the same thread are coalesced into one API call (up to Discord's
+ *   10 embeds, 6000 embed characters and 2000 content characters); rows that already failed
+ *   once are sent on their own so one bad message cannot keep failing a batch
+ * - Every route has a token bucket seeded with Discord's default limits and corrected from the
+ *   X-RateLimit-* response headers; a 429 blocks the route (or everything, when global) for
+ *   retry_after and reschedules the messages without counting an attempt
+ * - Other failures back off exponentially; after MAX_ATTEMPTS, or on a 4xx that retrying
+ *   cannot fix, the row is dead-lettered (status 'dead') and kept until retried by an admin
+ * - Mentions are stored as Discord usernames and resolved when the message is sent (cached)
+ */
+
+import axios from 'axios';
+import { query, withTransaction } from '../config/database.js';
+import { runWithQueryContext } from '../config/queryMetrics.js';
+import { INSTANCE_ID, acquireJobLease, releaseJobLease } from './jobLeaseService.js';
+import { resolveDiscordIdFromUsername } from './discord.js';
+
+export interface OutboxEmbed {
+  title: string;
+  description?: string;
+  color?: number;
+  fields?: Array<{ name: string; value: string; inline?: boolean }>;
+  footer?: { text: string };
+  timestamp?: string;
+}
+
+export interface OutboxMessage {
+  content?: string;
+  embeds?: OutboxEmbed[];
+  // Discord usernames (or numeric ids) to mention in front of the content
+  mentions?: string[];
+}
+
+interface OutboxRow {
+  id: number;
+  channel_id: string;
+  payload: OutboxMessage;
+  attempts: number;
+}
+
+type SendResult =
+  | { outcome: 'sent' }
+  | { outcome: 'rate_limited'; retryAfterMs: number }
+  | { outcome: 'failed'; error: string; retryable: boolean };
+
+const DISCORD_API_URL = process.env.DISCORD_API_URL || 'https://discord.com/api/v10';
+const BOT_TOKEN = process.env.DISCORD_BOT_TOKEN;
+const DISCORD_ENABLED = process.env.DISCORD_ENABLED === 'true';
+
+const DISPATCH_MS = parseInt(process.env.DISCORD_OUTBOX_DISPATCH_MS || '2000', 10);
+const MAX_ATTEMPTS = parseInt(process.env.DISCORD_OUTBOX_MAX_ATTEMPTS || '8', 10);
+const LEASE_NAME = 'discord_outbox';
+const LEASE_SECONDS = 30;
+const CLAIM_SECONDS = 120;
+const CLAIM_BATCH_SIZE = 50;
+const REQUEST_TIMEOUT_MS = 10000;
+// Waits on a rate limit bucket up to this long in place; longer waits reschedule the rows
+const MAX_INLINE_WAIT_MS = 5000;
+const BACKOFF_BASE_SECONDS = 10;
+const BACKOFF_MAX_SECONDS = 3600;
+const SENT_RETENTION_DAYS = 7;
+const PURGE_INTERVAL_MS = 60 * 60 * 1000;
+
+// Discord message limits
+const MAX_EMBEDS = 10;
+const MAX_EMBED_CHARACTERS = 6000;
+const MAX_CONTENT_LENGTH = 2000;
+// Upper bound of one rendered mention ("<@" + snowflake + "> ")
+const MENTION_LENGTH = 24;
+
+const MENTION_CACHE_MS = 60 * 60 * 1000;
+const MENTION_MISS_CACHE_MS = 5 * 60 * 1000;
+
+/**
+ * Token bucket for one Discord rate limit route
+ */
+class TokenBucket {
+  private tokens: number;
+  private updatedAt = Date.now();
+  private blockedUntil = 0;
+
+  constructor(private capacity: number, private refillPerSecond: number) {
+    this.tokens = capacity;
+  }
+
+  /**
+   * Take a token; returns 0 when taken, otherwise the milliseconds until one is available
+   */
+  take(now: number = Date.now()): number {
+    if (now < this.blockedUntil) {
+      return this.blockedUntil - now;
+    }
+    this.tokens = Math.min(this.capacity, this.tokens + ((now - this.updatedAt) / 1000) * this.refillPerSecond);
+    this.updatedAt = now;
+    if (this.tokens >= 1) {
+      this.tokens -= 1;
+      return 0;
+    }
+    return Math.ceil(((1 - this.tokens) / this.refillPerSecond) * 1000);
+  }
+
+  /**
+   * Give back a token taken for a request that was not made
+   */
+  refund(): void {
+    this.tokens = Math.min(this.capacity, this.tokens + 1);
+  }
+
+  /**
+   * Align with the X-RateLimit-Remaining / X-RateLimit-Reset-After of a response
+   */
+  sync(remaining: number, resetAfterMs: number, now: number = Date.now()): void {
+    this.tokens = Math.min(this.tokens, remaining);
+    this.updatedAt = now;
+    if (remaining <= 0) {
+      this.blockedUntil = Math.max(this.blockedUntil, now + resetAfterMs);
+    }
+  }
+
+  /**
+   * Block the bucket after a 429
+   */
+  block(ms: number, now: number = Date.now()): void {
+    this.tokens = 0;
+    this.updatedAt = now;
+    this.blockedUntil = Math.max(this.blockedUntil, now + ms);
+  }
+}
+
+// 50 requests per second per bot, 5 messages per 5 seconds per channel
+const globalBucket = new TokenBucket(50, 50);
+const routeBuckets = new Map<string, TokenBucket>();
+const mentionCache = new Map<string, { id: string | null; expiresAt: number }>();
+
+let dispatchTimer: NodeJS.Timeout | null = null;
+let dispatching = false;
+let dispatchAgain = false;
+let lastPurgeAt = 0;
+
+function routeBucket(route: string): TokenBucket {
+  let bucket = routeBuckets.get(route);
+  if (!bucket) {
+    if (routeBuckets.size >= 1000) {
+      routeBuckets.clear();
+    }
+    bucket = new TokenBucket(5, 1);
+    routeBuckets.set(route, bucket);
+  }
+  return bucket;
+}
+
+/**
+ * Take a token for a route (and the global bucket); 0 when the request may go out now
+ */
+function takeRateLimitToken(route: string): number {
+  const globalWait = globalBucket.take();
+  if (globalWait > 0) {
+    return globalWait;
+  }
+  const routeWait = routeBucket(route).take();
+  if (routeWait > 0) {
+    globalBucket.refund();
+  }
+  return routeWait;
+}
+
+function applyRateLimitHeaders(route: string, headers: Record<string, any>): void {
+  const remaining = parseInt(headers['x-ratelimit-remaining'], 10);
+  const resetAfter = parseFloat(headers['x-ratelimit-reset-after']);
+  if (!isNaN(remaining) && !isNaN(resetAfter)) {
+    routeBucket(route).sync(remaining, Math.ceil(resetAfter * 1000));
+  }
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+function embedCharacters(embed: OutboxEmbed): number {
+  return (embed.title?.length || 0)
+    + (embed.description?.length || 0)
+    + (embed.footer?.text.length || 0)
+    + (embed.fields || []).reduce((sum, field) => sum + field.name.length + field.value.length, 0);
+}
+
+function contentLength(message: OutboxMessage): number {
+  return (message.content?.length || 0) + (message.mentions?.length || 0) * MENTION_LENGTH;
+}
+
+/**
+ * Split the due rows of one channel (in id order) into the messages to send
+ */
+function coalesce(rows: OutboxRow[]): OutboxRow[][] {
+  const batches: OutboxRow[][] = [];
+  let current: OutboxRow[] = [];
+  let embeds = 0;
+  let characters = 0;
+  let content = 0;
+
+  for (const row of rows) {
+    const rowEmbeds = row.payload.embeds || [];
+    const rowCharacters = rowEmbeds.reduce((sum, embed) => sum + embedCharacters(embed), 0);
+    const rowContent = contentLength(row.payload);
+    const fits = current.length > 0
+      && current[0].attempts === 0
+      && row.attempts === 0
+      && embeds + rowEmbeds.length <= MAX_EMBEDS
+      && characters + rowCharacters <= MAX_EMBED_CHARACTERS
+      && content + rowContent + 1 <= MAX_CONTENT_LENGTH;
+
+    if (fits) {
+      current.push(row);
+      embeds += rowEmbeds.length;
+      characters += rowCharacters;
+      content += rowContent + 1;
+    } else {
+      if (current.length > 0) {
+        batches.push(current);
+      }
+      current = [row];
+      embeds = rowEmbeds.length;
+      characters = rowCharacters;
+      content = rowContent;
+    }
+  }
+  if (current.length > 0) {
+    batches.push(current);
+  }
+  return batches;
+}
+
+async function resolveMention(username: string): Promise<string | null> {
+  const cached = mentionCache.get(username);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.id;
+  }
+  const id = await resolveDiscordIdFromUsername(username);
+  mentionCache.set(username, { id, expiresAt: Date.now() + (id ? MENTION_CACHE_MS : MENTION_MISS_CACHE_MS) });
+  return id;
+}
+
+/**
+ * Build the Discord message body for a batch of rows
+ */
+async function buildMessage(rows: OutboxRow[]): Promise<{ content?: string; embeds?: OutboxEmbed[] }> {
+  const lines: string[] = [];
+  const embeds: OutboxEmbed[] = [];
+  for (const row of rows) {
+    const mentions: string[] = [];
+    for (const username of row.payload.mentions || []) {
+      const id = await resolveMention(username);
+      if (id) {
+        mentions.push(`<@${id}>`);
+      } else {
+        console.warn(`⚠️  [DISCORD-OUTBOX] Could not resolve Discord ID for username: ${username}`);
+      }
+    }
+    const line = [mentions.join(' '), row.payload.content || ''].filter(Boolean).join(' ');
+    if (line) {
+      lines.push(line);
+    }
+    embeds.push(...(row.payload.embeds || []));
+  }
+  return {
+    content: lines.length > 0 ? lines.join('\n').substring(0, MAX_CONTENT_LENGTH) : undefined,
+    embeds: embeds.length > 0 ? embeds : undefined
+  };
+}
+
+async function postMessage(channelId: string, message: { content?: string; embeds?: OutboxEmbed[] }): Promise<SendResult> {
+  const route = `channels/${channelId}/messages`;
+  try {
+    const response = await axios.post(`${DISCORD_API_URL}/${route}`, message, {
+      headers: { Authorization: `Bot ${BOT_TOKEN}`, 'Content-Type': 'application/json' },
+      timeout: REQUEST_TIMEOUT_MS,
+      validateStatus: () => true
+    });
+    applyRateLimitHeaders(route, response.headers);
+
+    if (response.status >= 200 && response.status < 300) {
+      return { outcome: 'sent' };
+    }
+    if (response.status === 429) {
+      const retryAfterMs = Math.ceil((parseFloat(response.data?.retry_after) || 1) * 1000);
+      if (response.data?.global || response.headers['x-ratelimit-global']) {
+        globalBucket.block(retryAfterMs);
+      } else {
+        routeBucket(route).block(retryAfterMs);
+      }
+      return { outcome: 'rate_limited', retryAfterMs };
+    }
+    const detail = typeof response.data === 'object' ? JSON.stringify(response.data) : String(response.data || '');
+    return {
+      outcome: 'failed',
+      error: `HTTP ${response.status}: ${detail}`.substring(0, 1000),
+      // 4xx other than 429 will fail the same way again
+      retryable: response.status >= 500
+    };
+  } catch (error: any) {
+    // Network error or timeout
+    return { outcome: 'failed', error: String(error.message || error).substring(0, 1000), retryable: true };
+  }
+}
+
+/**
+ * Claim due rows for this instance (pending and due, or left 'sending' by an expired claim)
+ */
+async function claimDueMessages(limit: number): Promise<OutboxRow[]> {
+  return withTransaction(async (connection) => {
+    const [candidates] = await connection.query<any>(
+      `SELECT id
+       FROM discord_outbox
+       WHERE (status = 'pending' AND next_attempt_at <= NOW())
+          OR (status = 'sending' AND claim_expires_at < NOW())
+       ORDER BY id ASC
+       LIMIT ?
+       FOR UPDATE SKIP LOCKED`,
+      [limit]
+    );
+
+    const ids = (candidates || []).map((row: any) => row.id);
+    if (ids.length === 0) {
+      return [];
+    }
+
+    await connection.query(
+      `UPDATE discord_outbox
+       SET status = 'sending', claimed_by = ?, claim_expires_at = DATE_ADD(NOW(), INTERVAL ? SECOND)
+       WHERE id IN (?)`,
+      [INSTANCE_ID, CLAIM_SECONDS, ids]
+    );
+
+    const [rows] = await connection.query<any>(
+      `SELECT id, channel_id, payload, attempts
+       FROM discord_outbox
+       WHERE id IN (?)
+       ORDER BY id ASC`,
+      [ids]
+    );
+
+    return (rows || []).map((row: any) => ({
+      id: Number(row.id),
+      channel_id: row.channel_id,
+      payload: typeof row.payload === 'string' ? JSON.parse(row.payload) : row.payload,
+      attempts: Number(row.attempts)
+    }));
+  });
+}
+
+function idPlaceholders(rows: OutboxRow[]): string {
+  return rows.map(() => '?').join(',');
+}
+
+async function markSent(rows: OutboxRow[]): Promise<void> {
+  await query(
+    `UPDATE discord_outbox
+     SET status = 'sent', sent_at = NOW(), attempts = attempts + 1, last_error = NULL,
+         claimed_by = NULL, claim_expires_at = NULL
+     WHERE id IN (${idPlaceholders(rows)})`,
+    rows.map(row => row.id)
+  );
+}
+
+/**
+ * Put rows back without counting an attempt (rate limited)
+ */
+async function deferRows(rows: OutboxRow[], delayMs: number): Promise<void> {
+  await query(
+    `UPDATE discord_outbox
+     SET status = 'pending', next_attempt_at = DATE_ADD(NOW(), INTERVAL ? SECOND),
+         claimed_by = NULL, claim_expires_at = NULL
+     WHERE id IN (${idPlaceholders(rows)})`,
+    [Math.ceil(delayMs / 1000), ...rows.map(row => row.id)]
+  );
+}
+
+/**
+ * Count a failed attempt: back off exponentially, or dead-letter
+ * (MariaDB evaluates SET assignments left to right, so status and next_attempt_at see the new attempts)
+ */
+async function failRows(rows: OutboxRow[], error: string, retryable: boolean): Promise<void> {
+  await query(
+    `UPDATE discord_outbox
+     SET attempts = attempts + 1,
+         status = IF(? OR attempts >= ?, 'dead', 'pending'),
+         next_attempt_at = DATE_ADD(NOW(), INTERVAL LEAST(? * POW(2, attempts - 1), ?) + FLOOR(RAND() * 5) SECOND),
+         last_error = ?, claimed_by = NULL, claim_expires_at = NULL
+     WHERE id IN (${idPlaceholders(rows)})`,
+    [retryable ? 0 : 1, MAX_ATTEMPTS, BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS, error, ...rows.map(row => row.id)]
+  );
+}
+
+/**
+ * Deliver the claimed rows of one channel in order
+ */
+async function dispatchChannel(channelId: string, rows: OutboxRow[]): Promise<number> {
+  const route = `channels/${channelId}/messages`;
+  const batches = coalesce(rows);
+  let sent = 0;
+
+  for (let i = 0; i < batches.length; i++) {
+    const batch = batches[i];
+    let wait = takeRateLimitToken(route);
+    while (wait > 0 && wait <= MAX_INLINE_WAIT_MS) {
+      await sleep(wait);
+      wait = takeRateLimitToken(route);
+    }
+    if (wait > 0) {
+      // Keep the thread's order: everything after this batch waits too
+      await deferRows(batches.slice(i).flat(), wait);
+      return sent;
+    }
+
+    const result = await postMessage(channelId, await buildMessage(batch));
+    if (result.outcome === 'sent') {
+      await markSent(batch);
+      sent += batch.length;
+    } else if (result.outcome === 'rate_limited') {
+      console.warn(`⚠️  [DISCORD-OUTBOX] Rate limited on ${route}, retrying in ${result.retryAfterMs}ms`);
+      await deferRows(batches.slice(i).flat(), result.retryAfterMs);
+      return sent;
+    } else {
+      // A rejected coalesced batch is retried message by message
+      const retryable = result.retryable || batch.length > 1;
+      console.error(`❌ [DISCORD-OUTBOX] Failed to send ${batch.length} message(s) to ${channelId}: ${result.error}`);
+      await failRows(batch, result.error, retryable);
+    }
+  }
+  return sent;
+}
+
+async function dispatchDue(): Promise<number> {
+  const rows = await claimDueMessages(CLAIM_BATCH_SIZE);
+  if (rows.length === 0) {
+    return 0;
+  }
+
+  const byChannel = new Map<string, OutboxRow[]>();
+  for (const row of rows) {
+    const channelRows = byChannel.get(row.channel_id) || [];
+    channelRows.push(row);
+    byChannel.set(row.channel_id, channelRows);
+  }
+
+  // Channels have separate route buckets, so they are sent in parallel
+  const sent = await Promise.all(Array.from(byChannel, ([channelId, channelRows]) => dispatchChannel(channelId, channelRows)));
+  const total = sent.reduce((sum, count) => sum + count, 0);
+  if (total > 0) {
+    console.log(`📤 [DISCORD-OUTBOX] Delivered ${total} message(s) to ${byChannel.size} thread(s)`);
+  }
+  return rows.length;
+}
+
+async function purgeSentMessages(): Promise<void> {
+  if (Date.now() - lastPurgeAt < PURGE_INTERVAL_MS) {
+    return;
+  }
+  lastPurgeAt = Date.now();
+  await query(
+    `DELETE FROM discord_outbox
+     WHERE status = 'sent' AND sent_at < DATE_SUB(NOW(), INTERVAL ${SENT_RETENTION_DAYS} DAY)`
+  );
+}
+
+async function runDispatcher(): Promise<void> {
+  if (dispatching) {
+    dispatchAgain = true;
+    return;
+  }
+  dispatching = true;
+  try {
+    do {
+      dispatchAgain = false;
+      // The lease is kept (renewed every round) rather than released, so the dispatcher stays put
+      if (!(await acquireJobLease(LEASE_NAME, LEASE_SECONDS))) {
+        return;
+      }
+      let claimed: number;
+      do {
+        claimed = await dispatchDue();
+      } while (claimed === CLAIM_BATCH_SIZE && (await acquireJobLease(LEASE_NAME, LEASE_SECONDS)));
+      await purgeSentMessages();
+    } while (dispatchAgain);
+  } catch (error) {
+    console.error('❌ [DISCORD-OUTBOX] Dispatch failed:', error);
+  } finally {
+    dispatching = false;
+  }
+}
+
+function kickDispatcher(): void {
+  if (dispatchTimer) {
+    setImmediate(() => runWithQueryContext(`job:${LEASE_NAME}`, runDispatcher));
+  }
+}
+
+/**
+ * Queue a message for a Discord channel or thread
+ */
+export async function enqueueDiscordMessage(channelId: string, message: OutboxMessage): Promise<void> {
+  await query(
+    'INSERT INTO discord_outbox (channel_id, payload) VALUES (?, ?)',
+    [channelId, JSON.stringify(message)]
+  );
+  kickDispatcher();
+}
+
+/**
+ * Start delivering queued messages (no-op while Discord is disabled)
+ */
+export function startDiscordOutboxDispatcher(): void {
+  if (dispatchTimer || !DISCORD_ENABLED || !BOT_TOKEN) {
+    return;
+  }
+  dispatchTimer = setInterval(() => runWithQueryContext(`job:${LEASE_NAME}`, runDispatcher), DISPATCH_MS);
+  dispatchTimer.unref();
+  kickDispatcher();
+}
+
+/**
+ * Stop the dispatcher and hand the lease to another instance
+ */
+export async function stopDiscordOutboxDispatcher(): Promise<void> {
+  if (!dispatchTimer) {
+    return;
+  }
+  clearInterval(dispatchTimer);
+  dispatchTimer = null;
+  try {
+    await releaseJobLease(LEASE_NAME);
+  } catch (error) {
+    console.error('❌ [DISCORD-OUTBOX] Failed to release dispatcher lease:', error);
+  }
+}
+
+/**
+ * Queue size per status and the most recent dead-lettered messages
+ */
+export async function getDiscordOutboxStatus(deadLimit: number = 50): Promise<{
+  counts: Record<string, number>;
+  dead: any[];
+}> {
+  const [counts, dead] = await Promise.all([
+    query('SELECT status, COUNT(*) AS count FROM discord_outbox GROUP BY status'),
+    query(
+      `SELECT id, channel_id, payload, attempts, last_error, created_at, next_attempt_at
+       FROM discord_outbox
+       WHERE status = 'dead'
+       ORDER BY id DESC
+       LIMIT ${Math.max(1, Math.min(deadLimit, 200))}`
+    )
+  ]);
+  const byStatus: Record<string, number> = { pending: 0, sending: 0, sent: 0, dead: 0 };
+  for (const row of counts.rows) {
+    byStatus[row.status] = Number(row.count);
+  }
+  return { counts: byStatus, dead: dead.rows };
+}
+
+/**
+ * Put a dead-lettered message back in the queue
+ * Returns false if there is no dead message with that id.
+ */
+export async function retryDeadDiscordMessage(id: number): Promise<boolean> {
+  const result = await query(
+    `UPDATE discord_outbox
+     SET status = 'pending', attempts = 0, next_attempt_at = NOW(), last_error = NULL
+     WHERE id = ? AND status = 'dead'`,
+    [id]
+  );
+  if ((result.rowCount || 0) === 0) {
+    return false;
+  }
+  kickDispatcher();
+  return true;
+}
+
+export default {
+  enqueueDiscordMessage,
+  startDiscordOutboxDispatcher,
+  stopDiscordOutboxDispatcher,
+  getDiscordOutboxStatus,
+  retryDeadDiscordMessage
+};
@@ -1,6 +1,7 @@
 import axios from 'axios';
+import { enqueueDiscordMessage } from './discordOutbox.js';
 
-const DISCORD_API_URL = 'https://discord.com/api/v10';
+const DISCORD_API_URL = process.env.DISCORD_API_URL || 'https://discord.com/api/v10';
 const BOT_TOKEN = process.env.DISCORD_BOT_TOKEN;
 const FORUM_CHANNEL_ID = process.env.DISCORD_FORUM_CHANNEL_ID; // ID of the forum channel "tournaments"
 const DISCORD_ENABLED = process.env.DISCORD_ENABLED === 'true'; // Enable Discord if explicitly set to 'true'
@@ -90,7 +91,8 @@ class DiscordService {
    */
   async publishTournamentMessage(
     threadId: string,
-    message: DiscordMessage
+    message: DiscordMessage,
+    mentions?: string[]
   ): Promise<boolean> {
     if (!DISCORD_ENABLED) {
       console.log(`⏭️  Discord disabled (DISCORD_ENABLED=${process.env.DISCORD_ENABLED}). Skipping message publish.`);
@@ -100,15 +102,12 @@ class DiscordService {
       return false;
     }
 
+    // Delivered by the outbox dispatcher (rate limited, retried, coalesced per thread)
     try {
-      await axios.post(
-        `${DISCORD_API_URL}/channels/${threadId}/messages`,
-        message,
-        { headers: this.headers }
-      );
+      await enqueueDiscordMessage(threadId, { ...message, mentions });
       return true;
     } catch (error) {
-      console.error('Error publicando mensaje en Discord:', error);
+      console.error('Error encolando mensaje para Discord:', error);
       return false;
     }
   }
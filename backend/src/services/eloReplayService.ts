@@ -0,0 +1,265 @@
+/**
+ * ELO Replay Service
+ * Recomputes ELO history from the matches table with the in-memory replay engine
+ * (replayEloHistory in utils/elo.ts) and writes the results back in bulk.
+ *
+ * Modes:
+ * - Full: replay every non-cancelled match from the 1400 baseline (admin recalculation)
+ * - Incremental: resume from per-player checkpoints taken just before a cancelled match
+ *   and replay only the matches played from that point on
+ */
+
+import { PoolConnection } from 'mysql2/promise';
+import { query, withTransaction } from '../config/database.js';
+import {
+  replayEloHistory,
+  formatTrend,
+  shouldPlayerBeRated,
+  EloReplayCheckpoint,
+  EloReplayResult
+} from '../utils/elo.js';
+import { getUserLevel } from '../utils/auth.js';
+import { bulkUpdateUserStats, UserStatsUpdate } from './statisticsCalculator.js';
+import { refreshLeaderboardPlayers } from './leaderboardService.js';
+
+const DEFAULT_ELO = 1400;
+const MATCH_UPDATE_BATCH_SIZE = 500;
+
+export interface EloReplaySummary {
+  matchesReplayed: number;
+  matchesUpdated: number;
+  playersUpdated: number;
+  // Players whose users_extension row was rewritten (their derived statistics may need a refresh)
+  playerIds: string[];
+}
+
+interface StoredMatch {
+  id: string;
+  winner_id: string;
+  loser_id: string;
+  winner_elo_before: number | null;
+  winner_elo_after: number | null;
+  loser_elo_before: number | null;
+  loser_elo_after: number | null;
+}
+
+interface PersistOptions {
+  // Only write matches whose stored ELO values differ from the replayed ones
+  onlyChangedMatches: boolean;
+  // Players whose users_extension row must be written even if none of their matches changed
+  forcePlayers: Set<string>;
+  // 'preserve' keeps the current is_rated flag, 'recompute' applies shouldPlayerBeRated
+  ratedPolicy: 'preserve' | 'recompute';
+}
+
+/**
+ * Load non-cancelled matches in chronological order, optionally from a given timestamp
+ */
+async function loadMatches(fromDate?: Date): Promise<StoredMatch[]> {
+  const result = await query(
+    `SELECT id, winner_id, loser_id, winner_elo_before, winner_elo_after, loser_elo_before, loser_elo_after
+     FROM matches
+     WHERE status != 'cancelled' ${fromDate ? 'AND created_at >= ?' : ''}
+     ORDER BY created_at ASC, id ASC`,
+    fromDate ? [fromDate] : []
+  );
+  return result.rows as StoredMatch[];
+}
+
+/**
+ * Build per-player checkpoints from all non-cancelled matches played strictly before a timestamp
+ * ELO comes from the player's last match before the timestamp; the streak is the run of identical
+ * results at the end of that history. One query, regardless of player count.
+ */
+async function loadCheckpoints(beforeDate: Date): Promise<Map<string, EloReplayCheckpoint>> {
+  const result = await query(
+    `SELECT player_id,
+            MAX(CASE WHEN rn = 1 THEN elo_after END) AS elo,
+            MAX(CASE WHEN rn = 1 THEN is_win END) AS last_is_win,
+            COUNT(*) AS matches_played,
+            SUM(is_win) AS total_wins,
+            MIN(CASE WHEN is_win != last_result THEN rn END) AS first_break
+     FROM (
+       SELECT p.*,
+              ROW_NUMBER() OVER (PARTITION BY p.player_id ORDER BY p.created_at DESC, p.match_id DESC) AS rn,
+              FIRST_VALUE(p.is_win) OVER (PARTITION BY p.player_id ORDER BY p.created_at DESC, p.match_id DESC) AS last_result
+       FROM (
+         SELECT id AS match_id, winner_id AS player_id, 1 AS is_win, winner_elo_after AS elo_after, created_at
+         FROM matches WHERE status != 'cancelled' AND created_at < ?
+         UNION ALL
+         SELECT id AS match_id, loser_id AS player_id, 0 AS is_win, loser_elo_after AS elo_after, created_at
+         FROM matches WHERE status != 'cancelled' AND created_at < ?
+       ) p
+     ) ranked
+     GROUP BY player_id`,
+    [beforeDate, beforeDate]
+  );
+
+  const checkpoints = new Map<string, EloReplayCheckpoint>();
+  for (const row of result.rows) {
+    const matchesPlayed = Number(row.matches_played) || 0;
+    const totalWins = Number(row.total_wins) || 0;
+    const streakLength = row.first_break ? Number(row.first_break) - 1 : matchesPlayed;
+    checkpoints.set(row.player_id, {
+      elo: Number(row.elo) || DEFAULT_ELO,
+      matches_played: matchesPlayed,
+      total_wins: totalWins,
+      total_losses: matchesPlayed - totalWins,
+      streak: Number(row.last_is_win) === 1 ? streakLength : -streakLength
+    });
+  }
+  return checkpoints;
+}
+
+/**
+ * Write replayed match ELO values with batched UPDATE ... JOIN statements
+ */
+async function writeMatchUpdates(
+  connection: PoolConnection,
+  matches: StoredMatch[],
+  replay: EloReplayResult,
+  indices: number[]
+): Promise<void> {
+  for (let offset = 0; offset < indices.length; offset += MATCH_UPDATE_BATCH_SIZE) {
+    const batch = indices.slice(offset, offset + MATCH_UPDATE_BATCH_SIZE);
+    const params: any[] = [];
+    const rowsSql = batch.map((i, position) => {
+      const wBefore = replay.winnerEloBefore[i];
+      const wAfter = replay.winnerEloAfter[i];
+      const lBefore = replay.loserEloBefore[i];
+      const lAfter = replay.loserEloAfter[i];
+      params.push(
+        matches[i].id,
+        wBefore, wAfter, lBefore, lAfter,
+        getUserLevel(wBefore), getUserLevel(wAfter),
+        getUserLevel(lBefore), getUserLevel(lAfter),
+        wAfter - wBefore
+      );
+      return position === 0
+        ? `SELECT ? AS id, ? AS winner_elo_before, ? AS winner_elo_after, ? AS loser_elo_before, ? AS loser_elo_after,
+                  ? AS winner_level_before, ? AS winner_level_after, ? AS loser_level_before, ? AS loser_level_after,
+                  ? AS elo_change`
+        : 'SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?';
+    });
+
+    await connection.query(
+      `UPDATE matches m
+       JOIN (${rowsSql.join(' UNION ALL ')}) v ON v.id = m.id
+       SET m.winner_elo_before = v.winner_elo_before, m.winner_elo_after = v.winner_elo_after,
+           m.loser_elo_before = v.loser_elo_before, m.loser_elo_after = v.loser_elo_after,
+           m.winner_level_before = v.winner_level_before, m.winner_level_after = v.winner_level_after,
+           m.loser_level_before = v.loser_level_before, m.loser_level_after = v.loser_level_after,
+           m.elo_change = v.elo_change`,
+      params
+    );
+  }
+}
+
+/**
+ * Persist a replay: changed matches and affected players, in a single transaction
+ */
+async function persistReplay(
+  matches: StoredMatch[],
+  replay: EloReplayResult,
+  options: PersistOptions
+): Promise<EloReplaySummary> {
+  const changedMatches: number[] = [];
+  const playersToWrite = new Set<string>(options.forcePlayers);
+
+  for (let i = 0; i < matches.length; i++) {
+    const stored = matches[i];
+    const changed = !options.onlyChangedMatches
+      || Number(stored.winner_elo_before) !== replay.winnerEloBefore[i]
+      || Number(stored.winner_elo_after) !== replay.winnerEloAfter[i]
+      || Number(stored.loser_elo_before) !== replay.loserEloBefore[i]
+      || Number(stored.loser_elo_after) !== replay.loserEloAfter[i];
+    if (changed) {
+      changedMatches.push(i);
+      playersToWrite.add(stored.winner_id);
+      playersToWrite.add(stored.loser_id);
+    }
+  }
+
+  // Load nickname (required by the bulk upsert) and current is_rated for the players to write
+  const userUpdates: UserStatsUpdate[] = [];
+  if (playersToWrite.size > 0) {
+    const usersResult = await query(
+      `SELECT id, nickname, is_rated FROM users_extension WHERE id IN (${Array.from(playersToWrite).map(() => '?').join(',')})`,
+      Array.from(playersToWrite)
+    );
+
+    for (const user of usersResult.rows) {
+      const index = replay.playerIndex.get(user.id);
+      const elo = index !== undefined ? replay.elo[index] : DEFAULT_ELO;
+      const matchesPlayed = index !== undefined ? replay.matchesPlayed[index] : 0;
+      userUpdates.push({
+        id: user.id,
+        nickname: user.nickname,
+        elo_rating: elo,
+        matches_played: matchesPlayed,
+        total_wins: index !== undefined ? replay.wins[index] : 0,
+        total_losses: index !== undefined ? replay.losses[index] : 0,
+        is_rated: options.ratedPolicy === 'recompute' ? shouldPlayerBeRated(matchesPlayed, elo) : !!user.is_rated,
+        level: getUserLevel(elo),
+        trend: formatTrend(index !== undefined ? replay.streak[index] : 0)
+      });
+    }
+  }
+
+  await withTransaction(async (connection) => {
+    await writeMatchUpdates(connection, matches, replay, changedMatches);
+    await bulkUpdateUserStats(userUpdates, connection);
+  });
+
+  // Large replays fall back to a full leaderboard reload inside refreshLeaderboardPlayers
+  await refreshLeaderboardPlayers(userUpdates.map(update => update.id));
+
+  return {
+    matchesReplayed: matches.length,
+    matchesUpdated: changedMatches.length,
+    playersUpdated: userUpdates.length,
+    playerIds: userUpdates.map(update => update.id)
+  };
+}
+
+/**
+ * Full replay: every non-cancelled match from the baseline, every user rewritten
+ * is_rated is preserved (same policy as the admin global recalculation)
+ */
+export async function replayEloFull(): Promise<EloReplaySummary> {
+  const matches = await loadMatches();
+  const replay = replayEloHistory(matches, undefined, DEFAULT_ELO);
+
+  // Users without any non-cancelled match are reset to the baseline as well
+  const allUsers = await query('SELECT id FROM users_extension');
+  const forcePlayers = new Set<string>(allUsers.rows.map((row: any) => row.id));
+
+  return persistReplay(matches, replay, {
+    onlyChangedMatches: false,
+    forcePlayers,
+    ratedPolicy: 'preserve'
+  });
+}
+
+/**
+ * Incremental replay after a match was cancelled
+ * Resumes from per-player checkpoints just before the cancelled match and replays
+ * the matches from that point on; only matches whose ELO actually changed are written.
+ * The cancelled match must already have status = 'cancelled'.
+ */
+export async function replayEloFromMatch(cancelledMatch: {
+  created_at: Date | string;
+  winner_id: string;
+  loser_id: string;
+}): Promise<EloReplaySummary> {
+  const fromDate = new Date(cancelledMatch.created_at);
+  const checkpoints = await loadCheckpoints(fromDate);
+  const matches = await loadMatches(fromDate);
+  const replay = replayEloHistory(matches, checkpoints, DEFAULT_ELO);
+
+  return persistReplay(matches, replay, {
+    onlyChangedMatches: true,
+    forcePlayers: new Set([cancelledMatch.winner_id, cancelledMatch.loser_id]),
+    ratedPolicy: 'recompute'
+  });
+}
@@ -1,4 +1,5 @@
-import { query } from '../config/database.js';
+import { query, withTransaction } from '../config/database.js';
+import { getLeaderboardPopulation } from './leaderboardService.js';
 
 export interface GlobalStatistics {
   users_total: number;
@@ -21,10 +22,250 @@ export interface GlobalStatistics {
 }
 
 /**
- * Calculate all global statistics
+ * Per-day counters behind the statistics (table global_statistics_daily)
+ *
+ * - users_new, matches and tournaments are bumped by the writers (registration, match commit
+ *   and cancel, tournament creation) through recordGlobalStatisticsEvent()
+ * - tournament_matches results are written from many places, so the creation days of rows whose
+ *   updated_at moved since the last sync are re-counted instead
+ * - Days older than a year are folded into ARCHIVE_BUCKET, so every figure sums at most 366 rows
+ * - rebuildGlobalStatisticsBuckets() recounts everything from the source tables (first use, nightly reconcile)
+ */
+export type GlobalStatisticsMetric = 'users_new' | 'matches' | 'tournament_matches' | 'tournaments';
+
+const ARCHIVE_BUCKET = '1970-01-01';
+// Newest day that still gets its own bucket is CURDATE(); the oldest is CURDATE() - 364
+const RECENT_BUCKETS_SQL = 'DATE_SUB(CURDATE(), INTERVAL 364 DAY)';
+// Live figures are recomputed at most this often (events clear the memo immediately)
+const MEMO_MS = 10 * 1000;
+
+const METRIC_SOURCES: Record<GlobalStatisticsMetric, { table: string; condition: string }> = {
+  users_new: { table: 'users_extension', condition: '1 = 1' },
+  matches: { table: 'matches', condition: "status != 'cancelled'" },
+  tournament_matches: { table: 'tournament_matches', condition: "match_status != 'pending'" },
+  tournaments: { table: 'tournaments', condition: '1 = 1' },
+};
+
+let bucketsReady = false;
+// DB clock value of the last tournament_matches sync; null until the first sync on this instance
+let tournamentMatchesSyncMark: Date | null = null;
+let memo: { stats: GlobalStatistics; computedAt: number } | null = null;
+let computing: Promise<GlobalStatistics> | null = null;
+let rebuilding: Promise<void> | null = null;
+
+/**
+ * Add a delta to the day bucket of an event (defaults to today)
+ * Pass the row's created_at when undoing an older event (match cancelled, tournament deleted).
+ * Never throws: a lost delta is corrected by the nightly reconcile.
+ */
+export async function recordGlobalStatisticsEvent(
+  metric: GlobalStatisticsMetric,
+  delta: number = 1,
+  at?: Date | string | null
+): Promise<void> {
+  try {
+    await query(
+      `INSERT INTO global_statistics_daily (metric, bucket_date, value)
+       VALUES (?, COALESCE(DATE(?), CURDATE()), ?)
+       ON DUPLICATE KEY UPDATE value = value + VALUES(value)`,
+      [metric, at ?? null, delta]
+    );
+    memo = null;
+  } catch (error) {
+    console.error(`[GlobalStats] Failed to record ${metric} event:`, error);
+  }
+}
+
+/**
+ * Take a tournament out of the counters before it is deleted
+ * Its played tournament matches go with it, and its ranked matches when includeMatches is set.
+ */
+export async function removeTournamentFromGlobalStatistics(
+  tournamentId: string,
+  options: { includeMatches?: boolean } = {}
+): Promise<void> {
+  try {
+    const tournament = await query('SELECT created_at FROM tournaments WHERE id = ?', [tournamentId]);
+    if (tournament.rows.length === 0) {
+      return;
+    }
+    await recordGlobalStatisticsEvent('tournaments', -1, tournament.rows[0].created_at);
+
+    const sources: Array<[GlobalStatisticsMetric, string]> = [['tournament_matches', 'tournament_matches']];
+    if (options.includeMatches) {
+      sources.push(['matches', 'matches']);
+    }
+    for (const [metric, table] of sources) {
+      const days = await query(
+        `SELECT DATE_FORMAT(created_at, '%Y-%m-%d') AS day, COUNT(*) AS value
+         FROM ${table}
+         WHERE tournament_id = ? AND ${METRIC_SOURCES[metric].condition}
+         GROUP BY day`,
+        [tournamentId]
+      );
+      for (const row of days.rows) {
+        await recordGlobalStatisticsEvent(metric, -Number(row.value), row.day);
+      }
+    }
+  } catch (error) {
+    console.error(`[GlobalStats] Failed to remove tournament ${tournamentId} from statistics:`, error);
+  }
+}
+
+/**
+ * Recount every bucket from the source tables and swap them in with one transaction
+ * Only the final DELETE + INSERT holds locks; an event committed between the recount and the
+ * swap can be missed, which the next reconcile corrects.
+ */
+export async function rebuildGlobalStatisticsBuckets(): Promise<void> {
+  if (!rebuilding) {
+    rebuilding = (async () => {
+      const clock = await query('SELECT NOW() AS db_now');
+      const rows: Array<[GlobalStatisticsMetric, string, number]> = [];
+
+      for (const metric of Object.keys(METRIC_SOURCES) as GlobalStatisticsMetric[]) {
+        const { table, condition } = METRIC_SOURCES[metric];
+        const result = await query(
+          `SELECT CASE WHEN created_at >= ${RECENT_BUCKETS_SQL}
+                       THEN DATE_FORMAT(created_at, '%Y-%m-%d') ELSE '${ARCHIVE_BUCKET}' END AS day,
+                  COUNT(*) AS value
+           FROM ${table}
+           WHERE ${condition}
+           GROUP BY day`
+        );
+        for (const row of result.rows) {
+          rows.push([metric, row.day, Number(row.value) || 0]);
+        }
+      }
+
+      await withTransaction(async (connection) => {
+        await connection.query('DELETE FROM global_statistics_daily');
+        if (rows.length > 0) {
+          await connection.query('INSERT INTO global_statistics_daily (metric, bucket_date, value) VALUES ?', [rows]);
+        }
+      });
+
+      tournamentMatchesSyncMark = clock.rows[0]?.db_now ? new Date(clock.rows[0].db_now) : null;
+      bucketsReady = true;
+      memo = null;
+    })().finally(() => { rebuilding = null; });
+  }
+  return rebuilding;
+}
+
+/**
+ * Fold buckets that have left the one-year window into the archive bucket
+ */
+export async function rollUpGlobalStatisticsBuckets(): Promise<number> {
+  return withTransaction(async (connection) => {
+    const [expired] = await connection.query(
+      `SELECT metric, SUM(value) AS value, COUNT(*) AS buckets
+       FROM global_statistics_daily
+       WHERE bucket_date < ${RECENT_BUCKETS_SQL} AND bucket_date > ?
+       GROUP BY metric
+       FOR UPDATE`,
+      [ARCHIVE_BUCKET]
+    ) as any[];
+
+    let folded = 0;
+    for (const row of expired) {
+      await connection.query(
+        `INSERT INTO global_statistics_daily (metric, bucket_date, value)
+         VALUES (?, ?, ?)
+         ON DUPLICATE KEY UPDATE value = value + VALUES(value)`,
+        [row.metric, ARCHIVE_BUCKET, Number(row.value) || 0]
+      );
+      folded += Number(row.buckets) || 0;
+    }
+    if (folded > 0) {
+      await connection.query(
+        `DELETE FROM global_statistics_daily WHERE bucket_date < ${RECENT_BUCKETS_SQL} AND bucket_date > ?`,
+        [ARCHIVE_BUCKET]
+      );
+    }
+    return folded;
+  });
+}
+
+/**
+ * Re-count the tournament_matches buckets of the creation days touched since the last sync
+ * After a restart the first sync looks back one day; older gaps wait for the nightly reconcile.
+ */
+async function syncTournamentMatchBuckets(): Promise<void> {
+  const clock = await query('SELECT NOW() AS db_now');
+  const touched = await query(
+    `SELECT DISTINCT CASE WHEN created_at >= ${RECENT_BUCKETS_SQL}
+                          THEN DATE_FORMAT(created_at, '%Y-%m-%d') ELSE '${ARCHIVE_BUCKET}' END AS day
+     FROM tournament_matches
+     WHERE updated_at >= ${tournamentMatchesSyncMark ? '?' : 'DATE_SUB(NOW(), INTERVAL 1 DAY)'}`,
+    tournamentMatchesSyncMark ? [tournamentMatchesSyncMark] : []
+  );
+  const days: string[] = touched.rows.map((row: any) => row.day);
+
+  if (days.length > 0) {
+    const recentDays = days.filter(day => day !== ARCHIVE_BUCKET);
+    const values = new Map<string, number>(days.map(day => [day, 0]));
+
+    if (recentDays.length > 0) {
+      const ranges = recentDays.map(() => '(created_at >= ? AND created_at < DATE_ADD(?, INTERVAL 1 DAY))').join(' OR ');
+      const counted = await query(
+        `SELECT DATE_FORMAT(created_at, '%Y-%m-%d') AS day, COUNT(*) AS value
+         FROM tournament_matches
+         WHERE ${METRIC_SOURCES.tournament_matches.condition} AND (${ranges})
+         GROUP BY day`,
+        recentDays.flatMap(day => [day, day])
+      );
+      for (const row of counted.rows) {
+        values.set(row.day, Number(row.value) || 0);
+      }
+    }
+    if (values.has(ARCHIVE_BUCKET)) {
+      const archived = await query(
+        `SELECT COUNT(*) AS value
+         FROM tournament_matches
+         WHERE ${METRIC_SOURCES.tournament_matches.condition}
+           AND (created_at < ${RECENT_BUCKETS_SQL} OR created_at IS NULL)`
+      );
+      values.set(ARCHIVE_BUCKET, Number(archived.rows[0]?.value) || 0);
+    }
+
+    await withTransaction(async (connection) => {
+      if (values.has(ARCHIVE_BUCKET)) {
+        // The archive now covers every expired day, so expired day buckets must go
+        await connection.query(
+          `DELETE FROM global_statistics_daily
+           WHERE metric = 'tournament_matches' AND bucket_date < ${RECENT_BUCKETS_SQL} AND bucket_date > ?`,
+          [ARCHIVE_BUCKET]
+        );
+      }
+      await connection.query(
+        `INSERT INTO global_statistics_daily (metric, bucket_date, value)
+         VALUES ?
+         ON DUPLICATE KEY UPDATE value = VALUES(value)`,
+        [Array.from(values, ([day, value]) => ['tournament_matches', day, value])]
+      );
+    });
+  }
+
+  tournamentMatchesSyncMark = clock.rows[0]?.db_now ? new Date(clock.rows[0].db_now) : new Date();
+}
+
+/**
+ * Calculate all global statistics from the day buckets
+ * User head counts come from the in-memory leaderboard, which already holds every users_extension row.
  */
 export async function calculateGlobalStatistics(): Promise<GlobalStatistics> {
   try {
+    if (!bucketsReady) {
+      const existing = await query('SELECT 1 FROM global_statistics_daily LIMIT 1');
+      if (existing.rows.length === 0) {
+        console.log('[GlobalStats] Day buckets empty, counting from source tables...');
+        await rebuildGlobalStatisticsBuckets();
+      }
+      bucketsReady = true;
+    }
+    await syncTournamentMatchBuckets();
+
     const stats: GlobalStatistics = {
       users_total: 0,
       users_active: 0,
@@ -45,81 +286,56 @@ export async function calculateGlobalStatistics(): Promise<GlobalStatistics> {
       last_updated: new Date().toISOString(),
     };
 
-    // Users statistics
-    const usersResult = await query(
-      `SELECT 
-        COUNT(*) as total,
-        SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END) as active,
-        SUM(CASE WHEN enable_ranked = 1 THEN 1 ELSE 0 END) as ranked,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) as new_month,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 364 DAY) THEN 1 ELSE 0 END) as new_year
-       FROM users_extension`
-    );
-
-    if (usersResult.rows.length > 0) {
-      const row = usersResult.rows[0];
-      stats.users_total = row.total || 0;
-      stats.users_active = row.active || 0;
-      stats.users_ranked = row.ranked || 0;
-      stats.users_new_month = row.new_month || 0;
-      stats.users_new_year = row.new_year || 0;
-    }
+    const population = await getLeaderboardPopulation();
+    stats.users_total = population.total;
+    stats.users_active = population.active;
+    stats.users_ranked = population.enable_ranked;
 
-    // Ranked matches statistics (from matches table, excluding cancelled)
     // today: only today, week: last 7 days (including today), month: last 30 days, year: last 365 days, total: all
-    const matchesResult = await query(
-      `SELECT 
-        SUM(CASE WHEN DATE(created_at) = CURDATE() THEN 1 ELSE 0 END) as today,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN 1 ELSE 0 END) as week,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) as month,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 364 DAY) THEN 1 ELSE 0 END) as year,
-        COUNT(*) as total
-       FROM matches
-       WHERE status != 'cancelled'`
-    );
-
-    if (matchesResult.rows.length > 0) {
-      const row = matchesResult.rows[0];
-      stats.matches_today = row.today || 0;
-      stats.matches_week = row.week || 0;
-      stats.matches_month = row.month || 0;
-      stats.matches_year = row.year || 0;
-      stats.matches_total = row.total || 0;
-    }
-
-    // Tournament matches statistics (from tournament_matches, excluding pending)
-    const tournamentMatchesResult = await query(
-      `SELECT 
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) as month,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 364 DAY) THEN 1 ELSE 0 END) as year,
-        COUNT(*) as total
-       FROM tournament_matches
-       WHERE match_status != 'pending'`
+    const bucketsResult = await query(
+      `SELECT metric,
+        SUM(CASE WHEN bucket_date = CURDATE() THEN value ELSE 0 END) as today,
+        SUM(CASE WHEN bucket_date >= DATE_SUB(CURDATE(), INTERVAL 6 DAY) THEN value ELSE 0 END) as week,
+        SUM(CASE WHEN bucket_date >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN value ELSE 0 END) as month,
+        SUM(CASE WHEN bucket_date >= ${RECENT_BUCKETS_SQL} THEN value ELSE 0 END) as year,
+        SUM(value) as total
+       FROM global_statistics_daily
+       GROUP BY metric`
     );
 
-    if (tournamentMatchesResult.rows.length > 0) {
-      const row = tournamentMatchesResult.rows[0];
-      stats.tournament_matches_month = row.month || 0;
-      stats.tournament_matches_year = row.year || 0;
-      stats.tournament_matches_total = row.total || 0;
-    }
-
-    // Tournaments statistics
-    const tournamentsResult = await query(
-      `SELECT 
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 29 DAY) THEN 1 ELSE 0 END) as month,
-        SUM(CASE WHEN created_at >= DATE_SUB(CURDATE(), INTERVAL 364 DAY) THEN 1 ELSE 0 END) as year,
-        COUNT(*) as total
-       FROM tournaments`
-    );
+    for (const row of bucketsResult.rows) {
+      const today = Number(row.today) || 0;
+      const week = Number(row.week) || 0;
+      const month = Number(row.month) || 0;
+      const year = Number(row.year) || 0;
+      const total = Number(row.total) || 0;
 
-    if (tournamentsResult.rows.length > 0) {
-      const row = tournamentsResult.rows[0];
-      stats.tournaments_month = row.month || 0;
-      stats.tournaments_year = row.year || 0;
-      stats.tournaments_total = row.total || 0;
+      switch (row.metric as GlobalStatisticsMetric) {
+        case 'users_new':
+          stats.users_new_month = month;
+          stats.users_new_year = year;
+          break;
+        case 'matches':
+          stats.matches_today = today;
+          stats.matches_week = week;
+          stats.matches_month = month;
+          stats.matches_year = year;
+          stats.matches_total = total;
+          break;
+        case 'tournament_matches':
+          stats.tournament_matches_month = month;
+          stats.tournament_matches_year = year;
+          stats.tournament_matches_total = total;
+          break;
+        case 'tournaments':
+          stats.tournaments_month = month;
+          stats.tournaments_year = year;
+          stats.tournaments_total = total;
+          break;
+      }
     }
 
+    memo = { stats, computedAt: Date.now() };
     return stats;
   } catch (error) {
     console.error('Error calculating global statistics:', error);
@@ -127,6 +343,20 @@ export async function calculateGlobalStatistics(): Promise<GlobalStatistics> {
   }
 }
 
+/**
+ * Live global statistics, recomputed from the buckets at most every MEMO_MS
+ * Concurrent callers share one computation.
+ */
+export async function getGlobalStatistics(): Promise<GlobalStatistics> {
+  if (memo && Date.now() - memo.computedAt < MEMO_MS) {
+    return memo.stats;
+  }
+  if (!computing) {
+    computing = calculateGlobalStatistics().finally(() => { computing = null; });
+  }
+  return computing;
+}
+
 /**
  * Update global_statistics table with calculated values
  */
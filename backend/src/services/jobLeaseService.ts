@@ -0,0 +1,250 @@
+import os from 'os';
+import { v4 as uuidv4 } from 'uuid';
+import { query, withTransaction } from '../config/database.js';
+import { runWithQueryContext } from '../config/queryMetrics.js';
+
+/**
+ * Job Lease Service
+ * DB-backed leases so that several backend replicas can run the same scheduler
+ * without executing a singleton job twice, plus row claiming for the replay queue.
+ *
+ * - job_leases: one row per job name; a replica owns the job while lease_until is in the future
+ * - The owner renews the lease with a heartbeat while the job runs and releases it when done
+ * - A crashed replica simply stops heart-beating, so its lease expires and another replica takes over
+ * - Scheduled jobs pass the cycle they belong to (see jobCycle); a successful run records it in
+ *   completed_cycle, so a replica whose timer fires a little later skips the same occurrence
+ * - If the heartbeat finds the lease taken over, the job is aborted (JobLeaseLostError) and its
+ *   cycle is not recorded
+ */
+
+const DEFAULT_LEASE_SECONDS = parseInt(process.env.JOB_LEASE_SECONDS || '120', 10);
+const REPLAY_CLAIM_SECONDS = parseInt(process.env.REPLAY_CLAIM_SECONDS || '900', 10);
+// Timers of different replicas may fire slightly before the scheduled minute
+const CYCLE_CLOCK_SKEW_MS = 60 * 1000;
+
+export class JobLeaseLostError extends Error {
+  constructor(jobName: string) {
+    super(`Lease for ${jobName} was lost while the job was running`);
+    this.name = 'JobLeaseLostError';
+  }
+}
+
+interface JobLeaseOptions {
+  // Lease length; renewed every leaseSeconds/3 while the job runs
+  leaseSeconds?: number;
+  // Scheduled occurrence the run belongs to; a cycle that already completed is not run again
+  cycle?: string;
+}
+
+/**
+ * Unique identifier of this backend process (host + pid + random suffix)
+ */
+export const INSTANCE_ID = `${os.hostname()}:${process.pid}:${uuidv4().slice(0, 8)}`;
+
+/**
+ * Identify the scheduled occurrence a job run belongs to
+ * 'day' and 'month' are UTC calendar periods, a number is a fixed interval in minutes.
+ * Times just before a boundary count as the next cycle, so replicas with slightly early
+ * clocks agree on the occurrence.
+ */
+export function jobCycle(period: 'day' | 'month' | number, now: number = Date.now()): string {
+  const at = new Date(now + CYCLE_CLOCK_SKEW_MS);
+  if (period === 'day') {
+    return at.toISOString().slice(0, 10);
+  }
+  if (period === 'month') {
+    return at.toISOString().slice(0, 7);
+  }
+  const intervalMs = period * 60 * 1000;
+  return new Date(Math.floor(at.getTime() / intervalMs) * intervalMs).toISOString().slice(0, 16);
+}
+
+/**
+ * Try to acquire (or renew) the lease for a job
+ * With a cycle, the lease is not granted if that cycle already completed.
+ * Returns true if this instance now owns the lease
+ */
+export async function acquireJobLease(
+  jobName: string,
+  leaseSeconds: number = DEFAULT_LEASE_SECONDS,
+  cycle: string | null = null
+): Promise<boolean> {
+  // Make sure the lease row exists (no-op if another replica created it first)
+  await query(
+    `INSERT IGNORE INTO job_leases (job_name, holder_id, lease_until, heartbeat_at)
+     VALUES (?, NULL, NOW(), NOW())`,
+    [jobName]
+  );
+
+  // Take the lease only if it is free, expired, or already ours
+  // (acquired_at is assigned first because MariaDB evaluates SET assignments left to right)
+  const result = await query(
+    `UPDATE job_leases
+     SET acquired_at = IF(holder_id <=> ?, acquired_at, NOW()),
+         holder_id = ?, lease_until = DATE_ADD(NOW(), INTERVAL ? SECOND), heartbeat_at = NOW()
+     WHERE job_name = ?
+       AND (holder_id IS NULL OR holder_id = ? OR lease_until < NOW())
+       AND (? IS NULL OR NOT (completed_cycle <=> ?))`,
+    [INSTANCE_ID, INSTANCE_ID, leaseSeconds, jobName, INSTANCE_ID, cycle, cycle]
+  );
+
+  return (result.rowCount || 0) > 0;
+}
+
+/**
+ * Extend a lease held by this instance
+ * Returns false if the lease was lost (expired and taken by another replica)
+ */
+export async function renewJobLease(jobName: string, leaseSeconds: number = DEFAULT_LEASE_SECONDS): Promise<boolean> {
+  const result = await query(
+    `UPDATE job_leases
+     SET lease_until = DATE_ADD(NOW(), INTERVAL ? SECOND), heartbeat_at = NOW()
+     WHERE job_name = ? AND holder_id = ?`,
+    [leaseSeconds, jobName, INSTANCE_ID]
+  );
+
+  return (result.rowCount || 0) > 0;
+}
+
+/**
+ * Release a lease held by this instance so other replicas can pick the job up immediately
+ * completedCycle marks that occurrence as done, so it is not run again.
+ */
+export async function releaseJobLease(jobName: string, completedCycle: string | null = null): Promise<void> {
+  await query(
+    `UPDATE job_leases
+     SET holder_id = NULL, lease_until = NOW(), heartbeat_at = NOW(),
+         completed_cycle = COALESCE(?, completed_cycle),
+         completed_at = IF(? IS NULL, completed_at, NOW())
+     WHERE job_name = ? AND holder_id = ?`,
+    [completedCycle, completedCycle, jobName, INSTANCE_ID]
+  );
+}
+
+/**
+ * Run a job only if this instance can acquire its lease
+ * The lease is renewed every leaseSeconds/3 while the job runs and released afterwards.
+ * With options.cycle the job runs at most once per cycle across all replicas.
+ * If the lease is lost mid-run, the job's AbortSignal fires and the call rejects with
+ * JobLeaseLostError; jobs with a final commit step should check the signal before it.
+ * Returns the job result, or null if another replica holds the lease or the cycle already ran.
+ * Queries issued by the job are attributed to "job:<jobName>" in the query metrics.
+ */
+export async function runWithJobLease<T>(
+  jobName: string,
+  job: (signal: AbortSignal) => Promise<T>,
+  options: JobLeaseOptions = {}
+): Promise<T | null> {
+  return runWithQueryContext(`job:${jobName}`, () => runLeasedJob(jobName, job, options));
+}
+
+async function runLeasedJob<T>(
+  jobName: string,
+  job: (signal: AbortSignal) => Promise<T>,
+  options: JobLeaseOptions
+): Promise<T | null> {
+  const leaseSeconds = options.leaseSeconds ?? DEFAULT_LEASE_SECONDS;
+  const cycle = options.cycle ?? null;
+
+  let acquired = false;
+  try {
+    acquired = await acquireJobLease(jobName, leaseSeconds, cycle);
+  } catch (error) {
+    console.error(`❌ [LEASE] Failed to acquire lease for ${jobName}:`, error);
+    return null;
+  }
+
+  if (!acquired) {
+    console.log(`ℹ️  [LEASE] ${jobName}${cycle ? ` (${cycle})` : ''} is running on another instance or already done, skipping`);
+    return null;
+  }
+
+  const controller = new AbortController();
+  const leaseLost = new Promise<never>((_, reject) => {
+    controller.signal.addEventListener('abort', () => reject(new JobLeaseLostError(jobName)), { once: true });
+  });
+  // Only observed through Promise.race; avoid an unhandled rejection if the job settles first
+  leaseLost.catch(() => undefined);
+
+  const heartbeatMs = Math.max(1000, Math.floor((leaseSeconds * 1000) / 3));
+  const heartbeat = setInterval(async () => {
+    try {
+      const renewed = await renewJobLease(jobName, leaseSeconds);
+      if (!renewed) {
+        console.warn(`⚠️  [LEASE] Lost lease for ${jobName} while running, aborting`);
+        clearInterval(heartbeat);
+        controller.abort();
+      }
+    } catch (error) {
+      console.error(`❌ [LEASE] Heartbeat failed for ${jobName}:`, error);
+    }
+  }, heartbeatMs);
+
+  let completed = false;
+  try {
+    const result = await Promise.race([job(controller.signal), leaseLost]);
+    completed = !controller.signal.aborted;
+    return result;
+  } finally {
+    clearInterval(heartbeat);
+    try {
+      await releaseJobLease(jobName, completed ? cycle : null);
+    } catch (error) {
+      console.error(`❌ [LEASE] Failed to release lease for ${jobName}:`, error);
+    }
+  }
+}
+
+/**
+ * Claim up to `limit` replays waiting to be parsed for this instance
+ * Uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent replicas never claim the same rows,
+ * then stamps claimed_by/claim_expires_at so the claim survives after the transaction commits.
+ * Claims of crashed instances expire after REPLAY_CLAIM_SECONDS.
+ */
+export async function claimUnparsedReplays<T = any>(columns: string, limit: number): Promise<T[]> {
+  return withTransaction(async (connection) => {
+    const [candidates] = await connection.query<any>(
+      `SELECT id
+       FROM replays
+       WHERE parse_status = 'new' AND parsed = 0
+         AND (claimed_by IS NULL OR claimed_by = ? OR claim_expires_at < NOW())
+       ORDER BY created_at ASC
+       LIMIT ?
+       FOR UPDATE SKIP LOCKED`,
+      [INSTANCE_ID, limit]
+    );
+
+    const ids = (candidates || []).map((row: any) => row.id);
+    if (ids.length === 0) {
+      return [];
+    }
+
+    await connection.query(
+      `UPDATE replays
+       SET claimed_by = ?, claim_expires_at = DATE_ADD(NOW(), INTERVAL ? SECOND)
+       WHERE id IN (?)`,
+      [INSTANCE_ID, REPLAY_CLAIM_SECONDS, ids]
+    );
+
+    const [rows] = await connection.query<any>(
+      `SELECT ${columns}
+       FROM replays
+       WHERE id IN (?)
+       ORDER BY created_at ASC`,
+      [ids]
+    );
+
+    return (rows || []) as T[];
+  });
+}
+
+/**
+ * Release all replay claims held by this instance
+ * Replays still in 'new' state (e.g. waiting for the replay file) become claimable again.
+ */
+export async function releaseReplayClaims(): Promise<void> {
+  await query(
+    `UPDATE replays SET claimed_by = NULL, claim_expires_at = NULL WHERE claimed_by = ?`,
+    [INSTANCE_ID]
+  );
+}
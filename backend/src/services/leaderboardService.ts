@@ -0,0 +1,450 @@
+/**
+ * Leaderboard Service
+ * Maintained in-memory ELO leaderboard so ranking pages, rank lookups and
+ * "players around me" windows never sort users_extension per request.
+ *
+ * - One sorted array per view (all, rated, active, ranked), ordered by (elo_rating DESC, id DESC)
+ * - Rank lookups, ELO range bounds and cursor positions are binary searches (O(log n));
+ *   an ELO change moves one entry within each view instead of re-sorting
+ * - Rows changed since the last sync (users_extension.updated_at) are pulled at most every
+ *   DELTA_SYNC_MS; writers on this instance can push changes immediately with refreshLeaderboardPlayers()
+ * - A full reload every FULL_RELOAD_MS repairs anything written without bumping updated_at
+ * - Nicknames are mirrored into a trigram/prefix index (utils/nicknameIndex.ts) for player search
+ */
+
+import { query } from '../config/database.js';
+import { NicknameIndex } from '../utils/nicknameIndex.js';
+
+export interface LeaderboardEntry {
+  id: string;
+  nickname: string;
+  elo_rating: number;
+  level: string | null;
+  is_rated: boolean;
+  is_active: boolean;
+  is_blocked: boolean;
+  enable_ranked: boolean;
+  matches_played: number;
+  total_wins: number;
+  total_losses: number;
+  country: string | null;
+  avatar: string | null;
+  trend: string;
+}
+
+export type LeaderboardView = 'all' | 'rated' | 'active' | 'ranked';
+
+export interface LeaderboardPageOptions {
+  offset?: number;
+  limit: number;
+  // Keyset position: return entries strictly after this (elo_rating, id) in the requested order
+  after?: { elo_rating: number; id: string };
+  minElo?: number | null;
+  maxElo?: number | null;
+  // Extra per-entry filter (nickname, enable_ranked, ...): a linear scan, but no sort
+  filter?: (entry: LeaderboardEntry) => boolean;
+  ascending?: boolean;
+}
+
+const VIEW_FILTERS: Record<LeaderboardView, (entry: LeaderboardEntry) => boolean> = {
+  all: entry => !entry.is_blocked,
+  rated: entry => !entry.is_blocked && entry.is_rated,
+  active: entry => !entry.is_blocked && entry.is_active,
+  // Same criteria as the public ranking pages
+  ranked: entry => !entry.is_blocked && entry.is_active && entry.is_rated
+    && entry.elo_rating >= 1400 && entry.matches_played >= 10
+};
+const VIEW_NAMES = Object.keys(VIEW_FILTERS) as LeaderboardView[];
+
+const DELTA_SYNC_MS = parseInt(process.env.LEADERBOARD_SYNC_MS || '5000', 10);
+const FULL_RELOAD_MS = parseInt(process.env.LEADERBOARD_RELOAD_MS || '300000', 10);
+// Refreshing more players than this at once is cheaper as a full reload
+const MAX_TARGETED_REFRESH = 500;
+
+const ENTRY_COLUMNS = `id, nickname, elo_rating, level, is_rated, is_active, is_blocked, enable_ranked,
+  matches_played, total_wins, total_losses, country, avatar, COALESCE(trend, '-') AS trend`;
+
+const byId = new Map<string, LeaderboardEntry>();
+const nicknames = new NicknameIndex();
+const views: Record<LeaderboardView, LeaderboardEntry[]> = { all: [], rated: [], active: [], ranked: [] };
+let loadedAt = 0;
+let deltaSyncedAt = 0;
+// DB clock value of the last sync; the next delta reads rows updated since then
+let syncMark: Date | null = null;
+let reloading: Promise<void> | null = null;
+let deltaSyncing: Promise<void> | null = null;
+
+function toEntry(row: any): LeaderboardEntry {
+  return {
+    id: row.id,
+    nickname: row.nickname,
+    elo_rating: Number(row.elo_rating) || 0,
+    level: row.level ?? null,
+    is_rated: !!row.is_rated,
+    is_active: !!row.is_active,
+    is_blocked: !!row.is_blocked,
+    enable_ranked: !!row.enable_ranked,
+    matches_played: Number(row.matches_played) || 0,
+    total_wins: Number(row.total_wins) || 0,
+    total_losses: Number(row.total_losses) || 0,
+    country: row.country ?? null,
+    avatar: row.avatar ?? null,
+    trend: row.trend || '-'
+  };
+}
+
+/**
+ * Leaderboard order: ELO descending, then id descending (matches the keyset used by listings)
+ */
+function compareEntries(a: { elo_rating: number; id: string }, b: { elo_rating: number; id: string }): number {
+  if (a.elo_rating !== b.elo_rating) {
+    return b.elo_rating - a.elo_rating;
+  }
+  return a.id < b.id ? 1 : a.id > b.id ? -1 : 0;
+}
+
+/**
+ * First index in a view whose entry does not come before the given key
+ */
+function lowerBound(list: LeaderboardEntry[], key: { elo_rating: number; id: string }): number {
+  let low = 0;
+  let high = list.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (compareEntries(list[mid], key) < 0) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+/**
+ * Number of entries in a view with an ELO strictly above the given one
+ */
+function countAbove(list: LeaderboardEntry[], elo: number): number {
+  let low = 0;
+  let high = list.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (list[mid].elo_rating > elo) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+function removeFromViews(entry: LeaderboardEntry): void {
+  for (const view of VIEW_NAMES) {
+    const list = views[view];
+    const index = lowerBound(list, entry);
+    if (index < list.length && list[index].id === entry.id) {
+      list.splice(index, 1);
+    }
+  }
+}
+
+function insertIntoViews(entry: LeaderboardEntry): void {
+  for (const view of VIEW_NAMES) {
+    if (VIEW_FILTERS[view](entry)) {
+      const list = views[view];
+      list.splice(lowerBound(list, entry), 0, entry);
+    }
+  }
+}
+
+function upsertEntry(row: any): void {
+  const previous = byId.get(row.id);
+  if (previous) {
+    removeFromViews(previous);
+  }
+  const entry = toEntry(row);
+  byId.set(entry.id, entry);
+  insertIntoViews(entry);
+  nicknames.upsert(entry.id, entry.nickname);
+}
+
+async function reload(): Promise<void> {
+  const [rows, clock] = await Promise.all([
+    query(`SELECT ${ENTRY_COLUMNS} FROM users_extension`),
+    query('SELECT NOW() AS db_now')
+  ]);
+
+  byId.clear();
+  for (const view of VIEW_NAMES) {
+    views[view] = [];
+  }
+  for (const row of rows.rows) {
+    const entry = toEntry(row);
+    byId.set(entry.id, entry);
+    for (const view of VIEW_NAMES) {
+      if (VIEW_FILTERS[view](entry)) {
+        views[view].push(entry);
+      }
+    }
+  }
+  for (const view of VIEW_NAMES) {
+    views[view].sort(compareEntries);
+  }
+  nicknames.reset(Array.from(byId.values()));
+
+  syncMark = clock.rows[0]?.db_now ? new Date(clock.rows[0].db_now) : new Date();
+  loadedAt = Date.now();
+  deltaSyncedAt = loadedAt;
+}
+
+async function deltaSync(): Promise<void> {
+  // The clock is read first so rows updated while the delta runs are picked up next time
+  const clock = await query('SELECT NOW() AS db_now');
+  const since = syncMark || new Date(0);
+  const changed = await query(
+    `SELECT ${ENTRY_COLUMNS} FROM users_extension WHERE updated_at >= ?`,
+    [since]
+  );
+  for (const row of changed.rows) {
+    upsertEntry(row);
+  }
+  syncMark = clock.rows[0]?.db_now ? new Date(clock.rows[0].db_now) : new Date();
+  deltaSyncedAt = Date.now();
+}
+
+/**
+ * Make sure the leaderboard is loaded and recent enough
+ * The first call loads synchronously; later full reloads run in the background while the
+ * current arrays keep serving requests.
+ */
+async function ensureLeaderboard(): Promise<void> {
+  const now = Date.now();
+  if (!loadedAt || now - loadedAt > FULL_RELOAD_MS) {
+    if (!reloading) {
+      reloading = reload().finally(() => { reloading = null; });
+    }
+    if (!loadedAt) {
+      await reloading;
+      return;
+    }
+    reloading.catch(error => console.error('❌ [LEADERBOARD] Background reload failed:', error));
+    return;
+  }
+
+  if (now - deltaSyncedAt > DELTA_SYNC_MS) {
+    if (!deltaSyncing) {
+      deltaSyncing = deltaSync().finally(() => { deltaSyncing = null; });
+    }
+    try {
+      await deltaSyncing;
+    } catch (error) {
+      // Serve the last known state; the next request retries
+      console.error('❌ [LEADERBOARD] Delta sync failed:', error);
+    }
+  }
+}
+
+/**
+ * Re-read specific players right after this instance changed them (match commit, block, ...)
+ */
+export async function refreshLeaderboardPlayers(playerIds: string[]): Promise<void> {
+  if (!loadedAt || playerIds.length === 0) {
+    return;
+  }
+  if (playerIds.length > MAX_TARGETED_REFRESH) {
+    invalidateLeaderboard();
+    return;
+  }
+
+  const result = await query(
+    `SELECT ${ENTRY_COLUMNS} FROM users_extension WHERE id IN (${playerIds.map(() => '?').join(',')})`,
+    playerIds
+  );
+  const found = new Set<string>();
+  for (const row of result.rows) {
+    found.add(row.id);
+    upsertEntry(row);
+  }
+  for (const id of playerIds) {
+    const stale = byId.get(id);
+    if (stale && !found.has(id)) {
+      removeFromViews(stale);
+      byId.delete(id);
+      nicknames.remove(id);
+    }
+  }
+}
+
+/**
+ * Force a full reload on the next access (after bulk rewrites such as a global ELO recalculation)
+ */
+export function invalidateLeaderboard(): void {
+  loadedAt = 0;
+}
+
+/**
+ * A page of a view in leaderboard order (or reversed), by offset or keyset position
+ */
+export async function getLeaderboardPage(
+  view: LeaderboardView,
+  options: LeaderboardPageOptions
+): Promise<{ entries: LeaderboardEntry[]; total: number; hasMore: boolean }> {
+  await ensureLeaderboard();
+  const list = views[view];
+
+  // ELO bounds as an index range [start, end) of the descending array
+  const start = options.maxElo != null ? countAbove(list, options.maxElo) : 0;
+  const end = options.minElo != null ? countAbove(list, options.minElo - 1e-9) : list.length;
+  const rangeSize = Math.max(0, end - start);
+
+  // Position k in the requested order maps to an array index
+  const indexAt = (k: number) => (options.ascending ? end - 1 - k : start + k);
+
+  let first = 0;
+  if (options.after) {
+    const position = lowerBound(list, options.after);
+    const skipsCursor = position < list.length && list[position].id === options.after.id ? 1 : 0;
+    first = options.ascending
+      ? Math.max(0, end - position)
+      : Math.max(0, position + skipsCursor - start);
+  }
+
+  const entries: LeaderboardEntry[] = [];
+  let hasMore = false;
+
+  if (!options.filter) {
+    const from = first + (options.after ? 0 : options.offset || 0);
+    for (let k = from; k < rangeSize; k++) {
+      if (entries.length === options.limit) {
+        hasMore = true;
+        break;
+      }
+      entries.push(list[indexAt(k)]);
+    }
+    return { entries, total: rangeSize, hasMore };
+  }
+
+  let skipped = 0;
+  let total = 0;
+  for (let k = 0; k < rangeSize; k++) {
+    const entry = list[indexAt(k)];
+    if (!options.filter(entry)) {
+      continue;
+    }
+    total++;
+    if (k < first) {
+      continue;
+    }
+    if (!options.after && skipped < (options.offset || 0)) {
+      skipped++;
+      continue;
+    }
+    if (entries.length < options.limit) {
+      entries.push(entry);
+    } else {
+      hasMore = true;
+    }
+  }
+  return { entries, total, hasMore };
+}
+
+/**
+ * Competition rank (1 + players with a strictly higher ELO) within a view
+ * Players outside the view still get the position their ELO would have in it.
+ */
+export async function getPlayerRank(
+  playerId: string,
+  view: LeaderboardView = 'ranked'
+): Promise<{ rank: number; total: number; in_view: boolean; entry: LeaderboardEntry } | null> {
+  await ensureLeaderboard();
+  const entry = byId.get(playerId);
+  if (!entry) {
+    return null;
+  }
+  const list = views[view];
+  return {
+    rank: countAbove(list, entry.elo_rating) + 1,
+    total: list.length,
+    in_view: VIEW_FILTERS[view](entry),
+    entry
+  };
+}
+
+/**
+ * Rank of an arbitrary ELO value within a view (no lookup of a specific player)
+ */
+export async function getRankForElo(elo: number, view: LeaderboardView = 'ranked'): Promise<number> {
+  await ensureLeaderboard();
+  return countAbove(views[view], elo) + 1;
+}
+
+/**
+ * Ranked nickname search (typeahead): exact, prefix, substring, then typo matches
+ */
+export async function searchPlayersByNickname(
+  searchQuery: string,
+  limit: number,
+  filter: (entry: LeaderboardEntry) => boolean = () => true
+): Promise<LeaderboardEntry[]> {
+  await ensureLeaderboard();
+  return nicknames
+    .search(searchQuery, limit, id => filter(byId.get(id)!))
+    .map(match => byId.get(match.id)!);
+}
+
+/**
+ * Ids of the players whose nickname contains the text (nickname LIKE '%text%')
+ */
+export async function findPlayerIdsByNickname(text: string): Promise<string[]> {
+  await ensureLeaderboard();
+  return nicknames.substringMatches(text);
+}
+
+/**
+ * Head counts over every users_extension row (blocked players included), for global statistics
+ */
+export async function getLeaderboardPopulation(): Promise<{ total: number; active: number; enable_ranked: number }> {
+  await ensureLeaderboard();
+  let active = 0;
+  let enableRanked = 0;
+  for (const entry of byId.values()) {
+    if (entry.is_active) active++;
+    if (entry.enable_ranked) enableRanked++;
+  }
+  return { total: byId.size, active, enable_ranked: enableRanked };
+}
+
+/**
+ * The players ranked just above and below a player ("around me" window)
+ * Returns null if the player is not part of the view.
+ */
+export async function getPlayersAround(
+  playerId: string,
+  radius: number,
+  view: LeaderboardView = 'ranked'
+): Promise<Array<LeaderboardEntry & { rank: number }> | null> {
+  await ensureLeaderboard();
+  const entry = byId.get(playerId);
+  const list = views[view];
+  if (!entry || !VIEW_FILTERS[view](entry)) {
+    return null;
+  }
+
+  const index = lowerBound(list, entry);
+  const from = Math.max(0, index - radius);
+  const to = Math.min(list.length, index + radius + 1);
+  return list.slice(from, to).map(neighbour => ({
+    ...neighbour,
+    rank: countAbove(list, neighbour.elo_rating) + 1
+  }));
+}
+
+/**
+ * Attach the competition rank within a view to a list of entries
+ */
+export function withRanks(
+  entries: LeaderboardEntry[],
+  view: LeaderboardView = 'ranked'
+): Array<LeaderboardEntry & { rank: number }> {
+  const list = views[view];
+  return entries.map(entry => ({ ...entry, rank: countAbove(list, entry.elo_rating) + 1 }));
+}
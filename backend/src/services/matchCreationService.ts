@@ -8,7 +8,11 @@
 import { query } from '../config/database.js';
 import { calculateNewRating, calculateTrend } from '../utils/elo.js';
 import { getUserLevel } from '../utils/auth.js';
+import { applyMatchToPlayerMatchStatistics, updateFactionMapStatistics } from './statisticsCalculator.js';
 import { v4 as uuidv4 } from 'uuid';
+import { invalidateResponseCache, CACHE_EVENTS } from '../middleware/responseCache.js';
+import { refreshLeaderboardPlayers } from './leaderboardService.js';
+import { recordGlobalStatisticsEvent } from './globalStatisticsService.js';
 
 export interface CreateTournamentUnrankedMatchInput {
   winnerId: string;
@@ -137,11 +141,35 @@ export async function createMatch(input: CreateMatchInput): Promise<CreateMatchR
       [loserNewRating, loserIsNowRated, newLoserMatches, loserTrend, getUserLevel(loserNewRating), loser.id]
     );
 
+    // Update faction/map balance statistics for this match only (incremental delta)
+    try {
+      await updateFactionMapStatistics(input.map, input.winnerFaction, input.loserFaction, input.winnerSide);
+    } catch (statsError) {
+      console.error('Warning: Error updating faction/map statistics:', statsError);
+    }
+
+    // Update per-player statistics for this match only (incremental delta)
+    try {
+      await applyMatchToPlayerMatchStatistics(matchId);
+    } catch (statsError) {
+      console.error('Warning: Error updating player match statistics:', statsError);
+    }
+
     // Update tournament round match if linked
     if (input.linkedTournamentRoundMatchId) {
       await updateTournamentRoundMatch(input.linkedTournamentRoundMatchId, winner.id);
     }
 
+    await recordGlobalStatisticsEvent('matches');
+
+    // Matches also arrive from the replay parse job, outside any route that would invalidate
+    invalidateResponseCache(CACHE_EVENTS.match);
+    try {
+      await refreshLeaderboardPlayers([winner.id, loser.id]);
+    } catch (leaderboardError) {
+      console.error('Warning: Error refreshing leaderboard:', leaderboardError);
+    }
+
     return { success: true, matchId };
   } catch (err) {
     return { success: false, error: (err as any)?.message || String(err) };
@@ -1,5 +1,6 @@
 import fs from 'fs';
 import path from 'path';
+import crypto from 'crypto';
 import { fileURLToPath } from 'url';
 import { queryTournament } from '../config/tournamentDatabase.js';
 
@@ -60,6 +61,14 @@ async function initializeMigrationsTable(): Promise<void> {
         INDEX idx_name (name)
       )
     `);
+    // Single row: fingerprint of the migration set that was last fully applied
+    await queryTournament(`
+      CREATE TABLE IF NOT EXISTS migration_fingerprint (
+        id TINYINT PRIMARY KEY,
+        fingerprint CHAR(64) NOT NULL,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+      )
+    `);
     console.log('✅ Migrations table ready');
   } catch (error) {
     console.error('❌ Error initializing migrations table:', error);
@@ -85,11 +94,11 @@ async function getAppliedMigrations(): Promise<string[]> {
 }
 
 /**
- * Get list of pending SQL migration files
+ * Get list of SQL migration files
  */
-function getPendingMigrationFiles(): string[] {
+async function getMigrationFiles(): Promise<string[]> {
   try {
-    const files = fs.readdirSync(MIGRATIONS_DIR);
+    const files = await fs.promises.readdir(MIGRATIONS_DIR);
     
     // Filter SQL files that look like migrations (start with date or have .sql extension)
     const sqlFiles = files.filter(
@@ -105,6 +114,38 @@ function getPendingMigrationFiles(): string[] {
   }
 }
 
+/**
+ * Fingerprint of a migration set
+ * Migrations are tracked by file name, so the sorted names identify what a database needs.
+ */
+function fingerprintMigrations(files: string[]): string {
+  return crypto.createHash('sha256').update(files.join('\n')).digest('hex');
+}
+
+/**
+ * Fingerprint stored by the last successful run (null before the first one)
+ */
+async function getStoredFingerprint(): Promise<string | null> {
+  try {
+    const results = await queryTournament(
+      'SELECT fingerprint FROM migration_fingerprint WHERE id = 1'
+    ) as any;
+    const rows = results?.rows || results || [];
+    return rows[0]?.fingerprint ?? null;
+  } catch (error) {
+    // Table not created yet: fall through to the full scan, which creates it
+    return null;
+  }
+}
+
+async function storeFingerprint(fingerprint: string): Promise<void> {
+  await queryTournament(
+    `INSERT INTO migration_fingerprint (id, fingerprint) VALUES (1, ?)
+     ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint)`,
+    [fingerprint]
+  );
+}
+
 /**
  * Execute a single migration file
  */
@@ -155,25 +196,35 @@ async function executeMigration(filename: string): Promise<void> {
 
 /**
  * Run all pending migrations
+ * The full scan (applied set vs. files) is skipped when the migration files are exactly the set
+ * recorded by the last successful run. Set MIGRATIONS_FORCE_SCAN=true to scan anyway (e.g. after
+ * deleting rows from the migrations table by hand to re-run a migration).
  */
 export async function runMigrations(): Promise<void> {
   try {
     console.log('🔄 Starting database migrations...\n');
 
+    const allMigrations = await getMigrationFiles();
+    const fingerprint = fingerprintMigrations(allMigrations);
+    if (process.env.MIGRATIONS_FORCE_SCAN !== 'true' && (await getStoredFingerprint()) === fingerprint) {
+      console.log(`✅ Database is up to date (${allMigrations.length} migrations, fingerprint ${fingerprint.slice(0, 12)} unchanged)\n`);
+      return;
+    }
+
     // Step 1: Initialize migrations table
     await initializeMigrationsTable();
 
     // Step 2: Get applied migrations
-    const appliedMigrations = await getAppliedMigrations();
-    console.log(`📊 Already applied: ${appliedMigrations.length} migrations\n`);
+    const appliedMigrations = new Set(await getAppliedMigrations());
+    console.log(`📊 Already applied: ${appliedMigrations.size} migrations\n`);
 
     // Step 3: Get pending migrations
-    const allMigrations = getPendingMigrationFiles();
     const pendingMigrations = allMigrations.filter(
-      (file) => !appliedMigrations.includes(file)
+      (file) => !appliedMigrations.has(file)
     );
 
     if (pendingMigrations.length === 0) {
+      await storeFingerprint(fingerprint);
       console.log('✅ Database is up to date\n');
       return;
     }
@@ -188,6 +239,8 @@ export async function runMigrations(): Promise<void> {
       console.log(`[${i + 1}/${pendingMigrations.length}] ✅ Completed: ${migration}\n`);
     }
 
+    // Only recorded once every migration succeeded, so a failed run is retried on the next boot
+    await storeFingerprint(fingerprint);
     console.log(`\n✅ All migrations completed successfully`);
   } catch (error) {
     console.error('\n❌ Migration failed:', error);
@@ -0,0 +1,190 @@
+/**
+ * Notification Bus
+ * In-process fan-out of user notifications to live push connections (GET /api/notifications/stream)
+ * so logged-in tabs stop polling the unread count.
+ *
+ * - Writers of user_notifications publish here right after their INSERT/UPDATE
+ * - While a user has at least one open connection, their unread count is kept in memory:
+ *   seeded with one COUNT when the first connection opens, adjusted by published events,
+ *   and dropped when the last connection closes
+ * - Writes made by another instance (or directly in the database) are picked up by a periodic
+ *   resync: one grouped COUNT for all connected users every RESYNC_MS
+ */
+
+import { EventEmitter } from 'events';
+import { query } from '../config/database.js';
+
+export interface PushedNotification {
+  id: string;
+  user_id: string;
+  tournament_id: string | null;
+  match_id: string | null;
+  type: string;
+  title: string;
+  message: string;
+  message_extra: string | null;
+  is_read: boolean;
+  created_at: Date;
+}
+
+export type NotificationEvent =
+  | { type: 'notification'; notification: PushedNotification; unreadCount: number }
+  | { type: 'unread'; unreadCount: number };
+
+const RESYNC_MS = parseInt(process.env.NOTIFICATION_RESYNC_MS || '60000', 10);
+const RESYNC_BATCH_SIZE = 500;
+
+const bus = new EventEmitter();
+// One listener per open connection; thousands of tabs are expected
+bus.setMaxListeners(0);
+
+const connectionCounts = new Map<string, number>();
+const unreadCounts = new Map<string, number>();
+let resyncTimer: NodeJS.Timeout | null = null;
+
+async function countUnread(userIds: string[]): Promise<Map<string, number>> {
+  const counts = new Map<string, number>(userIds.map(id => [id, 0]));
+  for (let i = 0; i < userIds.length; i += RESYNC_BATCH_SIZE) {
+    const batch = userIds.slice(i, i + RESYNC_BATCH_SIZE);
+    const result = await query(
+      `SELECT user_id, COUNT(*) AS count
+       FROM user_notifications
+       WHERE user_id IN (${batch.map(() => '?').join(',')}) AND is_read = false AND is_deleted = false
+       GROUP BY user_id`,
+      batch
+    );
+    for (const row of result.rows) {
+      counts.set(row.user_id, Number(row.count));
+    }
+  }
+  return counts;
+}
+
+function emit(userId: string, event: NotificationEvent): void {
+  bus.emit(userId, event);
+}
+
+function setUnreadCount(userId: string, count: number): void {
+  if (!connectionCounts.has(userId) || unreadCounts.get(userId) === count) {
+    return;
+  }
+  unreadCounts.set(userId, count);
+  emit(userId, { type: 'unread', unreadCount: count });
+}
+
+function startResyncTimer(): void {
+  if (resyncTimer) {
+    return;
+  }
+  resyncTimer = setInterval(() => {
+    resyncUnreadCounts().catch(error => console.error('❌ [NOTIFY] Unread count resync failed:', error));
+  }, RESYNC_MS);
+  resyncTimer.unref();
+}
+
+/**
+ * Register a push connection for a user
+ * Returns the current unread count (for the initial event) and an unsubscribe function.
+ */
+export async function subscribeToNotifications(
+  userId: string,
+  listener: (event: NotificationEvent) => void
+): Promise<{ unreadCount: number; unsubscribe: () => void }> {
+  connectionCounts.set(userId, (connectionCounts.get(userId) || 0) + 1);
+  bus.on(userId, listener);
+  startResyncTimer();
+
+  const unsubscribe = () => {
+    bus.off(userId, listener);
+    const remaining = (connectionCounts.get(userId) || 1) - 1;
+    if (remaining > 0) {
+      connectionCounts.set(userId, remaining);
+    } else {
+      connectionCounts.delete(userId);
+      unreadCounts.delete(userId);
+    }
+    if (connectionCounts.size === 0 && resyncTimer) {
+      clearInterval(resyncTimer);
+      resyncTimer = null;
+    }
+  };
+
+  try {
+    let unreadCount = unreadCounts.get(userId);
+    if (unreadCount === undefined) {
+      unreadCount = (await countUnread([userId])).get(userId) || 0;
+      if (connectionCounts.has(userId) && !unreadCounts.has(userId)) {
+        unreadCounts.set(userId, unreadCount);
+      }
+    }
+    return { unreadCount: unreadCounts.get(userId) ?? unreadCount, unsubscribe };
+  } catch (error) {
+    unsubscribe();
+    throw error;
+  }
+}
+
+/**
+ * Unread count from memory, when the user has a live connection (null otherwise)
+ */
+export function getCachedUnreadCount(userId: string): number | null {
+  return unreadCounts.get(userId) ?? null;
+}
+
+/**
+ * Open push connections of a user (for the per-user connection cap)
+ */
+export function getConnectionCount(userId: string): number {
+  return connectionCounts.get(userId) || 0;
+}
+
+/**
+ * Push newly stored notifications to their recipients
+ */
+export function publishNotifications(notifications: PushedNotification[]): void {
+  for (const notification of notifications) {
+    const current = unreadCounts.get(notification.user_id);
+    if (current === undefined) {
+      continue;
+    }
+    const unreadCount = notification.is_read ? current : current + 1;
+    unreadCounts.set(notification.user_id, unreadCount);
+    emit(notification.user_id, { type: 'notification', notification, unreadCount });
+  }
+}
+
+/**
+ * Re-count unread notifications of connected users and push changed counts
+ * Call after UPDATEs that change read/deleted state; without userIds every connected user is
+ * re-counted. Users without a live connection cost nothing.
+ */
+export async function resyncUnreadCounts(userIds?: string[]): Promise<void> {
+  const connected = (userIds || Array.from(connectionCounts.keys())).filter(id => connectionCounts.has(id));
+  if (connected.length === 0) {
+    return;
+  }
+  const counts = await countUnread(connected);
+  for (const [userId, count] of counts) {
+    setUnreadCount(userId, count);
+  }
+}
+
+/**
+ * Resync the connected recipients of a match's notifications (after bulk read-state updates by match)
+ */
+export async function resyncUnreadCountsForMatch(matchId: string): Promise<void> {
+  if (connectionCounts.size === 0) {
+    return;
+  }
+  const result = await query('SELECT DISTINCT user_id FROM user_notifications WHERE match_id = ?', [matchId]);
+  await resyncUnreadCounts(result.rows.map((row: any) => row.user_id));
+}
+
+export default {
+  subscribeToNotifications,
+  getCachedUnreadCount,
+  getConnectionCount,
+  publishNotifications,
+  resyncUnreadCounts,
+  resyncUnreadCountsForMatch
+};
@@ -1,5 +1,5 @@
-import bcrypt from 'bcrypt';
 import { queryPhpbb } from '../config/phpbbDatabase.js';
+import { compareOnPool, BcryptPoolBusyError } from './bcryptPool.js';
 
 /**
  * phpBB Authentication Service
@@ -56,6 +56,65 @@ function phpbbHtmlspecialchars(str: string): string {
     .replace(/'/g, '&#039;');
 }
 
+type PasswordEncoding = 'raw' | 'html' | 'latin1' | 'html_latin1';
+
+// bcrypt only looks at the first 72 bytes of the password
+const BCRYPT_MAX_PASSWORD_BYTES = 72;
+const MAX_REMEMBERED_ENCODINGS = 10000;
+
+// Encoding that last matched for a user, and how often each encoding matched overall
+const encodingByUser = new Map<number, PasswordEncoding>();
+const encodingHits: Record<PasswordEncoding, number> = { raw: 0, html: 0, latin1: 0, html_latin1: 0 };
+
+/**
+ * Password encodings worth hashing, most likely first.
+ * Encodings that produce the same bytes (as seen by bcrypt) are dropped, so an ASCII password
+ * without HTML special chars has a single candidate. The encoding that matched for this user
+ * last time goes first, the rest are ordered by how often they matched overall.
+ */
+function buildPasswordCandidates(
+  password: string,
+  userId: number
+): Array<{ encoding: PasswordEncoding; value: string | Buffer }> {
+  const htmlEncoded = phpbbHtmlspecialchars(password);
+  const all: Array<{ encoding: PasswordEncoding; value: string | Buffer }> = [
+    { encoding: 'raw', value: password },
+    { encoding: 'html', value: htmlEncoded },
+    { encoding: 'latin1', value: Buffer.from(password, 'latin1') },
+    { encoding: 'html_latin1', value: Buffer.from(htmlEncoded, 'latin1') }
+  ];
+
+  const seen = new Set<string>();
+  const candidates = all.filter(candidate => {
+    const bytes = (typeof candidate.value === 'string' ? Buffer.from(candidate.value, 'utf8') : candidate.value)
+      .subarray(0, BCRYPT_MAX_PASSWORD_BYTES)
+      .toString('hex');
+    if (seen.has(bytes)) {
+      return false;
+    }
+    seen.add(bytes);
+    return true;
+  });
+
+  const remembered = encodingByUser.get(userId);
+  // Stable sort: ties keep the historical order (raw, html, latin1, html_latin1)
+  return candidates.sort((a, b) => {
+    if (a.encoding === remembered) return -1;
+    if (b.encoding === remembered) return 1;
+    return encodingHits[b.encoding] - encodingHits[a.encoding];
+  });
+}
+
+function rememberEncoding(userId: number, encoding: PasswordEncoding): void {
+  encodingHits[encoding]++;
+  encodingByUser.delete(userId);
+  if (encodingByUser.size >= MAX_REMEMBERED_ENCODINGS) {
+    // Oldest first
+    encodingByUser.delete(encodingByUser.keys().next().value as number);
+  }
+  encodingByUser.set(userId, encoding);
+}
+
 /**
  * Validate password against phpBB hash.
  * phpBB uses bcrypt with $2y$ prefix — we convert to $2b$ for Node.js compatibility.
@@ -66,7 +125,10 @@ function phpbbHtmlspecialchars(str: string): string {
  * ENCODING NOTE: This phpBB installation has latin1 as its database/connection charset,
  * which means passwords with non-ASCII chars were hashed using Latin-1 bytes.
  * Our frontend is UTF-8, so e.g. ñ arrives as 2 bytes (0xC3 0xB1) vs Latin-1's 1 byte (0xF1).
- * Fix: if all other attempts fail and the password has non-ASCII chars, retry with Latin-1 bytes.
+ * Fix: if the password has non-ASCII chars, the Latin-1 bytes are tried as well.
+ *
+ * All candidates are compared in one request on the bcrypt pool (services/bcryptPool.ts),
+ * which stops at the first match. Throws BcryptPoolBusyError when the pool is saturated.
  */
 export async function validatePhpbbPassword(
   password: string,
@@ -83,39 +145,22 @@ export async function validatePhpbbPassword(
       hashToCompare = '$2b$' + hashToCompare.substring(4);
     }
 
-    // Attempt 1: raw password as sent by the user (UTF-8)
-    let isValid = await bcrypt.compare(password, hashToCompare);
-
-    // Attempt 2: phpBB encodes HTML special chars before hashing (& < > " ')
-    if (!isValid) {
-      const htmlEncoded = phpbbHtmlspecialchars(password);
-      if (htmlEncoded !== password) {
-        console.log(`🔐 [phpBB] Raw compare failed, retrying with htmlspecialchars encoding`);
-        isValid = await bcrypt.compare(htmlEncoded, hashToCompare);
-      }
-    }
-
-    // Attempt 3: htmlspecialchars + Latin-1 encoding (non-ASCII chars in latin1 DB)
-    const hasNonAscii = /[^\x00-\x7F]/.test(password);
-    if (!isValid && hasNonAscii) {
-      console.log(`🔐 [phpBB] Retrying with Latin-1 byte encoding (latin1 DB charset)`);
-      const passwordLatin1 = Buffer.from(password, 'latin1');
-      isValid = await bcrypt.compare(passwordLatin1, hashToCompare);
-
-      if (!isValid) {
-        const htmlEncodedLatin1 = Buffer.from(phpbbHtmlspecialchars(password), 'latin1');
-        isValid = await bcrypt.compare(htmlEncodedLatin1, hashToCompare);
-      }
-    }
+    const candidates = buildPasswordCandidates(password, phpbbUser.user_id);
+    const match = await compareOnPool(candidates.map(candidate => candidate.value), hashToCompare);
+    const isValid = match !== -1;
 
     if (isValid) {
-      console.log(`✅ [phpBB] Password valid for user: ${phpbbUser.username}`);
+      rememberEncoding(phpbbUser.user_id, candidates[match].encoding);
+      console.log(`✅ [phpBB] Password valid for user: ${phpbbUser.username} (${candidates[match].encoding} encoding)`);
     } else {
       console.warn(`❌ [phpBB] Password invalid for user: ${phpbbUser.username}`);
     }
 
     return isValid;
   } catch (error) {
+    if (error instanceof BcryptPoolBusyError) {
+      throw error;
+    }
     console.error('❌ [phpBB] Error validating password:', error);
     return false;
   }
@@ -252,7 +297,16 @@ export async function authenticatePhpbbUser(
 
     // Validate password
     console.log(`🔐 [AUTH] Validating password...`);
-    const isPasswordValid = await validatePhpbbPassword(password, phpbbUser);
+    let isPasswordValid: boolean;
+    try {
+      isPasswordValid = await validatePhpbbPassword(password, phpbbUser);
+    } catch (error) {
+      if (error instanceof BcryptPoolBusyError) {
+        console.warn(`⚠️ [AUTH] Password verification unavailable: ${error.message}`);
+        return { valid: false, error: 'authentication_busy' };
+      }
+      throw error;
+    }
     if (!isPasswordValid) {
       console.warn(`❌ [AUTH] Password validation failed`);
       return { valid: false, error: 'invalid_password' };
@@ -9,7 +9,16 @@
  * - Team member validation checks
  */
 
-import { query } from '../config/database.js';
+import { PoolConnection } from 'mysql2/promise';
+import { query, withTransaction } from '../config/database.js';
+import { resolveAssetIds } from './assetCatalog.js';
+import {
+  withRebuildCapture,
+  beginStatisticsRebuild,
+  readRebuildLog,
+  withSwapLock,
+  endStatisticsRebuild,
+} from './statisticsRebuildLog.js';
 import { randomUUID } from 'crypto';
 
 // ============================================================================
@@ -68,117 +77,173 @@ export interface BalanceTrendPoint {
 // TIEBREAKER CALCULATIONS
 // ============================================================================
 
+const TIEBREAKER_UPDATE_BATCH_SIZE = 500;
+
+interface TiebreakerEntity {
+  id: string;
+  wins: number;
+  // Whether this entity's wins count towards its opponents' OMP (accepted participants only)
+  countsAsOpponent: boolean;
+}
+
+interface TiebreakerSeries {
+  player1_id: string | null;
+  player2_id: string | null;
+  player1_wins: number;
+  player2_wins: number;
+}
+
+const round2 = (value: number) => Math.round(value * 100) / 100;
+
 /**
- * Calculate league tournament tiebreakers
- * Returns: total_points, OMP, GWP, OGP for each player
+ * Tiebreaker engine: computes points, OMP, GWP and OGP for every entity in one pass
+ * over the tournament's completed series, using per-entity opponent adjacency lists.
+ * - OMP: average match points (wins * pointsPerWin) of the distinct opponents faced
+ * - GWP: games won / games played * 100
+ * - OGP: average game win percentage of the opponents in the series played against this entity
+ * Byes (no opponent) count towards GWP only.
  */
-export async function calculateLeagueTiebreakers(
-  tournamentId: string
-): Promise<TiebreakerResult[]> {
-  try {
-    // Get all participants
-    const participantsResult = await query(
-      `SELECT DISTINCT tp.user_id
-       FROM tournament_participants tp
-       WHERE tp.tournament_id = ?
-       ORDER BY tp.user_id`,
-      [tournamentId]
-    );
+function computeTiebreakers(
+  entities: TiebreakerEntity[],
+  series: TiebreakerSeries[],
+  pointsPerWin: number,
+  idField: 'user_id' | 'team_id'
+): TiebreakerResult[] {
+  const indexById = new Map<string, number>();
+  entities.forEach((entity, i) => indexById.set(entity.id, i));
+
+  const n = entities.length;
+  const gamesWon = new Float64Array(n);
+  const gamesLost = new Float64Array(n);
+  // Adjacency: distinct opponent indices (-1 = opponent not registered in this tournament)
+  const opponentIndices: number[][] = Array.from({ length: n }, () => []);
+  const opponentSeen: Array<Set<string>> = Array.from({ length: n }, () => new Set());
+  const ogpSum = new Float64Array(n);
+  const ogpCount = new Int32Array(n);
+  const ogpSeen: Array<Set<string>> = Array.from({ length: n }, () => new Set());
+
+  const addSide = (selfId: string | null, opponentId: string | null, selfWins: number, opponentWins: number) => {
+    const i = selfId !== null ? indexById.get(selfId) : undefined;
+    if (i === undefined) return;
+    gamesWon[i] += selfWins;
+    gamesLost[i] += opponentWins;
+    if (opponentId === null) return;
+
+    if (!opponentSeen[i].has(opponentId)) {
+      opponentSeen[i].add(opponentId);
+      opponentIndices[i].push(indexById.get(opponentId) ?? -1);
+    }
 
-    const results: TiebreakerResult[] = [];
+    // Same series result against the same opponent is only counted once
+    const seriesKey = `${opponentId}|${opponentWins}|${selfWins}`;
+    if (!ogpSeen[i].has(seriesKey)) {
+      ogpSeen[i].add(seriesKey);
+      const played = opponentWins + selfWins;
+      ogpSum[i] += played > 0 ? (opponentWins / played) * 100 : 0;
+      ogpCount[i]++;
+    }
+  };
 
-    for (const participant of participantsResult.rows) {
-      const userId = participant.user_id;
+  for (const s of series) {
+    const p1Wins = Number(s.player1_wins) || 0;
+    const p2Wins = Number(s.player2_wins) || 0;
+    addSide(s.player1_id, s.player2_id, p1Wins, p2Wins);
+    addSide(s.player2_id, s.player1_id, p2Wins, p1Wins);
+  }
 
-      // 1. TOTAL POINTS = tournament_wins
-      const pointsResult = await query(
-        `SELECT COALESCE(tp.tournament_wins, 0) as total_points
-         FROM tournament_participants tp
-         WHERE tp.tournament_id = ? AND tp.user_id = ?`,
-        [tournamentId, userId]
-      );
-      const totalPoints = pointsResult.rows[0]?.total_points || 0;
-
-      // 2. OMP (Opponent Match Points) = Average wins of all opponents faced
-      const ompResult = await query(
-        `SELECT COALESCE(AVG(COALESCE(tp.tournament_wins, 0)), 0) as omp
-         FROM (
-           SELECT DISTINCT
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_id
-               ELSE tm.player1_id
-             END as opponent_id
-           FROM tournament_round_matches tm
-           WHERE tm.tournament_id = ?
-             AND (tm.player1_id = ? OR tm.player2_id = ?)
-             AND tm.series_status = 'completed'
-         ) opponents
-         LEFT JOIN tournament_participants tp ON tp.tournament_id = ? 
-           AND tp.user_id = opponents.opponent_id
-           AND tp.participation_status = 'accepted'`,
-        [userId, tournamentId]
-      );
-      const omp = parseFloat(ompResult.rows[0]?.omp || 0);
-
-      // 3. GWP (Game Win Percentage) = (games won / total games) * 100
-      const gwpResult = await query(
-        `SELECT 
-           COALESCE(SUM(CASE WHEN tm.player1_id = ? THEN tm.player1_wins ELSE tm.player2_wins END), 0) as games_won,
-           COALESCE(SUM(CASE WHEN tm.player1_id = ? THEN tm.player2_wins ELSE tm.player1_wins END), 0) as games_lost
-         FROM tournament_round_matches tm
-         WHERE tm.tournament_id = ?
-           AND (tm.player1_id = ? OR tm.player2_id = ?)
-           AND tm.series_status = 'completed'`,
-        [userId, tournamentId]
-      );
-      
-      const gamesWon = gwpResult.rows[0]?.games_won || 0;
-      const gamesLost = gwpResult.rows[0]?.games_lost || 0;
-      const totalGames = gamesWon + gamesLost;
-      const gwp = totalGames > 0 ? Math.round((gamesWon / totalGames) * 10000) / 100 : 0;
-
-      // 4. OGP (Opponent Game Win Percentage) = Average GWP of opponents
-      const ogpResult = await query(
-        `SELECT COALESCE(AVG(
-           CASE 
-             WHEN (opp_wins + opp_losses) > 0 
-             THEN (opp_wins / (opp_wins + opp_losses) * 100)
-             ELSE 0
-           END
-         ), 0) as ogp
-         FROM (
-           SELECT DISTINCT
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_id
-               ELSE tm.player1_id
-             END as opponent_id,
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_wins
-               ELSE tm.player1_wins
-             END as opp_wins,
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player1_wins
-               ELSE tm.player2_wins
-             END as opp_losses
-           FROM tournament_round_matches tm
-           WHERE tm.tournament_id = ?
-             AND (tm.player1_id = ? OR tm.player2_id = ?)
-             AND tm.series_status = 'completed'
-         ) opponent_data`,
-        [userId, tournamentId]
-      );
-      const ogp = parseFloat(ogpResult.rows[0]?.ogp || 0);
-
-      results.push({
-        user_id: userId,
-        total_points: totalPoints,
-        omp,
-        gwp,
-        ogp
+  return entities.map((entity, i) => {
+    let opponentPoints = 0;
+    for (const j of opponentIndices[i]) {
+      if (j >= 0 && entities[j].countsAsOpponent) {
+        opponentPoints += entities[j].wins * pointsPerWin;
+      }
+    }
+    const opponents = opponentIndices[i].length;
+    const totalGames = gamesWon[i] + gamesLost[i];
+
+    return {
+      [idField]: entity.id,
+      total_points: entity.wins * pointsPerWin,
+      omp: opponents > 0 ? round2(opponentPoints / opponents) : 0,
+      gwp: totalGames > 0 ? round2((gamesWon[i] / totalGames) * 100) : 0,
+      ogp: ogpCount[i] > 0 ? round2(ogpSum[i] / ogpCount[i]) : 0
+    } as TiebreakerResult;
+  });
+}
+
+/**
+ * Load the completed series of a tournament (second and last query of a tiebreaker run)
+ */
+async function loadCompletedSeries(tournamentId: string): Promise<TiebreakerSeries[]> {
+  const result = await query(
+    `SELECT player1_id, player2_id, player1_wins, player2_wins
+     FROM tournament_round_matches
+     WHERE tournament_id = ? AND series_status = 'completed'`,
+    [tournamentId]
+  );
+  return result.rows as TiebreakerSeries[];
+}
+
+/**
+ * Write OMP/GWP/OGP back with batched UPDATE ... JOIN statements in one transaction
+ */
+async function persistTiebreakers(
+  tableName: 'tournament_participants' | 'tournament_teams',
+  keyColumn: 'user_id' | 'id',
+  tournamentId: string,
+  results: TiebreakerResult[]
+): Promise<void> {
+  if (results.length === 0) return;
+
+  await withTransaction(async (connection) => {
+    for (let offset = 0; offset < results.length; offset += TIEBREAKER_UPDATE_BATCH_SIZE) {
+      const batch = results.slice(offset, offset + TIEBREAKER_UPDATE_BATCH_SIZE);
+      const params: any[] = [];
+      const rowsSql = batch.map((row, position) => {
+        params.push(row.user_id ?? row.team_id, row.omp, row.gwp, row.ogp);
+        return position === 0 ? 'SELECT ? AS id, ? AS omp, ? AS gwp, ? AS ogp' : 'SELECT ?, ?, ?, ?';
       });
+      params.push(tournamentId);
+
+      await connection.query(
+        `UPDATE ${tableName} t
+         JOIN (${rowsSql.join(' UNION ALL ')}) v ON v.id = t.${keyColumn}
+         SET t.omp = v.omp, t.gwp = v.gwp, t.ogp = v.ogp
+         WHERE t.tournament_id = ?`,
+        params
+      );
     }
+  });
+}
+
+/**
+ * Calculate league tournament tiebreakers
+ * Returns: total_points, OMP, GWP, OGP for each player (two queries in total)
+ */
+export async function calculateLeagueTiebreakers(
+  tournamentId: string
+): Promise<TiebreakerResult[]> {
+  try {
+    const [participantsResult, series] = await Promise.all([
+      query(
+        `SELECT user_id, COALESCE(MAX(tournament_wins), 0) AS wins,
+                MAX(participation_status = 'accepted') AS is_accepted
+         FROM tournament_participants
+         WHERE tournament_id = ?
+         GROUP BY user_id
+         ORDER BY user_id`,
+        [tournamentId]
+      ),
+      loadCompletedSeries(tournamentId)
+    ]);
+
+    const participants: TiebreakerEntity[] = participantsResult.rows.map((row: any) => ({
+      id: row.user_id,
+      wins: Number(row.wins) || 0,
+      countsAsOpponent: Number(row.is_accepted) === 1
+    }));
 
-    return results;
+    return computeTiebreakers(participants, series, 1, 'user_id');
   } catch (error) {
     console.error('Error calculating league tiebreakers:', error);
     throw error;
@@ -196,120 +261,54 @@ export async function calculateSwissTiebreakers(
 }
 
 /**
- * Calculate team swiss tournament tiebreakers
+ * Calculate team swiss tournament tiebreakers (points = wins * 3)
  */
 export async function calculateTeamSwissTiebreakers(
   tournamentId: string
 ): Promise<TiebreakerResult[]> {
   try {
-    // Get all teams
-    const teamsResult = await query(
-      `SELECT DISTINCT tt.id
-       FROM tournament_teams tt
-       WHERE tt.tournament_id = ?
-       ORDER BY tt.id`,
-      [tournamentId]
-    );
-
-    const results: TiebreakerResult[] = [];
-
-    for (const team of teamsResult.rows) {
-      const teamId = team.id;
-
-      // 1. TOTAL POINTS = tournament_wins * 3
-      const pointsResult = await query(
-        `SELECT COALESCE(tt.tournament_wins, 0) * 3 as total_points
-         FROM tournament_teams tt
-         WHERE tt.tournament_id = ? AND tt.id = ?`,
-        [tournamentId, teamId]
-      );
-      const totalPoints = pointsResult.rows[0]?.total_points || 0;
-
-      // 2. OMP = Average wins of all opponent teams * 3
-      const ompResult = await query(
-        `SELECT COALESCE(AVG(COALESCE(tt.tournament_wins, 0) * 3), 0) as omp
-         FROM (
-           SELECT DISTINCT
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_id
-               ELSE tm.player1_id
-             END as opponent_id
-           FROM tournament_round_matches tm
-           WHERE tm.tournament_id = ?
-             AND (tm.player1_id = ? OR tm.player2_id = ?)
-             AND tm.series_status = 'completed'
-         ) opponents
-         LEFT JOIN tournament_teams tt ON tt.tournament_id = ? 
-           AND tt.id = opponents.opponent_id`,
-        [teamId, tournamentId]
-      );
-      const omp = parseFloat(ompResult.rows[0]?.omp || 0);
-
-      // 3. GWP (Game Win Percentage)
-      const gwpResult = await query(
-        `SELECT 
-           COALESCE(SUM(CASE WHEN tm.player1_id = ? THEN tm.player1_wins ELSE tm.player2_wins END), 0) as games_won,
-           COALESCE(SUM(CASE WHEN tm.player1_id = ? THEN tm.player2_wins ELSE tm.player1_wins END), 0) as games_lost
-         FROM tournament_round_matches tm
-         WHERE tm.tournament_id = ?
-           AND (tm.player1_id = ? OR tm.player2_id = ?)
-           AND tm.series_status = 'completed'`,
-        [teamId, tournamentId]
-      );
-      
-      const gamesWon = gwpResult.rows[0]?.games_won || 0;
-      const gamesLost = gwpResult.rows[0]?.games_lost || 0;
-      const totalGames = gamesWon + gamesLost;
-      const gwp = totalGames > 0 ? Math.round((gamesWon / totalGames) * 10000) / 100 : 0;
-
-      // 4. OGP (Opponent Game Win Percentage)
-      const ogpResult = await query(
-        `SELECT COALESCE(AVG(
-           CASE 
-             WHEN (opp_wins + opp_losses) > 0 
-             THEN (opp_wins / (opp_wins + opp_losses) * 100)
-             ELSE 0
-           END
-         ), 0) as ogp
-         FROM (
-           SELECT DISTINCT
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_id
-               ELSE tm.player1_id
-             END as opponent_id,
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player2_wins
-               ELSE tm.player1_wins
-             END as opp_wins,
-             CASE 
-               WHEN tm.player1_id = ? THEN tm.player1_wins
-               ELSE tm.player2_wins
-             END as opp_losses
-           FROM tournament_round_matches tm
-           WHERE tm.tournament_id = ?
-             AND (tm.player1_id = ? OR tm.player2_id = ?)
-             AND tm.series_status = 'completed'
-         ) opponent_data`,
-        [teamId, tournamentId]
-      );
-      const ogp = parseFloat(ogpResult.rows[0]?.ogp || 0);
-
-      results.push({
-        team_id: teamId,
-        total_points: totalPoints,
-        omp,
-        gwp,
-        ogp
-      });
-    }
+    const [teamsResult, series] = await Promise.all([
+      query(
+        `SELECT id, COALESCE(tournament_wins, 0) AS wins
+         FROM tournament_teams
+         WHERE tournament_id = ?
+         ORDER BY id`,
+        [tournamentId]
+      ),
+      loadCompletedSeries(tournamentId)
+    ]);
+
+    const teams: TiebreakerEntity[] = teamsResult.rows.map((row: any) => ({
+      id: row.id,
+      wins: Number(row.wins) || 0,
+      countsAsOpponent: true
+    }));
 
-    return results;
+    return computeTiebreakers(teams, series, 3, 'team_id');
   } catch (error) {
     console.error('Error calculating team swiss tiebreakers:', error);
     throw error;
   }
 }
 
+/**
+ * Recalculate and store OMP/GWP/OGP for all participants of a tournament
+ */
+export async function updateTournamentTiebreakers(tournamentId: string): Promise<{ updated_count: number }> {
+  const results = await calculateSwissTiebreakers(tournamentId);
+  await persistTiebreakers('tournament_participants', 'user_id', tournamentId, results);
+  return { updated_count: results.length };
+}
+
+/**
+ * Recalculate and store OMP/GWP/OGP for all teams of a team tournament
+ */
+export async function updateTeamTiebreakers(tournamentId: string): Promise<{ updated_count: number }> {
+  const results = await calculateTeamSwissTiebreakers(tournamentId);
+  await persistTiebreakers('tournament_teams', 'id', tournamentId, results);
+  return { updated_count: results.length };
+}
+
 // ============================================================================
 // TEAM MEMBER VALIDATIONS
 // ============================================================================
@@ -449,7 +448,8 @@ export async function createBalanceEventBeforeSnapshot(
  * Create faction/map statistics snapshot
  */
 export async function createFactionMapStatisticsSnapshot(
-  snapshotDate: Date = new Date()
+  snapshotDate: Date = new Date(),
+  signal?: AbortSignal
 ): Promise<{ snapshots_created: number; snapshots_skipped: number }> {
   try {
     const { randomUUID } = await import('crypto');
@@ -468,6 +468,7 @@ export async function createFactionMapStatisticsSnapshot(
         snapshots_skipped: existingResult.rows[0].count
       };
     }
+    signal?.throwIfAborted();
 
     const result = await query(
       `INSERT INTO faction_map_statistics_history (
@@ -525,6 +526,8 @@ export async function createFactionMapStatisticsSnapshot(
 
 /**
  * Get balance event impact (before vs after)
+ * Compares the daysBefore days before the event with the daysAfter days from the event on,
+ * summed from the daily faction/map buckets.
  */
 export async function getBalanceEventImpact(
   eventId: string,
@@ -532,9 +535,8 @@ export async function getBalanceEventImpact(
   daysAfter: number = 30
 ): Promise<BalanceEventImpact[]> {
   try {
-    // Get event details
     const eventResult = await query(
-      'SELECT snapshot_before_date, event_date FROM balance_events WHERE id = ?',
+      'SELECT event_date FROM balance_events WHERE id = ?',
       [eventId]
     );
 
@@ -542,36 +544,17 @@ export async function getBalanceEventImpact(
       return [];
     }
 
-    const { snapshot_before_date, event_date } = eventResult.rows[0];
-    const afterDate = new Date(event_date);
-    afterDate.setDate(afterDate.getDate() + daysAfter);
-
-    const result = await query(
-      `SELECT
-        COALESCE(gm.id, '') as map_id,
-        COALESCE(gm.name, '') as map_name,
-        COALESCE(f1.id, '') as faction_id,
-        COALESCE(f1.name, '') as faction_name,
-        COALESCE(f2.id, '') as opponent_faction_id,
-        COALESCE(f2.name, '') as opponent_faction_name,
-        COALESCE(AVG(CASE WHEN fmsh.snapshot_date < ? THEN fmsh.winrate ELSE NULL END), 0) as winrate_before,
-        COALESCE(AVG(CASE WHEN fmsh.snapshot_date >= ? THEN fmsh.winrate ELSE NULL END), 0) as winrate_after,
-        COALESCE(AVG(CASE WHEN fmsh.snapshot_date >= ? THEN fmsh.winrate ELSE NULL END), 0) -
-          COALESCE(AVG(CASE WHEN fmsh.snapshot_date < ? THEN fmsh.winrate ELSE NULL END), 0) as winrate_change,
-        COUNT(DISTINCT CASE WHEN fmsh.snapshot_date < ? THEN fmsh.map_id END) as sample_size_before,
-        COUNT(DISTINCT CASE WHEN fmsh.snapshot_date >= ? THEN fmsh.map_id END) as sample_size_after,
-        COALESCE(SUM(CASE WHEN fmsh.snapshot_date < ? THEN fmsh.total_games ELSE 0 END), 0) as games_before,
-        COALESCE(SUM(CASE WHEN fmsh.snapshot_date >= ? THEN fmsh.total_games ELSE 0 END), 0) as games_after
-      FROM faction_map_statistics_history fmsh
-      LEFT JOIN game_maps gm ON gm.id = fmsh.map_id
-      LEFT JOIN factions f1 ON f1.id = fmsh.faction_id
-      LEFT JOIN factions f2 ON f2.id = fmsh.opponent_faction_id
-      WHERE fmsh.snapshot_date BETWEEN ? AND ?
-      GROUP BY gm.id, gm.name, f1.id, f1.name, f2.id, f2.name`,
-      [eventId, snapshot_before_date, event_date, afterDate.toISOString().split('T')[0]]
+    const eventDate = new Date(eventResult.rows[0].event_date);
+    const windowStart = new Date(eventDate);
+    windowStart.setDate(windowStart.getDate() - daysBefore);
+    const windowEnd = new Date(eventDate);
+    windowEnd.setDate(windowEnd.getDate() + daysAfter);
+
+    return await sumFactionMapWindows(
+      eventDate.toISOString().split('T')[0],
+      windowStart.toISOString().split('T')[0],
+      windowEnd.toISOString().split('T')[0]
     );
-
-    return result.rows as BalanceEventImpact[];
   } catch (error) {
     console.error('Error getting balance event impact:', error);
     throw error;
@@ -580,6 +563,8 @@ export async function getBalanceEventImpact(
 
 /**
  * Get balance trend for faction/map over time
+ * One point per day with the matchup's cumulative record up to and including that day
+ * (both sides combined), built from running sums over the daily buckets.
  */
 export async function getBalanceTrend(
   mapId: string,
@@ -589,25 +574,53 @@ export async function getBalanceTrend(
   dateTo: Date
 ): Promise<BalanceTrendPoint[]> {
   try {
+    const fromDay = dateFrom.toISOString().split('T')[0];
+    const today = new Date().toISOString().split('T')[0];
+    const requestedTo = dateTo.toISOString().split('T')[0];
+    const toDay = requestedTo < today ? requestedTo : today;
+
     const result = await query(
-      `SELECT
-        fms.snapshot_date,
-        fms.total_games,
-        fms.wins,
-        fms.losses,
-        fms.winrate,
-        fms.confidence_level,
-        fms.sample_size_category
-      FROM faction_map_statistics_history fms
-      WHERE fms.map_id = ?
-        AND fms.faction_id = ?
-        AND fms.opponent_faction_id = ?
-        AND fms.snapshot_date BETWEEN ? AND ?
-      ORDER BY fms.snapshot_date ASC`,
-      [mapId, factionId, opponentFactionId, dateFrom, dateTo]
+      `SELECT DATE_FORMAT(bucket_date, '%Y-%m-%d') AS day, SUM(games) AS games, SUM(wins) AS wins
+       FROM faction_map_daily_statistics
+       WHERE map_id = ? AND faction_id = ? AND opponent_faction_id = ? AND bucket_date <= ?
+       GROUP BY bucket_date
+       ORDER BY bucket_date ASC`,
+      [mapId, factionId, opponentFactionId, toDay]
     );
 
-    return result.rows as BalanceTrendPoint[];
+    const buckets = result.rows.map((row: any) => ({
+      day: row.day as string,
+      games: Number(row.games) || 0,
+      wins: Number(row.wins) || 0
+    }));
+
+    const points: BalanceTrendPoint[] = [];
+    let games = 0;
+    let wins = 0;
+    let next = 0;
+    for (const day = new Date(`${fromDay}T00:00:00Z`); day.toISOString().split('T')[0] <= toDay; day.setUTCDate(day.getUTCDate() + 1)) {
+      const dayStr = day.toISOString().split('T')[0];
+      while (next < buckets.length && buckets[next].day <= dayStr) {
+        games += buckets[next].games;
+        wins += buckets[next].wins;
+        next++;
+      }
+      if (games <= 0) {
+        continue;
+      }
+      points.push({
+        snapshot_date: new Date(day),
+        total_games: games,
+        wins,
+        losses: games - wins,
+        winrate: round2((wins / games) * 100),
+        // Same bands as createFactionMapStatisticsSnapshot
+        confidence_level: games < 10 ? 25.0 : games < 30 ? 50.0 : games < 50 ? 75.0 : 95.0,
+        sample_size_category: games < 10 ? 'small' : games < 50 ? 'medium' : 'large'
+      });
+    }
+
+    return points;
   } catch (error) {
     console.error('Error getting balance trend:', error);
     throw error;
@@ -662,24 +675,9 @@ export async function manageFactionMapStatisticsSnapshots(): Promise<{
 // STATISTICS RECALCULATION (10 functions)
 // ============================================================================
 
-/**
- * Recalculate all player match statistics
- * Populates 4 types of rows per player:
- *  1. Global  (opponent_id=NULL, map_id=NULL, faction_id=NULL)
- *  2. Per-opponent (opponent_id=set, map_id=NULL, faction_id=NULL, opponent_faction_id=NULL)
- *  3. Per-map      (opponent_id=NULL, map_id=set, faction_id=NULL)
- *  4. Per-faction  (opponent_id=NULL, map_id=NULL, faction_id=set, opponent_faction_id=set)
- */
-export async function recalculatePlayerMatchStatistics(): Promise<{ records_updated: number }> {
-  try {
-    const { randomUUID } = await import('crypto');
-
-    await query('TRUNCATE TABLE player_match_statistics');
-
-    // Fetch all non-cancelled matches with map/faction IDs resolved.
-    // We process each row twice (winner + loser perspective) to avoid UNION/subquery complexity.
-    const matchesResult = await query(
-      `SELECT
+// Match columns needed to derive player_match_statistics rows (map/faction IDs resolved)
+const PLAYER_STATS_MATCH_COLUMNS = `
+         m.id,
          m.winner_id,
          m.loser_id,
          gm.id  AS map_id,
@@ -694,113 +692,128 @@ export async function recalculatePlayerMatchStatistics(): Promise<{ records_upda
        FROM matches m
        LEFT JOIN game_maps gm ON gm.name = m.map
        LEFT JOIN factions f_w ON f_w.name = m.winner_faction
-       LEFT JOIN factions f_l ON f_l.name = m.loser_faction
-       WHERE m.status != 'cancelled'
-       ORDER BY m.created_at ASC`
-    );
+       LEFT JOIN factions f_l ON f_l.name = m.loser_faction`;
 
-    // ── Accumulator types ──────────────────────────────────────────────────────
+const PLAYER_STATS_INSERT_COLUMNS = `(id, player_id, opponent_id, map_id, faction_id, opponent_faction_id,
+       player_side, total_games, wins, losses, winrate, avg_elo_change, elo_change_sum,
+       elo_gained, elo_lost, last_elo_against_me, last_match_date)`;
 
-    type GlobalEntry = {
-      wins: number; losses: number; elo_sum: number; elo_count: number;
-    };
-    type OpponentEntry = {
-      wins: number; losses: number; elo_sum: number; elo_count: number;
-      elo_gained: number; elo_lost: number;
-      last_elo_against_me: number | null; last_match_date: string | null;
-    };
-    type MapEntry = {
-      map_id: string;
-      wins: number; losses: number; elo_sum: number; elo_count: number;
-    };
-    type FactionEntry = {
-      faction_id: string; opponent_faction_id: string;
-      wins: number; losses: number;
-    };
-
-    // player_id → side → entry
-    const globalMap    = new Map<string, Map<number, GlobalEntry>>();
-    // player_id → side → opponent_id → entry
-    const opponentMap  = new Map<string, Map<number, Map<string, OpponentEntry>>>();
-    // player_id → side → map_id → entry
-    const mapMap       = new Map<string, Map<number, Map<string, MapEntry>>>();
-    // player_id → side → "faction_id|opp_faction_id" → entry
-    const factionMap   = new Map<string, Map<number, Map<string, FactionEntry>>>();
-
-    const SIDES = [0, 1, 2] as const;
-
-    const getOrInit = <K, V>(map: Map<K, V>, key: K, init: () => V): V => {
-      let v = map.get(key);
-      if (!v) { v = init(); map.set(key, v); }
-      return v;
-    };
-
-    const addGlobal = (playerId: string, side: number, isWin: boolean, eloChange: number) => {
-      const byPlayer = getOrInit(globalMap, playerId, () => new Map());
-      const entry    = getOrInit(byPlayer, side, () => ({ wins: 0, losses: 0, elo_sum: 0, elo_count: 0 }));
-      if (isWin) entry.wins++; else entry.losses++;
-      entry.elo_sum   += eloChange;
-      entry.elo_count += 1;
-    };
-
-    const addOpponent = (
-      playerId: string, side: number, opponentId: string,
-      isWin: boolean, eloChange: number,
-      opponentEloBefore: number, matchDate: string
-    ) => {
-      const byPlayer   = getOrInit(opponentMap, playerId, () => new Map());
-      const bySide     = getOrInit(byPlayer,   side,     () => new Map());
-      const entry      = getOrInit(bySide, opponentId, () => ({
-        wins: 0, losses: 0, elo_sum: 0, elo_count: 0,
-        elo_gained: 0, elo_lost: 0,
-        last_elo_against_me: null as number | null,
-        last_match_date: null as string | null,
-      }));
-      if (isWin) { entry.wins++; if (eloChange > 0) entry.elo_gained += eloChange; }
-      else       { entry.losses++; if (eloChange < 0) entry.elo_lost += Math.abs(eloChange); }
-      entry.elo_sum   += eloChange;
-      entry.elo_count += 1;
-      entry.last_elo_against_me = opponentEloBefore;
-      entry.last_match_date     = matchDate;
-    };
-
-    const addMap = (
-      playerId: string, side: number, mapId: string,
-      isWin: boolean, eloChange: number
-    ) => {
-      const byPlayer = getOrInit(mapMap, playerId, () => new Map());
-      const bySide   = getOrInit(byPlayer, side,   () => new Map());
-      const entry    = getOrInit(bySide, mapId, () => ({ map_id: mapId, wins: 0, losses: 0, elo_sum: 0, elo_count: 0 }));
-      if (isWin) entry.wins++; else entry.losses++;
-      entry.elo_sum   += eloChange;
-      entry.elo_count += 1;
-    };
+const PLAYER_STATS_BATCH_SIZE = 500;
 
-    const addFaction = (
-      playerId: string, side: number,
-      factionId: string, opponentFactionId: string, isWin: boolean
-    ) => {
-      const byPlayer = getOrInit(factionMap, playerId, () => new Map());
-      const bySide   = getOrInit(byPlayer, side,       () => new Map());
-      const key      = `${factionId}|${opponentFactionId}`;
-      const entry    = getOrInit(bySide, key, () => ({ faction_id: factionId, opponent_faction_id: opponentFactionId, wins: 0, losses: 0 }));
-      if (isWin) entry.wins++; else entry.losses++;
-    };
-
-    // ── One-pass accumulation ─────────────────────────────────────────────────
-    for (const row of matchesResult.rows) {
-      const winnerSide: number = row.winner_side ?? 1;
-      const loserSide:  number = winnerSide === 1 ? 2 : 1;
-
-      const winnerEloChange = (row.winner_elo_after  ?? 0) - (row.winner_elo_before ?? 0);
-      const loserEloChange  = (row.loser_elo_after   ?? 0) - (row.loser_elo_before  ?? 0);
-      const matchDate       = row.created_at
-        ? (row.created_at instanceof Date
-            ? row.created_at.toISOString().slice(0, 19).replace('T', ' ')
-            : String(row.created_at).slice(0, 19).replace('T', ' '))
-        : null;
-
-      // ── WINNER perspective ──────────────────────────────────────
+/**
+ * Build player_match_statistics rows from a set of matches (one pass, in memory)
+ * Produces 4 types of rows per player and side (0 = all sides, 1, 2):
+ *  1. Global  (opponent_id=NULL, map_id=NULL, faction_id=NULL)
+ *  2. Per-opponent (opponent_id=set, map_id=NULL, faction_id=NULL, opponent_faction_id=NULL)
+ *  3. Per-map      (opponent_id=NULL, map_id=set, faction_id=NULL)
+ *  4. Per-faction  (opponent_id=NULL, map_id=NULL, faction_id=set, opponent_faction_id=set)
+ * Rows are returned as value arrays in PLAYER_STATS_INSERT_COLUMNS order.
+ * If onlyPlayers is set, only rows of those players are produced.
+ */
+function buildPlayerMatchStatisticsRows(matchRows: any[], onlyPlayers?: Set<string>): any[][] {
+  // ── Accumulator types ──────────────────────────────────────────────────────
+
+  type GlobalEntry = {
+    wins: number; losses: number; elo_sum: number; elo_count: number;
+  };
+  type OpponentEntry = {
+    wins: number; losses: number; elo_sum: number; elo_count: number;
+    elo_gained: number; elo_lost: number;
+    last_elo_against_me: number | null; last_match_date: string | null;
+  };
+  type MapEntry = {
+    map_id: string;
+    wins: number; losses: number; elo_sum: number; elo_count: number;
+  };
+  type FactionEntry = {
+    faction_id: string; opponent_faction_id: string;
+    wins: number; losses: number;
+  };
+
+  // player_id → side → entry
+  const globalMap    = new Map<string, Map<number, GlobalEntry>>();
+  // player_id → side → opponent_id → entry
+  const opponentMap  = new Map<string, Map<number, Map<string, OpponentEntry>>>();
+  // player_id → side → map_id → entry
+  const mapMap       = new Map<string, Map<number, Map<string, MapEntry>>>();
+  // player_id → side → "faction_id|opp_faction_id" → entry
+  const factionMap   = new Map<string, Map<number, Map<string, FactionEntry>>>();
+
+  const SIDES = [0, 1, 2] as const;
+
+  const getOrInit = <K, V>(map: Map<K, V>, key: K, init: () => V): V => {
+    let v = map.get(key);
+    if (!v) { v = init(); map.set(key, v); }
+    return v;
+  };
+
+  const addGlobal = (playerId: string, side: number, isWin: boolean, eloChange: number) => {
+    const byPlayer = getOrInit(globalMap, playerId, () => new Map());
+    const entry    = getOrInit(byPlayer, side, () => ({ wins: 0, losses: 0, elo_sum: 0, elo_count: 0 }));
+    if (isWin) entry.wins++; else entry.losses++;
+    entry.elo_sum   += eloChange;
+    entry.elo_count += 1;
+  };
+
+  const addOpponent = (
+    playerId: string, side: number, opponentId: string,
+    isWin: boolean, eloChange: number,
+    opponentEloBefore: number, matchDate: string
+  ) => {
+    const byPlayer   = getOrInit(opponentMap, playerId, () => new Map());
+    const bySide     = getOrInit(byPlayer,   side,     () => new Map());
+    const entry      = getOrInit(bySide, opponentId, () => ({
+      wins: 0, losses: 0, elo_sum: 0, elo_count: 0,
+      elo_gained: 0, elo_lost: 0,
+      last_elo_against_me: null as number | null,
+      last_match_date: null as string | null,
+    }));
+    if (isWin) { entry.wins++; if (eloChange > 0) entry.elo_gained += eloChange; }
+    else       { entry.losses++; if (eloChange < 0) entry.elo_lost += Math.abs(eloChange); }
+    entry.elo_sum   += eloChange;
+    entry.elo_count += 1;
+    entry.last_elo_against_me = opponentEloBefore;
+    entry.last_match_date     = matchDate;
+  };
+
+  const addMap = (
+    playerId: string, side: number, mapId: string,
+    isWin: boolean, eloChange: number
+  ) => {
+    const byPlayer = getOrInit(mapMap, playerId, () => new Map());
+    const bySide   = getOrInit(byPlayer, side,   () => new Map());
+    const entry    = getOrInit(bySide, mapId, () => ({ map_id: mapId, wins: 0, losses: 0, elo_sum: 0, elo_count: 0 }));
+    if (isWin) entry.wins++; else entry.losses++;
+    entry.elo_sum   += eloChange;
+    entry.elo_count += 1;
+  };
+
+  const addFaction = (
+    playerId: string, side: number,
+    factionId: string, opponentFactionId: string, isWin: boolean
+  ) => {
+    const byPlayer = getOrInit(factionMap, playerId, () => new Map());
+    const bySide   = getOrInit(byPlayer, side,       () => new Map());
+    const key      = `${factionId}|${opponentFactionId}`;
+    const entry    = getOrInit(bySide, key, () => ({ faction_id: factionId, opponent_faction_id: opponentFactionId, wins: 0, losses: 0 }));
+    if (isWin) entry.wins++; else entry.losses++;
+  };
+
+  // ── One-pass accumulation (matches must be sorted by created_at ASC) ─────
+  for (const row of matchRows) {
+    const winnerSide: number = row.winner_side ?? 1;
+    const loserSide:  number = winnerSide === 1 ? 2 : 1;
+
+    const winnerEloChange = (row.winner_elo_after  ?? 0) - (row.winner_elo_before ?? 0);
+    const loserEloChange  = (row.loser_elo_after   ?? 0) - (row.loser_elo_before  ?? 0);
+    const matchDate       = row.created_at
+      ? (row.created_at instanceof Date
+          ? row.created_at.toISOString().slice(0, 19).replace('T', ' ')
+          : String(row.created_at).slice(0, 19).replace('T', ' '))
+      : null;
+
+    // ── WINNER perspective ──────────────────────────────────────
+    if (!onlyPlayers || onlyPlayers.has(row.winner_id)) {
       for (const side of SIDES) {
         const sideFilter = side === 0 || side === winnerSide;
         if (!sideFilter) continue;
@@ -811,8 +824,10 @@ export async function recalculatePlayerMatchStatistics(): Promise<{ records_upda
         if (row.winner_faction_id && row.loser_faction_id)
           addFaction(row.winner_id, side, row.winner_faction_id, row.loser_faction_id, true);
       }
+    }
 
-      // ── LOSER perspective ───────────────────────────────────────
+    // ── LOSER perspective ───────────────────────────────────────
+    if (!onlyPlayers || onlyPlayers.has(row.loser_id)) {
       for (const side of SIDES) {
         const sideFilter = side === 0 || side === loserSide;
         if (!sideFilter) continue;
@@ -824,240 +839,699 @@ export async function recalculatePlayerMatchStatistics(): Promise<{ records_upda
           addFaction(row.loser_id, side, row.loser_faction_id, row.winner_faction_id, false);
       }
     }
+  }
 
-    // ── INSERT helpers ────────────────────────────────────────────────────────
-    let recordsUpdated = 0;
-
-    const insertBase = `INSERT INTO player_match_statistics
-      (id, player_id, opponent_id, map_id, faction_id, opponent_faction_id,
-       player_side, total_games, wins, losses, winrate, avg_elo_change)
-      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-
-    const insertOpponent = `INSERT INTO player_match_statistics
-      (id, player_id, opponent_id, map_id, faction_id, opponent_faction_id,
-       player_side, total_games, wins, losses, winrate, avg_elo_change,
-       elo_gained, elo_lost, last_elo_against_me, last_match_date)
-      VALUES (?, ?, ?, NULL, NULL, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`;
-
-    const wr = (w: number, total: number) => total > 0 ? Math.round((w / total) * 10000) / 100 : 0;
-    const avg = (sum: number, n: number) => n > 0 ? Math.round((sum / n) * 100) / 100 : 0;
+  // ── Row materialization ───────────────────────────────────────────────────
+  const rows: any[][] = [];
+  const wr = (w: number, total: number) => total > 0 ? Math.round((w / total) * 10000) / 100 : 0;
+  const avg = (sum: number, n: number) => n > 0 ? Math.round((sum / n) * 100) / 100 : 0;
+  const round2 = (n: number) => Math.round(n * 100) / 100;
+
+  // 1. Global stats
+  for (const [playerId, bySide] of globalMap) {
+    for (const [side, e] of bySide) {
+      const total = e.wins + e.losses;
+      rows.push([
+        randomUUID(), playerId, null, null, null, null,
+        side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count), round2(e.elo_sum),
+        0, 0, null, null
+      ]);
+    }
+  }
 
-    // 1. Global stats
-    for (const [playerId, bySide] of globalMap) {
-      for (const [side, e] of bySide) {
+  // 2. Per-opponent stats
+  for (const [playerId, bySide] of opponentMap) {
+    for (const [side, byOpponent] of bySide) {
+      for (const [opponentId, e] of byOpponent) {
         const total = e.wins + e.losses;
-        await query(insertBase, [
-          randomUUID(), playerId, null, null, null, null,
-          side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count)
+        rows.push([
+          randomUUID(), playerId, opponentId, null, null, null,
+          side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count), round2(e.elo_sum),
+          round2(e.elo_gained),
+          round2(e.elo_lost),
+          e.last_elo_against_me !== null ? round2(e.last_elo_against_me) : null,
+          e.last_match_date || null
         ]);
-        recordsUpdated++;
       }
     }
+  }
 
-    // 2. Per-opponent stats
-    for (const [playerId, bySide] of opponentMap) {
-      for (const [side, byOpponent] of bySide) {
-        for (const [opponentId, e] of byOpponent) {
-          const total = e.wins + e.losses;
-          await query(insertOpponent, [
-            randomUUID(), playerId, opponentId,
-            side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count),
-            Math.round(e.elo_gained * 100) / 100,
-            Math.round(e.elo_lost   * 100) / 100,
-            e.last_elo_against_me !== null ? Math.round(e.last_elo_against_me * 100) / 100 : null,
-            e.last_match_date || null
-          ]);
-          recordsUpdated++;
-        }
+  // 3. Per-map stats
+  for (const [playerId, bySide] of mapMap) {
+    for (const [side, byMap] of bySide) {
+      for (const [mapId, e] of byMap) {
+        const total = e.wins + e.losses;
+        rows.push([
+          randomUUID(), playerId, null, mapId, null, null,
+          side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count), round2(e.elo_sum),
+          0, 0, null, null
+        ]);
       }
     }
+  }
 
-    // 3. Per-map stats
-    for (const [playerId, bySide] of mapMap) {
-      for (const [side, byMap] of bySide) {
-        for (const [mapId, e] of byMap) {
-          const total = e.wins + e.losses;
-          await query(insertBase, [
-            randomUUID(), playerId, null, mapId, null, null,
-            side, total, e.wins, e.losses, wr(e.wins, total), avg(e.elo_sum, e.elo_count)
-          ]);
-          recordsUpdated++;
-        }
+  // 4. Per-faction stats
+  for (const [playerId, bySide] of factionMap) {
+    for (const [side, byFaction] of bySide) {
+      for (const e of byFaction.values()) {
+        const total = e.wins + e.losses;
+        rows.push([
+          randomUUID(), playerId, null, null, e.faction_id, e.opponent_faction_id,
+          side, total, e.wins, e.losses, wr(e.wins, total), 0, 0,
+          0, 0, null, null
+        ]);
       }
     }
+  }
 
-    // 4. Per-faction stats
-    for (const [playerId, bySide] of factionMap) {
-      for (const [side, byFaction] of bySide) {
-        for (const e of byFaction.values()) {
-          const total = e.wins + e.losses;
-          await query(insertBase, [
-            randomUUID(), playerId, null, null, e.faction_id, e.opponent_faction_id,
-            side, total, e.wins, e.losses, wr(e.wins, total), 0
-          ]);
-          recordsUpdated++;
-        }
-      }
+  return rows;
+}
+
+/**
+ * Insert prebuilt player_match_statistics rows into a table with batched multi-row INSERTs
+ */
+async function insertPlayerMatchStatisticsRows(
+  connection: PoolConnection,
+  tableName: string,
+  rows: any[][]
+): Promise<void> {
+  for (let offset = 0; offset < rows.length; offset += PLAYER_STATS_BATCH_SIZE) {
+    await connection.query(
+      `INSERT INTO ${tableName} ${PLAYER_STATS_INSERT_COLUMNS} VALUES ?`,
+      [rows.slice(offset, offset + PLAYER_STATS_BATCH_SIZE)]
+    );
+  }
+}
+
+/**
+ * Recompute the rows of a set of players in a player_match_statistics table from the current matches
+ */
+async function replacePlayerMatchStatisticsRows(
+  connection: PoolConnection,
+  tableName: string,
+  players: string[]
+): Promise<number> {
+  if (players.length === 0) return 0;
+
+  const [matchRows] = await connection.query<any>(
+    `SELECT ${PLAYER_STATS_MATCH_COLUMNS}
+     WHERE m.status != 'cancelled'
+       AND (m.winner_id IN (?) OR m.loser_id IN (?))
+     ORDER BY m.created_at ASC`,
+    [players, players]
+  );
+
+  const rows = buildPlayerMatchStatisticsRows(matchRows, new Set(players));
+
+  await connection.query(`DELETE FROM ${tableName} WHERE player_id IN (?)`, [players]);
+  await insertPlayerMatchStatisticsRows(connection, tableName, rows);
+  return rows.length;
+}
+
+/**
+ * Recompute the shadow rows of players whose statistics changed since the rebuild log entry afterId
+ * Returns the log id to continue from.
+ */
+async function catchUpPlayerMatchStatisticsShadow(afterId: number): Promise<number> {
+  let lastId = afterId;
+  for (;;) {
+    const batch = await readRebuildLog('player_match_statistics', lastId);
+    if (batch.keys.length === 0) {
+      return lastId;
     }
+    lastId = batch.lastId;
+    await withTransaction(connection =>
+      replacePlayerMatchStatisticsRows(connection, 'player_match_statistics_shadow', batch.keys)
+    );
+  }
+}
 
-    return { records_updated: recordsUpdated };
+/**
+ * Full rebuild of player match statistics (offline verification mode)
+ * Builds every row from all non-cancelled matches into player_match_statistics_shadow,
+ * reports how many live rows had drifted from the rebuilt values, and swaps the shadow
+ * table in with a single atomic RENAME TABLE, so readers never see an empty table.
+ * Players touched by per-match deltas while the rebuild runs (on any instance) are
+ * recomputed in the shadow table before the drift check and the swap.
+ * Day-to-day maintenance is incremental (applyMatchToPlayerMatchStatistics /
+ * refreshPlayerMatchStatistics); this only corrects drift.
+ * An aborted signal (lost job lease) stops the rebuild before the swap.
+ */
+export async function recalculatePlayerMatchStatistics(
+  signal?: AbortSignal
+): Promise<{ records_updated: number; records_drifted: number }> {
+  try {
+    // Start capturing deltas before the snapshot is read
+    await beginStatisticsRebuild('player_match_statistics');
+  } catch (error) {
+    console.error('Error recalculating player match statistics:', error);
+    throw error;
+  }
+
+  try {
+    const matchesResult = await query(
+      `SELECT ${PLAYER_STATS_MATCH_COLUMNS}
+       WHERE m.status != 'cancelled'
+       ORDER BY m.created_at ASC`
+    );
+
+    const rows = buildPlayerMatchStatisticsRows(matchesResult.rows);
+
+    await query('DROP TABLE IF EXISTS player_match_statistics_shadow');
+    await query('CREATE TABLE player_match_statistics_shadow LIKE player_match_statistics');
+
+    await withTransaction(connection =>
+      insertPlayerMatchStatisticsRows(connection, 'player_match_statistics_shadow', rows)
+    );
+
+    // Catch up without holding writers back, then once more with them held back for the swap
+    const caughtUpTo = await catchUpPlayerMatchStatisticsShadow(0);
+    signal?.throwIfAborted();
+
+    const drifted = await withSwapLock('player_match_statistics', async () => {
+      await catchUpPlayerMatchStatisticsShadow(caughtUpTo);
+      signal?.throwIfAborted();
+
+      // Verification: live rows missing from the rebuild or with different counters
+      const driftResult = await query(
+        `SELECT COUNT(*) AS drifted
+         FROM player_match_statistics live
+         LEFT JOIN player_match_statistics_shadow fresh ON fresh.stat_key = live.stat_key
+         WHERE fresh.id IS NULL
+            OR fresh.total_games != live.total_games
+            OR fresh.wins != live.wins
+            OR fresh.losses != live.losses`
+      );
+      const driftedRows = Number(driftResult.rows[0]?.drifted || 0);
+      if (driftedRows > 0) {
+        console.warn(`⚠️  [STATS] player_match_statistics had ${driftedRows} drifted rows, replacing with rebuilt table`);
+      }
+
+      // Atomic swap: readers see either the old or the new table, never a partial one
+      await query('DROP TABLE IF EXISTS player_match_statistics_old');
+      await query(
+        `RENAME TABLE player_match_statistics TO player_match_statistics_old,
+                      player_match_statistics_shadow TO player_match_statistics`
+      );
+      return driftedRows;
+    });
+    await query('DROP TABLE IF EXISTS player_match_statistics_old');
+
+    return { records_updated: rows.length, records_drifted: drifted };
   } catch (error) {
     console.error('Error recalculating player match statistics:', error);
     throw error;
+  } finally {
+    await endStatisticsRebuild('player_match_statistics').catch(error =>
+      console.error('Error ending player match statistics rebuild:', error)
+    );
   }
 }
 
 /**
- * Recalculate all faction/map statistics
+ * Apply a newly created match to player_match_statistics (per-match delta)
+ * Upserts only the rows the match touches: global, per-opponent, per-map and per-faction
+ * rows of both players, for side 0 (all sides) and the side each player actually played.
  */
-export async function recalculateFactionMapStatistics(): Promise<{ records_updated: number }> {
+export async function applyMatchToPlayerMatchStatistics(matchId: string): Promise<void> {
+  try {
+    const matchResult = await query(
+      `SELECT ${PLAYER_STATS_MATCH_COLUMNS}
+       WHERE m.id = ? AND m.status != 'cancelled'`,
+      [matchId]
+    );
+    if (matchResult.rows.length === 0) return;
+
+    const rows = buildPlayerMatchStatisticsRows(matchResult.rows);
+
+    // Rows built from a single match are exactly the deltas to add
+    await withRebuildCapture('player_match_statistics', async (connection, capture) => {
+      for (let offset = 0; offset < rows.length; offset += PLAYER_STATS_BATCH_SIZE) {
+        await connection.query(
+          `INSERT INTO player_match_statistics ${PLAYER_STATS_INSERT_COLUMNS}
+           VALUES ?
+           ON DUPLICATE KEY UPDATE
+             total_games = total_games + VALUES(total_games),
+             wins = wins + VALUES(wins),
+             losses = losses + VALUES(losses),
+             elo_change_sum = elo_change_sum + VALUES(elo_change_sum),
+             elo_gained = elo_gained + VALUES(elo_gained),
+             elo_lost = elo_lost + VALUES(elo_lost),
+             winrate = IF(total_games > 0, ROUND(wins / total_games * 100, 2), 0),
+             avg_elo_change = IF(faction_id IS NULL AND total_games > 0, ROUND(elo_change_sum / total_games, 2), 0),
+             last_elo_against_me = IF(VALUES(last_match_date) IS NOT NULL
+                                      AND (last_match_date IS NULL OR VALUES(last_match_date) >= last_match_date),
+                                      VALUES(last_elo_against_me), last_elo_against_me),
+             last_match_date = IF(VALUES(last_match_date) IS NOT NULL
+                                  AND (last_match_date IS NULL OR VALUES(last_match_date) >= last_match_date),
+                                  VALUES(last_match_date), last_match_date)`,
+          [rows.slice(offset, offset + PLAYER_STATS_BATCH_SIZE)]
+        );
+      }
+      await capture([matchResult.rows[0].winner_id, matchResult.rows[0].loser_id]);
+    });
+  } catch (error) {
+    console.error('Error applying match to player match statistics:', error);
+    throw error;
+  }
+}
+
+/**
+ * Rebuild player_match_statistics rows for a set of players only
+ * Used after a match is cancelled: the cancellation (and the ELO replay it triggers)
+ * changes counters and ELO averages of the players involved, and of nobody else.
+ */
+export async function refreshPlayerMatchStatistics(playerIds: string[]): Promise<{ records_updated: number }> {
+  const players = Array.from(new Set(playerIds.filter(Boolean)));
+  if (players.length === 0) return { records_updated: 0 };
+
   try {
-    await query('TRUNCATE TABLE faction_map_statistics');
+    const recordsUpdated = await withRebuildCapture('player_match_statistics', async (connection, capture) => {
+      const count = await replacePlayerMatchStatisticsRows(connection, 'player_match_statistics', players);
+      await capture(players);
+      return count;
+    });
 
-    // Fetch each non-cancelled match once, resolving map and faction IDs via JOIN.
-    // winner_side is now stored on every match (1 = winner played side 1, 2 = side 2).
-    // We process each row twice in JS (winner perspective + loser perspective) instead of
-    // using a UNION ALL, which avoids SQL aggregation returning mixed types (COUNT→number,
-    // SUM→string) that caused JS string-concatenation bugs.
-    const matchesResult = await query(
-      `SELECT
+    return { records_updated: recordsUpdated };
+  } catch (error) {
+    console.error('Error refreshing player match statistics:', error);
+    throw error;
+  }
+}
+
+// ----------------------------------------------------------------------------
+// Faction/map statistics (maintained aggregate)
+// ----------------------------------------------------------------------------
+
+const FACTION_MAP_STATS_BATCH_SIZE = 500;
+// Concurrent callers on this instance share one rebuild
+let factionMapRebuild: Promise<{ records_updated: number }> | null = null;
+
+// Source rows of the faction/map aggregates (map and faction IDs resolved by JOIN)
+const FACTION_MAP_MATCH_COLUMNS = `
          gm.id  AS map_id,
          f_w.id AS winner_faction_id,
          f_l.id AS loser_faction_id,
-         m.winner_side
+         m.winner_side,
+         DATE_FORMAT(m.created_at, '%Y-%m-%d') AS match_date
        FROM matches m
        JOIN game_maps gm ON gm.name = m.map
        JOIN factions f_w ON f_w.name = m.winner_faction
-       JOIN factions f_l ON f_l.name = m.loser_faction
-       WHERE m.status != 'cancelled'`
-    );
+       JOIN factions f_l ON f_l.name = m.loser_faction`;
 
-    type Entry = {
-      map_id: string;
-      faction_id: string;
-      opponent_faction_id: string;
-      faction_side: number;
-      total_games: number;
-      wins: number;
-      losses: number;
-    };
+/**
+ * Resolve map and faction names to ids from the in-memory asset catalog
+ * A miss reloads the catalog (the map or faction may have been created since the last load).
+ */
+async function resolveFactionMapIds(
+  map: string,
+  winnerFaction: string,
+  loserFaction: string
+): Promise<{ mapId: string; winnerFactionId: string; loserFactionId: string } | null> {
+  const ids = await resolveAssetIds(map, [winnerFaction, loserFaction]);
+  if (!ids) {
+    return null;
+  }
+  return { mapId: ids.mapId, winnerFactionId: ids.factionIds[0], loserFactionId: ids.factionIds[1] };
+}
+
+/**
+ * Sides of both perspectives of a match (same convention as the full rebuild):
+ * an unknown winner_side counts as side 1 for the winner
+ */
+function factionMapSides(winnerSide: number | null | undefined): { winnerFactionSide: number; loserFactionSide: number } {
+  const winnerFactionSide: number = winnerSide ?? 1;
+  const loserFactionSide: number = winnerFactionSide === 1 ? 2 : winnerFactionSide === 2 ? 1 : 0;
+  return { winnerFactionSide, loserFactionSide };
+}
 
-    const aggregated = new Map<string, Entry>();
-
-    const addEntry = (
-      map_id: string,
-      faction_id: string,
-      opponent_faction_id: string,
-      faction_side: number,
-      isWin: boolean
-    ) => {
-      const key = `${map_id}|${faction_id}|${opponent_faction_id}|${faction_side}`;
-      const entry = aggregated.get(key);
-      if (entry) {
-        entry.total_games++;
-        if (isWin) entry.wins++;
-        else entry.losses++;
+/**
+ * Rebuild log key of a map and faction pair (both orders of the pair share a key)
+ */
+function factionMapLogKey(mapId: string, factionA: string, factionB: string): string {
+  const [first, second] = [factionA, factionB].sort();
+  return `${mapId}|${first}|${second}`;
+}
+
+/**
+ * Aggregate matches into faction_map_statistics rows and faction_map_daily_statistics buckets
+ * Each row is processed twice in JS (winner perspective + loser perspective) instead of
+ * using a UNION ALL, which avoids SQL aggregation returning mixed types (COUNT→number,
+ * SUM→string) that caused JS string-concatenation bugs.
+ */
+function aggregateFactionMapMatches(matchRows: any[]): { rows: any[][]; dailyRows: any[][] } {
+  type Entry = {
+    map_id: string;
+    faction_id: string;
+    opponent_faction_id: string;
+    faction_side: number;
+    total_games: number;
+    wins: number;
+    losses: number;
+  };
+
+  const aggregated = new Map<string, Entry>();
+  // Day buckets: key → [map_id, faction_id, opponent_faction_id, faction_side, bucket_date, games, wins]
+  const daily = new Map<string, [string, string, string, number, string, number, number]>();
+
+  const addEntry = (
+    map_id: string,
+    faction_id: string,
+    opponent_faction_id: string,
+    faction_side: number,
+    isWin: boolean,
+    matchDate: string | null
+  ) => {
+    if (matchDate) {
+      const dayKey = `${map_id}|${faction_id}|${opponent_faction_id}|${faction_side}|${matchDate}`;
+      const bucket = daily.get(dayKey);
+      if (bucket) {
+        bucket[5]++;
+        if (isWin) bucket[6]++;
       } else {
-        aggregated.set(key, {
-          map_id,
-          faction_id,
-          opponent_faction_id,
-          faction_side,
-          total_games: 1,
-          wins: isWin ? 1 : 0,
-          losses: isWin ? 0 : 1
-        });
+        daily.set(dayKey, [map_id, faction_id, opponent_faction_id, faction_side, matchDate, 1, isWin ? 1 : 0]);
       }
-    };
+    }
+
+    const key = `${map_id}|${faction_id}|${opponent_faction_id}|${faction_side}`;
+    const entry = aggregated.get(key);
+    if (entry) {
+      entry.total_games++;
+      if (isWin) entry.wins++;
+      else entry.losses++;
+    } else {
+      aggregated.set(key, {
+        map_id,
+        faction_id,
+        opponent_faction_id,
+        faction_side,
+        total_games: 1,
+        wins: isWin ? 1 : 0,
+        losses: isWin ? 0 : 1
+      });
+    }
+  };
+
+  for (const row of matchRows) {
+    // If winner_side is unknown (NULL), assume side 1 for the winner (convention for
+    // historical matches where side was not recorded).
+    const { winnerFactionSide, loserFactionSide } = factionMapSides(row.winner_side);
+
+    // Winner perspective: faction that won, playing as winnerSide
+    addEntry(row.map_id, row.winner_faction_id, row.loser_faction_id, winnerFactionSide, true, row.match_date);
+    // Loser perspective: faction that lost, playing as loserSide
+    addEntry(row.map_id, row.loser_faction_id, row.winner_faction_id, loserFactionSide, false, row.match_date);
+  }
+
+  const rows = Array.from(aggregated.values()).map(stats => [
+    randomUUID(), stats.map_id, stats.faction_id, stats.opponent_faction_id, stats.faction_side,
+    stats.total_games, stats.wins, stats.losses,
+    Math.round((stats.wins / stats.total_games) * 100 * 100) / 100
+  ]);
 
-    for (const row of matchesResult.rows) {
-      // If winner_side is unknown (NULL), assume side 1 for the winner (convention for
-      // historical matches where side was not recorded).
-      const winnerSide: number = row.winner_side ?? 1;
-      const loserSide: number  = winnerSide === 1 ? 2 : winnerSide === 2 ? 1 : 0;
+  return { rows, dailyRows: Array.from(daily.values()) };
+}
 
-      // Winner perspective: faction that won, playing as winnerSide
-      addEntry(row.map_id, row.winner_faction_id, row.loser_faction_id, winnerSide, true);
-      // Loser perspective: faction that lost, playing as loserSide
-      addEntry(row.map_id, row.loser_faction_id, row.winner_faction_id, loserSide, false);
+/**
+ * Insert aggregated rows into a faction_map_statistics / faction_map_daily_statistics table pair
+ */
+async function insertFactionMapRows(
+  connection: PoolConnection,
+  tableName: string,
+  dailyTableName: string,
+  aggregate: { rows: any[][]; dailyRows: any[][] }
+): Promise<void> {
+  for (let offset = 0; offset < aggregate.rows.length; offset += FACTION_MAP_STATS_BATCH_SIZE) {
+    await connection.query(
+      `INSERT INTO ${tableName}
+       (id, map_id, faction_id, opponent_faction_id, faction_side, total_games, wins, losses, winrate)
+       VALUES ?`,
+      [aggregate.rows.slice(offset, offset + FACTION_MAP_STATS_BATCH_SIZE)]
+    );
+  }
+  for (let offset = 0; offset < aggregate.dailyRows.length; offset += FACTION_MAP_STATS_BATCH_SIZE) {
+    await connection.query(
+      `INSERT INTO ${dailyTableName}
+       (map_id, faction_id, opponent_faction_id, faction_side, bucket_date, games, wins)
+       VALUES ?`,
+      [aggregate.dailyRows.slice(offset, offset + FACTION_MAP_STATS_BATCH_SIZE)]
+    );
+  }
+}
+
+/**
+ * Recompute the shadow rows of the map/faction pairs whose statistics changed since the
+ * rebuild log entry afterId, from the current matches
+ * Returns the log id to continue from.
+ */
+async function catchUpFactionMapStatisticsShadow(afterId: number): Promise<number> {
+  let lastId = afterId;
+  for (;;) {
+    const batch = await readRebuildLog('faction_map_statistics', lastId);
+    if (batch.keys.length === 0) {
+      return lastId;
     }
+    lastId = batch.lastId;
+
+    await withTransaction(async (connection) => {
+      for (const key of batch.keys) {
+        const [mapId, factionA, factionB] = key.split('|');
+        const [matchRows] = await connection.query<any>(
+          `SELECT ${FACTION_MAP_MATCH_COLUMNS}
+           WHERE m.status != 'cancelled'
+             AND gm.id = ? AND f_w.id IN (?, ?) AND f_l.id IN (?, ?)`,
+          [mapId, factionA, factionB, factionA, factionB]
+        );
+        for (const tableName of ['faction_map_statistics_shadow', 'faction_map_daily_statistics_shadow']) {
+          await connection.query(
+            `DELETE FROM ${tableName}
+             WHERE map_id = ? AND faction_id IN (?, ?) AND opponent_faction_id IN (?, ?)`,
+            [mapId, factionA, factionB, factionA, factionB]
+          );
+        }
+        await insertFactionMapRows(
+          connection,
+          'faction_map_statistics_shadow',
+          'faction_map_daily_statistics_shadow',
+          aggregateFactionMapMatches(matchRows)
+        );
+      }
+    });
+  }
+}
 
-    const { randomUUID } = await import('crypto');
-    let recordsInserted = 0;
+/**
+ * Apply a ±1 delta (winner and loser perspective) to faction_map_statistics
+ */
+async function applyFactionMapDelta(
+  connection: PoolConnection,
+  ids: { mapId: string; winnerFactionId: string; loserFactionId: string },
+  winnerSide: number | null | undefined,
+  delta: 1 | -1
+): Promise<void> {
+  const { winnerFactionSide, loserFactionSide } = factionMapSides(winnerSide);
+
+  if (delta === 1) {
+    // One statement for both perspectives (requires UNIQUE KEY on map_id+faction_id+opponent_faction_id+faction_side).
+    // SET assignments are evaluated left to right, so winrate sees the updated counters.
+    await connection.query(
+      `INSERT INTO faction_map_statistics
+       (id, map_id, faction_id, opponent_faction_id, faction_side, total_games, wins, losses, winrate)
+       VALUES (?, ?, ?, ?, ?, 1, 1, 0, 100.00),
+              (?, ?, ?, ?, ?, 1, 0, 1, 0.00)
+       ON DUPLICATE KEY UPDATE
+         total_games = total_games + 1,
+         wins = wins + VALUES(wins),
+         losses = losses + VALUES(losses),
+         winrate = ROUND(100.0 * wins / total_games, 2)`,
+      [randomUUID(), ids.mapId, ids.winnerFactionId, ids.loserFactionId, winnerFactionSide,
+       randomUUID(), ids.mapId, ids.loserFactionId, ids.winnerFactionId, loserFactionSide]
+    );
+    return;
+  }
+
+  const perspectives: Array<[string, string, number, number]> = [
+    [ids.winnerFactionId, ids.loserFactionId, winnerFactionSide, 1],
+    [ids.loserFactionId, ids.winnerFactionId, loserFactionSide, 0]
+  ];
+  for (const [factionId, opponentFactionId, side, isWin] of perspectives) {
+    await connection.query(
+      `UPDATE faction_map_statistics
+       SET total_games = total_games - 1,
+           wins = wins - ?,
+           losses = losses - ?,
+           winrate = IF(total_games > 0, ROUND(100.0 * wins / total_games, 2), 0)
+       WHERE map_id = ? AND faction_id = ? AND opponent_faction_id = ? AND faction_side = ?
+         AND total_games > 0`,
+      [isWin, 1 - isWin, ids.mapId, factionId, opponentFactionId, side]
+    );
+  }
+  // The full rebuild never stores empty combinations
+  await connection.query(
+    `DELETE FROM faction_map_statistics
+     WHERE map_id = ? AND faction_id IN (?, ?) AND opponent_faction_id IN (?, ?) AND total_games <= 0`,
+    [ids.mapId, ids.winnerFactionId, ids.loserFactionId, ids.winnerFactionId, ids.loserFactionId]
+  );
+}
+
+/**
+ * Apply a ±1 delta (winner and loser perspective) to the day bucket of a match in
+ * faction_map_daily_statistics; matchDate defaults to today
+ */
+async function applyFactionMapDailyDelta(
+  connection: PoolConnection,
+  ids: { mapId: string; winnerFactionId: string; loserFactionId: string },
+  winnerSide: number | null | undefined,
+  delta: 1 | -1,
+  matchDate?: Date | string | null
+): Promise<void> {
+  const { winnerFactionSide, loserFactionSide } = factionMapSides(winnerSide);
+  const day = matchDate ?? null;
+
+  if (delta === 1) {
+    await connection.query(
+      `INSERT INTO faction_map_daily_statistics
+       (map_id, faction_id, opponent_faction_id, faction_side, bucket_date, games, wins)
+       VALUES (?, ?, ?, ?, COALESCE(DATE(?), CURDATE()), 1, 1),
+              (?, ?, ?, ?, COALESCE(DATE(?), CURDATE()), 1, 0)
+       ON DUPLICATE KEY UPDATE
+         games = games + VALUES(games),
+         wins = wins + VALUES(wins)`,
+      [ids.mapId, ids.winnerFactionId, ids.loserFactionId, winnerFactionSide, day,
+       ids.mapId, ids.loserFactionId, ids.winnerFactionId, loserFactionSide, day]
+    );
+    return;
+  }
+
+  // Never create or underflow a bucket: only decrement buckets that still hold games
+  const perspectives: Array<[string, string, number, number]> = [
+    [ids.winnerFactionId, ids.loserFactionId, winnerFactionSide, 1],
+    [ids.loserFactionId, ids.winnerFactionId, loserFactionSide, 0]
+  ];
+  for (const [factionId, opponentFactionId, side, isWin] of perspectives) {
+    await connection.query(
+      `UPDATE faction_map_daily_statistics
+       SET games = games - 1,
+           wins = GREATEST(wins - ?, 0)
+       WHERE map_id = ? AND faction_id = ? AND opponent_faction_id = ? AND faction_side = ?
+         AND bucket_date = COALESCE(DATE(?), CURDATE())
+         AND games > 0`,
+      [isWin, ids.mapId, factionId, opponentFactionId, side, day]
+    );
+  }
+  // Empty buckets are not kept (the rebuild never stores them either)
+  await connection.query(
+    `DELETE FROM faction_map_daily_statistics
+     WHERE map_id = ? AND faction_id IN (?, ?) AND opponent_faction_id IN (?, ?)
+       AND bucket_date = COALESCE(DATE(?), CURDATE())
+       AND games <= 0`,
+    [ids.mapId, ids.winnerFactionId, ids.loserFactionId, ids.winnerFactionId, ids.loserFactionId, day]
+  );
+}
 
-    for (const stats of aggregated.values()) {
-      const winrate = stats.total_games > 0 ? (stats.wins / stats.total_games) * 100 : 0;
+/**
+ * Full rebuild of faction/map statistics
+ * Aggregates every non-cancelled match in memory, bulk-loads the result into
+ * faction_map_statistics_shadow and swaps it in with one atomic RENAME TABLE, so the
+ * balance endpoints never read an empty or half-built table. The daily buckets
+ * (faction_map_daily_statistics) are rebuilt and swapped in the same way.
+ * Deltas written while the rebuild runs (on any instance) are captured from before the
+ * snapshot read and their map/faction pairs recomputed in the shadow tables before the swap.
+ * Concurrent callers on this instance share the same rebuild; a rebuild already running on
+ * another instance makes this one fail with StatisticsRebuildInProgressError.
+ */
+export async function recalculateFactionMapStatistics(): Promise<{ records_updated: number }> {
+  if (!factionMapRebuild) {
+    factionMapRebuild = rebuildFactionMapStatistics().finally(() => {
+      factionMapRebuild = null;
+    });
+  }
+  return factionMapRebuild;
+}
 
+async function rebuildFactionMapStatistics(): Promise<{ records_updated: number }> {
+  try {
+    // Start capturing deltas before the snapshot is read
+    await beginStatisticsRebuild('faction_map_statistics');
+  } catch (error) {
+    console.error('Error recalculating faction/map statistics:', error);
+    throw error;
+  }
+
+  try {
+    // Fetch each non-cancelled match once, resolving map and faction IDs via JOIN.
+    // winner_side is now stored on every match (1 = winner played side 1, 2 = side 2).
+    const matchesResult = await query(
+      `SELECT ${FACTION_MAP_MATCH_COLUMNS}
+       WHERE m.status != 'cancelled'`
+    );
+
+    const aggregate = aggregateFactionMapMatches(matchesResult.rows);
+
+    await query('DROP TABLE IF EXISTS faction_map_statistics_shadow');
+    await query('CREATE TABLE faction_map_statistics_shadow LIKE faction_map_statistics');
+    await query('DROP TABLE IF EXISTS faction_map_daily_statistics_shadow');
+    await query('CREATE TABLE faction_map_daily_statistics_shadow LIKE faction_map_daily_statistics');
+
+    await withTransaction(connection =>
+      insertFactionMapRows(connection, 'faction_map_statistics_shadow', 'faction_map_daily_statistics_shadow', aggregate)
+    );
+
+    // Catch up with matches confirmed/cancelled during the rebuild without holding writers back,
+    // then once more with them held back, and swap atomically
+    const caughtUpTo = await catchUpFactionMapStatisticsShadow(0);
+
+    await withSwapLock('faction_map_statistics', async () => {
+      await catchUpFactionMapStatisticsShadow(caughtUpTo);
+
+      await query('DROP TABLE IF EXISTS faction_map_statistics_old');
+      await query('DROP TABLE IF EXISTS faction_map_daily_statistics_old');
       await query(
-        `INSERT INTO faction_map_statistics
-         (id, map_id, faction_id, opponent_faction_id, faction_side, total_games, wins, losses, winrate)
-         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-        [randomUUID(), stats.map_id, stats.faction_id, stats.opponent_faction_id, stats.faction_side,
-         stats.total_games, stats.wins, stats.losses, Math.round(winrate * 100) / 100]
+        `RENAME TABLE faction_map_statistics TO faction_map_statistics_old,
+                      faction_map_statistics_shadow TO faction_map_statistics,
+                      faction_map_daily_statistics TO faction_map_daily_statistics_old,
+                      faction_map_daily_statistics_shadow TO faction_map_daily_statistics`
       );
-      recordsInserted++;
-    }
+    });
+    await query('DROP TABLE IF EXISTS faction_map_statistics_old');
+    await query('DROP TABLE IF EXISTS faction_map_daily_statistics_old');
 
-    return { records_updated: recordsInserted };
+    return { records_updated: aggregate.rows.length };
   } catch (error) {
     console.error('Error recalculating faction/map statistics:', error);
     throw error;
+  } finally {
+    await endStatisticsRebuild('faction_map_statistics').catch(error =>
+      console.error('Error ending faction/map statistics rebuild:', error)
+    );
   }
 }
 
 /**
- * Update faction/map statistics for a single match
+ * Apply a single match to faction/map statistics and its daily bucket
+ * delta = 1 when the match is confirmed/created, -1 when a counted match is cancelled
+ * (pass the match's created_at as matchDate so the right day is decremented).
+ * Map and faction names are resolved through the in-memory id cache.
  */
 export async function updateFactionMapStatistics(
   map: string,
   winnerFaction: string,
   loserFaction: string,
-  winnerSideNumber?: number | null
+  winnerSideNumber?: number | null,
+  delta: 1 | -1 = 1,
+  matchDate?: Date | string | null
 ): Promise<boolean> {
   try {
-    // Import randomUUID for ID generation
-    const { randomUUID } = await import('crypto');
-    
-    // Get map and faction IDs
-    const mapResult = await query('SELECT id FROM game_maps WHERE name = ?', [map]);
-    const winnerFactionResult = await query('SELECT id FROM factions WHERE name = ?', [winnerFaction]);
-    const loserFactionResult = await query('SELECT id FROM factions WHERE name = ?', [loserFaction]);
-
-    if (mapResult.rows.length === 0 || winnerFactionResult.rows.length === 0 || loserFactionResult.rows.length === 0) {
+    const ids = await resolveFactionMapIds(map, winnerFaction, loserFaction);
+    if (!ids) {
       return false;
     }
 
-    const mapId = mapResult.rows[0].id;
-    const winnerFactionId = winnerFactionResult.rows[0].id;
-    const loserFactionId = loserFactionResult.rows[0].id;
-
-    // faction_side: 0 = unknown, 1 = side 1, 2 = side 2
-    const winnerFactionSide = winnerSideNumber ?? 0;
-    const loserFactionSide = winnerSideNumber === 1 ? 2 : winnerSideNumber === 2 ? 1 : 0;
-
-    // Update winner stats using ON DUPLICATE KEY UPDATE (requires UNIQUE KEY on map_id+faction_id+opponent_faction_id+faction_side)
-    await query(
-      `INSERT INTO faction_map_statistics
-       (id, map_id, faction_id, opponent_faction_id, faction_side, total_games, wins, losses, winrate)
-       VALUES (?, ?, ?, ?, ?, 1, 1, 0, 100.00)
-       ON DUPLICATE KEY UPDATE
-         total_games = total_games + 1,
-         wins = wins + 1,
-         winrate = ROUND(100.0 * (wins + 1) / (total_games + 1), 2)`,
-      [randomUUID(), mapId, winnerFactionId, loserFactionId, winnerFactionSide]
-    );
-
-    // Update loser stats using ON DUPLICATE KEY UPDATE
-    await query(
-      `INSERT INTO faction_map_statistics
-       (id, map_id, faction_id, opponent_faction_id, faction_side, total_games, wins, losses, winrate)
-       VALUES (?, ?, ?, ?, ?, 1, 0, 1, 0.00)
-       ON DUPLICATE KEY UPDATE
-         total_games = total_games + 1,
-         losses = losses + 1,
-         winrate = ROUND(100.0 * wins / (total_games + 1), 2)`,
-      [randomUUID(), mapId, loserFactionId, winnerFactionId, loserFactionSide]
-    );
+    await withRebuildCapture('faction_map_statistics', async (connection, capture) => {
+      await applyFactionMapDelta(connection, ids, winnerSideNumber, delta);
+      await applyFactionMapDailyDelta(connection, ids, winnerSideNumber, delta, matchDate);
+      await capture([factionMapLogKey(ids.mapId, ids.winnerFactionId, ids.loserFactionId)]);
+    });
 
     return true;
   } catch (error) {
@@ -1394,9 +1868,111 @@ export async function createBalanceEventAfterSnapshot(
 }
 
 /**
- * Get balance event impact computed directly from matches.
+ * Before/after sums of the daily faction/map buckets for every matchup, split at splitDate
+ * ('YYYY-MM-DD'); fromDate/toDate optionally bound the before and after windows.
+ * Each match contributes a winner and a loser perspective, like recalculateFactionMapStatistics.
+ */
+async function sumFactionMapWindows(
+  splitDate: string,
+  fromDate: string | null = null,
+  toDate: string | null = null
+): Promise<BalanceEventImpact[]> {
+  const conditions: string[] = [];
+  const params: any[] = [splitDate];
+  if (fromDate) {
+    conditions.push('d.bucket_date >= ?');
+    params.push(fromDate);
+  }
+  if (toDate) {
+    conditions.push('d.bucket_date < ?');
+    params.push(toDate);
+  }
+
+  const result = await query(
+    `SELECT t.*, gm.name AS map_name, f1.name AS faction_name, f2.name AS opponent_faction_name
+     FROM (
+       SELECT d.map_id, d.faction_id, d.opponent_faction_id, d.faction_side,
+              d.bucket_date >= ? AS is_after,
+              SUM(d.games) AS games, SUM(d.wins) AS wins
+       FROM faction_map_daily_statistics d
+       ${conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : ''}
+       GROUP BY d.map_id, d.faction_id, d.opponent_faction_id, d.faction_side, is_after
+     ) t
+     JOIN game_maps gm ON gm.id = t.map_id
+     JOIN factions f1 ON f1.id = t.faction_id
+     JOIN factions f2 ON f2.id = t.opponent_faction_id`,
+    params
+  );
+
+  type Window = { games: number; wins: number; s1_games: number; s1_wins: number; s2_games: number; s2_wins: number };
+  type Entry = {
+    map_id: string; map_name: string;
+    faction_id: string; faction_name: string;
+    opponent_faction_id: string; opponent_faction_name: string;
+    before: Window; after: Window;
+  };
+  const emptyWindow = (): Window => ({ games: 0, wins: 0, s1_games: 0, s1_wins: 0, s2_games: 0, s2_wins: 0 });
+
+  const aggregated = new Map<string, Entry>();
+  for (const row of result.rows) {
+    const key = `${row.map_id}|${row.faction_id}|${row.opponent_faction_id}`;
+    let entry = aggregated.get(key);
+    if (!entry) {
+      entry = {
+        map_id: row.map_id, map_name: row.map_name,
+        faction_id: row.faction_id, faction_name: row.faction_name,
+        opponent_faction_id: row.opponent_faction_id, opponent_faction_name: row.opponent_faction_name,
+        before: emptyWindow(), after: emptyWindow(),
+      };
+      aggregated.set(key, entry);
+    }
+    const window = Number(row.is_after) ? entry.after : entry.before;
+    const games = Number(row.games) || 0;
+    const wins = Number(row.wins) || 0;
+    const side = Number(row.faction_side);
+    window.games += games;
+    window.wins += wins;
+    if (side === 1) { window.s1_games += games; window.s1_wins += wins; }
+    if (side === 2) { window.s2_games += games; window.s2_wins += wins; }
+  }
+
+  const wr = (wins: number, games: number) =>
+    games > 0 ? Math.round((wins / games) * 10000) / 100 : null;
+
+  return Array.from(aggregated.values())
+    .filter(entry => entry.before.games > 0 || entry.after.games > 0)
+    .map(({ before, after, ...entry }) => ({
+      ...entry,
+      games_before: before.games,
+      wins_before: before.wins,
+      losses_before: before.games - before.wins,
+      winrate_before: wr(before.wins, before.games) ?? 0,
+      side1_games_before: before.s1_games,
+      side1_wins_before: before.s1_wins,
+      side1_winrate_before: wr(before.s1_wins, before.s1_games),
+      side2_games_before: before.s2_games,
+      side2_wins_before: before.s2_wins,
+      side2_winrate_before: wr(before.s2_wins, before.s2_games),
+      games_after: after.games,
+      wins_after: after.wins,
+      losses_after: after.games - after.wins,
+      winrate_after: wr(after.wins, after.games) ?? 0,
+      side1_games_after: after.s1_games,
+      side1_wins_after: after.s1_wins,
+      side1_winrate_after: wr(after.s1_wins, after.s1_games),
+      side2_games_after: after.s2_games,
+      side2_wins_after: after.s2_wins,
+      side2_winrate_after: wr(after.s2_wins, after.s2_games),
+      winrate_change: (after.games > 0 ? (after.wins / after.games) * 100 : 0) -
+                      (before.games > 0 ? (before.wins / before.games) * 100 : 0),
+      sample_size_before: before.games,
+      sample_size_after: after.games,
+    }));
+}
+
+/**
+ * Get balance event impact from the daily faction/map buckets.
  * Uses event_date as the dividing line: matches before vs matches after.
- * Each match is processed twice (winner + loser perspective) like recalculateFactionMapStatistics.
  */
 export async function getBalanceEventForwardImpact(
   eventId: string
@@ -1412,121 +1988,7 @@ export async function getBalanceEventForwardImpact(
     }
 
     const eventDate: string = new Date(eventResult.rows[0].event_date).toISOString().split('T')[0];
-
-    const matchesResult = await query(
-      `SELECT
-         gm.id  AS map_id,
-         gm.name AS map_name,
-         f_w.id AS winner_faction_id,
-         f_w.name AS winner_faction_name,
-         f_l.id AS loser_faction_id,
-         f_l.name AS loser_faction_name,
-         m.winner_side,
-         DATE(m.created_at) AS match_date
-       FROM matches m
-       JOIN game_maps gm ON gm.name = m.map
-       JOIN factions f_w ON f_w.name = m.winner_faction
-       JOIN factions f_l ON f_l.name = m.loser_faction
-       WHERE m.status != 'cancelled'`
-    );
-
-    type Entry = {
-      map_id: string; map_name: string;
-      faction_id: string; faction_name: string;
-      opponent_faction_id: string; opponent_faction_name: string;
-      games_before: number; wins_before: number; losses_before: number;
-      s1_games_before: number; s1_wins_before: number;
-      s2_games_before: number; s2_wins_before: number;
-      games_after: number; wins_after: number; losses_after: number;
-      s1_games_after: number; s1_wins_after: number;
-      s2_games_after: number; s2_wins_after: number;
-    };
-
-    const aggregated = new Map<string, Entry>();
-
-    const addEntry = (
-      map_id: string, map_name: string,
-      faction_id: string, faction_name: string,
-      opponent_faction_id: string, opponent_faction_name: string,
-      matchDate: string, isWin: boolean, factionSide: number
-    ) => {
-      const key = `${map_id}|${faction_id}|${opponent_faction_id}`;
-      let entry = aggregated.get(key);
-      if (!entry) {
-        entry = {
-          map_id, map_name, faction_id, faction_name,
-          opponent_faction_id, opponent_faction_name,
-          games_before: 0, wins_before: 0, losses_before: 0,
-          s1_games_before: 0, s1_wins_before: 0,
-          s2_games_before: 0, s2_wins_before: 0,
-          games_after: 0, wins_after: 0, losses_after: 0,
-          s1_games_after: 0, s1_wins_after: 0,
-          s2_games_after: 0, s2_wins_after: 0,
-        };
-        aggregated.set(key, entry);
-      }
-      const isBefore = matchDate < eventDate;
-      if (isBefore) {
-        entry.games_before++;
-        if (isWin) entry.wins_before++; else entry.losses_before++;
-        if (factionSide === 1) { entry.s1_games_before++; if (isWin) entry.s1_wins_before++; }
-        if (factionSide === 2) { entry.s2_games_before++; if (isWin) entry.s2_wins_before++; }
-      } else {
-        entry.games_after++;
-        if (isWin) entry.wins_after++; else entry.losses_after++;
-        if (factionSide === 1) { entry.s1_games_after++; if (isWin) entry.s1_wins_after++; }
-        if (factionSide === 2) { entry.s2_games_after++; if (isWin) entry.s2_wins_after++; }
-      }
-    };
-
-    for (const row of matchesResult.rows) {
-      const matchDate: string = row.match_date instanceof Date
-        ? row.match_date.toISOString().split('T')[0]
-        : String(row.match_date).split('T')[0];
-      const winnerSide: number = row.winner_side ?? 1;
-      const loserSide: number  = winnerSide === 1 ? 2 : 1;
-
-      addEntry(row.map_id, row.map_name, row.winner_faction_id, row.winner_faction_name,
-               row.loser_faction_id, row.loser_faction_name, matchDate, true, winnerSide);
-      addEntry(row.map_id, row.map_name, row.loser_faction_id, row.loser_faction_name,
-               row.winner_faction_id, row.winner_faction_name, matchDate, false, loserSide);
-    }
-
-    const wr = (wins: number, games: number) =>
-      games > 0 ? Math.round((wins / games) * 10000) / 100 : null;
-
-    return Array.from(aggregated.values()).map(entry => ({
-      map_id: entry.map_id,
-      map_name: entry.map_name,
-      faction_id: entry.faction_id,
-      faction_name: entry.faction_name,
-      opponent_faction_id: entry.opponent_faction_id,
-      opponent_faction_name: entry.opponent_faction_name,
-      games_before: entry.games_before,
-      wins_before: entry.wins_before,
-      losses_before: entry.losses_before,
-      winrate_before: wr(entry.wins_before, entry.games_before) ?? 0,
-      side1_games_before: entry.s1_games_before,
-      side1_wins_before: entry.s1_wins_before,
-      side1_winrate_before: wr(entry.s1_wins_before, entry.s1_games_before),
-      side2_games_before: entry.s2_games_before,
-      side2_wins_before: entry.s2_wins_before,
-      side2_winrate_before: wr(entry.s2_wins_before, entry.s2_games_before),
-      games_after: entry.games_after,
-      wins_after: entry.wins_after,
-      losses_after: entry.losses_after,
-      winrate_after: wr(entry.wins_after, entry.games_after) ?? 0,
-      side1_games_after: entry.s1_games_after,
-      side1_wins_after: entry.s1_wins_after,
-      side1_winrate_after: wr(entry.s1_wins_after, entry.s1_games_after),
-      side2_games_after: entry.s2_games_after,
-      side2_wins_after: entry.s2_wins_after,
-      side2_winrate_after: wr(entry.s2_wins_after, entry.s2_games_after),
-      winrate_change: (entry.games_after > 0 ? (entry.wins_after / entry.games_after) * 100 : 0) -
-                      (entry.games_before > 0 ? (entry.wins_before / entry.games_before) * 100 : 0),
-      sample_size_before: entry.games_before,
-      sample_size_after: entry.games_after,
-    }));
+    return await sumFactionMapWindows(eventDate);
   } catch (error) {
     console.error('Error getting balance event impact from matches:', error);
     throw error;
@@ -1582,10 +2044,75 @@ export async function recalculateBalanceEventSnapshots(recreateAll: boolean = fa
     throw error;
   }
 }
+/**
+ * Player stats row written back to users_extension by bulkUpdateUserStats
+ */
+export interface UserStatsUpdate {
+  id: string;
+  nickname: string;
+  elo_rating: number;
+  matches_played: number;
+  total_wins: number;
+  total_losses: number;
+  is_rated: number | boolean;
+  level: string;
+  trend: string | number;
+}
+
+const USER_STATS_BATCH_SIZE = 500;
+
+/**
+ * Write player stats to users_extension in batches of multi-row
+ * INSERT ... ON DUPLICATE KEY UPDATE, all inside a single transaction.
+ * Only existing users should be passed (nickname is required by the INSERT branch).
+ * When a connection is given, the statements join the caller's transaction instead.
+ */
+export async function bulkUpdateUserStats(rows: UserStatsUpdate[], connection?: PoolConnection): Promise<number> {
+  if (rows.length === 0) return 0;
+
+  const writeBatches = async (conn: PoolConnection): Promise<number> => {
+    for (let offset = 0; offset < rows.length; offset += USER_STATS_BATCH_SIZE) {
+      const batch = rows.slice(offset, offset + USER_STATS_BATCH_SIZE).map(row => [
+        row.id,
+        row.nickname,
+        row.elo_rating,
+        row.matches_played,
+        row.total_wins,
+        row.total_losses,
+        row.is_rated ? 1 : 0,
+        row.level,
+        String(row.trend)
+      ]);
+
+      await conn.query(
+        `INSERT INTO users_extension
+           (id, nickname, elo_rating, matches_played, total_wins, total_losses, is_rated, level, trend)
+         VALUES ?
+         ON DUPLICATE KEY UPDATE
+           elo_rating = VALUES(elo_rating),
+           matches_played = VALUES(matches_played),
+           total_wins = VALUES(total_wins),
+           total_losses = VALUES(total_losses),
+           is_rated = VALUES(is_rated),
+           level = VALUES(level),
+           trend = VALUES(trend),
+           updated_at = CURRENT_TIMESTAMP`,
+        [batch]
+      );
+    }
+    return rows.length;
+  };
+
+  return connection ? writeBatches(connection) : withTransaction(writeBatches);
+}
+
 /**
  * CRITICAL: Recalculate player ELO from match records
  * Takes the FINAL ELO from the last non-cancelled match for each player
  * Updates users_extension with correct ELO, ranking, and level
+ *
+ * Set-based: one aggregate query over matches, levels/trends computed in memory,
+ * results applied with bulkUpdateUserStats (batched upsert, single transaction)
  */
 export async function recalculatePlayerEloSequential(): Promise<{
   players_updated: number;
@@ -1593,16 +2120,26 @@ export async function recalculatePlayerEloSequential(): Promise<{
   errors: string[];
 }> {
   const errors: string[] = [];
-  let playersUpdated = 0;
 
   try {
-    // Get all unique players from non-cancelled matches
-    const playersResult = await query(
-      `SELECT DISTINCT winner_id as player_id FROM matches
-       WHERE status != 'cancelled'
-       UNION
-       SELECT DISTINCT loser_id FROM matches
-       WHERE status != 'cancelled'`
+    // Per-player aggregate over all non-cancelled matches (each match contributes a winner and a loser row)
+    const statsResult = await query(
+      `SELECT p.player_id,
+              u.nickname,
+              u.elo_rating AS previous_elo,
+              SUM(p.is_win) AS wins,
+              SUM(1 - p.is_win) AS losses,
+              MAX(CASE WHEN p.is_win = 1 THEN p.elo_after END) AS final_elo_as_winner,
+              MAX(CASE WHEN p.is_win = 0 THEN p.elo_after END) AS final_elo_as_loser
+       FROM (
+         SELECT winner_id AS player_id, 1 AS is_win, winner_elo_after AS elo_after
+         FROM matches WHERE status != 'cancelled'
+         UNION ALL
+         SELECT loser_id AS player_id, 0 AS is_win, loser_elo_after AS elo_after
+         FROM matches WHERE status != 'cancelled'
+       ) p
+       INNER JOIN users_extension u ON u.id = p.player_id
+       GROUP BY p.player_id, u.nickname, u.elo_rating`
     );
 
     const totalMatches = await query(
@@ -1610,72 +2147,40 @@ export async function recalculatePlayerEloSequential(): Promise<{
        WHERE status != 'cancelled'`
     );
 
-    // For each player, get their final ELO and stats from their matches
-    for (const player of playersResult.rows) {
-      const playerId = player.player_id;
-      
-      try {
-        // Get all stats for this player from their matches (non-cancelled only)
-        const statsResult = await query(
-          `SELECT
-             COUNT(CASE WHEN winner_id = ? THEN 1 END) as wins,
-             COUNT(CASE WHEN loser_id = ? THEN 1 END) as losses,
-             MAX(CASE WHEN winner_id = ? THEN winner_elo_after ELSE NULL END) as final_elo_as_winner,
-             MAX(CASE WHEN loser_id = ? THEN loser_elo_after ELSE NULL END) as final_elo_as_loser
-           FROM matches
-           WHERE (winner_id = ? OR loser_id = ?)
-           AND status != 'cancelled'`,
-          [playerId, playerId, playerId, playerId, playerId, playerId]
-        );
-
-        const stats = statsResult.rows[0];
-        const wins = stats.wins || 0;
-        const losses = stats.losses || 0;
-        const matchesPlayed = wins + losses;
+    const updates: UserStatsUpdate[] = statsResult.rows.map((stats: any) => {
+      const wins = Number(stats.wins) || 0;
+      const losses = Number(stats.losses) || 0;
+      const matchesPlayed = wins + losses;
 
-        // Get final ELO (use the most recent match ELO)
-        const finalElo = stats.final_elo_as_winner || stats.final_elo_as_loser || 1400;
+      // Get final ELO (use the most recent match ELO)
+      const finalElo = stats.final_elo_as_winner || stats.final_elo_as_loser || 1400;
 
-        // Determine if player should be rated (10+ matches and ELO >= 1400)
-        const isRated = matchesPlayed >= 10 && finalElo >= 1400 ? 1 : 0;
+      // Determine if player should be rated (10+ matches and ELO >= 1400)
+      const isRated = matchesPlayed >= 10 && finalElo >= 1400 ? 1 : 0;
 
-        // Calculate level based on ELO
-        let level = 'Novato';
-        if (finalElo >= 1600) level = 'Experto';
-        else if (finalElo >= 1500) level = 'Avanzado';
-        else if (finalElo >= 1450) level = 'Iniciado';
+      // Calculate level based on ELO
+      let level = 'Novato';
+      if (finalElo >= 1600) level = 'Experto';
+      else if (finalElo >= 1500) level = 'Avanzado';
+      else if (finalElo >= 1450) level = 'Iniciado';
 
-        // Get previous ELO for trend calculation
-        const prevEloResult = await query(
-          `SELECT elo_rating FROM users_extension WHERE id = ?`,
-          [playerId]
-        );
+      const prevElo = stats.previous_elo || 1400;
+      const trend = finalElo > prevElo ? 1 : (finalElo < prevElo ? -1 : 0);
 
-        const prevElo = prevEloResult.rows[0]?.elo_rating || 1400;
-        const trend = finalElo > prevElo ? 1 : (finalElo < prevElo ? -1 : 0);
-
-        // Update users_extension
-        await query(
-          `UPDATE users_extension
-           SET elo_rating = ?,
-               matches_played = ?,
-               total_wins = ?,
-               total_losses = ?,
-               is_rated = ?,
-               level = ?,
-               trend = ?,
-               updated_at = CURRENT_TIMESTAMP
-           WHERE id = ?`,
-          [finalElo, matchesPlayed, wins, losses, isRated, level, trend, playerId]
-        );
+      return {
+        id: stats.player_id,
+        nickname: stats.nickname,
+        elo_rating: finalElo,
+        matches_played: matchesPlayed,
+        total_wins: wins,
+        total_losses: losses,
+        is_rated: isRated,
+        level,
+        trend
+      };
+    });
 
-        playersUpdated++;
-      } catch (e) {
-        const msg = `Error updating player ${playerId}: ${e instanceof Error ? e.message : String(e)}`;
-        errors.push(msg);
-        console.error(msg);
-      }
-    }
+    const playersUpdated = await bulkUpdateUserStats(updates);
 
     return {
       players_updated: playersUpdated,
@@ -1694,6 +2199,8 @@ export default {
   calculateLeagueTiebreakers,
   calculateSwissTiebreakers,
   calculateTeamSwissTiebreakers,
+  updateTournamentTiebreakers,
+  updateTeamTiebreakers,
   checkTeamMemberCount,
   checkTeamMemberPositions,
   createBalanceEventBeforeSnapshot,
@@ -1702,6 +2209,8 @@ export default {
   getBalanceTrend,
   manageFactionMapStatisticsSnapshots,
   recalculatePlayerMatchStatistics,
+  applyMatchToPlayerMatchStatistics,
+  refreshPlayerMatchStatistics,
   recalculateFactionMapStatistics,
   updateFactionMapStatistics,
   getBalanceStatisticsSnapshot,
@@ -1714,5 +2223,6 @@ export default {
   createBalanceEventAfterSnapshot,
   getBalanceEventForwardImpact,
   recalculateBalanceEventSnapshots,
-  recalculatePlayerEloSequential
+  recalculatePlayerEloSequential,
+  bulkUpdateUserStats
 };
@@ -0,0 +1,198 @@
+import { PoolConnection } from 'mysql2/promise';
+import { query, withTransaction, pool } from '../config/database.js';
+
+/**
+ * Statistics Rebuild Log
+ * Keeps per-match deltas from getting lost while a maintained statistics table is rebuilt
+ * into a shadow table and swapped in with RENAME TABLE. Shared by every backend instance.
+ *
+ * - statistics_rebuilds: one row per table; active = 1 while a rebuild runs. It is set before
+ *   the rebuild reads its snapshot, so every delta that might be missing from it is captured
+ * - statistics_rebuild_log: keys touched by deltas written while active (player ids, or a
+ *   map/faction combination). The rebuild recomputes those keys in the shadow table from the
+ *   current source rows, which is idempotent: a delta already in the snapshot is not counted twice
+ * - Writers read the flag with LOCK IN SHARE MODE in the transaction of their live write, so
+ *   setting or clearing it waits for writes in flight
+ * - The final catch-up and the RENAME run under a named lock (GET_LOCK) that capturing writers
+ *   also take, so no delta can land in the outgoing table after the last catch-up
+ */
+
+export type StatisticsRebuildName = 'player_match_statistics' | 'faction_map_statistics';
+
+// A rebuild whose instance died without clearing the flag is taken over after this long
+const STALE_REBUILD_MINUTES = 60;
+// Longest a capturing writer waits for the final catch-up and swap of a rebuild
+const SWAP_LOCK_WAIT_SECONDS = parseInt(process.env.STATISTICS_SWAP_LOCK_WAIT_SECONDS || '120', 10);
+
+export class StatisticsRebuildInProgressError extends Error {
+  constructor(name: StatisticsRebuildName) {
+    super(`A rebuild of ${name} is already running`);
+    this.name = 'StatisticsRebuildInProgressError';
+  }
+}
+
+// Thrown inside the writer transaction when a rebuild started after the flag was checked
+class RetryWithSwapLock extends Error {}
+
+const swapLockName = (name: StatisticsRebuildName) => `statistics_rebuild:${name}`;
+
+/**
+ * Take the swap lock of a rebuild on a dedicated connection (held across commits)
+ * Returns a function that releases it.
+ */
+async function acquireSwapLock(name: StatisticsRebuildName): Promise<() => Promise<void>> {
+  const connection = await pool.getConnection();
+  try {
+    const [rows] = await connection.query<any>('SELECT GET_LOCK(?, ?) AS locked', [swapLockName(name), SWAP_LOCK_WAIT_SECONDS]);
+    if (Number(rows[0]?.locked) !== 1) {
+      throw new Error(`Timed out waiting for the ${name} rebuild swap lock`);
+    }
+  } catch (error) {
+    connection.release();
+    throw error;
+  }
+  return async () => {
+    try {
+      await connection.query('SELECT RELEASE_LOCK(?)', [swapLockName(name)]);
+    } finally {
+      connection.release();
+    }
+  };
+}
+
+async function isRebuildActive(name: StatisticsRebuildName, connection?: PoolConnection): Promise<boolean> {
+  if (connection) {
+    const [rows] = await connection.query<any>(
+      'SELECT active FROM statistics_rebuilds WHERE name = ? LOCK IN SHARE MODE',
+      [name]
+    );
+    return Number(rows[0]?.active) === 1;
+  }
+  const result = await query('SELECT active FROM statistics_rebuilds WHERE name = ?', [name]);
+  return Number(result.rows[0]?.active) === 1;
+}
+
+/**
+ * Run a live statistics write in a transaction, capturing its keys if a rebuild is running
+ * fn receives the transaction connection and a `capture` function; call it with the keys the
+ * write touched (it is a no-op when no rebuild is active).
+ */
+export async function withRebuildCapture<T>(
+  name: StatisticsRebuildName,
+  fn: (connection: PoolConnection, capture: (keys: string[]) => Promise<void>) => Promise<T>
+): Promise<T> {
+  let needSwapLock = await isRebuildActive(name);
+
+  for (;;) {
+    const release = needSwapLock ? await acquireSwapLock(name) : null;
+    try {
+      return await withTransaction(async (connection) => {
+        const active = await isRebuildActive(name, connection);
+        if (active && !release) {
+          throw new RetryWithSwapLock();
+        }
+        const capture = async (keys: string[]) => {
+          const unique = Array.from(new Set(keys.filter(Boolean)));
+          if (!active || unique.length === 0) {
+            return;
+          }
+          await connection.query(
+            'INSERT INTO statistics_rebuild_log (rebuild_name, entry_key) VALUES ?',
+            [unique.map(key => [name, key])]
+          );
+        };
+        return fn(connection, capture);
+      });
+    } catch (error) {
+      if (error instanceof RetryWithSwapLock) {
+        needSwapLock = true;
+        continue;
+      }
+      throw error;
+    } finally {
+      if (release) {
+        await release();
+      }
+    }
+  }
+}
+
+/**
+ * Mark a rebuild as running, before it reads its snapshot
+ * Throws StatisticsRebuildInProgressError if another instance is rebuilding the same table.
+ */
+export async function beginStatisticsRebuild(name: StatisticsRebuildName): Promise<void> {
+  await query(
+    `INSERT IGNORE INTO statistics_rebuilds (name, active, started_at) VALUES (?, 0, NULL)`,
+    [name]
+  );
+  await withTransaction(async (connection) => {
+    const [result] = await connection.query<any>(
+      `UPDATE statistics_rebuilds
+       SET active = 1, started_at = NOW()
+       WHERE name = ?
+         AND (active = 0 OR started_at < DATE_SUB(NOW(), INTERVAL ? MINUTE))`,
+      [name, STALE_REBUILD_MINUTES]
+    );
+    if ((result.affectedRows || 0) === 0) {
+      throw new StatisticsRebuildInProgressError(name);
+    }
+    // Entries left behind by a rebuild that died
+    await connection.query('DELETE FROM statistics_rebuild_log WHERE rebuild_name = ?', [name]);
+  });
+}
+
+/**
+ * Keys captured after `afterId`, with the id to continue from
+ */
+export async function readRebuildLog(
+  name: StatisticsRebuildName,
+  afterId: number
+): Promise<{ lastId: number; keys: string[] }> {
+  const result = await query(
+    `SELECT id, entry_key FROM statistics_rebuild_log
+     WHERE rebuild_name = ? AND id > ?
+     ORDER BY id ASC`,
+    [name, afterId]
+  );
+  if (result.rows.length === 0) {
+    return { lastId: afterId, keys: [] };
+  }
+  return {
+    lastId: Number(result.rows[result.rows.length - 1].id),
+    keys: Array.from(new Set(result.rows.map((row: any) => String(row.entry_key))))
+  };
+}
+
+/**
+ * Run the final catch-up and swap of a rebuild while capturing writers are held back
+ */
+export async function withSwapLock<T>(name: StatisticsRebuildName, fn: () => Promise<T>): Promise<T> {
+  const release = await acquireSwapLock(name);
+  try {
+    return await fn();
+  } finally {
+    await release();
+  }
+}
+
+/**
+ * Clear the rebuild flag and its captured keys (after the swap, or when the rebuild failed)
+ */
+export async function endStatisticsRebuild(name: StatisticsRebuildName): Promise<void> {
+  await withTransaction(async (connection) => {
+    await connection.query(
+      'UPDATE statistics_rebuilds SET active = 0, started_at = NULL WHERE name = ?',
+      [name]
+    );
+    await connection.query('DELETE FROM statistics_rebuild_log WHERE rebuild_name = ?', [name]);
+  });
+}
+
+export default {
+  withRebuildCapture,
+  beginStatisticsRebuild,
+  readRebuildLog,
+  withSwapLock,
+  endStatisticsRebuild
+};
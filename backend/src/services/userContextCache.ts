@@ -0,0 +1,138 @@
+/**
+ * User Context Cache
+ * Short-lived in-process copy of the authorization-relevant state of a user (admin flag,
+ * lockout, forum moderator membership), so admin/moderator checks do not cost a
+ * users_extension lookup (and two phpBB lookups for moderators) on every request.
+ *
+ * - Entries live for TTL_MS; concurrent misses for the same user share one query
+ * - Routes that change the state (make-admin, remove-admin, delete, unlock, lockout) call
+ *   invalidateUserContext() so this instance sees the change immediately; other instances
+ *   pick it up within TTL_MS
+ * - Forum moderator membership is resolved lazily, only for non-admins that need it
+ */
+
+import { query } from '../config/database.js';
+import { checkUserIsForumModerator } from './phpbbAuth.js';
+
+export interface UserContext {
+  id: string;
+  nickname: string;
+  isAdmin: boolean;
+  lockedUntil: Date | null;
+}
+
+interface CacheEntry {
+  context: UserContext | null;
+  moderator: Promise<boolean> | null;
+  expiresAt: number;
+}
+
+const TTL_MS = parseInt(process.env.USER_CONTEXT_TTL_MS || '30000', 10);
+const MAX_ENTRIES = 10000;
+
+const entries = new Map<string, CacheEntry>();
+const loading = new Map<string, Promise<CacheEntry>>();
+// Bumped by invalidateUserContext() so a load started before the change is not cached
+const generations = new Map<string, number>();
+
+async function loadEntry(userId: string): Promise<CacheEntry> {
+  const generation = generations.get(userId) || 0;
+  const result = await query(
+    'SELECT id, nickname, is_admin, locked_until FROM users_extension WHERE id = ?',
+    [userId]
+  );
+  const row = result.rows[0];
+  const entry: CacheEntry = {
+    context: row
+      ? {
+          id: row.id,
+          nickname: row.nickname,
+          isAdmin: !!row.is_admin,
+          lockedUntil: row.locked_until ? new Date(row.locked_until) : null
+        }
+      : null,
+    moderator: null,
+    expiresAt: Date.now() + TTL_MS
+  };
+
+  if ((generations.get(userId) || 0) === generation) {
+    if (entries.size >= MAX_ENTRIES) {
+      // Oldest first
+      entries.delete(entries.keys().next().value as string);
+    }
+    entries.set(userId, entry);
+  }
+  return entry;
+}
+
+async function getEntry(userId: string): Promise<CacheEntry> {
+  const cached = entries.get(userId);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached;
+  }
+  entries.delete(userId);
+
+  let pending = loading.get(userId);
+  if (!pending) {
+    const load: Promise<CacheEntry> = loadEntry(userId).finally(() => {
+      if (loading.get(userId) === load) {
+        loading.delete(userId);
+      }
+    });
+    loading.set(userId, load);
+    pending = load;
+  }
+  return pending;
+}
+
+/**
+ * Authorization state of a user (null if the user has no users_extension row)
+ */
+export async function getUserContext(userId: string): Promise<UserContext | null> {
+  return (await getEntry(userId)).context;
+}
+
+/**
+ * Whether the user is a tournament admin
+ */
+export async function isUserAdmin(userId: string | undefined): Promise<boolean> {
+  if (!userId) {
+    return false;
+  }
+  return !!(await getUserContext(userId))?.isAdmin;
+}
+
+/**
+ * Whether the user belongs to the forum moderator group (cached with the rest of the context)
+ */
+export async function isUserForumModerator(userId: string, username: string): Promise<boolean> {
+  const entry = await getEntry(userId);
+  if (!entry.moderator) {
+    entry.moderator = checkUserIsForumModerator(username);
+  }
+  return entry.moderator;
+}
+
+/**
+ * Whether the account is locked out after failed login attempts
+ */
+export function isUserLocked(context: UserContext): boolean {
+  return !!context.lockedUntil && context.lockedUntil > new Date();
+}
+
+/**
+ * Drop the cached state of a user (call after changing is_admin or locked_until, or deleting the user)
+ */
+export function invalidateUserContext(userId: string): void {
+  entries.delete(userId);
+  loading.delete(userId);
+  generations.set(userId, (generations.get(userId) || 0) + 1);
+}
+
+export default {
+  getUserContext,
+  isUserAdmin,
+  isUserForumModerator,
+  isUserLocked,
+  invalidateUserContext
+};
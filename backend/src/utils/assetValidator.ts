@@ -8,9 +8,17 @@
  * 1. Both factions are marked as is_ranked=true in factions table
  * 2. Map is marked as is_ranked=true in maps table
  * 3. If validation fails, the match is NOT ranked (confidence=0)
+ *
+ * Lookups are served by the in-memory asset catalog (services/assetCatalog.ts).
  */
 
-import { query } from '../config/database.js';
+import {
+  findMap,
+  findFaction,
+  getMapNameVariants,
+  getFactionNameVariants,
+  type CatalogAsset
+} from '../services/assetCatalog.js';
 
 export interface AssetValidationResult {
   isValid: boolean;
@@ -21,80 +29,25 @@ export interface AssetValidationResult {
 }
 
 /**
- * Generate map name variants for flexible matching
- * e.g., "2p — Tombs of Kesorak" → ["2p — Tombs of Kesorak", "Tombs of Kesorak"]
- * e.g., "4p - The Great Chasm" → ["4p - The Great Chasm", "The Great Chasm"]
+ * Find a map in the asset catalog trying multiple name variants
  */
-function getMapNameVariants(mapName: string): string[] {
-  const variants: Set<string> = new Set([mapName]);
-  
-  // Try removing common player count prefixes: "Np —", "Np -", "Np " (where N is 1-6 digits)
-  // Match patterns like: "2p —", "4p -", "1p ", etc.
-  const cleaned = mapName.replace(/^\d+p[\s—\-]+/i, '');
-  if (cleaned !== mapName) {
-    variants.add(cleaned);
+async function findMapInDatabase(mapName: string): Promise<CatalogAsset | null> {
+  const map = await findMap(mapName);
+  if (map && map.name !== mapName) {
+    console.log(`   📍 Map found: "${map.name}" (from: "${mapName}")`);
   }
-  
-  return Array.from(variants);
+  return map;
 }
 
 /**
- * Find a map in database trying multiple name variants
+ * Find a faction in the asset catalog trying multiple name variants
  */
-async function findMapInDatabase(mapName: string): Promise<any> {
-  const variants = getMapNameVariants(mapName);
-  
-  for (const variant of variants) {
-    const result = await query(
-      `SELECT is_ranked FROM game_maps WHERE name = ? LIMIT 1`,
-      [variant]
-    );
-    
-    if (result && (result as any).rows && (result as any).rows.length > 0) {
-      console.log(`   📍 Map found: "${variant}" (from: "${mapName}")`);
-      return (result as any).rows[0];
-    }
-  }
-  
-  return null;
-}
-
-/**
- * Generate faction name variants for flexible matching
- * e.g., "Ladder Rebels" → ["Ladder Rebels", "Rebels"]
- * Removes common addon prefixes to find base faction names
- */
-function getFactionNameVariants(factionName: string): string[] {
-  const variants: Set<string> = new Set([factionName]);
-  
-  // Remove common addon prefixes: "Ladder ", "Campaign ", etc.
-  const cleaned = factionName.replace(/^(Ladder|Campaign|Ranked|Custom)\s+/i, '');
-  if (cleaned !== factionName) {
-    variants.add(cleaned);
-  }
-  
-  return Array.from(variants);
-}
-
-/**
- * Find a faction in database trying multiple name variants
- */
-async function findFactionInDatabase(factionName: string): Promise<any> {
-  const variants = getFactionNameVariants(factionName);
-  
-  for (const variant of variants) {
-    const result = await query(
-      `SELECT is_ranked FROM factions WHERE name = ? LIMIT 1`,
-      [variant]
-    );
-    
-    if (result && (result as any).rows && (result as any).rows.length > 0) {
-      console.log(`   🏛️  Faction found: "${variant}" (from: "${factionName}")`);
-      return (result as any).rows[0];
-    }
+async function findFactionInDatabase(factionName: string): Promise<CatalogAsset | null> {
+  const faction = await findFaction(factionName);
+  if (faction && faction.name !== factionName) {
+    console.log(`   🏛️  Faction found: "${faction.name}" (from: "${factionName}")`);
   }
-  
-  return null;
+  return faction;
 }
 
 /**
@@ -211,7 +164,7 @@ export async function isFactionRanked(factionName: string): Promise<boolean> {
       return false;
     }
 
-    return factionRecord.is_ranked === true || factionRecord.is_ranked === 1;
+    return factionRecord.is_ranked;
   } catch (error) {
     console.error(`[VALIDATE] Error checking faction: ${factionName}`, error);
     return false;
@@ -229,7 +182,7 @@ export async function isMapRanked(mapName: string): Promise<boolean> {
       return false;
     }
 
-    return mapRecord.is_ranked === true || mapRecord.is_ranked === 1;
+    return mapRecord.is_ranked;
   } catch (error) {
     console.error(`[VALIDATE] Error checking map: ${mapName}`, error);
     return false;
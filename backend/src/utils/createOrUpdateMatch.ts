@@ -17,7 +17,10 @@
 
 import { query } from '../config/database.js';
 import { getUserLevel } from './auth.js';
+import { findMap, findFaction } from '../services/assetCatalog.js';
 import { v4 as uuidv4 } from 'uuid';
+import { refreshLeaderboardPlayers, getPlayerRank } from '../services/leaderboardService.js';
+import { recordGlobalStatisticsEvent } from '../services/globalStatisticsService.js';
 
 export interface ParsedVictory {
   confidence_level: 1 | 2;
@@ -57,23 +60,14 @@ export interface ParsedReplay {
 }
 
 /**
- * Get player's current ranking position
+ * Get player's current ranking position among rated players (from the maintained leaderboard)
+ * The player's row is re-read first so positions taken right after an ELO update are exact.
  */
 async function getPlayerRankingPosition(userId: string): Promise<number | null> {
   try {
-    const result = await query(
-      `SELECT COUNT(*) as position FROM users_extension 
-       WHERE is_rated = 1 AND elo_rating > (
-         SELECT elo_rating FROM users_extension WHERE id = ?
-       )`,
-      [userId]
-    );
-    
-    if (result && (result as any).rows && (result as any).rows.length > 0) {
-      return (result as any).rows[0].position + 1; // Add 1 because position is 0-indexed
-    }
-    
-    return null;
+    await refreshLeaderboardPlayers([userId]);
+    const ranking = await getPlayerRank(userId, 'rated');
+    return ranking ? ranking.rank : null;
   } catch (error) {
     console.warn(`⚠️  Could not get ranking position for player ${userId}:`, (error as any)?.message);
     return null;
@@ -81,37 +75,15 @@ async function getPlayerRankingPosition(userId: string): Promise<number | null>
 }
 
 /**
- * Find exact faction name in database (with variant matching)
+ * Find exact faction name in the asset catalog (with variant matching)
  */
 async function getExactFactionName(factionName: string | undefined): Promise<string | undefined> {
   if (!factionName) return undefined;
   
   try {
-    // Try exact match first
-    let result = await query(
-      `SELECT name FROM factions WHERE name = ? LIMIT 1`,
-      [factionName]
-    );
-    
-    if (result && (result as any).rows && (result as any).rows.length > 0) {
-      return (result as any).rows[0].name;
-    }
-    
-    // Try without common prefixes: "Ladder ", "Campaign ", etc.
-    const cleaned = factionName.replace(/^(Ladder|Campaign|Ranked|Custom)\s+/i, '');
-    if (cleaned !== factionName) {
-      result = await query(
-        `SELECT name FROM factions WHERE name = ? LIMIT 1`,
-        [cleaned]
-      );
-      
-      if (result && (result as any).rows && (result as any).rows.length > 0) {
-        return (result as any).rows[0].name;
-      }
-    }
-    
+    const faction = await findFaction(factionName);
     // Not found, return original
-    return factionName;
+    return faction ? faction.name : factionName;
   } catch (error) {
     console.warn(`⚠️  Could not lookup faction: ${factionName}`, (error as any)?.message);
     return factionName;
@@ -119,37 +91,15 @@ async function getExactFactionName(factionName: string | undefined): Promise<str
 }
 
 /**
- * Find exact map name in database (with variant matching)
+ * Find exact map name in the asset catalog (with variant matching)
  */
 async function getExactMapName(mapName: string | undefined): Promise<string | undefined> {
   if (!mapName) return undefined;
   
   try {
-    // Try exact match first
-    let result = await query(
-      `SELECT name FROM game_maps WHERE name = ? LIMIT 1`,
-      [mapName]
-    );
-    
-    if (result && (result as any).rows && (result as any).rows.length > 0) {
-      return (result as any).rows[0].name;
-    }
-    
-    // Try without player count prefix: "2p — ", "4p - ", etc.
-    const cleaned = mapName.replace(/^\d+p[\s—\-]+/i, '');
-    if (cleaned !== mapName) {
-      result = await query(
-        `SELECT name FROM game_maps WHERE name = ? LIMIT 1`,
-        [cleaned]
-      );
-      
-      if (result && (result as any).rows && (result as any).rows.length > 0) {
-        return (result as any).rows[0].name;
-      }
-    }
-    
+    const map = await findMap(mapName);
     // Not found, return original
-    return mapName;
+    return map ? map.name : mapName;
   } catch (error) {
     console.warn(`⚠️  Could not lookup map: ${mapName}`, (error as any)?.message);
     return mapName;
@@ -287,6 +237,7 @@ async function ensurePlayerExists(playerName: string): Promise<string> {
         0
       ]
     );
+    await recordGlobalStatisticsEvent('users_new');
 
     console.log(`✅ [PLAYER] Player created: ${playerName}`);
 
@@ -408,6 +359,9 @@ async function createNewMatch(
         createdAt
       ]
     );
+    if (status !== 'cancelled') {
+      await recordGlobalStatisticsEvent('matches', 1, createdAt);
+    }
 
     console.log(`✅ [MATCH] Match created: ${matchId}`);
 
@@ -181,56 +181,150 @@ export const calculateTrend = (currentTrend: string, isWin: boolean): string =>
 };
 
 /**
- * Recalculate all stats (ELO + wins/losses/matches) in cascade for a user and their affected matches
- * This is used when a match is cancelled and affects subsequent matches
- * @param userId - The user whose stats need recalculation
- * @param affectedMatches - All matches involving this user after the cancelled match (sorted by created_at)
- * @param cancelledMatchCreatedAt - The timestamp of the cancelled match (to exclude it and get matches after it)
- * @returns Object with recalculated stats: { elo: number, matches_played: number, total_wins: number, total_losses: number, trend: string }
+ * Convert a signed streak counter (+n = n wins in a row, -n = n losses in a row, 0 = none)
+ * to the trend string format used by users_extension ('+3', '-2', '-')
  */
-export const recalculateUserStatsInCascade = (
-  initialElo: number,
-  affectedMatches: Array<{
-    id: string;
-    winner_id: string;
-    loser_id: string;
-    created_at: string;
-  }>,
-  userId: string
-): { elo: number; matches_played: number; total_wins: number; total_losses: number; trend: string } => {
-  let currentElo = initialElo;
-  let matches_played = 0;
-  let total_wins = 0;
-  let total_losses = 0;
-  let trend = '-';
-
-  // Process matches in order
-  for (const match of affectedMatches) {
-    if (match.winner_id === userId) {
-      // User won
-      // For cascade: we need the opponent's current ELO after previous matches
-      // We'll estimate opponent's ELO based on their initial + previous wins/losses
-      // This is a simplified approach - in production, you'd track all users in cascade
-      
-      const isWin = true;
-      total_wins++;
-      matches_played++;
-      trend = calculateTrend(trend, isWin);
-      // Note: ELO is updated externally with full opponent knowledge
-    } else if (match.loser_id === userId) {
-      // User lost
-      const isWin = false;
-      total_losses++;
-      matches_played++;
-      trend = calculateTrend(trend, isWin);
+export const formatTrend = (streak: number): string => {
+  if (streak > 0) return `+${streak}`;
+  if (streak < 0) return `${streak}`;
+  return '-';
+};
+
+/**
+ * Minimal match record consumed by the ELO replay engine
+ * Matches must be sorted chronologically (created_at ASC, id ASC)
+ */
+export interface EloReplayMatch {
+  id: string;
+  winner_id: string;
+  loser_id: string;
+}
+
+/**
+ * Player state at a point in time (used to resume a replay mid-history)
+ */
+export interface EloReplayCheckpoint {
+  elo: number;
+  matches_played: number;
+  total_wins: number;
+  total_losses: number;
+  streak: number; // signed, see formatTrend
+}
+
+/**
+ * Result of an ELO replay
+ * Player state is stored in typed arrays indexed by position in playerIds;
+ * match results are stored in typed arrays indexed by position in the input matches.
+ */
+export interface EloReplayResult {
+  playerIds: string[];
+  playerIndex: Map<string, number>;
+  elo: Int32Array;
+  matchesPlayed: Int32Array;
+  wins: Int32Array;
+  losses: Int32Array;
+  streak: Int32Array;
+  winnerEloBefore: Int32Array;
+  winnerEloAfter: Int32Array;
+  loserEloBefore: Int32Array;
+  loserEloAfter: Int32Array;
+}
+
+/**
+ * Replay ELO over a chronological match list in a single linear pass
+ * Uses calculateNewRating/getKFactor for every match exactly like live reporting does.
+ *
+ * @param matches - Non-cancelled matches ordered by created_at ASC, id ASC
+ * @param checkpoints - Optional starting state per player (incremental mode); players
+ *                      without a checkpoint start from defaultElo with no games
+ * @param defaultElo - Baseline ELO for players without history (FIDE baseline 1400)
+ */
+export const replayEloHistory = (
+  matches: EloReplayMatch[],
+  checkpoints?: Map<string, EloReplayCheckpoint>,
+  defaultElo: number = 1400
+): EloReplayResult => {
+  // Assign a dense index to every player (checkpointed players first, then in order of appearance)
+  const playerIds: string[] = [];
+  const playerIndex = new Map<string, number>();
+  const indexOf = (playerId: string): number => {
+    let index = playerIndex.get(playerId);
+    if (index === undefined) {
+      index = playerIds.length;
+      playerIds.push(playerId);
+      playerIndex.set(playerId, index);
     }
+    return index;
+  };
+
+  if (checkpoints) {
+    for (const playerId of checkpoints.keys()) indexOf(playerId);
+  }
+  const matchWinner = new Int32Array(matches.length);
+  const matchLoser = new Int32Array(matches.length);
+  for (let i = 0; i < matches.length; i++) {
+    matchWinner[i] = indexOf(matches[i].winner_id);
+    matchLoser[i] = indexOf(matches[i].loser_id);
+  }
+
+  const playerCount = playerIds.length;
+  const elo = new Int32Array(playerCount).fill(defaultElo);
+  const matchesPlayed = new Int32Array(playerCount);
+  const wins = new Int32Array(playerCount);
+  const losses = new Int32Array(playerCount);
+  const streak = new Int32Array(playerCount);
+
+  if (checkpoints) {
+    for (const [playerId, checkpoint] of checkpoints.entries()) {
+      const index = playerIndex.get(playerId)!;
+      elo[index] = checkpoint.elo;
+      matchesPlayed[index] = checkpoint.matches_played;
+      wins[index] = checkpoint.total_wins;
+      losses[index] = checkpoint.total_losses;
+      streak[index] = checkpoint.streak;
+    }
+  }
+
+  const winnerEloBefore = new Int32Array(matches.length);
+  const winnerEloAfter = new Int32Array(matches.length);
+  const loserEloBefore = new Int32Array(matches.length);
+  const loserEloAfter = new Int32Array(matches.length);
+
+  for (let i = 0; i < matches.length; i++) {
+    const w = matchWinner[i];
+    const l = matchLoser[i];
+    const wBefore = elo[w];
+    const lBefore = elo[l];
+
+    const wAfter = calculateNewRating(wBefore, lBefore, 'win', matchesPlayed[w]);
+    const lAfter = calculateNewRating(lBefore, wBefore, 'loss', matchesPlayed[l]);
+
+    winnerEloBefore[i] = wBefore;
+    winnerEloAfter[i] = wAfter;
+    loserEloBefore[i] = lBefore;
+    loserEloAfter[i] = lAfter;
+
+    elo[w] = wAfter;
+    elo[l] = lAfter;
+    matchesPlayed[w]++;
+    matchesPlayed[l]++;
+    wins[w]++;
+    losses[l]++;
+    streak[w] = streak[w] > 0 ? streak[w] + 1 : 1;
+    streak[l] = streak[l] < 0 ? streak[l] - 1 : -1;
   }
 
   return {
-    elo: currentElo,
-    matches_played,
-    total_wins,
-    total_losses,
-    trend
+    playerIds,
+    playerIndex,
+    elo,
+    matchesPlayed,
+    wins,
+    losses,
+    streak,
+    winnerEloBefore,
+    winnerEloAfter,
+    loserEloBefore,
+    loserEloAfter
   };
 };
@@ -0,0 +1,256 @@
+/**
+ * In-memory nickname search index
+ * File: backend/src/utils/nicknameIndex.ts
+ *
+ * Answers player typeahead and nickname filters without a leading-wildcard LIKE scan.
+ *
+ * - A sorted array of normalised nicknames serves prefix lookups by binary search
+ * - Bigram and trigram posting lists serve substring lookups (every gram of the query must occur)
+ *   and typo-tolerant matches (ranked by trigram overlap)
+ * - Nicknames are normalised like the utf8mb4_unicode_ci collation compares them:
+ *   lower case, accents stripped
+ */
+
+export interface NicknameMatch {
+  id: string;
+  nickname: string;
+  score: number;
+}
+
+interface IndexedName {
+  id: string;
+  nickname: string;
+  normalized: string;
+}
+
+// Minimum trigram overlap (Jaccard) for a non-substring match to count as a typo of the query
+const FUZZY_MIN_SIMILARITY = 0.3;
+
+export function normalizeNickname(value: string): string {
+  return value.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase().trim();
+}
+
+function gramsOf(normalized: string, size: number): Set<string> {
+  const grams = new Set<string>();
+  for (let i = 0; i + size <= normalized.length; i++) {
+    grams.add(normalized.slice(i, i + size));
+  }
+  return grams;
+}
+
+const trigramsOf = (normalized: string) => gramsOf(normalized, 3);
+
+// Posting keys: every bigram (for two-letter queries) and trigram of a nickname
+function postingKeysOf(normalized: string): Set<string> {
+  return new Set([...gramsOf(normalized, 2), ...gramsOf(normalized, 3)]);
+}
+
+export class NicknameIndex {
+  private byId = new Map<string, IndexedName>();
+  // Sorted by (normalized, id) for prefix ranges
+  private sorted: IndexedName[] = [];
+  private postings = new Map<string, Set<string>>();
+
+  get size(): number {
+    return this.byId.size;
+  }
+
+  /**
+   * Replace the whole index (initial load / full reload)
+   */
+  reset(players: Array<{ id: string; nickname: string }>): void {
+    this.byId.clear();
+    this.postings.clear();
+    this.sorted = [];
+    for (const player of players) {
+      const name = this.toIndexed(player.id, player.nickname);
+      this.byId.set(name.id, name);
+      this.sorted.push(name);
+      this.addPostings(name);
+    }
+    this.sorted.sort(compareNames);
+  }
+
+  /**
+   * Add a player or update their nickname; a no-op when the nickname did not change
+   */
+  upsert(id: string, nickname: string): void {
+    const existing = this.byId.get(id);
+    if (existing && existing.nickname === nickname) {
+      return;
+    }
+    if (existing) {
+      this.remove(id);
+    }
+    const name = this.toIndexed(id, nickname);
+    this.byId.set(id, name);
+    this.sorted.splice(this.lowerBound(name.normalized, id), 0, name);
+    this.addPostings(name);
+  }
+
+  remove(id: string): void {
+    const existing = this.byId.get(id);
+    if (!existing) {
+      return;
+    }
+    this.byId.delete(id);
+    const index = this.lowerBound(existing.normalized, id);
+    if (this.sorted[index]?.id === id) {
+      this.sorted.splice(index, 1);
+    }
+    for (const gram of postingKeysOf(existing.normalized)) {
+      const ids = this.postings.get(gram);
+      ids?.delete(id);
+      if (ids && ids.size === 0) {
+        this.postings.delete(gram);
+      }
+    }
+  }
+
+  /**
+   * Ids of every nickname containing the query (same result as nickname LIKE '%query%')
+   */
+  substringMatches(query: string): string[] {
+    const needle = normalizeNickname(query);
+    if (!needle) {
+      return Array.from(this.byId.keys());
+    }
+
+    if (needle.length === 1) {
+      const ids: string[] = [];
+      for (const name of this.sorted) {
+        if (name.normalized.includes(needle)) {
+          ids.push(name.id);
+        }
+      }
+      return ids;
+    }
+
+    // Walk the rarest gram's postings and verify the full substring
+    let rarest: Set<string> | undefined;
+    for (const gram of gramsOf(needle, Math.min(needle.length, 3))) {
+      const ids = this.postings.get(gram);
+      if (!ids) {
+        return [];
+      }
+      if (!rarest || ids.size < rarest.size) {
+        rarest = ids;
+      }
+    }
+    const ids: string[] = [];
+    for (const id of rarest!) {
+      if (this.byId.get(id)!.normalized.includes(needle)) {
+        ids.push(id);
+      }
+    }
+    return ids;
+  }
+
+  /**
+   * Top-k nicknames for a typeahead query, best first
+   * Exact match > prefix (shorter names first) > substring (earlier position first) > typo match.
+   * accept() filters candidates (active, not blocked, ...) before they take a result slot.
+   */
+  search(query: string, limit: number, accept: (id: string) => boolean = () => true): NicknameMatch[] {
+    const needle = normalizeNickname(query);
+    if (!needle || limit <= 0) {
+      return [];
+    }
+
+    const scored = new Map<string, number>();
+    const consider = (name: IndexedName, score: number) => {
+      if ((scored.get(name.id) ?? -1) < score && accept(name.id)) {
+        scored.set(name.id, score);
+      }
+    };
+
+    // Prefix range
+    for (let i = this.lowerBound(needle, ''); i < this.sorted.length; i++) {
+      const name = this.sorted[i];
+      if (!name.normalized.startsWith(needle)) {
+        break;
+      }
+      consider(name, name.normalized.length === needle.length ? 1000 : 900 + 50 * (needle.length / name.normalized.length));
+    }
+
+    if (needle.length < 3) {
+      // Too short for typo matching: fill the remaining slots with substring hits
+      if (scored.size < limit) {
+        for (const id of this.substringMatches(needle)) {
+          const name = this.byId.get(id)!;
+          const position = name.normalized.indexOf(needle);
+          if (position > 0) {
+            consider(name, 700 - Math.min(position, 100));
+          }
+        }
+      }
+    } else {
+      const queryGrams = trigramsOf(needle);
+      const shared = new Map<string, number>();
+      for (const gram of queryGrams) {
+        for (const id of this.postings.get(gram) || []) {
+          shared.set(id, (shared.get(id) || 0) + 1);
+        }
+      }
+      for (const [id, count] of shared) {
+        const name = this.byId.get(id)!;
+        const position = name.normalized.indexOf(needle);
+        if (position > 0) {
+          consider(name, 700 - Math.min(position, 100));
+          continue;
+        }
+        if (position === 0) {
+          continue;
+        }
+        const nameGrams = Math.max(name.normalized.length - 2, 0);
+        const similarity = count / (queryGrams.size + nameGrams - count);
+        if (similarity >= FUZZY_MIN_SIMILARITY) {
+          consider(name, 500 * similarity);
+        }
+      }
+    }
+
+    return Array.from(scored, ([id, score]) => ({ id, nickname: this.byId.get(id)!.nickname, score }))
+      .sort((a, b) => b.score - a.score || a.nickname.length - b.nickname.length || a.nickname.localeCompare(b.nickname))
+      .slice(0, limit);
+  }
+
+  private toIndexed(id: string, nickname: string): IndexedName {
+    return { id, nickname, normalized: normalizeNickname(nickname || '') };
+  }
+
+  private addPostings(name: IndexedName): void {
+    for (const gram of postingKeysOf(name.normalized)) {
+      let ids = this.postings.get(gram);
+      if (!ids) {
+        ids = new Set<string>();
+        this.postings.set(gram, ids);
+      }
+      ids.add(name.id);
+    }
+  }
+
+  /**
+   * First position in the sorted array not before (normalized, id)
+   */
+  private lowerBound(normalized: string, id: string): number {
+    let low = 0;
+    let high = this.sorted.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (compareNames(this.sorted[mid], { normalized, id }) < 0) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+    return low;
+  }
+}
+
+function compareNames(a: { normalized: string; id: string }, b: { normalized: string; id: string }): number {
+  if (a.normalized !== b.normalized) {
+    return a.normalized < b.normalized ? -1 : 1;
+  }
+  return a.id < b.id ? -1 : a.id > b.id ? 1 : 0;
+}
@@ -0,0 +1,127 @@
+/**
+ * Keyset pagination helpers
+ * File: backend/src/utils/pagination.ts
+ *
+ * Listings page through their sort key plus the primary key as a tiebreaker
+ * ((created_at, id) for matches), so page N costs one index range scan instead of
+ * reading and discarding N * pageSize rows.
+ *
+ * - Cursors are opaque base64url tokens carrying the last row's sort values and the sort they belong to
+ * - Totals come from a short-lived count cache instead of a COUNT(*) on every page
+ */
+
+import { query } from '../config/database.js';
+
+export interface KeysetColumn {
+  // SQL expression used in ORDER BY / WHERE (e.g. 'm.created_at')
+  expr: string;
+  // Property of the result row holding the value (e.g. 'created_at')
+  field: string;
+  direction: 'ASC' | 'DESC';
+}
+
+const APPROX_COUNT_TTL_MS = 60 * 1000;
+const APPROX_COUNT_MAX_ENTRIES = 500;
+const countCache = new Map<string, { value: number; expiresAt: number }>();
+
+/**
+ * ORDER BY clause for the keyset columns
+ */
+export function keysetOrderBy(columns: KeysetColumn[]): string {
+  return columns.map(column => `${column.expr} ${column.direction}`).join(', ');
+}
+
+/**
+ * Opaque cursor pointing just after the given row
+ * sortKey identifies the ordering so that a cursor cannot be replayed against another sort.
+ */
+export function encodeCursor(sortKey: string, columns: KeysetColumn[], row: any): string {
+  const values = columns.map(column => {
+    const value = row[column.field];
+    return value instanceof Date ? { d: value.toISOString() } : value;
+  });
+  return Buffer.from(JSON.stringify({ s: sortKey, v: values })).toString('base64url');
+}
+
+/**
+ * Decode a cursor produced by encodeCursor for the same sort
+ * Returns null for malformed cursors or cursors issued for a different sort.
+ */
+export function decodeCursor(cursor: string, sortKey: string, columns: KeysetColumn[]): any[] | null {
+  try {
+    const decoded = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (decoded?.s !== sortKey || !Array.isArray(decoded.v) || decoded.v.length !== columns.length) {
+      return null;
+    }
+    return decoded.v.map((value: any) =>
+      value && typeof value === 'object' && typeof value.d === 'string' ? new Date(value.d) : value
+    );
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * WHERE condition selecting the rows that come after the cursor values in keyset order
+ * Expanded as (a > ?) OR (a = ? AND b > ?) ... so mixed ASC/DESC orderings work and the
+ * leading column still drives an index range scan.
+ */
+export function keysetCondition(columns: KeysetColumn[], values: any[]): { sql: string; params: any[] } {
+  const branches: string[] = [];
+  const params: any[] = [];
+
+  columns.forEach((column, i) => {
+    const parts: string[] = [];
+    for (let j = 0; j < i; j++) {
+      parts.push(`${columns[j].expr} = ?`);
+      params.push(values[j]);
+    }
+    parts.push(`${column.expr} ${column.direction === 'DESC' ? '<' : '>'} ?`);
+    params.push(values[i]);
+    branches.push(parts.length > 1 ? `(${parts.join(' AND ')})` : parts[0]);
+  });
+
+  return { sql: `(${branches.join(' OR ')})`, params };
+}
+
+/**
+ * In-memory keyset comparison matching keysetOrderBy, for merging rows from several sources
+ */
+export function compareKeyset(columns: KeysetColumn[], a: any, b: any): number {
+  for (const column of columns) {
+    let left = a[column.field];
+    let right = b[column.field];
+    if (left instanceof Date || right instanceof Date) {
+      left = new Date(left).getTime();
+      right = new Date(right).getTime();
+    }
+    if (left === right) {
+      continue;
+    }
+    const order = left < right ? -1 : 1;
+    return column.direction === 'DESC' ? -order : order;
+  }
+  return 0;
+}
+
+/**
+ * Row count for a listing filter, cached for APPROX_COUNT_TTL_MS
+ * Good enough for "about N results" and page counts; lists that page by cursor never need it exact.
+ */
+export async function getApproximateCount(countSql: string, params: any[]): Promise<number> {
+  const key = `${countSql}\u0000${JSON.stringify(params)}`;
+  const cached = countCache.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.value;
+  }
+
+  const result = await query(countSql, params);
+  const value = parseInt(Object.values(result.rows[0] || {})[0] as string) || 0;
+
+  if (countCache.size >= APPROX_COUNT_MAX_ENTRIES) {
+    countCache.delete(countCache.keys().next().value as string);
+  }
+  countCache.delete(key);
+  countCache.set(key, { value, expiresAt: Date.now() + APPROX_COUNT_TTL_MS });
+  return value;
+}
@@ -0,0 +1,232 @@
+/**
+ * Local replay blob cache
+ * File: backend/src/utils/replayBlobCache.ts
+ *
+ * Disk cache in front of remote replay storage (Supabase), so repeated downloads of the same
+ * replay are served from local disk instead of the storage API.
+ *
+ * - Entries are keyed by filename; the file on disk is named <sha256(filename)>-<sha256(content)>,
+ *   so the index can be rebuilt from the directory after a restart and the content hash doubles
+ *   as an ETag
+ * - Downloads are streamed to a temporary file (hashing on the way) and renamed into place,
+ *   never held in memory
+ * - Concurrent misses for the same filename share one upstream fetch (single flight)
+ * - Least recently used entries are evicted once the cache exceeds REPLAY_CACHE_MAX_BYTES
+ */
+
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+import { Readable, Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+
+export interface CachedReplay {
+  path: string;
+  size: number;
+  // sha256 of the content (hex)
+  hash: string;
+}
+
+export interface OpenedReplay extends CachedReplay {
+  stream: fs.ReadStream;
+}
+
+const CACHE_DIR = process.env.REPLAY_CACHE_DIR || path.join(process.cwd(), '.cache', 'replays');
+const MAX_BYTES = parseInt(process.env.REPLAY_CACHE_MAX_BYTES || String(1024 * 1024 * 1024), 10);
+// Access times are written back to disk (for the LRU order after a restart) at most this often
+const TOUCH_INTERVAL_MS = 60 * 1000;
+const ENTRY_NAME = /^([0-9a-f]{64})-([0-9a-f]{64})$/;
+
+interface CacheEntry extends CachedReplay {
+  touchedAt: number;
+}
+
+// Keyed by sha256(filename); Map order is the LRU order (least recently used first)
+const entries = new Map<string, CacheEntry>();
+const inflight = new Map<string, Promise<CacheEntry>>();
+let totalBytes = 0;
+let initializing: Promise<void> | null = null;
+
+const sha256 = (value: string) => crypto.createHash('sha256').update(value).digest('hex');
+
+/**
+ * Create the cache directory and index what an earlier process left in it
+ */
+function initialize(): Promise<void> {
+  if (!initializing) {
+    initializing = (async () => {
+      await fs.promises.mkdir(CACHE_DIR, { recursive: true });
+      const found: Array<{ key: string; entry: CacheEntry; mtime: number }> = [];
+      for (const name of await fs.promises.readdir(CACHE_DIR)) {
+        const filePath = path.join(CACHE_DIR, name);
+        const match = ENTRY_NAME.exec(name);
+        if (!match) {
+          // Leftover temporary file of an interrupted download
+          await fs.promises.rm(filePath, { force: true });
+          continue;
+        }
+        const stat = await fs.promises.stat(filePath);
+        found.push({
+          key: match[1],
+          entry: { path: filePath, size: stat.size, hash: match[2], touchedAt: stat.mtimeMs },
+          mtime: stat.mtimeMs
+        });
+      }
+      found.sort((a, b) => a.mtime - b.mtime);
+      for (const { key, entry } of found) {
+        const previous = entries.get(key);
+        if (previous) {
+          // Two versions of the same filename: keep the newer one
+          await removeEntry(key, previous);
+        }
+        entries.set(key, entry);
+        totalBytes += entry.size;
+      }
+      await evict();
+    })().catch(error => {
+      initializing = null;
+      throw error;
+    });
+  }
+  return initializing;
+}
+
+async function removeEntry(key: string, entry: CacheEntry): Promise<void> {
+  if (entries.get(key) === entry) {
+    entries.delete(key);
+    totalBytes -= entry.size;
+  }
+  // Readers that already opened the file keep reading it
+  await fs.promises.rm(entry.path, { force: true });
+}
+
+async function evict(keep?: string): Promise<void> {
+  for (const [key, entry] of entries) {
+    if (totalBytes <= MAX_BYTES) {
+      break;
+    }
+    if (key !== keep) {
+      await removeEntry(key, entry);
+    }
+  }
+}
+
+function touch(key: string, entry: CacheEntry): void {
+  entries.delete(key);
+  entries.set(key, entry);
+  const now = Date.now();
+  if (now - entry.touchedAt > TOUCH_INTERVAL_MS) {
+    entry.touchedAt = now;
+    const time = new Date(now);
+    fs.promises.utimes(entry.path, time, time).catch(() => undefined);
+  }
+}
+
+async function fetchIntoCache(key: string, fetchSource: () => Promise<Readable>): Promise<CacheEntry> {
+  const tmpPath = path.join(CACHE_DIR, `.download-${key}-${process.pid}-${Date.now()}`);
+  const hash = crypto.createHash('sha256');
+  let size = 0;
+
+  try {
+    await pipeline(
+      await fetchSource(),
+      new Transform({
+        transform(chunk, _encoding, callback) {
+          hash.update(chunk);
+          size += chunk.length;
+          callback(null, chunk);
+        }
+      }),
+      fs.createWriteStream(tmpPath)
+    );
+  } catch (error) {
+    await fs.promises.rm(tmpPath, { force: true });
+    throw error;
+  }
+
+  const contentHash = hash.digest('hex');
+  const entry: CacheEntry = {
+    path: path.join(CACHE_DIR, `${key}-${contentHash}`),
+    size,
+    hash: contentHash,
+    touchedAt: Date.now()
+  };
+  await fs.promises.rename(tmpPath, entry.path);
+
+  const previous = entries.get(key);
+  if (previous && previous.path !== entry.path) {
+    await removeEntry(key, previous);
+  } else if (previous) {
+    totalBytes -= previous.size;
+  }
+  entries.delete(key);
+  entries.set(key, entry);
+  totalBytes += entry.size;
+  await evict(key);
+  return entry;
+}
+
+/**
+ * Local copy of a replay, fetched through fetchSource on a miss
+ */
+export async function getCachedReplay(filename: string, fetchSource: () => Promise<Readable>): Promise<CachedReplay> {
+  await initialize();
+  const key = sha256(filename);
+
+  const cached = entries.get(key);
+  if (cached) {
+    touch(key, cached);
+    return { path: cached.path, size: cached.size, hash: cached.hash };
+  }
+
+  let pending = inflight.get(key);
+  if (!pending) {
+    pending = fetchIntoCache(key, fetchSource).finally(() => inflight.delete(key));
+    inflight.set(key, pending);
+  }
+  const entry = await pending;
+  return { path: entry.path, size: entry.size, hash: entry.hash };
+}
+
+/**
+ * Open a read stream on the cached copy of a replay (fetching it first on a miss)
+ */
+export async function openCachedReplay(filename: string, fetchSource: () => Promise<Readable>): Promise<OpenedReplay> {
+  for (let attempt = 0; ; attempt++) {
+    const replay = await getCachedReplay(filename, fetchSource);
+    try {
+      const handle = await fs.promises.open(replay.path, 'r');
+      return { ...replay, stream: handle.createReadStream() };
+    } catch (error: any) {
+      // Evicted between the lookup and the open: fetch it again once
+      if (error.code !== 'ENOENT' || attempt > 0) {
+        throw error;
+      }
+      const key = sha256(filename);
+      const entry = entries.get(key);
+      if (entry && entry.path === replay.path) {
+        entries.delete(key);
+        totalBytes -= entry.size;
+      }
+    }
+  }
+}
+
+/**
+ * Drop a replay from the cache (after it was deleted or replaced in storage)
+ */
+export async function invalidateCachedReplay(filename: string): Promise<void> {
+  await initialize();
+  const key = sha256(filename);
+  const entry = entries.get(key);
+  if (entry) {
+    await removeEntry(key, entry);
+  }
+}
+
+/**
+ * Cache size and entry count (exposed through GET /api/admin/replay-cache)
+ */
+export function getReplayCacheStats(): { entries: number; bytes: number; maxBytes: number; inflight: number } {
+  return { entries: entries.size, bytes: totalBytes, maxBytes: MAX_BYTES, inflight: inflight.size };
+}
@@ -0,0 +1,294 @@
+/**
+ * Replay upload preview
+ * File: backend/src/utils/replayPreview.ts
+ *
+ * Extracts the map and players (with factions) of an uploaded replay for the report form.
+ *
+ * - ReplayPreviewParser scans the decompressed WML line by line, so the replay text never has
+ *   to be held in memory as a whole
+ * - parseReplayUpload() hashes, size-limits, decompresses and parses an upload stream as it
+ *   arrives (gzip is decompressed incrementally; bz2 has no streaming decoder here, so the
+ *   size-limited compressed bytes are decompressed once the upload is complete)
+ * - Results are kept for REPLAY_PREVIEW_TTL_MS keyed by the sha256 of the uploaded bytes, so
+ *   the same file is never parsed twice in a row
+ */
+
+import path from 'path';
+import crypto from 'crypto';
+import { Readable, Transform, Writable } from 'stream';
+import { pipeline } from 'stream/promises';
+import { StringDecoder } from 'string_decoder';
+import { createGunzip } from 'zlib';
+
+export interface ReplayPreview {
+  map: string | null;
+  players: Array<{ id: string; name: string; faction: string }>;
+}
+
+export interface ParsedReplayUpload {
+  // sha256 of the uploaded (compressed) bytes
+  hash: string;
+  size: number;
+  preview: ReplayPreview;
+  // True when the preview came from the preview cache
+  cached: boolean;
+}
+
+export class ReplayUploadError extends Error {
+  constructor(public status: number, message: string) {
+    super(message);
+  }
+}
+
+export const REPLAY_UPLOAD_MAX_BYTES = parseInt(process.env.REPLAY_UPLOAD_MAX_BYTES || String(512 * 1024), 10);
+// Guard against decompression bombs
+const MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024;
+const PREVIEW_TTL_MS = parseInt(process.env.REPLAY_PREVIEW_TTL_MS || String(10 * 60 * 1000), 10);
+const PREVIEW_CACHE_MAX_ENTRIES = 500;
+
+const previews = new Map<string, { preview: ReplayPreview; expiresAt: number }>();
+
+/**
+ * Incremental extractor for the replay fields the preview needs
+ * Feed decoded text with write() in any chunking, then call end().
+ */
+export class ReplayPreviewParser {
+  private pending = '';
+  private map: string | null = null;
+  private sideUsers: string | null = null;
+  // faction_name of every side, in file order (fallback when [old_side] has none)
+  private factionsInOrder: string[] = [];
+  // current_player -> faction from the [old_side*] blocks
+  private factionByPlayer: Record<string, string> = {};
+  private oldSide: { player: string | null; factionName: string | null; faction: string | null } | null = null;
+
+  write(text: string): void {
+    const lines = (this.pending + text).split('\n');
+    this.pending = lines.pop() || '';
+    for (const line of lines) {
+      this.scanLine(line);
+    }
+  }
+
+  end(): ReplayPreview {
+    if (this.pending) {
+      this.scanLine(this.pending);
+      this.pending = '';
+    }
+    this.closeOldSide();
+    return this.build();
+  }
+
+  private scanLine(line: string): void {
+    const tag = /\[old_side[^\]]*\]/.exec(line);
+    if (tag) {
+      this.closeOldSide();
+      this.oldSide = { player: null, factionName: null, faction: null };
+      line = line.slice(tag.index + tag[0].length);
+    }
+
+    if (this.map === null) {
+      const scenarioMatch = line.match(/mp_scenario_name="([^"]+)"/);
+      if (scenarioMatch) {
+        this.map = scenarioMatch[1];
+      }
+    }
+    if (this.sideUsers === null) {
+      const sideUsersMatch = line.match(/side_users="([^"]+)"/);
+      if (sideUsersMatch) {
+        this.sideUsers = sideUsersMatch[1];
+      }
+    }
+
+    const factionRegex = /faction_name\s*=\s*_?"([^"]+)"/g;
+    let factionMatch;
+    while ((factionMatch = factionRegex.exec(line)) !== null) {
+      this.factionsInOrder.push(factionMatch[1].replace(/^_/, ''));
+    }
+
+    if (this.oldSide) {
+      this.oldSide.player ??= line.match(/current_player="([^"]+)"/)?.[1] ?? null;
+      this.oldSide.factionName ??= line.match(/faction_name\s*=\s*_?"([^"]+)"/)?.[1] ?? null;
+      this.oldSide.faction ??= line.match(/faction="([^"]+)"/)?.[1] ?? null;
+    }
+  }
+
+  private closeOldSide(): void {
+    const side = this.oldSide;
+    this.oldSide = null;
+    if (!side?.player) {
+      return;
+    }
+    const rawFaction = (side.factionName || side.faction || '').trim();
+    if (rawFaction) {
+      this.factionByPlayer[side.player] = rawFaction.replace(/^_/, '');
+    }
+  }
+
+  private build(): ReplayPreview {
+    // Remove "2p — " prefix if present
+    const map = this.map ? this.map.replace(/^2p\s*—\s*/, '') : null;
+
+    // Players from the global side_users attribute (e.g., id1:Nick1,id2:Nick2)
+    const playerNames: string[] = [];
+    for (const pair of (this.sideUsers || '').split(',')) {
+      const parts = pair.split(':');
+      const name = (parts[1] || parts[0]).trim();
+      if (name) playerNames.push(name);
+    }
+
+    const players: ReplayPreview['players'] = [];
+    const count = Math.min(playerNames.length, this.factionsInOrder.length);
+    for (let i = 0; i < count; i++) {
+      const name = playerNames[i];
+      const faction = this.factionByPlayer[name] ?? this.factionsInOrder[i] ?? 'Unknown';
+      players.push({ id: name, name, faction });
+    }
+
+    // If playerNames are empty but old_side mapping exists, use it to populate players
+    if (playerNames.length === 0) {
+      for (const [name, faction] of Object.entries(this.factionByPlayer)) {
+        players.push({ id: name, name, faction });
+      }
+    }
+
+    return { map, players };
+  }
+}
+
+async function decompressBz2(data: Buffer): Promise<Buffer> {
+  const bz2Module: any = await import('bz2');
+  let decompress = bz2Module.decompress || bz2Module.default?.decompress;
+  if (!decompress && typeof bz2Module === 'function') {
+    decompress = bz2Module;
+  }
+  if (typeof decompress !== 'function') {
+    throw new Error('bz2.decompress is not available');
+  }
+  return Buffer.from(decompress(data));
+}
+
+/**
+ * Cached preview of an upload by content hash (null when unknown or expired)
+ */
+export function getCachedReplayPreview(hash: string): ReplayPreview | null {
+  const entry = previews.get(hash);
+  if (!entry) {
+    return null;
+  }
+  if (entry.expiresAt <= Date.now()) {
+    previews.delete(hash);
+    return null;
+  }
+  return entry.preview;
+}
+
+function storeReplayPreview(hash: string, preview: ReplayPreview): void {
+  const now = Date.now();
+  for (const [key, entry] of previews) {
+    // Oldest first: stop at the first live entry once there is room
+    if (entry.expiresAt > now && previews.size < PREVIEW_CACHE_MAX_ENTRIES) {
+      break;
+    }
+    previews.delete(key);
+  }
+  previews.delete(hash);
+  previews.set(hash, { preview, expiresAt: now + PREVIEW_TTL_MS });
+}
+
+/**
+ * Hash, size-limit, decompress and parse a replay upload as it streams in
+ * Throws ReplayUploadError for unsupported or oversized files.
+ */
+export async function parseReplayUpload(
+  source: Readable,
+  fileName: string,
+  maxBytes: number = REPLAY_UPLOAD_MAX_BYTES
+): Promise<ParsedReplayUpload> {
+  const fileExt = path.extname(fileName).toLowerCase();
+  if (fileExt !== '.gz' && fileExt !== '.bz2') {
+    source.resume();
+    throw new ReplayUploadError(400, 'Unsupported file format. Only .gz and .bz2 files are allowed.');
+  }
+
+  const hash = crypto.createHash('sha256');
+  let size = 0;
+  const meter = new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      size += chunk.length;
+      if (size > maxBytes) {
+        return callback(new ReplayUploadError(413, `Replay file too large (max ${maxBytes} bytes)`));
+      }
+      hash.update(chunk);
+      callback(null, chunk);
+    }
+  });
+
+  const parser = new ReplayPreviewParser();
+  const decoder = new StringDecoder('utf8');
+  let decompressedSize = 0;
+  const feed = (chunk: Buffer) => {
+    decompressedSize += chunk.length;
+    if (decompressedSize > MAX_DECOMPRESSED_BYTES) {
+      throw new ReplayUploadError(413, 'Replay file too large once decompressed');
+    }
+    parser.write(decoder.write(chunk));
+  };
+
+  // Piped rather than part of the pipeline: a rejected upload must not destroy the request
+  // (and with it the socket) before the error response is sent
+  source.once('error', error => meter.destroy(error));
+  source.pipe(meter);
+
+  try {
+    if (fileExt === '.gz') {
+      await pipeline(meter, createGunzip(), new Writable({
+        write(chunk: Buffer, _encoding, callback) {
+          try {
+            feed(chunk);
+            callback();
+          } catch (error) {
+            callback(error as Error);
+          }
+        }
+      }));
+    } else {
+      const compressed: Buffer[] = [];
+      await pipeline(meter, new Writable({
+        write(chunk: Buffer, _encoding, callback) {
+          compressed.push(chunk);
+          callback();
+        }
+      }));
+      feed(await decompressBz2(Buffer.concat(compressed)));
+    }
+  } catch (error) {
+    if (error instanceof ReplayUploadError) {
+      throw error;
+    }
+    throw new ReplayUploadError(400, `Failed to decompress replay file: ${(error as Error).message}`);
+  }
+  parser.write(decoder.end());
+
+  const digest = hash.digest('hex');
+  const cached = getCachedReplayPreview(digest);
+  if (cached) {
+    return { hash: digest, size, preview: cached, cached: true };
+  }
+  const preview = parser.end();
+  storeReplayPreview(digest, preview);
+  return { hash: digest, size, preview, cached: false };
+}
+
+/**
+ * parseReplayUpload() for an upload that is already in memory (multipart / base64 bodies)
+ * A cached preview of the same bytes is returned without decompressing again.
+ */
+export async function parseReplayBuffer(fileBuffer: Buffer, fileName: string): Promise<ParsedReplayUpload> {
+  const digest = crypto.createHash('sha256').update(fileBuffer).digest('hex');
+  const cached = getCachedReplayPreview(digest);
+  if (cached) {
+    return { hash: digest, size: fileBuffer.length, preview: cached, cached: true };
+  }
+  return parseReplayUpload(Readable.from([fileBuffer]), fileName, Math.max(fileBuffer.length, REPLAY_UPLOAD_MAX_BYTES));
+}
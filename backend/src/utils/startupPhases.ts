@@ -0,0 +1,64 @@
+/**
+ * Startup phase timing
+ * File: backend/src/utils/startupPhases.ts
+ *
+ * Records how long each step of the server startup takes, so slow phases show up in the boot
+ * log instead of having to be guessed. "module loading" is the time from process start to the
+ * first recorded phase (Node startup plus evaluating the static imports of server.ts).
+ */
+
+import { performance } from 'perf_hooks';
+
+interface StartupPhase {
+  name: string;
+  ms: number;
+  // Phases that ran after the server was already accepting requests
+  background: boolean;
+}
+
+const phases: StartupPhase[] = [];
+let readyAtMs: number | null = null;
+
+/**
+ * Time a startup step
+ */
+export async function timePhase<T>(name: string, fn: () => T | Promise<T>): Promise<T> {
+  if (phases.length === 0) {
+    phases.push({ name: 'module loading', ms: performance.now(), background: false });
+  }
+  const start = performance.now();
+  try {
+    return await fn();
+  } finally {
+    phases.push({ name, ms: performance.now() - start, background: readyAtMs !== null });
+  }
+}
+
+/**
+ * Mark the moment the server started accepting requests
+ */
+export function markStartupReady(): void {
+  readyAtMs = performance.now();
+}
+
+/**
+ * Recorded phases and the time (since process start) at which the server became ready
+ */
+export function getStartupReport(): { readyAtMs: number | null; phases: StartupPhase[] } {
+  return {
+    readyAtMs: readyAtMs === null ? null : Math.round(readyAtMs),
+    phases: phases.map(phase => ({ ...phase, ms: Math.round(phase.ms) }))
+  };
+}
+
+/**
+ * Print the recorded phases, slowest first
+ */
+export function logStartupReport(): void {
+  const report = getStartupReport();
+  console.log(`\n🕒 Startup phases (ready after ${report.readyAtMs ?? '?'}ms):`);
+  for (const phase of [...report.phases].sort((a, b) => b.ms - a.ms)) {
+    console.log(`   ${String(phase.ms).padStart(6)}ms  ${phase.name}${phase.background ? ' (after ready)' : ''}`);
+  }
+  console.log('');
+}
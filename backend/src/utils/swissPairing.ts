@@ -0,0 +1,633 @@
+/**
+ * Swiss pairing engine
+ * Models a Swiss round as a minimum-cost perfect matching on the players (plus a bye
+ * vertex when the count is odd) and solves it with Edmonds' blossom algorithm.
+ *
+ * Pair cost (lower is better):
+ * - score difference (squared, so floating one group down beats floating two)
+ * - rematch of an earlier pairing in this tournament
+ * - side balance: both players due the same side (player1 / player2 slot)
+ * - distance in the standings (keeps pairs close inside a score group)
+ * - a tiny seeded jitter that breaks exact ties reproducibly
+ * Bye cost: previous byes, then standings (the best-ranked player gets the bye, as before).
+ */
+
+export interface SwissPlayer {
+  id: string;
+  // tournament_wins - tournament_losses
+  score: number;
+  // Times played in the player1 slot minus times played in the player2 slot
+  sideBalance: number;
+  // Byes already received in this tournament
+  byes: number;
+}
+
+export interface SwissPairing {
+  player1Id: string;
+  // null = bye
+  player2Id: string | null;
+}
+
+export interface SwissPairingResult {
+  pairings: SwissPairing[];
+  seed: number;
+  totalCost: number;
+  rematches: number;
+}
+
+const SCORE_DIFF_COST = 10_000;
+const REMATCH_COST = 10_000_000;
+const SIDE_CONFLICT_COST = 500;
+const RANK_DISTANCE_COST = 10;
+const JITTER_RANGE = 10;
+const BYE_BASE_COST = 0;
+const REPEAT_BYE_COST = 100_000_000;
+
+// Candidate edges per player (by standings distance) before falling back to the complete graph
+const INITIAL_RANK_WINDOW = 24;
+
+/**
+ * Unordered key for a pairing of two ids
+ */
+export function pairingKey(a: string, b: string): string {
+  return a < b ? `${a}|${b}` : `${b}|${a}`;
+}
+
+/**
+ * Derive a 32-bit seed from any string (FNV-1a), e.g. `${tournamentId}:${roundNumber}`
+ */
+export function seedFromString(value: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < value.length; i++) {
+    hash ^= value.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return hash >>> 0;
+}
+
+// mulberry32: small, fast, reproducible PRNG
+function createRandom(seed: number): () => number {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+/**
+ * Pair one Swiss round
+ * `players` must be sorted by standings (best first); `previousPairings` holds pairingKey()s.
+ */
+export function pairSwissRound(
+  players: SwissPlayer[],
+  previousPairings: Set<string>,
+  seed: number
+): SwissPairingResult {
+  const n = players.length;
+  if (n < 2) {
+    return {
+      pairings: n === 1 ? [{ player1Id: players[0].id, player2Id: null }] : [],
+      seed,
+      totalCost: 0,
+      rematches: 0
+    };
+  }
+
+  const random = createRandom(seed);
+  const hasBye = n % 2 === 1;
+  const byeVertex = hasBye ? n : -1;
+  const vertexCount = hasBye ? n + 1 : n;
+
+  // Jitter is drawn once per player so costs do not depend on edge enumeration order
+  const jitter = players.map(() => Math.floor(random() * JITTER_RANGE));
+
+  const pairCost = (i: number, j: number): number => {
+    const a = players[i];
+    const b = players[j];
+    const scoreDiff = a.score - b.score;
+    let cost = scoreDiff * scoreDiff * SCORE_DIFF_COST;
+    if (previousPairings.has(pairingKey(a.id, b.id))) cost += REMATCH_COST;
+    // Both leaning to the same slot: one of them has to take the side they played more
+    if ((a.sideBalance > 0 && b.sideBalance > 0) || (a.sideBalance < 0 && b.sideBalance < 0)) {
+      cost += Math.min(Math.abs(a.sideBalance), Math.abs(b.sideBalance)) * SIDE_CONFLICT_COST;
+    }
+    cost += Math.abs(i - j) * RANK_DISTANCE_COST;
+    cost += (jitter[i] + jitter[j]) % JITTER_RANGE;
+    return cost;
+  };
+
+  const byeCost = (i: number): number =>
+    BYE_BASE_COST + players[i].byes * REPEAT_BYE_COST + i * RANK_DISTANCE_COST + jitter[i];
+
+  // Upper bound on any cost, used to turn costs into positive weights for max-weight matching
+  const maxScore = Math.max(...players.map(p => p.score));
+  const minScore = Math.min(...players.map(p => p.score));
+  const maxByes = Math.max(...players.map(p => p.byes));
+  const maxSide = Math.max(...players.map(p => Math.abs(p.sideBalance)));
+  const costCeiling = (maxScore - minScore) ** 2 * SCORE_DIFF_COST + REMATCH_COST
+    + maxSide * SIDE_CONFLICT_COST + n * RANK_DISTANCE_COST + JITTER_RANGE
+    + (maxByes + 1) * REPEAT_BYE_COST + 1;
+
+  const solve = (window: number) => {
+    const edges: Array<[number, number, number]> = [];
+    for (let i = 0; i < n; i++) {
+      const last = Math.min(n - 1, i + window);
+      for (let j = i + 1; j <= last; j++) {
+        edges.push([i, j, costCeiling - pairCost(i, j)]);
+      }
+      if (hasBye) {
+        edges.push([i, byeVertex, costCeiling - byeCost(i)]);
+      }
+    }
+    return maxWeightMatching(vertexCount, edges, true);
+  };
+
+  // Sparse graph first; widen until the matching is perfect and no avoidable rematch remains
+  let window = Math.min(INITIAL_RANK_WINDOW, n - 1);
+  let mate = solve(window);
+  while (window < n - 1) {
+    const perfect = mate.every(m => m !== -1);
+    const rematch = mate.some((m, i) => i < n && m > i && m < n && previousPairings.has(pairingKey(players[i].id, players[m].id)));
+    if (perfect && !rematch) break;
+    window = Math.min(n - 1, window * 2);
+    mate = solve(window);
+  }
+
+  const pairings: SwissPairing[] = [];
+  let totalCost = 0;
+  let rematches = 0;
+  for (let i = 0; i < n; i++) {
+    const j = mate[i];
+    if (j === byeVertex) {
+      pairings.push({ player1Id: players[i].id, player2Id: null });
+      totalCost += byeCost(i);
+      continue;
+    }
+    if (j < i) continue;
+
+    const a = players[i];
+    const b = players[j];
+    if (previousPairings.has(pairingKey(a.id, b.id))) rematches++;
+    totalCost += pairCost(i, j);
+    // The player who has been player1 less often takes the player1 slot (ties: better ranked)
+    pairings.push(b.sideBalance < a.sideBalance
+      ? { player1Id: b.id, player2Id: a.id }
+      : { player1Id: a.id, player2Id: b.id });
+  }
+
+  return { pairings, seed, totalCost, rematches };
+}
+
+/**
+ * Maximum-weight matching in a general graph (Edmonds' blossom algorithm, O(n^3))
+ * Port of Joris van Rantwijk's reference implementation (mwmatching.py).
+ * Weights must be integers. With maxCardinality, only maximum-cardinality matchings
+ * are considered. Returns mate[v] (partner vertex, or -1).
+ */
+function maxWeightMatching(
+  nvertex: number,
+  edges: Array<[number, number, number]>,
+  maxCardinality: boolean
+): number[] {
+  const nedge = edges.length;
+  if (nedge === 0) return new Array(nvertex).fill(-1);
+
+  let maxWeight = 0;
+  for (const [, , w] of edges) if (w > maxWeight) maxWeight = w;
+
+  // endpoint[p] is the vertex at endpoint p; edge k has endpoints 2k and 2k+1
+  const endpoint = new Int32Array(2 * nedge);
+  for (let k = 0; k < nedge; k++) {
+    endpoint[2 * k] = edges[k][0];
+    endpoint[2 * k + 1] = edges[k][1];
+  }
+
+  // neighbend[v]: remote endpoints of the edges incident to v
+  const neighbend: number[][] = Array.from({ length: nvertex }, () => []);
+  for (let k = 0; k < nedge; k++) {
+    neighbend[edges[k][0]].push(2 * k + 1);
+    neighbend[edges[k][1]].push(2 * k);
+  }
+
+  const mate = new Int32Array(nvertex).fill(-1);
+  const label = new Int32Array(2 * nvertex);
+  const labelend = new Int32Array(2 * nvertex).fill(-1);
+  const inblossom = new Int32Array(nvertex);
+  for (let v = 0; v < nvertex; v++) inblossom[v] = v;
+  const blossomparent = new Int32Array(2 * nvertex).fill(-1);
+  const blossomchilds: Array<number[] | null> = new Array(2 * nvertex).fill(null);
+  const blossombase = new Int32Array(2 * nvertex).fill(-1);
+  for (let v = 0; v < nvertex; v++) blossombase[v] = v;
+  const blossomendps: Array<number[] | null> = new Array(2 * nvertex).fill(null);
+  const bestedge = new Int32Array(2 * nvertex).fill(-1);
+  const blossombestedges: Array<number[] | null> = new Array(2 * nvertex).fill(null);
+  const unusedblossoms: number[] = [];
+  for (let b = nvertex; b < 2 * nvertex; b++) unusedblossoms.push(b);
+  const dualvar = new Float64Array(2 * nvertex);
+  for (let v = 0; v < nvertex; v++) dualvar[v] = maxWeight;
+  const allowedge = new Uint8Array(nedge);
+  let queue: number[] = [];
+
+  // Python-style indexing (negative indices count from the end)
+  const at = (list: number[], index: number) => list[index < 0 ? index + list.length : index];
+
+  const slack = (k: number) => dualvar[edges[k][0]] + dualvar[edges[k][1]] - 2 * edges[k][2];
+
+  const blossomLeaves = (b: number, out: number[] = []): number[] => {
+    if (b < nvertex) {
+      out.push(b);
+    } else {
+      for (const t of blossomchilds[b]!) {
+        if (t < nvertex) out.push(t);
+        else blossomLeaves(t, out);
+      }
+    }
+    return out;
+  };
+
+  const assignLabel = (w: number, t: number, p: number): void => {
+    const b = inblossom[w];
+    label[w] = label[b] = t;
+    labelend[w] = labelend[b] = p;
+    bestedge[w] = bestedge[b] = -1;
+    if (t === 1) {
+      queue.push(...blossomLeaves(b));
+    } else if (t === 2) {
+      const base = blossombase[b];
+      assignLabel(endpoint[mate[base]], 1, mate[base] ^ 1);
+    }
+  };
+
+  const scanBlossom = (vStart: number, wStart: number): number => {
+    let v = vStart;
+    let w = wStart;
+    const path: number[] = [];
+    let base = -1;
+    while (v !== -1 || w !== -1) {
+      let b = inblossom[v];
+      if (label[b] & 4) {
+        base = blossombase[b];
+        break;
+      }
+      path.push(b);
+      label[b] = 5;
+      if (labelend[b] === -1) {
+        v = -1;
+      } else {
+        v = endpoint[labelend[b]];
+        b = inblossom[v];
+        v = endpoint[labelend[b]];
+      }
+      if (w !== -1) {
+        const tmp = v;
+        v = w;
+        w = tmp;
+      }
+    }
+    for (const b of path) label[b] = 1;
+    return base;
+  };
+
+  const addBlossom = (base: number, k: number): void => {
+    let [v, w] = edges[k];
+    const bb = inblossom[base];
+    let bv = inblossom[v];
+    let bw = inblossom[w];
+    const b = unusedblossoms.pop()!;
+    blossombase[b] = base;
+    blossomparent[b] = -1;
+    blossomparent[bb] = b;
+    let path: number[] = [];
+    let endps: number[] = [];
+    while (bv !== bb) {
+      blossomparent[bv] = b;
+      path.push(bv);
+      endps.push(labelend[bv]);
+      v = endpoint[labelend[bv]];
+      bv = inblossom[v];
+    }
+    path.push(bb);
+    path = path.reverse();
+    endps = endps.reverse();
+    endps.push(2 * k);
+    while (bw !== bb) {
+      blossomparent[bw] = b;
+      path.push(bw);
+      endps.push(labelend[bw] ^ 1);
+      w = endpoint[labelend[bw]];
+      bw = inblossom[w];
+    }
+    blossomchilds[b] = path;
+    blossomendps[b] = endps;
+    label[b] = 1;
+    labelend[b] = labelend[bb];
+    dualvar[b] = 0;
+    for (const leaf of blossomLeaves(b)) {
+      if (label[inblossom[leaf]] === 2) queue.push(leaf);
+      inblossom[leaf] = b;
+    }
+
+    const bestedgeto = new Int32Array(2 * nvertex).fill(-1);
+    for (const child of path) {
+      let nblists: number[][];
+      if (blossombestedges[child] === null) {
+        nblists = blossomLeaves(child).map(leaf => neighbend[leaf].map(p => p >> 1));
+      } else {
+        nblists = [blossombestedges[child]!];
+      }
+      for (const nblist of nblists) {
+        for (const edge of nblist) {
+          let j = edges[edge][1];
+          if (inblossom[j] === b) j = edges[edge][0];
+          const bj = inblossom[j];
+          if (bj !== b && label[bj] === 1 && (bestedgeto[bj] === -1 || slack(edge) < slack(bestedgeto[bj]))) {
+            bestedgeto[bj] = edge;
+          }
+        }
+      }
+      blossombestedges[child] = null;
+      bestedge[child] = -1;
+    }
+    const best: number[] = [];
+    for (const edge of bestedgeto) if (edge !== -1) best.push(edge);
+    blossombestedges[b] = best;
+    bestedge[b] = -1;
+    for (const edge of best) {
+      if (bestedge[b] === -1 || slack(edge) < slack(bestedge[b])) bestedge[b] = edge;
+    }
+  };
+
+  const expandBlossom = (b: number, endstage: boolean): void => {
+    const childs = blossomchilds[b]!;
+    for (const s of childs) {
+      blossomparent[s] = -1;
+      if (s < nvertex) {
+        inblossom[s] = s;
+      } else if (endstage && dualvar[s] === 0) {
+        expandBlossom(s, endstage);
+      } else {
+        for (const leaf of blossomLeaves(s)) inblossom[leaf] = s;
+      }
+    }
+
+    if (!endstage && label[b] === 2) {
+      const endps = blossomendps[b]!;
+      const entrychild = inblossom[endpoint[labelend[b] ^ 1]];
+      let j = childs.indexOf(entrychild);
+      let jstep: number;
+      let endptrick: number;
+      if (j & 1) {
+        j -= childs.length;
+        jstep = 1;
+        endptrick = 0;
+      } else {
+        jstep = -1;
+        endptrick = 1;
+      }
+      let p = labelend[b];
+      while (j !== 0) {
+        label[endpoint[p ^ 1]] = 0;
+        label[endpoint[at(endps, j - endptrick) ^ endptrick ^ 1]] = 0;
+        assignLabel(endpoint[p ^ 1], 2, p);
+        allowedge[at(endps, j - endptrick) >> 1] = 1;
+        j += jstep;
+        p = at(endps, j - endptrick) ^ endptrick;
+        allowedge[p >> 1] = 1;
+        j += jstep;
+      }
+      let bv = at(childs, j);
+      label[endpoint[p ^ 1]] = label[bv] = 2;
+      labelend[endpoint[p ^ 1]] = labelend[bv] = p;
+      bestedge[bv] = -1;
+      j += jstep;
+      while (at(childs, j) !== entrychild) {
+        bv = at(childs, j);
+        if (label[bv] === 1) {
+          j += jstep;
+          continue;
+        }
+        let reached = -1;
+        for (const leaf of blossomLeaves(bv)) {
+          if (label[leaf] !== 0) {
+            reached = leaf;
+            break;
+          }
+        }
+        if (reached !== -1) {
+          label[reached] = 0;
+          label[endpoint[mate[blossombase[bv]]]] = 0;
+          assignLabel(reached, 2, labelend[reached]);
+        }
+        j += jstep;
+      }
+    }
+
+    label[b] = labelend[b] = -1;
+    blossomchilds[b] = blossomendps[b] = null;
+    blossombase[b] = -1;
+    blossombestedges[b] = null;
+    bestedge[b] = -1;
+    unusedblossoms.push(b);
+  };
+
+  const augmentBlossom = (b: number, v: number): void => {
+    let t = v;
+    while (blossomparent[t] !== b) t = blossomparent[t];
+    if (t >= nvertex) augmentBlossom(t, v);
+
+    const childs = blossomchilds[b]!;
+    const endps = blossomendps[b]!;
+    const i = childs.indexOf(t);
+    let j = i;
+    let jstep: number;
+    let endptrick: number;
+    if (i & 1) {
+      j -= childs.length;
+      jstep = 1;
+      endptrick = 0;
+    } else {
+      jstep = -1;
+      endptrick = 1;
+    }
+    while (j !== 0) {
+      j += jstep;
+      t = at(childs, j);
+      const p = at(endps, j - endptrick) ^ endptrick;
+      if (t >= nvertex) augmentBlossom(t, endpoint[p]);
+      j += jstep;
+      t = at(childs, j);
+      if (t >= nvertex) augmentBlossom(t, endpoint[p ^ 1]);
+      mate[endpoint[p]] = p ^ 1;
+      mate[endpoint[p ^ 1]] = p;
+    }
+    blossomchilds[b] = childs.slice(i).concat(childs.slice(0, i));
+    blossomendps[b] = endps.slice(i).concat(endps.slice(0, i));
+    blossombase[b] = blossombase[blossomchilds[b]![0]];
+  };
+
+  const augmentMatching = (k: number): void => {
+    const [v, w] = edges[k];
+    for (const [start, startP] of [[v, 2 * k + 1], [w, 2 * k]]) {
+      let s = start;
+      let p = startP;
+      for (;;) {
+        const bs = inblossom[s];
+        if (bs >= nvertex) augmentBlossom(bs, s);
+        mate[s] = p;
+        if (labelend[bs] === -1) break;
+        const t = endpoint[labelend[bs]];
+        const bt = inblossom[t];
+        s = endpoint[labelend[bt]];
+        const j = endpoint[labelend[bt] ^ 1];
+        if (bt >= nvertex) augmentBlossom(bt, j);
+        mate[j] = labelend[bt];
+        p = labelend[bt] ^ 1;
+      }
+    }
+  };
+
+  // Main loop: one augmentation per stage
+  for (let stage = 0; stage < nvertex; stage++) {
+    label.fill(0);
+    bestedge.fill(-1);
+    for (let b = nvertex; b < 2 * nvertex; b++) blossombestedges[b] = null;
+    allowedge.fill(0);
+    queue = [];
+
+    for (let v = 0; v < nvertex; v++) {
+      if (mate[v] === -1 && label[inblossom[v]] === 0) assignLabel(v, 1, -1);
+    }
+
+    let augmented = false;
+    for (;;) {
+      while (queue.length > 0 && !augmented) {
+        const v = queue.pop()!;
+        for (const p of neighbend[v]) {
+          const k = p >> 1;
+          const w = endpoint[p];
+          if (inblossom[v] === inblossom[w]) continue;
+          let kslack = 0;
+          if (!allowedge[k]) {
+            kslack = slack(k);
+            if (kslack <= 0) allowedge[k] = 1;
+          }
+          if (allowedge[k]) {
+            if (label[inblossom[w]] === 0) {
+              assignLabel(w, 2, p ^ 1);
+            } else if (label[inblossom[w]] === 1) {
+              const base = scanBlossom(v, w);
+              if (base >= 0) {
+                addBlossom(base, k);
+              } else {
+                augmentMatching(k);
+                augmented = true;
+                break;
+              }
+            } else if (label[w] === 0) {
+              label[w] = 2;
+              labelend[w] = p ^ 1;
+            }
+          } else if (label[inblossom[w]] === 1) {
+            const b = inblossom[v];
+            if (bestedge[b] === -1 || kslack < slack(bestedge[b])) bestedge[b] = k;
+          } else if (label[w] === 0) {
+            if (bestedge[w] === -1 || kslack < slack(bestedge[w])) bestedge[w] = k;
+          }
+        }
+      }
+
+      if (augmented) break;
+
+      // No augmenting path with the current duals: compute the dual adjustment
+      let deltatype = -1;
+      let delta = 0;
+      let deltaedge = -1;
+      let deltablossom = -1;
+
+      if (!maxCardinality) {
+        deltatype = 1;
+        delta = Infinity;
+        for (let v = 0; v < nvertex; v++) delta = Math.min(delta, dualvar[v]);
+      }
+      for (let v = 0; v < nvertex; v++) {
+        if (label[inblossom[v]] === 0 && bestedge[v] !== -1) {
+          const d = slack(bestedge[v]);
+          if (deltatype === -1 || d < delta) {
+            delta = d;
+            deltatype = 2;
+            deltaedge = bestedge[v];
+          }
+        }
+      }
+      for (let b = 0; b < 2 * nvertex; b++) {
+        if (blossomparent[b] === -1 && label[b] === 1 && bestedge[b] !== -1) {
+          const d = slack(bestedge[b]) / 2;
+          if (deltatype === -1 || d < delta) {
+            delta = d;
+            deltatype = 3;
+            deltaedge = bestedge[b];
+          }
+        }
+      }
+      for (let b = nvertex; b < 2 * nvertex; b++) {
+        if (blossombase[b] >= 0 && blossomparent[b] === -1 && label[b] === 2
+          && (deltatype === -1 || dualvar[b] < delta)) {
+          delta = dualvar[b];
+          deltatype = 4;
+          deltablossom = b;
+        }
+      }
+      if (deltatype === -1) {
+        // No further improvement possible; max-cardinality optimum reached
+        deltatype = 1;
+        delta = Infinity;
+        for (let v = 0; v < nvertex; v++) delta = Math.min(delta, dualvar[v]);
+        delta = Math.max(0, delta);
+      }
+
+      for (let v = 0; v < nvertex; v++) {
+        const l = label[inblossom[v]];
+        if (l === 1) dualvar[v] -= delta;
+        else if (l === 2) dualvar[v] += delta;
+      }
+      for (let b = nvertex; b < 2 * nvertex; b++) {
+        if (blossombase[b] >= 0 && blossomparent[b] === -1) {
+          if (label[b] === 1) dualvar[b] += delta;
+          else if (label[b] === 2) dualvar[b] -= delta;
+        }
+      }
+
+      if (deltatype === 1) {
+        break;
+      } else if (deltatype === 2) {
+        allowedge[deltaedge] = 1;
+        let [i, j] = edges[deltaedge];
+        if (label[inblossom[i]] === 0) i = j;
+        queue.push(i);
+      } else if (deltatype === 3) {
+        allowedge[deltaedge] = 1;
+        queue.push(edges[deltaedge][0]);
+      } else {
+        expandBlossom(deltablossom, false);
+      }
+    }
+
+    if (!augmented) break;
+
+    // End of stage: expand S-blossoms with zero dual
+    for (let b = nvertex; b < 2 * nvertex; b++) {
+      if (blossomparent[b] === -1 && blossombase[b] >= 0 && label[b] === 1 && dualvar[b] === 0) {
+        expandBlossom(b, true);
+      }
+    }
+  }
+
+  const result = new Array<number>(nvertex).fill(-1);
+  for (let v = 0; v < nvertex; v++) {
+    if (mate[v] >= 0) result[v] = endpoint[mate[v]];
+  }
+  return result;
+}
@@ -6,8 +6,11 @@
 
 
 import { randomUUID } from 'crypto';
-import { query } from '../config/database.js';
+import type { PoolConnection, ResultSetHeader } from 'mysql2/promise';
+import { query, withTransaction } from '../config/database.js';
 import discordService from '../services/discordService.js';
+import { updateTournamentTiebreakers, updateTeamTiebreakers } from '../services/statisticsCalculator.js';
+import { pairSwissRound, pairingKey, seedFromString, SwissPlayer } from './swissPairing.js';
 
 interface Participant {
   id: string;
@@ -15,6 +18,114 @@ interface Participant {
   elo_rating?: number;
 }
 
+// Rows per multi-row INSERT / batched UPDATE when a round is written
+const ROUND_WRITE_BATCH_SIZE = 500;
+
+/**
+ * Run a statement on the transaction connection when there is one, otherwise on the pool
+ * (use "?" placeholders). Returns the rows of a SELECT. Reads inside a transaction must go
+ * through its connection to see its uncommitted writes.
+ */
+async function queryOn(connection: PoolConnection | undefined, sql: string, values: any[]): Promise<any[]> {
+  if (connection) {
+    const [rows] = await connection.query(sql, values);
+    return rows as any[];
+  }
+  return (await query(sql, values)).rows;
+}
+
+/**
+ * Series (tournament_round_matches) and game (tournament_matches) rows for the pairings of a round
+ * Computed in memory so the whole round can be written with a few multi-row INSERTs.
+ * Byes (player2_id null) get no rows; their players are returned in byes.
+ */
+function buildRoundMatchRows(
+  pairings: any[],
+  tournamentId: string,
+  roundId: string,
+  bestOf: number,
+  winsRequired: number,
+  matchesScheduled: number
+): { seriesRows: any[][]; matchRows: any[][]; byes: string[] } {
+  const seriesRows: any[][] = [];
+  const matchRows: any[][] = [];
+  const byes: string[] = [];
+
+  for (const pairing of pairings) {
+    if (pairing.is_bye || pairing.player2_id === null) {
+      byes.push(pairing.player1_id);
+      continue;
+    }
+
+    const roundMatchId = randomUUID();
+    seriesRows.push([
+      roundMatchId, tournamentId, roundId, pairing.player1_id, pairing.player2_id,
+      bestOf, winsRequired, 'in_progress', matchesScheduled
+    ]);
+
+    // Initial tournament_matches entries (exactly wins_required matches)
+    // For Bo3: 2 matches (need 2 wins), for Bo5: 3 matches (need 3 wins)
+    for (let i = 0; i < winsRequired; i++) {
+      matchRows.push([
+        randomUUID(), tournamentId, roundId, pairing.player1_id, pairing.player2_id, 'pending', roundMatchId
+      ]);
+    }
+  }
+
+  return { seriesRows, matchRows, byes };
+}
+
+/**
+ * Write series and game rows built by buildRoundMatchRows (series first: games reference them)
+ */
+async function insertRoundMatchRows(
+  connection: PoolConnection,
+  seriesRows: any[][],
+  matchRows: any[][]
+): Promise<void> {
+  for (let offset = 0; offset < seriesRows.length; offset += ROUND_WRITE_BATCH_SIZE) {
+    await connection.query(
+      `INSERT INTO tournament_round_matches
+         (id, tournament_id, round_id, player1_id, player2_id, best_of, wins_required, series_status, matches_scheduled)
+       VALUES ?`,
+      [seriesRows.slice(offset, offset + ROUND_WRITE_BATCH_SIZE)]
+    );
+  }
+  for (let offset = 0; offset < matchRows.length; offset += ROUND_WRITE_BATCH_SIZE) {
+    await connection.query(
+      `INSERT INTO tournament_matches
+         (id, tournament_id, round_id, player1_id, player2_id, match_status, tournament_round_match_id)
+       VALUES ?`,
+      [matchRows.slice(offset, offset + ROUND_WRITE_BATCH_SIZE)]
+    );
+  }
+}
+
+/**
+ * Set tournament_ranking from the position of each row id in rankedIds (batched UPDATE ... JOIN)
+ */
+async function writeRankings(
+  connection: PoolConnection,
+  tableName: 'tournament_participants' | 'tournament_teams',
+  rankedIds: string[]
+): Promise<void> {
+  for (let offset = 0; offset < rankedIds.length; offset += ROUND_WRITE_BATCH_SIZE) {
+    const batch = rankedIds.slice(offset, offset + ROUND_WRITE_BATCH_SIZE);
+    const params: any[] = [];
+    const rowsSql = batch.map((id, position) => {
+      params.push(id, offset + position + 1);
+      return position === 0 ? 'SELECT ? AS id, ? AS ranking' : 'SELECT ?, ?';
+    });
+
+    await connection.query(
+      `UPDATE ${tableName} t
+       JOIN (${rowsSql.join(' UNION ALL ')}) v ON v.id = t.id
+       SET t.tournament_ranking = v.ranking`,
+      params
+    );
+  }
+}
+
 /**
  * Select top players for elimination phase in Swiss-Elimination Mix
  * This function is called before activating the first elimination round
@@ -51,22 +162,10 @@ export async function selectPlayersForEliminationPhase(
     // Calculate tiebreakers FIRST before selecting players
     console.log(`\n🎲 [TIEBREAKERS] Calculating Swiss tiebreakers (OMP, GWP, OGP)...`);
     try {
-      const functionName = tournamentMode === 'team' ? 'update_team_tiebreakers' : 'update_tournament_tiebreakers';
-      console.log(`[DEBUG] Using tiebreaker function: ${functionName}`);
-      const tiebreakersResult = await query(
-        `SELECT updated_count, error_message FROM ${functionName}(?)`,
-        [tournamentId]
-      );
-      
-      if (tiebreakersResult.rows.length > 0) {
-        const { updated_count, error_message } = tiebreakersResult.rows[0];
-        console.log(`[DEBUG] Tiebreaker result - updated: ${updated_count}, error: ${error_message}`);
-        if (error_message) {
-          console.error(`❌ [TIEBREAKERS] Error: ${error_message}`);
-        } else {
-          console.log(`✅ [TIEBREAKERS] Calculated tiebreakers for ${updated_count} ${tournamentMode === 'team' ? 'teams' : 'participants'}`);
-        }
-      }
+      const { updated_count } = tournamentMode === 'team'
+        ? await updateTeamTiebreakers(tournamentId)
+        : await updateTournamentTiebreakers(tournamentId);
+      console.log(`✅ [TIEBREAKERS] Calculated tiebreakers for ${updated_count} ${tournamentMode === 'team' ? 'teams' : 'participants'}`);
     } catch (tiebreakersErr) {
       console.error('[TIEBREAKERS] Error calculating tiebreakers:', tiebreakersErr);
       // Don't fail the tournament if tiebreakers calculation fails
@@ -280,14 +379,19 @@ export async function generateRoundMatches(
       }
     }
 
-    // Insert all matches
-    for (const match of matches) {
-      await query(
-        `INSERT INTO tournament_matches (id, tournament_id, round_id, player1_id, player2_id, match_status)
-         VALUES (?, ?, ?, ?, ?, 'pending')`,
-        [randomUUID(), match.tournament_id, match.round_id, match.player1_id, match.player2_id]
-      );
-    }
+    // Insert all matches (multi-row INSERTs in one transaction)
+    const rows = matches.map(match => [
+      randomUUID(), match.tournament_id, match.round_id, match.player1_id, match.player2_id, 'pending'
+    ]);
+    await withTransaction(async (connection) => {
+      for (let offset = 0; offset < rows.length; offset += ROUND_WRITE_BATCH_SIZE) {
+        await connection.query(
+          `INSERT INTO tournament_matches (id, tournament_id, round_id, player1_id, player2_id, match_status)
+           VALUES ?`,
+          [rows.slice(offset, offset + ROUND_WRITE_BATCH_SIZE)]
+        );
+      }
+    });
 
     return { matches, count: matches.length };
   } catch (error) {
@@ -486,7 +590,8 @@ function generateRoundRobinMatches(
 /**
  * Generates Swiss system matches
  * Pairs players based on their current score and tiebreakers (OMP, GWP, OGP)
- * Avoids re-pairings when possible
+ * Each round is solved as a min-cost perfect matching (see utils/swissPairing.ts):
+ * re-pairings only happen when no other perfect pairing exists
  * For team mode: player_id1/2 contain team_id (Option B architecture)
  */
 async function generateSwissMatches(
@@ -518,14 +623,14 @@ async function generateSwissMatches(
           tt.gwp,
           tt.ogp
          FROM tournament_teams tt
-         WHERE tt.tournament_id = ? AND tt.id = ANY(?)
+         WHERE tt.tournament_id = ? AND tt.id IN (${participants.map(() => '?').join(',')})
          ORDER BY 
            (tt.tournament_wins - tt.tournament_losses) DESC,
            tt.omp DESC,
            tt.gwp DESC,
            tt.ogp DESC,
            tt.team_elo DESC`,
-        [tournamentId, participants.map(p => p.user_id)]
+        [tournamentId, ...participants.map(p => p.user_id)]
       );
     } else {
       // 1v1 mode: get standings from tournament_participants (participants are user_ids)
@@ -540,14 +645,14 @@ async function generateSwissMatches(
           tp.ogp
          FROM tournament_participants tp
          LEFT JOIN users_extension u ON tp.user_id = u.id
-         WHERE tp.tournament_id = ? AND tp.user_id = ANY(?)
+         WHERE tp.tournament_id = ? AND tp.user_id IN (${participants.map(() => '?').join(',')})
          ORDER BY 
            (tp.tournament_wins - tp.tournament_losses) DESC,
            tp.omp DESC,
            tp.gwp DESC,
            tp.ogp DESC,
            u.elo_rating DESC`,
-        [tournamentId, participants.map(p => p.user_id)]
+        [tournamentId, ...participants.map(p => p.user_id)]
       );
     }
 
@@ -559,221 +664,66 @@ async function generateSwissMatches(
       console.log(`  ${label} ${p.user_id}: ${p.tournament_wins}-${p.tournament_losses} (OMP:${p.omp} GWP:${p.gwp} OGP:${p.ogp} ELO:${p.elo_rating})`);
     });
 
-    // Group by score and sort within each group by tiebreakers
-    const scoreGroups: { [key: string]: any[] } = {};
-    standings.forEach(player => {
-      const score = (player.tournament_wins - player.tournament_losses).toString();
-      if (!scoreGroups[score]) {
-        scoreGroups[score] = [];
-      }
-      scoreGroups[score].push(player);
-    });
-
-    // Sort players within each score group by tiebreakers (OMP, GWP, OGP, ELO)
-    Object.keys(scoreGroups).forEach(score => {
-      scoreGroups[score].sort((a, b) => {
-        // Compare OMP (higher is better)
-        if (a.omp !== b.omp) return (b.omp || 0) - (a.omp || 0);
-        // Compare GWP (higher is better)
-        if (a.gwp !== b.gwp) return (b.gwp || 0) - (a.gwp || 0);
-        // Compare OGP (higher is better)
-        if (a.ogp !== b.ogp) return (b.ogp || 0) - (a.ogp || 0);
-        // Compare ELO (higher is better)
-        return (b.elo_rating || 0) - (a.elo_rating || 0);
-      });
-    });
-
-    console.log(`\n[SCORE GROUPS]:`);
-    Object.keys(scoreGroups).sort((a, b) => parseInt(b) - parseInt(a)).forEach(score => {
-      console.log(`  Score ${score}: ${scoreGroups[score].length} players`);
-    });
-
-    // Get history of pairings to avoid re-matches
-    const pairingHistoryResult = await query(
-      `SELECT DISTINCT 
-        LEAST(player1_id, player2_id) as player_a,
-        GREATEST(player1_id, player2_id) as player_b
+    // Pairing history: previous opponents, side (player1/player2 slot) balance and inferred byes.
+    // Byes are not stored as round matches, so a player who is missing from an earlier round is
+    // counted as having had a bye in it.
+    const historyResult = await query(
+      `SELECT round_id, player1_id, player2_id
        FROM tournament_round_matches
        WHERE tournament_id = ? AND player1_id IS NOT NULL AND player2_id IS NOT NULL`,
       [tournamentId]
     );
 
-    const previousPairings = new Set(
-      pairingHistoryResult.rows.map(row => `${row.player_a}|${row.player_b}`)
-    );
-
-    console.log(`\n[PREVIOUS PAIRINGS]: ${previousPairings.size} historical pairings found`);
-
-    // PHASE 1: Pair within each score group, reserve best if odd
-    const paired = new Set<string>();
-    const unpairedByScore: { [score: string]: any[] } = {};
-    const reservedByScore: { [score: string]: any } = {}; // Best player from each odd score group
-    
-    for (const score of Object.keys(scoreGroups).sort((a, b) => parseInt(b) - parseInt(a))) {
-      const group = scoreGroups[score];
-      console.log(`\n[PAIRING GROUP] Score ${score}:`);
-
-      // Get available players in this group
-      const available = group.filter(p => !paired.has(p.user_id));
-      
-      // If odd number of players, reserve the best one for bye (no pairing)
-      let reservedForBye: any = null;
-      let availableToMatch = available;
-      
-      if (available.length % 2 === 1 && available.length > 1) {
-        // Odd group: reserve the best player (index 0, already sorted by tiebreakers DESC) for bye
-        reservedForBye = available[0];
-        availableToMatch = available.slice(1);
-        reservedByScore[score] = reservedForBye;
-        console.log(`  🔄 Odd group of ${available.length}: reserving best player ${reservedForBye.user_id} (ELO:${reservedForBye.elo_rating})`);
-      } else if (available.length % 2 === 1 && available.length === 1) {
-        // Single player in odd group, reserve it
-        reservedForBye = available[0];
-        reservedByScore[score] = reservedForBye;
-        console.log(`  🔄 Single player group: reserving ${reservedForBye.user_id} (ELO:${reservedForBye.elo_rating})`);
-      }
-      
-      // Pair as many as possible within this score group
-      for (let i = 0; i < availableToMatch.length - 1; i++) {
-        if (paired.has(availableToMatch[i].user_id)) continue;
-
-        let paired_with = null;
-
-        // Try to pair with next player without creating a re-match
-        for (let j = i + 1; j < availableToMatch.length; j++) {
-          if (paired.has(availableToMatch[j].user_id)) continue;
-
-          const pairing_key = `${Math.min(availableToMatch[i].user_id, availableToMatch[j].user_id)}|${Math.max(availableToMatch[i].user_id, availableToMatch[j].user_id)}`;
-          
-          if (!previousPairings.has(pairing_key)) {
-            paired_with = availableToMatch[j];
-            console.log(`  ✅ Pair ${availableToMatch[i].user_id} vs ${availableToMatch[j].user_id} (new pairing)`);
-            break;
-          } else {
-            console.log(`  ⚠️  Avoid ${availableToMatch[i].user_id} vs ${availableToMatch[j].user_id} (re-match)`);
-          }
-        }
-
-        // If no new pairing found, use the first available (re-match necessary)
-        if (!paired_with) {
-          for (let j = i + 1; j < availableToMatch.length; j++) {
-            if (!paired.has(availableToMatch[j].user_id)) {
-              paired_with = availableToMatch[j];
-              console.log(`  ⚠️  Pair ${availableToMatch[i].user_id} vs ${availableToMatch[j].user_id} (unavoidable re-match)`);
-              break;
-            }
-          }
-        }
-
-        if (paired_with) {
-          matches.push({
-            tournament_id: tournamentId,
-            round_id: roundId,
-            player1_id: availableToMatch[i].user_id,
-            player2_id: paired_with.user_id,
-          });
-          paired.add(availableToMatch[i].user_id);
-          paired.add(paired_with.user_id);
-        }
-      }
-
-      // Collect remaining unpaired from this score group (excluding reserved)
-      const remainingUnpaired = availableToMatch.filter(p => !paired.has(p.user_id));
-      if (remainingUnpaired.length > 0) {
-        unpairedByScore[score] = remainingUnpaired;
-        console.log(`  ⏸️  Unpaired in this group: ${remainingUnpaired.map(p => `${p.user_id}(ELO:${p.elo_rating})`).join(', ')}`);
-      }
-    }
-
-    // PHASE 2: Try to pair unpaired players from different score groups (excluding reserved)
-    console.log(`\n[CROSS-GROUP PAIRING] Attempting to pair unpaired players from different score groups...`);
-    const scoreList = Object.keys(unpairedByScore).sort((a, b) => parseInt(b) - parseInt(a));
-    
-    for (let s = 0; s < scoreList.length - 1; s++) {
-      const score1 = scoreList[s];
-      const score2 = scoreList[s + 1];
-      const group1 = unpairedByScore[score1].filter(p => !paired.has(p.user_id));
-      const group2 = unpairedByScore[score2].filter(p => !paired.has(p.user_id));
-
-      console.log(`  Trying Score ${score1} vs Score ${score2}: ${group1.length} vs ${group2.length} unpaired`);
-
-      // Pair from score1 with score2
-      for (const player1 of group1) {
-        if (paired.has(player1.user_id)) continue;
-
-        for (const player2 of group2) {
-          if (paired.has(player2.user_id)) continue;
-
-          const pairing_key = `${Math.min(player1.user_id, player2.user_id)}|${Math.max(player1.user_id, player2.user_id)}`;
-          
-          if (!previousPairings.has(pairing_key)) {
-            console.log(`    ✅ Cross-pair ${player1.user_id}(Score ${score1}) vs ${player2.user_id}(Score ${score2}) (new pairing)`);
-            matches.push({
-              tournament_id: tournamentId,
-              round_id: roundId,
-              player1_id: player1.user_id,
-              player2_id: player2.user_id,
-            });
-            paired.add(player1.user_id);
-            paired.add(player2.user_id);
-            break;
-          }
-        }
+    const previousPairings = new Set<string>();
+    const sideBalance = new Map<string, number>();
+    const roundsPlayed = new Map<string, Set<string>>();
+    const previousRounds = new Set<string>();
+    for (const row of historyResult.rows) {
+      previousPairings.add(pairingKey(row.player1_id, row.player2_id));
+      sideBalance.set(row.player1_id, (sideBalance.get(row.player1_id) || 0) + 1);
+      sideBalance.set(row.player2_id, (sideBalance.get(row.player2_id) || 0) - 1);
+      for (const id of [row.player1_id, row.player2_id]) {
+        if (!roundsPlayed.has(id)) roundsPlayed.set(id, new Set());
+        roundsPlayed.get(id)!.add(row.round_id);
       }
+      previousRounds.add(row.round_id);
     }
 
-    // PHASE 3: Handle reserved players - if total reserved is odd, assign bye to best, pair rest
-    const allReserved = Object.values(reservedByScore);
-    console.log(`\n[RESERVED PLAYERS ANALYSIS] Total reserved: ${allReserved.length}`);
-    
-    if (allReserved.length > 0) {
-      // Sort reserved players by tiebreakers (best first)
-      const sortedReserved = [...allReserved].sort((a, b) => {
-        if (a.omp !== b.omp) return (b.omp || 0) - (a.omp || 0);
-        if (a.gwp !== b.gwp) return (b.gwp || 0) - (a.gwp || 0);
-        if (a.ogp !== b.ogp) return (b.ogp || 0) - (a.ogp || 0);
-        return (b.elo_rating || 0) - (a.elo_rating || 0);
-      });
+    console.log(`\n[PREVIOUS PAIRINGS]: ${previousPairings.size} historical pairings found`);
 
-      if (allReserved.length % 2 === 1) {
-        // Odd number of reserved: give bye to best, pair rest
-        const byePlayer = sortedReserved[0];
-        console.log(`\n✅ BYE (from reserved players): ${byePlayer.user_id} (${byePlayer.tournament_wins}-${byePlayer.tournament_losses}, ELO: ${byePlayer.elo_rating})`);
+    // Standings are already ordered by score and tiebreakers (OMP, GWP, OGP, ELO)
+    const swissPlayers: SwissPlayer[] = standings.map(player => ({
+      id: player.user_id,
+      score: (player.tournament_wins || 0) - (player.tournament_losses || 0),
+      sideBalance: sideBalance.get(player.user_id) || 0,
+      byes: Math.max(0, previousRounds.size - (roundsPlayed.get(player.user_id)?.size || 0))
+    }));
+
+    // Deterministic seed per tournament round so pairings can be reproduced and audited
+    const seed = seedFromString(`${tournamentId}:${roundNumber}`);
+    const startedAt = Date.now();
+    const result = pairSwissRound(swissPlayers, previousPairings, seed);
+    console.log(`[SWISS PAIRINGS] Min-cost matching solved in ${Date.now() - startedAt}ms (seed ${seed}, cost ${result.totalCost}, ${result.rematches} unavoidable re-matches)`);
+
+    for (const pairing of result.pairings) {
+      if (pairing.player2Id === null) {
+        console.log(`  ✅ BYE: ${pairing.player1Id}`);
         matches.push({
           tournament_id: tournamentId,
           round_id: roundId,
-          player1_id: byePlayer.user_id,
+          player1_id: pairing.player1Id,
           player2_id: null,
           is_bye: true,
         });
-        paired.add(byePlayer.user_id);
-
-        // Pair the remaining reserved players
-        const remainingReserved = sortedReserved.slice(1);
-        for (let i = 0; i < remainingReserved.length - 1; i += 2) {
-          matches.push({
-            tournament_id: tournamentId,
-            round_id: roundId,
-            player1_id: remainingReserved[i].user_id,
-            player2_id: remainingReserved[i + 1].user_id,
-          });
-          paired.add(remainingReserved[i].user_id);
-          paired.add(remainingReserved[i + 1].user_id);
-          console.log(`  ✅ Pair reserved: ${remainingReserved[i].user_id} vs ${remainingReserved[i + 1].user_id}`);
-        }
       } else {
-        // Even number of reserved: pair them all
-        for (let i = 0; i < sortedReserved.length; i += 2) {
-          matches.push({
-            tournament_id: tournamentId,
-            round_id: roundId,
-            player1_id: sortedReserved[i].user_id,
-            player2_id: sortedReserved[i + 1].user_id,
-          });
-          paired.add(sortedReserved[i].user_id);
-          paired.add(sortedReserved[i + 1].user_id);
-          console.log(`  ✅ Pair reserved: ${sortedReserved[i].user_id} vs ${sortedReserved[i + 1].user_id}`);
-        }
+        const rematch = previousPairings.has(pairingKey(pairing.player1Id, pairing.player2Id));
+        console.log(`  ${rematch ? '⚠️ ' : '✅'} Pair ${pairing.player1Id} vs ${pairing.player2Id}${rematch ? ' (unavoidable re-match)' : ''}`);
+        matches.push({
+          tournament_id: tournamentId,
+          round_id: roundId,
+          player1_id: pairing.player1Id,
+          player2_id: pairing.player2Id,
+        });
       }
     }
 
@@ -893,7 +843,8 @@ function generateLeagueMatchesBerger(
  * - Fetches all tournament rounds
  * - Fetches all participants
  * - For each round, generates Berger-scheduled matches
- * - Inserts all matches into tournament_round_matches table
+ * - Inserts all matches into tournament_round_matches / tournament_matches with multi-row
+ *   INSERTs in one transaction (a failure leaves no partial schedule behind)
  */
 export async function preGenerateLeagueMatches(
   tournamentId: string
@@ -969,8 +920,10 @@ export async function preGenerateLeagueMatches(
       'bo7': 7,
     };
 
-    // Pre-generate matches for all rounds
+    // Compute the complete schedule in memory, then write it in one transaction
     let totalMatchesCreated = 0;
+    const seriesRows: any[][] = [];
+    const matchRows: any[][] = [];
     for (const round of rounds) {
       const roundNumber = round.round_number;
       console.log(`\n[PRE_GENERATE] Generating matches for Round ${roundNumber}...`);
@@ -986,51 +939,18 @@ export async function preGenerateLeagueMatches(
 
       console.log(`[PRE_GENERATE] Generated ${matches.length} pairings for Round ${roundNumber}`);
 
-      // Insert all matches for this round
+      // Bye matches (player2_id is null) get no rows
       const bestOf = formatMap[round.match_format] || 3;
       const winsRequired = Math.ceil(bestOf / 2);
-      
-      for (const match of matches) {
-        const roundMatchId = randomUUID();
-        
-        // Skip insertion for bye matches (player2_id is null)
-        if (match.player2_id !== null) {
-          // Insert into tournament_round_matches
-          await query(
-            `INSERT INTO tournament_round_matches (id, tournament_id, round_id, player1_id, player2_id, best_of, wins_required, series_status)
-             VALUES (?, ?, ?, ?, ?, ?, ?, 'in_progress')`,
-            [
-              roundMatchId,
-              match.tournament_id,
-              match.round_id,
-              match.player1_id,
-              match.player2_id,
-              bestOf,
-              winsRequired
-            ]
-          );
-
-          // Insert individual tournament_matches (one per needed win)
-          for (let i = 0; i < winsRequired; i++) {
-            await query(
-              `INSERT INTO tournament_matches (id, tournament_id, round_id, player1_id, player2_id, match_status, tournament_round_match_id)
-               VALUES (?, ?, ?, ?, ?, 'pending', ?)`,
-              [
-                randomUUID(),
-                match.tournament_id,
-                match.round_id,
-                match.player1_id,
-                match.player2_id,
-                roundMatchId
-              ]
-            );
-          }
-        }
-      }
+      const roundRows = buildRoundMatchRows(matches, tournamentId, round.id, bestOf, winsRequired, 0);
+      seriesRows.push(...roundRows.seriesRows);
+      matchRows.push(...roundRows.matchRows);
 
       totalMatchesCreated += matches.length;
     }
 
+    await withTransaction(connection => insertRoundMatchRows(connection, seriesRows, matchRows));
+
     console.log(`\n[PRE_GENERATE] ✅ Created ${totalMatchesCreated} total round-matches across all rounds`);
     console.log(`${'='.repeat(80)}\n`);
     return true;
@@ -1099,6 +1019,10 @@ function generateLeagueMatches(
 
 /**
  * Activates a round and generates its matches (for first time only)
+ * Everything that decides the round (participants, pairings) is read and computed first; the
+ * round is then written in a single transaction: status, series and games (multi-row INSERTs),
+ * bye points, current_round and rankings. Either the whole round is activated or nothing is,
+ * and of two concurrent activations of the same round only one goes through.
  */
 export async function activateRound(tournamentId: string, roundNumber: number): Promise<boolean> {
   try {
@@ -1106,9 +1030,10 @@ export async function activateRound(tournamentId: string, roundNumber: number):
     console.log(`🎯 [ACTIVATE_ROUND] Starting activation for tournament=${tournamentId}, round_number=${roundNumber}`);
     console.log(`${'='.repeat(80)}`);
     
-    // Get the round with format info
+    // Get the round with format info (and the tournament settings used below)
     const roundResult = await query(
-      `SELECT tr.id, tr.round_status, tr.tournament_id, t.tournament_type, t.total_rounds,
+      `SELECT tr.id, tr.round_status, tr.round_type, tr.tournament_id, t.tournament_type, t.tournament_mode,
+              t.total_rounds, t.general_rounds, t.final_rounds,
               CASE 
                 -- For pure elimination: use general_rounds_format for all except final round
                 WHEN t.tournament_type = 'elimination' 
@@ -1146,17 +1071,12 @@ export async function activateRound(tournamentId: string, roundNumber: number):
       return false;
     }
 
-    // Get tournament info (including tournament_mode for team tournament handling)
-    const tournamentResult = await query(
-      `SELECT tournament_type, tournament_mode FROM tournaments WHERE id = ?`,
-      [tournamentId]
-    );
-
-    if (tournamentResult.rows.length === 0) {
-      throw new Error('Tournament not found');
-    }
-
-    const tournament = tournamentResult.rows[0];
+    const tournament = {
+      tournament_type: round.tournament_type,
+      tournament_mode: round.tournament_mode
+    };
+    const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
+    const roundType = round.round_type?.toLowerCase() || 'general';
 
     // Check if this is transitioning from Swiss to Elimination phase
     if (roundNumber > 1) {
@@ -1166,16 +1086,7 @@ export async function activateRound(tournamentId: string, roundNumber: number):
       console.log(`Tournament ID: ${tournamentId}`);
       console.log(`Round Number: ${roundNumber}`);
       console.log(`Tournament Type: ${tournament.tournament_type}`);
-      
-      const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
-      const roundTypeResult = await query(
-        `SELECT round_type FROM tournament_rounds WHERE id = ?`,
-        [round.id]
-      );
-      const roundType = roundTypeResult.rows[0]?.round_type?.toLowerCase() || 'general';
-      
-      console.log(`Round Type from DB: ${roundTypeResult.rows[0]?.round_type}`);
-      console.log(`Round Type (lowercase): ${roundType}`);
+      console.log(`Round Type: ${roundType}`);
       console.log(`Is elimination phase? ${roundType !== 'general'}`);
       
       // If we're activating the first elimination round in a swiss_elimination tournament,
@@ -1183,18 +1094,13 @@ export async function activateRound(tournamentId: string, roundNumber: number):
       if (tournamentType === 'swiss_elimination' && roundType !== 'general') {
         console.log(`\n✅ [ACTIVATE_ROUND] Detected Swiss-Elimination Mix entering elimination phase`);
         
-        const tournamentInfo = await query(
-          `SELECT general_rounds, final_rounds FROM tournaments WHERE id = ?`,
-          [tournamentId]
-        );
-        const { general_rounds, final_rounds } = tournamentInfo.rows[0];
+        const { general_rounds, final_rounds } = round;
         
         console.log(`General Rounds (Swiss phase): ${general_rounds}`);
         console.log(`Final Rounds (Elimination phase): ${final_rounds}`);
         console.log(`Players to advance: ${Math.pow(2, final_rounds)}`);
         
         // Check if players have already been selected (should have at least some eliminated)
-        console.log(`\n[DEBUG] About to query eliminated players...`);
         const eliminatedCount = await query(
           `SELECT COUNT(*) as count FROM tournament_participants 
            WHERE tournament_id = ? AND status = 'eliminated'`,
@@ -1202,11 +1108,9 @@ export async function activateRound(tournamentId: string, roundNumber: number):
         );
         
         const elimCount = parseInt(eliminatedCount.rows[0].count);
-        console.log(`[DEBUG] elimCount = ${elimCount}, type: ${typeof elimCount}`);
         console.log(`Currently eliminated players: ${elimCount}`);
         
         // If no players are eliminated yet, run the selection
-        console.log(`[DEBUG] Checking condition: elimCount === 0? ${elimCount === 0}`);
         if (elimCount === 0) {
           console.log(`\n⚠️  [ACTIVATE_ROUND] No eliminated players detected. Running selectPlayersForEliminationPhase()...`);
           const selectionResult = await selectPlayersForEliminationPhase(tournamentId, final_rounds);
@@ -1252,42 +1156,20 @@ export async function activateRound(tournamentId: string, roundNumber: number):
       }
     } else {
       // For subsequent rounds, behavior depends on tournament type AND round type
-      const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
-      
-      // Get the round type - must query it since it wasn't in the initial round fetch
-      const roundTypeResult = await query(
-        `SELECT round_type FROM tournament_rounds WHERE id = ?`,
-        [round.id]
-      );
-      const roundType = roundTypeResult.rows[0]?.round_type?.toLowerCase() || 'general';
-      
       console.log(`\n[GET_PARTICIPANTS] Round Type check: "${roundType}" (not 'general'? ${roundType !== 'general'})`);
       
       if (isteamMode) {
         // Team tournament: subsequent rounds
-        if (tournamentType === 'elimination') {
-          // Team elimination: only get active teams, ordered by ranking
-          const teamsResult = await query(
-            `SELECT tt.id as user_id, tt.team_elo as elo_rating, tt.tournament_ranking
-             FROM tournament_teams tt
-             WHERE tt.tournament_id = ? AND tt.status = 'active'
-             ORDER BY tt.tournament_ranking ASC`,
-            [tournamentId]
-          );
-          participants = teamsResult.rows;
-          console.log(`[GET_PARTICIPANTS] Team mode elimination: ${participants.length} active teams (ordered by ranking)`);
-        } else {
-          // Team swiss/league: all active teams, ordered by ranking
-          const teamsResult = await query(
-            `SELECT tt.id as user_id, tt.team_elo as elo_rating, tt.tournament_ranking
-             FROM tournament_teams tt
-             WHERE tt.tournament_id = ? AND tt.status = 'active'
-             ORDER BY tt.tournament_ranking ASC`,
-            [tournamentId]
-          );
-          participants = teamsResult.rows;
-          console.log(`[GET_PARTICIPANTS] Team mode swiss/league: ${participants.length} active teams (ordered by ranking)`);
-        }
+        // Elimination: only active teams; swiss/league: all active teams (both ordered by ranking)
+        const teamsResult = await query(
+          `SELECT tt.id as user_id, tt.team_elo as elo_rating, tt.tournament_ranking
+           FROM tournament_teams tt
+           WHERE tt.tournament_id = ? AND tt.status = 'active'
+           ORDER BY tt.tournament_ranking ASC`,
+          [tournamentId]
+        );
+        participants = teamsResult.rows;
+        console.log(`[GET_PARTICIPANTS] Team mode ${tournamentType === 'elimination' ? 'elimination' : 'swiss/league'}: ${participants.length} active teams (ordered by ranking)`);
       } else if (tournamentType === 'elimination') {
         // 1v1 Elimination: only get non-eliminated participants (status = 'active')
         const participantsResult = await query(
@@ -1347,10 +1229,9 @@ export async function activateRound(tournamentId: string, roundNumber: number):
     console.log(`[ACTIVATE_ROUND] Retrieved ${participants.length} participants for round ${roundNumber}`);
     console.log(`[ACTIVATE_ROUND] Best Of format: ${bestOf} (wins required: ${winsRequired})`);
 
-    const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
-
     // For league tournaments, all matches are pre-generated during tournament preparation
     // Just change the status to in_progress
+    let roundRows: ReturnType<typeof buildRoundMatchRows> = { seriesRows: [], matchRows: [], byes: [] };
     if (tournamentType === 'league') {
       console.log(`[ACTIVATE_ROUND] League tournament: skipping match generation (pre-generated during preparation)`);
       console.log(`[ACTIVATE_ROUND] Simply marking round as in_progress...`);
@@ -1358,136 +1239,86 @@ export async function activateRound(tournamentId: string, roundNumber: number):
       // Non-league tournaments: generate matches on-demand
 
       // Generate pairings based on round number and tournament type
-          let pairings;
-          if (roundNumber === 1) {
-            // First round: pair all participants
-            pairings = generateFirstRoundMatches(participants, tournamentId, round.id, tournament.tournament_mode);
-          } else {
-            // Subsequent rounds: depends on tournament type AND round type
-            const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
-      
-            // Get the round type to determine if we're in final phase
-            const roundTypeResult = await query(
-              `SELECT round_type FROM tournament_rounds WHERE id = ?`,
-              [round.id]
-            );
-            const roundType = roundTypeResult.rows[0]?.round_type?.toLowerCase() || 'general';
-      
-            console.log(`\n[GENERATE_PAIRINGS] Round ${roundNumber}:`);
-            console.log(`  Tournament Type: ${tournamentType}`);
-            console.log(`  Round Type: ${roundType}`);
-            console.log(`  Participants: ${participants.length}`);
-      
-            if (tournamentType === 'elimination') {
-              // Elimination: pair winners from previous round
-              console.log(`  → Using ELIMINATION pairings`);
-              pairings = generateEliminationMatches(participants, tournamentId, round.id, tournament.tournament_mode);
-            } else if (tournamentType === 'swiss_elimination' && roundType !== 'general') {
-              // Swiss-Elimination Mix in final phase (not Swiss): use elimination pairings with Swiss seeding
-              console.log(`  → Using ELIMINATION pairings with Swiss seeding (Swiss-Elimination final phase)`);
-              pairings = generateEliminationMatches(participants, tournamentId, round.id, tournament.tournament_mode, true);
-            } else if (tournamentType === 'swiss' || tournamentType === 'swiss_elimination') {
-              // Swiss: use Swiss pairing system for all participants still in tournament
-              console.log(`  → Using SWISS pairings`);
-              pairings = await generateSwissMatches(participants, tournamentId, round.id, roundNumber, tournament.tournament_mode);
-            } else {
-              // League: all participants play each other using Berger algorithm
-              console.log(`  → Using LEAGUE pairings (Berger round-robin algorithm)`);
-              pairings = generateLeagueMatchesBerger(participants, tournamentId, round.id, roundNumber, tournament.tournament_mode);
-            }
-      
-            console.log(`  Generated ${pairings.length} total pairings`);
-            const byeCount = pairings.filter(p => p.is_bye || p.player2_id === null).length;
-            const matchCount = pairings.length - byeCount;
-            console.log(`  → ${matchCount} actual matches, ${byeCount} byes`);
-          }
-
-          console.log(`[ACTIVATE_ROUND] Processing ${pairings.length} pairings...`);
-          let matchesCreated = 0;
-          let byesProcessed = 0;
+      let pairings;
+      if (roundNumber === 1) {
+        // First round: pair all participants
+        pairings = generateFirstRoundMatches(participants, tournamentId, round.id, tournament.tournament_mode);
+      } else {
+        // Subsequent rounds: depends on tournament type AND round type
+        console.log(`\n[GENERATE_PAIRINGS] Round ${roundNumber}:`);
+        console.log(`  Tournament Type: ${tournamentType}`);
+        console.log(`  Round Type: ${roundType}`);
+        console.log(`  Participants: ${participants.length}`);
 
-          for (const pairing of pairings) {
-           // Handle bye (automatic advancement for odd player count)
-            if (pairing.is_bye || pairing.player2_id === null) {
-              console.log(`✅ BYE: ${tournament.tournament_mode === 'team' ? 'Team' : 'Player'} ${pairing.player1_id} advances automatically to next round`);
-              byesProcessed++;
-        
-              // In League tournaments, byes don't award points (all teams play same number of matches)
-              // In Swiss/Swiss-Elimination, byes award 1 point (automatic win)
-              const tournamentType = tournament.tournament_type?.toLowerCase() || 'elimination';
-              const shouldAwardPointsForBye = tournamentType !== 'league';
-        
-              // Register automatic win for bye player (unless it's a league tournament)
-              if (shouldAwardPointsForBye) {
-                if (isteamMode) {
-                  await query(
-                    `UPDATE tournament_teams 
-                     SET tournament_wins = COALESCE(tournament_wins, 0) + 1,
-                         tournament_points = COALESCE(tournament_points, 0) + 1
-                     WHERE tournament_id = ? AND id = ?`,
-                    [tournamentId, pairing.player1_id]
-                  );
-                  console.log(`  → Team ${pairing.player1_id}: +1 win, +1 point`);
-                } else {
-                  await query(
-                    `UPDATE tournament_participants 
-                     SET tournament_wins = COALESCE(tournament_wins, 0) + 1,
-                         tournament_points = COALESCE(tournament_points, 0) + 1
-                     WHERE tournament_id = ? AND user_id = ?`,
-                    [tournamentId, pairing.player1_id]
-                  );
-                  console.log(`  → Player ${pairing.player1_id}: +1 win, +1 point`);
-                }
-              } else {
-                console.log(`  → League tournament: No automatic points awarded for bye`);
-              }
-              continue;
-            }
+        if (tournamentType === 'elimination') {
+          // Elimination: pair winners from previous round
+          console.log(`  → Using ELIMINATION pairings`);
+          pairings = generateEliminationMatches(participants, tournamentId, round.id, tournament.tournament_mode);
+        } else if (tournamentType === 'swiss_elimination' && roundType !== 'general') {
+          // Swiss-Elimination Mix in final phase (not Swiss): use elimination pairings with Swiss seeding
+          console.log(`  → Using ELIMINATION pairings with Swiss seeding (Swiss-Elimination final phase)`);
+          pairings = generateEliminationMatches(participants, tournamentId, round.id, tournament.tournament_mode, true);
+        } else if (tournamentType === 'swiss' || tournamentType === 'swiss_elimination') {
+          // Swiss: use Swiss pairing system for all participants still in tournament
+          console.log(`  → Using SWISS pairings`);
+          pairings = await generateSwissMatches(participants, tournamentId, round.id, roundNumber, tournament.tournament_mode);
+        } else {
+          // League: all participants play each other using Berger algorithm
+          console.log(`  → Using LEAGUE pairings (Berger round-robin algorithm)`);
+          pairings = generateLeagueMatchesBerger(participants, tournamentId, round.id, roundNumber, tournament.tournament_mode);
+        }
 
-            // Create tournament_round_matches entry
-            const roundMatchId = randomUUID();
-            await query(
-              `INSERT INTO tournament_round_matches 
-               (id, tournament_id, round_id, player1_id, player2_id, best_of, wins_required, series_status, matches_scheduled)
-               VALUES (?, ?, ?, ?, ?, ?, ?, 'in_progress', ?)`,
-              [roundMatchId, tournamentId, round.id, pairing.player1_id, pairing.player2_id, bestOf, winsRequired, winsRequired]
-            );
+        console.log(`  Generated ${pairings.length} total pairings`);
+      }
 
-            // Create initial tournament_matches entries (exactly wins_required matches)
-            // For Bo3: 2 matches (need 2 wins), for Bo5: 3 matches (need 3 wins)
-            const matchesToCreate = winsRequired;
-            for (let i = 0; i < matchesToCreate; i++) {
-              await query(
-                `INSERT INTO tournament_matches 
-                 (id, tournament_id, round_id, player1_id, player2_id, match_status, tournament_round_match_id)
-                 VALUES (?, ?, ?, ?, ?, 'pending', ?)`,
-                [randomUUID(), tournamentId, round.id, pairing.player1_id, pairing.player2_id, roundMatchId]
-              );
-            }
+      roundRows = buildRoundMatchRows(pairings, tournamentId, round.id, bestOf, winsRequired, winsRequired);
+      for (const byeId of roundRows.byes) {
+        console.log(`✅ BYE: ${isteamMode ? 'Team' : 'Player'} ${byeId} advances automatically to next round (+1 win, +1 point)`);
+      }
+      console.log(`[ACTIVATE_ROUND] Prepared ${roundRows.seriesRows.length} series (${roundRows.matchRows.length} matches, Bo${bestOf}, ${winsRequired} wins required), ${roundRows.byes.length} byes`);
+    }
 
-            console.log(`Created ${matchesToCreate} initial matches for round_match ${roundMatchId} (Bo${bestOf}, needs ${winsRequired} wins)`);
-            matchesCreated++;
-          }
+    const activated = await withTransaction(async (connection) => {
+      // Claim the round first: a concurrent activation finds it no longer pending and writes nothing
+      const [claim] = await connection.query(
+        `UPDATE tournament_rounds 
+         SET round_status = 'in_progress', round_start_date = NOW()
+         WHERE id = ? AND round_status = 'pending'`,
+        [round.id]
+      );
+      if ((claim as ResultSetHeader).affectedRows === 0) {
+        return false;
+      }
 
-          console.log(`[ACTIVATE_ROUND] Summary: Created ${matchesCreated} series, ${byesProcessed} byes`);
-    }
+      await insertRoundMatchRows(connection, roundRows.seriesRows, roundRows.matchRows);
+
+      // Byes are only generated for Swiss/Swiss-Elimination/Elimination rounds, where a bye
+      // counts as an automatic win (league rounds are pre-generated and award nothing for a bye)
+      if (roundRows.byes.length > 0) {
+        await connection.query(
+          `UPDATE ${isteamMode ? 'tournament_teams' : 'tournament_participants'}
+           SET tournament_wins = COALESCE(tournament_wins, 0) + 1,
+               tournament_points = COALESCE(tournament_points, 0) + 1
+           WHERE tournament_id = ? AND ${isteamMode ? 'id' : 'user_id'} IN (?)`,
+          [tournamentId, roundRows.byes]
+        );
+      }
 
-    // Update round status to in_progress
-    await query(
-      `UPDATE tournament_rounds 
-       SET round_status = 'in_progress', round_start_date = NOW()
-       WHERE id = ?`,
-      [round.id]
-    );
+      // Update current_round and recalculate rankings based on tournament mode
+      if (isteamMode) {
+        await updateTeamCurrentRound(tournamentId, roundNumber, connection);
+        await recalculateTeamRankingsForTournament(tournamentId, connection);
+      } else {
+        // 1v1 mode
+        await updateParticipantCurrentRound(tournamentId, roundNumber, connection);
+        await recalculateParticipantRankings(tournamentId, connection);
+      }
+      return true;
+    });
 
-    // Update current_round and recalculate rankings based on tournament mode
-    if (isteamMode) {
-      await updateTeamCurrentRound(tournamentId, roundNumber);
-      await recalculateTeamRankingsForTournament(tournamentId);
-    } else {
-      // 1v1 mode
-      await updateParticipantCurrentRound(tournamentId, roundNumber);
-      await recalculateParticipantRankings(tournamentId);
+    if (!activated) {
+      console.warn(`Round ${roundNumber} was activated concurrently, nothing written`);
+      return false;
     }
 
     // Summary logged in else block for non-league, league tournaments skip match generation
@@ -1526,68 +1357,65 @@ export async function isRoundComplete(roundId: string): Promise<boolean> {
 
 /**
  * Marks a round as complete and advances to next round
+ * Completing the round and (after the last round) finishing the tournament are written in one
+ * transaction; the next round is activated afterwards in its own (see activateRound).
  */
 export async function completeRound(roundId: string, tournamentId: string): Promise<void> {
   try {
-    // Get current round number
+    // Current round number, whether there is a next round and the tournament settings in one read
     const roundResult = await query(
-      `SELECT round_number FROM tournament_rounds WHERE id = ?`,
-      [roundId]
+      `SELECT tr.round_number, t.auto_advance_round, t.name, t.discord_thread_id,
+              EXISTS (
+                SELECT 1 FROM tournament_rounds nr
+                WHERE nr.tournament_id = tr.tournament_id AND nr.round_number = tr.round_number + 1
+              ) AS has_next_round
+       FROM tournament_rounds tr
+       JOIN tournaments t ON t.id = ?
+       WHERE tr.id = ?`,
+      [tournamentId, roundId]
     );
 
     if (roundResult.rows.length === 0) {
       throw new Error('Round not found');
     }
 
-    const currentRoundNumber = roundResult.rows[0].round_number;
+    const { round_number: currentRoundNumber, auto_advance_round, name, discord_thread_id } = roundResult.rows[0];
+    const hasNextRound = !!Number(roundResult.rows[0].has_next_round);
 
-    // Update current round status
-    await query(
-      `UPDATE tournament_rounds 
-       SET round_status = 'completed', round_end_date = NOW()
-       WHERE id = ?`,
-      [roundId]
-    );
+    await withTransaction(async (connection) => {
+      // Update current round status
+      await connection.query(
+        `UPDATE tournament_rounds 
+         SET round_status = 'completed', round_end_date = NOW()
+         WHERE id = ?`,
+        [roundId]
+      );
 
-    // Check if there are more rounds
-    const nextRoundResult = await query(
-      `SELECT id FROM tournament_rounds 
-       WHERE tournament_id = ? AND round_number = ?`,
-      [tournamentId, currentRoundNumber + 1]
-    );
+      if (!hasNextRound) {
+        // No more rounds, tournament is finished
+        await connection.query(
+          `UPDATE tournaments SET status = 'finished', finished_at = NOW() WHERE id = ?`,
+          [tournamentId]
+        );
+      }
+    });
 
-    if (nextRoundResult.rows.length > 0) {
+    if (hasNextRound) {
       // Activate next round automatically if auto_advance_round is true
-      const tournamentResult = await query(
-        `SELECT auto_advance_round FROM tournaments WHERE id = ?`,
-        [tournamentId]
-      );
-
-      if (tournamentResult.rows[0].auto_advance_round) {
+      if (auto_advance_round) {
         await activateRound(tournamentId, currentRoundNumber + 1);
       }
     } else {
-      // No more rounds, tournament is finished
-      await query(
-        `UPDATE tournaments SET status = 'finished', finished_at = NOW() WHERE id = ?`,
-        [tournamentId]
-      );
-
       // Notify Discord of tournament finish
       try {
-        const tournamentResult = await query(
-          `SELECT name, discord_thread_id FROM tournaments WHERE id = ?`,
-          [tournamentId]
-        );
-
-        if (tournamentResult.rows.length > 0 && tournamentResult.rows[0].discord_thread_id) {
+        if (discord_thread_id) {
           // Get winner and runner-up based on tournament type
           const { winner, runnerUp } = await getWinnerAndRunnerUp(tournamentId);
 
           if (winner) {
             await discordService.postTournamentFinished(
-              tournamentResult.rows[0].discord_thread_id,
-              tournamentResult.rows[0].name,
+              discord_thread_id,
+              name,
               winner.nickname || 'Unknown',
               runnerUp ? runnerUp.nickname : 'N/A'
             );
@@ -1854,20 +1682,10 @@ export async function checkAndCompleteRound(tournamentId: string, roundNumber: n
         // This ensures rankings are properly ordered by OMP/GWP/OGP for correct winner selection
         console.log(`\n🎲 [TIEBREAKERS] Calculating tournament tiebreakers (OMP, GWP, OGP) BEFORE finishing...`);
         try {
-          const functionName = tournMode === 'team' ? 'update_team_tiebreakers' : 'update_tournament_tiebreakers';
-          const tiebreakersResult = await query(
-            `SELECT updated_count, error_message FROM ${functionName}(?)`,
-            [tournamentId]
-          );
-          
-          if (tiebreakersResult.rows.length > 0) {
-            const { updated_count, error_message } = tiebreakersResult.rows[0];
-            if (error_message) {
-              console.error(`❌ [TIEBREAKERS] Error: ${error_message}`);
-            } else {
-              console.log(`✅ [TIEBREAKERS] Calculated tiebreakers for ${updated_count} ${tournMode === 'team' ? 'teams' : 'participants'}`);
-            }
-          }
+          const { updated_count } = tournMode === 'team'
+            ? await updateTeamTiebreakers(tournamentId)
+            : await updateTournamentTiebreakers(tournamentId);
+          console.log(`✅ [TIEBREAKERS] Calculated tiebreakers for ${updated_count} ${tournMode === 'team' ? 'teams' : 'participants'}`);
         } catch (tiebreakersErr) {
           console.error('[TIEBREAKERS] Error calculating tiebreakers:', tiebreakersErr);
           // Don't fail the tournament finish if tiebreakers calculation fails
@@ -1975,20 +1793,26 @@ export async function recalculateTeamRankings(tournamentId: string): Promise<voi
  * For round 1: all participants start at round 1
  * For subsequent rounds: only active participants advance, eliminated stay at elimination round
  */
-export async function updateParticipantCurrentRound(tournamentId: string, roundNumber: number): Promise<void> {
+export async function updateParticipantCurrentRound(
+  tournamentId: string,
+  roundNumber: number,
+  connection?: PoolConnection
+): Promise<void> {
   try {
     console.log(`\n🔄 [PARTICIPANT_ROUND] Updating current_round to ${roundNumber} for tournament ${tournamentId}`);
 
     if (roundNumber === 1) {
       // For round 1, all participants start in round 1
-      await query(
+      await queryOn(
+        connection,
         `UPDATE tournament_participants SET current_round = ? WHERE tournament_id = ?`,
         [roundNumber, tournamentId]
       );
       console.log(`✅ All participants set to current_round = ${roundNumber}`);
     } else {
       // Only update active participants (eliminated ones stay at their elimination round)
-      await query(
+      await queryOn(
+        connection,
         `UPDATE tournament_participants SET current_round = ? WHERE tournament_id = ? AND status = 'active'`,
         [roundNumber, tournamentId]
       );
@@ -2004,21 +1828,27 @@ export async function updateParticipantCurrentRound(tournamentId: string, roundN
  * Update current_round for team when advancing to next round
  * Called when a new round is activated
  */
-export async function updateTeamCurrentRound(tournamentId: string, roundNumber: number): Promise<void> {
+export async function updateTeamCurrentRound(
+  tournamentId: string,
+  roundNumber: number,
+  connection?: PoolConnection
+): Promise<void> {
   try {
     console.log(`\n🔄 [TEAM_ROUND] Updating current_round to ${roundNumber} for tournament ${tournamentId}`);
 
     // For round 1, all teams start in round 1
     // For subsequent rounds, only active teams are updated
     if (roundNumber === 1) {
-      await query(
+      await queryOn(
+        connection,
         `UPDATE tournament_teams SET current_round = ? WHERE tournament_id = ?`,
         [roundNumber, tournamentId]
       );
       console.log(`✅ All teams set to current_round = ${roundNumber}`);
     } else {
       // Only update active teams (eliminated teams stay at their elimination round)
-      await query(
+      await queryOn(
+        connection,
         `UPDATE tournament_teams SET current_round = ? WHERE tournament_id = ? AND status = 'active'`,
         [roundNumber, tournamentId]
       );
@@ -2193,30 +2023,32 @@ export async function getWinnerAndRunnerUp(
  * Check if tournament is currently in elimination phase
  * Used to determine ranking logic (elimination vs swiss/league)
  */
-export async function isInEliminationPhase(tournamentId: string): Promise<boolean> {
+export async function isInEliminationPhase(tournamentId: string, connection?: PoolConnection): Promise<boolean> {
   try {
     // Check for active rounds in elimination phase
-    const activeElimResult = await query(
+    const activeElimRows = await queryOn(
+      connection,
       `SELECT COUNT(*) as count FROM tournament_rounds 
        WHERE tournament_id = ? AND round_status = 'in_progress' 
        AND round_classification IN ('semifinal', 'final')`,
       [tournamentId]
     );
 
-    if (parseInt(activeElimResult.rows[0].count) > 0) {
+    if (parseInt(activeElimRows[0].count) > 0) {
       return true;
     }
 
     // Check if latest completed round is in elimination phase
-    const latestRoundResult = await query(
+    const latestRoundRows = await queryOn(
+      connection,
       `SELECT round_classification FROM tournament_rounds 
        WHERE tournament_id = ? AND round_status = 'completed'
        ORDER BY round_number DESC LIMIT 1`,
       [tournamentId]
     );
 
-    if (latestRoundResult.rows.length > 0) {
-      return ['semifinal', 'final'].includes(latestRoundResult.rows[0].round_classification);
+    if (latestRoundRows.length > 0) {
+      return ['semifinal', 'final'].includes(latestRoundRows[0].round_classification);
     }
 
     return false;
@@ -2233,18 +2065,19 @@ export async function isInEliminationPhase(tournamentId: string): Promise<boolea
  * - Swiss/League phase: by statistics (tournament_points, omp, gwp, ogp)
  * Updates tournament_ranking column for UI display and includes both active and eliminated
  */
-export async function recalculateParticipantRankings(tournamentId: string): Promise<void> {
+export async function recalculateParticipantRankings(tournamentId: string, connection?: PoolConnection): Promise<void> {
   try {
     console.log(`\n📊 [RECALC_RANKINGS_1V1] Recalculating rankings for 1v1 tournament ${tournamentId}`);
 
-    const isElimination = await isInEliminationPhase(tournamentId);
+    const isElimination = await isInEliminationPhase(tournamentId, connection);
     console.log(`   Phase: ${isElimination ? 'ELIMINATION' : 'SWISS/LEAGUE'}`);
 
-    let participantsResult;
+    let participants;
 
     if (isElimination) {
       // Elimination phase: active participants first, then by current_round desc, then by stats, then by ELO
-      participantsResult = await query(
+      participants = await queryOn(
+        connection,
         `SELECT 
           tp.id,
           tp.status,
@@ -2271,7 +2104,8 @@ export async function recalculateParticipantRankings(tournamentId: string): Prom
       console.log(`   Sorting by: status (active first) → current_round DESC → statistics → ELO DESC`);
     } else {
       // Swiss/League phase: by statistics only, then by ELO as tiebreaker
-      participantsResult = await query(
+      participants = await queryOn(
+        connection,
         `SELECT 
           tp.id,
           tp.status,
@@ -2296,16 +2130,15 @@ export async function recalculateParticipantRankings(tournamentId: string): Prom
       console.log(`   Sorting by: statistics (points → omp → gwp → ogp) → ELO DESC`);
     }
 
-    const participants = participantsResult.rows;
     console.log(`   Found ${participants.length} participants for ranking`);
 
-    // Update ranking for each participant
+    // Update ranking for each participant (batched)
+    const rankedIds = participants.map((participant: any) => participant.id);
+    await (connection
+      ? writeRankings(connection, 'tournament_participants', rankedIds)
+      : withTransaction(conn => writeRankings(conn, 'tournament_participants', rankedIds)));
     for (let i = 0; i < participants.length; i++) {
       const ranking = i + 1;
-      await query(
-        `UPDATE tournament_participants SET tournament_ranking = ? WHERE id = ?`,
-        [ranking, participants[i].id]
-      );
       console.log(`   ${participants[i].nickname}: Rank #${ranking} (${participants[i].status}, Round ${participants[i].current_round}, ${participants[i].tournament_points}pts, ELO: ${participants[i].elo_rating})`);
     }
 
@@ -2323,18 +2156,19 @@ export async function recalculateParticipantRankings(tournamentId: string): Prom
  * - Swiss/League phase: by statistics (tournament_points, omp, gwp, ogp)
  * Updates tournament_ranking column for UI display and includes both active and eliminated
  */
-export async function recalculateTeamRankingsForTournament(tournamentId: string): Promise<void> {
+export async function recalculateTeamRankingsForTournament(tournamentId: string, connection?: PoolConnection): Promise<void> {
   try {
     console.log(`\n📊 [RECALC_RANKINGS_TEAM] Recalculating rankings for team tournament ${tournamentId}`);
 
-    const isElimination = await isInEliminationPhase(tournamentId);
+    const isElimination = await isInEliminationPhase(tournamentId, connection);
     console.log(`   Phase: ${isElimination ? 'ELIMINATION' : 'SWISS/LEAGUE'}`);
 
-    let teamsResult;
+    let teams;
 
     if (isElimination) {
       // Elimination phase: active teams first, then by current_round desc, then by stats
-      teamsResult = await query(
+      teams = await queryOn(
+        connection,
         `SELECT 
           tt.id,
           tt.name,
@@ -2363,7 +2197,8 @@ export async function recalculateTeamRankingsForTournament(tournamentId: string)
       console.log(`   Sorting by: status (active first) → current_round DESC → statistics → team ELO sum DESC`);
     } else {
       // Swiss/League phase: by statistics only, then by team ELO sum as tiebreaker
-      teamsResult = await query(
+      teams = await queryOn(
+        connection,
         `SELECT 
           tt.id,
           tt.name,
@@ -2390,16 +2225,15 @@ export async function recalculateTeamRankingsForTournament(tournamentId: string)
       console.log(`   Sorting by: statistics (points → omp → gwp → ogp) → team ELO sum DESC`);
     }
 
-    const teams = teamsResult.rows;
     console.log(`   Found ${teams.length} teams for ranking`);
 
-    // Update ranking for each team
+    // Update ranking for each team (batched)
+    const rankedIds = teams.map((team: any) => team.id);
+    await (connection
+      ? writeRankings(connection, 'tournament_teams', rankedIds)
+      : withTransaction(conn => writeRankings(conn, 'tournament_teams', rankedIds)));
     for (let i = 0; i < teams.length; i++) {
       const ranking = i + 1;
-      await query(
-        `UPDATE tournament_teams SET tournament_ranking = ? WHERE id = ?`,
-        [ranking, teams[i].id]
-      );
       console.log(`   ${teams[i].name}: Rank #${ranking} (${teams[i].status}, Round ${teams[i].current_round}, ${teams[i].tournament_points}pts, Team ELO sum: ${teams[i].team_total_elo})`);
     }
 
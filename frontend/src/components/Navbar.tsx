@@ -4,6 +4,7 @@ import { Link, useNavigate } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { useAuthStore } from '../store/authStore';
 import { userService } from '../services/api';
+import { getNotificationStreamUrl } from '../services/notificationService';
 
 const Navbar: React.FC = () => {
   const { t, i18n } = useTranslation();
@@ -92,12 +93,36 @@ const Navbar: React.FC = () => {
         }
       };
 
-      loadUnreadCount();
       loadRecentNotifications();
 
-      // Refresh unread count every 30 seconds
-      const interval = setInterval(loadUnreadCount, 30000);
-      return () => clearInterval(interval);
+      // Live unread count: the stream sends it on (re)connect and whenever it changes
+      let stream: EventSource | null = null;
+      if (typeof EventSource !== 'undefined') {
+        const token = localStorage.getItem('token');
+        stream = new EventSource(getNotificationStreamUrl(token));
+        stream.addEventListener('unread', (event) => {
+          const data = JSON.parse((event as MessageEvent).data);
+          setUnreadCount(data.unreadCount || 0);
+        });
+        stream.addEventListener('notification', (event) => {
+          const data = JSON.parse((event as MessageEvent).data);
+          setUnreadCount(data.unreadCount || 0);
+          loadRecentNotifications();
+        });
+      } else {
+        loadUnreadCount();
+      }
+
+      // Poll every 30 seconds only while the stream is not connected
+      const interval = setInterval(() => {
+        if (!stream || stream.readyState !== EventSource.OPEN) {
+          loadUnreadCount();
+        }
+      }, 30000);
+      return () => {
+        clearInterval(interval);
+        stream?.close();
+      };
     }
   }, [isAuthenticated]);
 
@@ -92,3 +92,10 @@ export async function markAllAsRead(): Promise<boolean> {
     return false;
   }
 }
+
+/**
+ * URL of the notification event stream (EventSource cannot send headers, so the token goes in the query)
+ */
+export function getNotificationStreamUrl(token: string | null): string {
+  return `${API_BASE}/notifications/stream?token=${encodeURIComponent(token || '')}`;
+}
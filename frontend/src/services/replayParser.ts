@@ -120,32 +120,22 @@ export async function parseReplayFile(file: File): Promise<ReplayData> {
       const token = localStorage.getItem('token') || '';
       console.log('[REPLAY] Token available:', !!token);
       
-      // Convert file to base64 for JSON transmission (avoids multipart/form-data issues)
-      const arrayBuffer = await file.arrayBuffer();
-      const bytes = new Uint8Array(arrayBuffer);
-      let binaryString = '';
-      for (let i = 0; i < bytes.byteLength; i++) {
-        binaryString += String.fromCharCode(bytes[i]);
-      }
-      const fileData = btoa(binaryString);
-      
       // Determine backend URL from environment
       const apiBase = import.meta.env.VITE_API_URL
         ? (import.meta.env.VITE_API_URL.endsWith('/api') ? import.meta.env.VITE_API_URL : `${import.meta.env.VITE_API_URL}/api`)
         : '/api';
-      const backendUrl = `${apiBase}/matches/preview-replay-base64`;
+      const backendUrl = `${apiBase}/matches/preview-replay-stream?fileName=${encodeURIComponent(file.name)}`;
       console.log('[REPLAY] Sending BZ2 request to', backendUrl);
       
+      // Send the raw file as the request body (no base64 inflation, no multipart/form-data);
+      // the backend parses it while it uploads
       const response = await fetch(backendUrl, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
+          'Content-Type': 'application/octet-stream',
           'Authorization': `Bearer ${token}`,
         },
-        body: JSON.stringify({
-          fileData,
-          fileName: file.name,
-        }),
+        body: file,
       });
       
       console.log('[REPLAY] Response status:', response.status, response.statusText);